@@ -15,29 +15,34 @@ import requests
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from redhat_ldap_mcp.core.ldap_connector import LDAPConnector
-from redhat_ldap_mcp.config.models import Config
+from redhat_ldap_mcp.config.loader import load_config
+from redhat_ldap_mcp.tools.people_search import PeopleSearchTool  # noqa: E402
 
 class LDAPDataCollector:
     """Collects and processes LDAP data for analytics"""
 
     def __init__(self, config_path: str = "config/my-ldap.json"):
         """Initialize the data collector"""
-        self.config = Config.from_file(config_path)
-        self.ldap_client = LDAPConnector(self.config.ldap)
+        self.config = load_config(config_path)
+        self.ldap_client = LDAPConnector(
+            self.config.ldap, self.config.security, self.config.performance
+        )
+        self.people_tool = PeopleSearchTool(self.ldap_client)
         self.data_cache = {}
         self.last_refresh = None
 
     def collect_all_people(self) -> pd.DataFrame:
         """Collect comprehensive data about all people in the organization"""
         try:
-            # Search for all people
-            search_results = self.ldap_client.search_people("*", limit=5000)
-
+            # Stream one paged sweep of all people; each page is normalized
+            # and dropped before the next one is fetched
             people_data = []
-            for person in search_results:
-                person_details = self.ldap_client.get_person_details(person.get('uid', ''))
-                if person_details:
-                    people_data.append(self._normalize_person_data(person_details))
+            for entry in self.ldap_client.iter_search(
+                search_base=self.config.schema.person_search_base,
+                search_filter="(objectClass=person)",
+                attributes=self.people_tool.get_person_attributes(),
+            ):
+                people_data.append(self._normalize_person_data(entry.get('attributes', {})))
 
             df = pd.DataFrame(people_data)
             self.data_cache['people'] = df
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""
+Benchmark concurrent tool-call throughput for the sync and async paths.
+
+The sync path mirrors how FastMCP runs a plain ``def`` tool: every call is
+pushed onto the event loop's shared default thread pool. The async path
+awaits the same tool through AsyncLDAPConnector's dedicated executor.
+Both use the same pooled connector against a local mock directory with a
+fixed per-search latency.
+
+Usage:
+    python benchmarks/bench_async_tools.py --calls 400 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from mock_directory import create_mock_connector
+from redhat_ldap_mcp.config.models import PerformanceConfig
+from redhat_ldap_mcp.core.async_connector import AsyncLDAPConnector
+from redhat_ldap_mcp.tools.people_search import PeopleSearchTool
+
+
+async def run_sync_path(tool: PeopleSearchTool, uids: list[str], workers: int) -> float:
+    """Run blocking tool calls on a shared worker pool and return elapsed seconds."""
+    loop = asyncio.get_running_loop()
+    shared_pool = ThreadPoolExecutor(max_workers=workers)
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(loop.run_in_executor(shared_pool, tool.get_person_details, uid) for uid in uids)
+    )
+    elapsed = time.perf_counter() - start
+    shared_pool.shutdown()
+    return elapsed
+
+
+async def run_async_path(async_connector: AsyncLDAPConnector, uids: list[str]) -> float:
+    """Run the same calls through the async connector and return elapsed seconds."""
+    tool = PeopleSearchTool(async_connector.connector)
+    start = time.perf_counter()
+    await asyncio.gather(*(async_connector.run(tool.get_person_details, uid) for uid in uids))
+    return time.perf_counter() - start
+
+
+def main():
+    """Run the benchmark and print a summary table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--people", type=int, default=200, help="Synthetic directory size")
+    parser.add_argument("--calls", type=int, default=400, help="Concurrent tool calls")
+    parser.add_argument("--latency", type=float, default=0.05, help="Per-search latency (s)")
+    parser.add_argument("--pool-size", type=int, default=32, help="LDAP connection pool size")
+    parser.add_argument(
+        "--shared-workers",
+        type=int,
+        default=8,
+        help="Worker threads the sync path gets from the shared pool",
+    )
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    performance = PerformanceConfig(
+        pool_max_size=args.pool_size, pool_min_size=0, query_cache_enabled=False
+    )
+    connector = create_mock_connector(
+        people=args.people, latency=args.latency, performance_config=performance
+    )
+    uids = [f"user{i % args.people}" for i in range(args.calls)]
+
+    sync_elapsed = asyncio.run(
+        run_sync_path(PeopleSearchTool(connector), uids, args.shared_workers)
+    )
+
+    async_connector = AsyncLDAPConnector(connector)
+    async_elapsed = asyncio.run(run_async_path(async_connector, uids))
+    async_connector.shutdown()
+
+    print(f"{args.calls} get_person_details calls, {args.latency * 1000:.0f} ms per search")
+    print(f"{'path':<8}{'elapsed (s)':>14}{'calls/s':>12}")
+    for name, elapsed in (("sync", sync_elapsed), ("async", async_elapsed)):
+        print(f"{name:<8}{elapsed:>14.2f}{args.calls / elapsed:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""
+Benchmark the per-entry cost of decoding a whole-directory sweep.
+
+Runs one search over synthetic people on the mock directory, then times
+turning its results into processed person records two ways: through ldap3
+Entry objects unwrapped attribute by attribute (how LDAPConnector decoded
+results before reading the raw response), and through
+LDAPConnector._process_entry over connection.response. Both are followed by
+PeopleSearchTool._process_person_entry, timed separately.
+
+Usage:
+    python benchmarks/bench_entry_decoding.py --people 50000
+"""
+
+import argparse
+import logging
+import time
+
+from mock_directory import PEOPLE_BASE, create_mock_connector
+from redhat_ldap_mcp.tools.people_search import PeopleSearchTool
+
+
+def decode_entry_objects(connection) -> list[dict]:
+    """Decode the last search's results through ldap3 Entry objects."""
+    connection._entries = None  # Rebuilt from the response on next access
+    decoded = []
+    for entry in connection.entries:
+        attributes = {}
+        for name in entry.entry_attributes:
+            value = getattr(entry, name).value
+            attributes[name] = value[0] if isinstance(value, list) and len(value) == 1 else value
+        decoded.append({"dn": entry.entry_dn, "attributes": attributes})
+    return decoded
+
+
+def decode_response(connector, connection) -> list[dict]:
+    """Decode the last search's results from the raw response."""
+    return [
+        connector._process_entry(entry)
+        for entry in connection.response
+        if entry["type"] == "searchResEntry"
+    ]
+
+
+def best_of(repeats: int, func) -> tuple[float, list]:
+    """Run func repeatedly and return the fastest time in seconds with its result."""
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    """Run the benchmark and print per-entry costs."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--people", type=int, default=50000, help="Synthetic directory size")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per path (best kept)")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    connector = create_mock_connector(people=args.people)
+    tool = PeopleSearchTool(connector)
+    connection = connector.connect()
+    connection.search(
+        search_base=PEOPLE_BASE,
+        search_filter="(objectClass=person)",
+        attributes=tool.get_person_attributes(),
+    )
+    count = len(connection.response)
+
+    print(f"{count} entries, per-entry cost in microseconds (best of {args.repeats})")
+    print(f"{'path':<16}{'decode':>10}{'person':>10}{'total':>10}")
+    for name, decode in [
+        ("Entry objects", lambda: decode_entry_objects(connection)),
+        ("raw response", lambda: decode_response(connector, connection)),
+    ]:
+        decode_seconds, entries = best_of(args.repeats, decode)
+        person_seconds, _ = best_of(
+            args.repeats, lambda entries=entries: [tool._process_person_entry(e) for e in entries]
+        )
+        decode_us = decode_seconds / count * 1e6
+        person_us = person_seconds / count * 1e6
+        print(f"{name:<16}{decode_us:>10.2f}{person_us:>10.2f}{decode_us + person_us:>10.2f}")
+
+    connector.release(connection)
+
+
+if __name__ == "__main__":
+    main()
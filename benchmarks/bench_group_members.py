@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""
+Benchmark group member resolution: per-member lookups vs batched filters.
+
+The per-member path replays the previous get_group_members behaviour (one
+get_person_details search per member value). The batched path is the
+current GroupsTool.get_group_members. Both run against the same mock
+directory with the query cache disabled, and their outputs are compared.
+
+Usage:
+    python benchmarks/bench_group_members.py --members 2000 --latency 0.002
+"""
+
+import argparse
+import logging
+import time
+
+from mock_directory import GROUPS_BASE, create_mock_connector
+from redhat_ldap_mcp.config.models import PerformanceConfig
+from redhat_ldap_mcp.tools.groups import GroupsTool
+
+
+def resolve_per_member(tool: GroupsTool, group_dn: str) -> list[dict]:
+    """Resolve members one search at a time, as get_group_members used to."""
+    entry = tool.connector.search(
+        search_base=group_dn,
+        search_filter="(objectClass=*)",
+        attributes=["member", "uniqueMember", "memberUid"],
+        size_limit=1,
+    )[0]
+    members = []
+    for member_attr in ["member", "uniqueMember"]:
+        member_dns = entry["attributes"].get(member_attr) or []
+        if isinstance(member_dns, str):
+            member_dns = [member_dns]
+        for member_dn in member_dns:
+            person = tool.people_tool.get_person_details(member_dn)
+            if person:
+                members.append(person)
+    return members
+
+
+def timed(func, *args) -> tuple[float, object]:
+    """Return (elapsed seconds, result)."""
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    """Run the benchmark and print a summary table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--people", type=int, default=5000, help="Synthetic directory size")
+    parser.add_argument("--members", type=int, default=2000, help="Members in the group")
+    parser.add_argument("--latency", type=float, default=0.002, help="Per-search latency (s)")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    connector = create_mock_connector(
+        people=args.people,
+        groups=1,
+        members_per_group=args.members,
+        latency=args.latency,
+        performance_config=PerformanceConfig(query_cache_enabled=False),
+    )
+    tool = GroupsTool(connector)
+    group_dn = f"cn=group0,{GROUPS_BASE}"
+
+    legacy_elapsed, legacy = timed(resolve_per_member, tool, group_dn)
+    batched_elapsed, batched = timed(tool.get_group_members, group_dn)
+    assert batched == legacy, "batched resolution changed the output"
+
+    print(f"{args.members} members, {args.latency * 1000:.1f} ms per search")
+    print(f"{'path':<12}{'elapsed (s)':>14}{'speedup':>10}")
+    print(f"{'per-member':<12}{legacy_elapsed:>14.2f}{1.0:>10.1f}")
+    print(f"{'batched':<12}{batched_elapsed:>14.2f}{legacy_elapsed / batched_elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
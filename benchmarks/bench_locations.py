@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""
+Benchmark the location tools: a directory sweep per call vs precomputed aggregates.
+
+Each round calls find_locations, find_locations with a query,
+get_location_hierarchy and get_location_stats. Without the location index
+every call sweeps the directory (get_location_stats through
+find_locations). With location_index_enabled the first call builds the
+aggregates from one sweep and later calls read them. Both run against the
+same mock directory with the query cache disabled, and their outputs are
+compared.
+
+Usage:
+    python benchmarks/bench_locations.py --people 50000 --latency 0.002
+"""
+
+import argparse
+import logging
+import time
+
+from mock_directory import create_mock_connector
+from redhat_ldap_mcp.config.models import PerformanceConfig
+from redhat_ldap_mcp.tools.locations import LocationsTool
+
+
+def run_round(tool: LocationsTool, query: str) -> tuple[float, list]:
+    """Call each location tool once; return (elapsed seconds, results)."""
+    start = time.perf_counter()
+    results = [
+        tool.find_locations(),
+        tool.find_locations(query),
+        tool.get_location_hierarchy(),
+        tool.get_location_stats(),
+    ]
+    return time.perf_counter() - start, results
+
+
+def main():
+    """Run the benchmark and print first-round and steady-state times per path."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--people", type=int, default=50000, help="Synthetic directory size")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds of location tool calls")
+    parser.add_argument("--latency", type=float, default=0.002, help="Per-search latency (s)")
+    parser.add_argument("--query", default="Boston", help="find_locations query")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    print(f"{args.rounds} rounds of 4 location tool calls over {args.people} people")
+    print(f"{'path':<16}{'first (ms)':>12}{'later (ms)':>12}{'total (s)':>12}")
+    outputs = []
+    for name, enabled in [("sweep per call", False), ("location index", True)]:
+        connector = create_mock_connector(
+            people=args.people,
+            latency=args.latency,
+            performance_config=PerformanceConfig(
+                # Sweeps stop at max_results; let both paths see every person
+                query_cache_enabled=False,
+                max_results=args.people,
+                location_index_enabled=enabled,
+            ),
+        )
+        tool = LocationsTool(connector)
+        rounds = [run_round(tool, args.query) for _ in range(args.rounds)]
+        times = [elapsed for elapsed, _ in rounds]
+        later = sum(times[1:]) / max(len(times) - 1, 1)
+        print(f"{name:<16}{times[0] * 1000:>12.1f}{later * 1000:>12.2f}{sum(times):>12.2f}")
+        outputs.append(rounds[-1][1])
+        connector.disconnect()
+
+    assert outputs[0] == outputs[1], "location index changed the output"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""
+Benchmark tool-call latency during a directory outage.
+
+Warms the query cache with half of the looked-up people, lets it expire,
+then takes the mock directory down (searches fail, new connections are
+refused after a connect timeout) and fires a burst of get_person_details
+calls. Without a circuit breaker every call waits out its own connection
+retries; with one, calls fail fast once the circuit opens and previously
+cached people are served stale.
+
+Usage:
+    python benchmarks/bench_outage.py --calls 300 --threads 16 --connect-timeout 0.2
+"""
+
+import argparse
+import logging
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from mock_directory import create_mock_connector
+from redhat_ldap_mcp.config.models import PerformanceConfig
+from redhat_ldap_mcp.tools.people_search import PeopleSearchTool
+
+
+def timed_call(tool: PeopleSearchTool, uid: str) -> tuple[float, bool]:
+    """Look up one person, returning (seconds, answered)."""
+    start = time.perf_counter()
+    try:
+        answered = tool.get_person_details(uid) is not None
+    except Exception:
+        answered = False
+    return time.perf_counter() - start, answered
+
+
+def main():
+    """Run the benchmark with and without the circuit breaker and print latencies."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=300, help="Calls during the outage")
+    parser.add_argument("--threads", type=int, default=16, help="Concurrent callers")
+    parser.add_argument(
+        "--connect-timeout", type=float, default=0.2, help="Seconds a refused connection takes"
+    )
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    uids = [f"user{i % 100}" for i in range(args.calls)]
+    print(
+        f"{args.calls} get_person_details calls from {args.threads} threads during an outage, "
+        f"{args.connect_timeout * 1000:.0f} ms connect timeout"
+    )
+    columns = ("elapsed (s)", "p50 (ms)", "p99 (ms)", "answered")
+    print(f"{'circuit breaker':<18}" + "".join(f"{column:>12}" for column in columns))
+    for name, threshold in (("off", 10**9), ("on", 3)):
+        performance = PerformanceConfig(
+            max_retries=3,
+            retry_delay=0.05,
+            cache_timeout=1,
+            circuit_breaker_threshold=threshold,
+            circuit_breaker_open_interval=5.0,
+            pool_max_size=args.threads,
+        )
+        connector = create_mock_connector(
+            people=100,
+            performance_config=performance,
+            connect_timeout=args.connect_timeout,
+        )
+        tool = PeopleSearchTool(connector)
+        for uid in uids[:50]:
+            tool.get_person_details(uid)
+        time.sleep(1.1)
+
+        connector.mock_outage.set()
+        with ThreadPoolExecutor(max_workers=args.threads) as executor:
+            start = time.perf_counter()
+            results = list(executor.map(partial(timed_call, tool), uids))
+            elapsed = time.perf_counter() - start
+
+        latencies = sorted(seconds * 1000 for seconds, _ in results)
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        answered = sum(1 for _, ok in results if ok)
+        print(
+            f"{name:<18}{elapsed:>12.2f}{statistics.median(latencies):>12.1f}"
+            f"{p99:>12.1f}{answered:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
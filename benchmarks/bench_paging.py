@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""
+Benchmark paging through the people at a large location.
+
+Reads every page of one location three ways: get_people_at_location with
+a growing max_results, re-fetching the prefix for each page as clients
+without cursors must; get_people_at_location_page with cursors resuming
+the paged search kept open on its connection; and the same cursors with
+no room to keep searches open, so each page restarts and skips the
+entries already returned. The mock directory has no virtual list view,
+which would make every page cost the same without holding a connection.
+
+Usage:
+    python benchmarks/bench_paging.py --people 30000 --page-size 100
+"""
+
+import argparse
+import logging
+import time
+
+from mock_directory import create_mock_connector
+from redhat_ldap_mcp.config.models import PerformanceConfig
+from redhat_ldap_mcp.tools.locations import LocationsTool
+
+
+def refetch_prefix(tool: LocationsTool, location: str, page_size: int, pages: int) -> list[float]:
+    """Read each page by fetching everything up to its end; return seconds per page."""
+    times = []
+    for page in range(1, pages + 1):
+        start = time.perf_counter()
+        # The client keeps only the last page_size people
+        tool.get_people_at_location(location, max_results=page * page_size)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def follow_cursors(tool: LocationsTool, location: str, page_size: int, pages: int) -> list[float]:
+    """Read each page with the previous page's cursor; return seconds per page."""
+    times = []
+    cursor = None
+    for _ in range(pages):
+        start = time.perf_counter()
+        page = tool.get_people_at_location_page(location, page_size=page_size, cursor=cursor)
+        times.append(time.perf_counter() - start)
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    return times
+
+
+def main():
+    """Run the benchmark and print first, last and total page times per method."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--people", type=int, default=30000, help="Synthetic directory size")
+    parser.add_argument("--page-size", type=int, default=100, help="People per page")
+    parser.add_argument("--pages", type=int, default=40, help="Pages to read")
+    parser.add_argument("--latency", type=float, default=0.002, help="Per-search latency (s)")
+    parser.add_argument("--location", default="Boston", help="Location to page through")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    methods = [
+        ("re-fetch prefix", refetch_prefix, 10),
+        ("cursor, open search", follow_cursors, 10),
+        # A one-connection pool leaves no room for open cursors
+        ("cursor, restarted", follow_cursors, 1),
+    ]
+
+    print(f"{args.pages} pages of {args.page_size} people at {args.location}")
+    print(f"{'method':<22}{'first (ms)':>12}{'last (ms)':>12}{'total (s)':>12}")
+    for name, read, pool_size in methods:
+        connector = create_mock_connector(
+            people=args.people,
+            latency=args.latency,
+            performance_config=PerformanceConfig(
+                pool_max_size=pool_size, query_cache_enabled=False, max_results=100000
+            ),
+        )
+        times = read(LocationsTool(connector), args.location, args.page_size, args.pages)
+        print(f"{name:<22}{times[0] * 1000:>12.1f}{times[-1] * 1000:>12.1f}{sum(times):>12.2f}")
+        connector.disconnect()
+
+
+if __name__ == "__main__":
+    main()
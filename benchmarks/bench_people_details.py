@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""
+Benchmark bulk person lookups: a get_person_details loop vs get_people_details.
+
+The loop is what clients and collectors did before the bulk tool, one
+search per identifier. The bulk path is PeopleSearchTool.get_people_details.
+Identifiers mix uids, emails and DNs. Both run against the same mock
+directory with the query cache disabled, and their outputs are compared.
+
+Usage:
+    python benchmarks/bench_people_details.py --lookups 2000 --latency 0.002
+"""
+
+import argparse
+import logging
+import time
+
+from mock_directory import create_mock_connector, person_dn
+from redhat_ldap_mcp.config.models import PerformanceConfig
+from redhat_ldap_mcp.tools.people_search import PeopleSearchTool
+
+
+def identifier(index: int) -> str:
+    """Return a uid, email or DN for the person with the given index, in turn."""
+    kind = index % 3
+    if kind == 0:
+        return f"user{index}"
+    if kind == 1:
+        return f"user{index}@example.com"
+    return person_dn(index)
+
+
+def lookup_each(tool: PeopleSearchTool, identifiers: list[str]) -> dict[str, dict]:
+    """Look people up one search at a time."""
+    people = {}
+    for value in identifiers:
+        person = tool.get_person_details(value)
+        if person:
+            people[value] = person
+    return people
+
+
+def timed(func, *args) -> tuple[float, object]:
+    """Return (elapsed seconds, result)."""
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    """Run the benchmark and print a summary table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--people", type=int, default=5000, help="Synthetic directory size")
+    parser.add_argument("--lookups", type=int, default=2000, help="Identifiers to look up")
+    parser.add_argument("--latency", type=float, default=0.002, help="Per-search latency (s)")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    connector = create_mock_connector(
+        people=args.people,
+        latency=args.latency,
+        performance_config=PerformanceConfig(query_cache_enabled=False),
+    )
+    tool = PeopleSearchTool(connector)
+    identifiers = [identifier(index) for index in range(args.lookups)]
+
+    loop_elapsed, looped = timed(lookup_each, tool, identifiers)
+    bulk_elapsed, bulk = timed(tool.get_people_details, identifiers)
+    assert bulk["people"] == looped, "bulk lookup changed the output"
+
+    print(f"{args.lookups} lookups, {args.latency * 1000:.1f} ms per search")
+    print(f"{'path':<12}{'elapsed (s)':>14}{'speedup':>10}")
+    print(f"{'loop':<12}{loop_elapsed:>14.2f}{1.0:>10.1f}")
+    print(f"{'bulk':<12}{bulk_elapsed:>14.2f}{loop_elapsed / bulk_elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""
+Benchmark search_people and autocomplete_people latency from the people index.
+
+Builds a PeopleIndex over synthetic people (without going through the mock
+directory, which is too slow to load at this size) and times a mix of
+name, uid, email and title queries through PeopleSearchTool.search_people,
+then every keystroke prefix of those queries through autocomplete_people,
+then misspelled full names through the fuzzy mode of search_people.
+
+Usage:
+    python benchmarks/bench_people_index.py --people 100000 --queries 2000
+"""
+
+import argparse
+import functools
+import logging
+import random
+import statistics
+import time
+
+from mock_directory import FIRST_NAMES, LAST_NAMES, TITLES, build_people, create_mock_connector
+from redhat_ldap_mcp.config.models import PerformanceConfig
+from redhat_ldap_mcp.core.people_index import PEOPLE_INDEX, PeopleIndex
+from redhat_ldap_mcp.tools.people_search import PeopleSearchTool
+
+
+def sample_queries(count: int, people: int) -> list[str]:
+    """Return a reproducible mix of realistic queries."""
+    rng = random.Random(42)
+    makers = [
+        lambda: rng.choice(FIRST_NAMES),
+        lambda: rng.choice(LAST_NAMES)[:4],
+        lambda: f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        lambda: f"user{rng.randrange(people)}",
+        lambda: f"user{rng.randrange(people)}@example.com",
+        lambda: rng.choice(TITLES).split()[-1],
+    ]
+    return [rng.choice(makers)() for _ in range(count)]
+
+
+def main():
+    """Run the benchmark and print latency percentiles."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--people", type=int, default=100000, help="Synthetic directory size")
+    parser.add_argument("--queries", type=int, default=2000, help="Queries to time")
+    parser.add_argument("--max-results", type=int, default=10, help="Results per query")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    connector = create_mock_connector(
+        people=0, performance_config=PerformanceConfig(people_index_enabled=True)
+    )
+    tool = PeopleSearchTool(connector)
+
+    start = time.perf_counter()
+    people = [
+        tool._process_person_entry({"dn": dn, "attributes": attributes})
+        for dn, attributes in build_people(args.people)
+    ]
+    index = PeopleIndex(people)
+    index.fuzzy.search("", 0)  # built on first fuzzy search otherwise
+    build_seconds = time.perf_counter() - start
+    connector.indexes.put(PEOPLE_INDEX, index)
+
+    queries = sample_queries(args.queries, args.people)
+    # Every keystroke of each query, as a typeahead UI sends them
+    prefixes = [query[:length] for query in queries for length in range(1, len(query) + 1)]
+
+    print(f"{args.people} people, index built in {build_seconds:.1f}s")
+    print(f"{'tool':<22}{'calls':>8}{'p50 (ms)':>10}{'p99 (ms)':>10}{'max (ms)':>10}")
+    # Names with one character dropped, as typed in a hurry
+    names = [query for query in queries if " " in query]
+    typos = [name[:2] + name[3:] for name in names]
+
+    for name, method, inputs in [
+        ("search_people", tool.search_people, queries),
+        ("autocomplete_people", tool.autocomplete_people, prefixes),
+        ("search_people fuzzy", functools.partial(tool.search_people, fuzzy=True), typos),
+    ]:
+        latencies = []
+        for text in inputs:
+            start = time.perf_counter()
+            method(text, args.max_results)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(
+            f"{name:<22}{len(latencies):>8}{statistics.median(latencies):>10.3f}"
+            f"{p99:>10.3f}{latencies[-1]:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
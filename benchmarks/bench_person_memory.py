@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""
+Benchmark resident memory of a whole-directory person snapshot.
+
+Sweeps synthetic people from the mock directory (values arrive as fresh
+strings per entry, as they do off the wire) and measures, with
+tracemalloc, the memory still held once the sweep is done: processed
+person dictionaries versus the compact Person records that
+PeopleSearchTool._sweep_people keeps for the people index and org graph.
+
+Usage:
+    python benchmarks/bench_person_memory.py --people 100000
+"""
+
+import argparse
+import gc
+import logging
+import tracemalloc
+
+from mock_directory import PEOPLE_BASE, create_mock_connector
+from redhat_ldap_mcp.config.models import PerformanceConfig
+from redhat_ldap_mcp.core.person import compact_people
+from redhat_ldap_mcp.tools.people_search import PeopleSearchTool
+
+
+def retained_bytes(build) -> int:
+    """Return the bytes still allocated after build() once its result is the only survivor."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    """Run the benchmark and print snapshot sizes."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--people", type=int, default=100000, help="Synthetic directory size")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    connector = create_mock_connector(
+        people=args.people, performance_config=PerformanceConfig(query_cache_enabled=False)
+    )
+    tool = PeopleSearchTool(connector)
+
+    def sweep():
+        return connector.iter_search(
+            search_base=PEOPLE_BASE,
+            search_filter="(objectClass=person)",
+            attributes=tool.get_person_attributes(),
+            size_limit=args.people,
+        )
+
+    # Warm up, so mock directory indexes built on first search are not counted
+    for _ in sweep():
+        pass
+
+    dicts = retained_bytes(lambda: [tool._process_person_entry(entry) for entry in sweep()])
+    compact = retained_bytes(
+        lambda: compact_people(tool._process_person_entry(entry) for entry in sweep())
+    )
+
+    print(f"{args.people} people")
+    print(f"{'records':<16}{'MiB':>10}{'bytes/person':>14}")
+    for name, size in [("dicts", dicts), ("Person", compact)]:
+        print(f"{name:<16}{size / 2**20:>10.1f}{size / args.people:>14.0f}")
+    print(f"reduction: {dicts / compact:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""
+Benchmark spreading concurrent lookups over read replicas.
+
+Runs the same burst of get_person_details calls against one mock server
+and against a server with two replicas under each selection strategy.
+Every mock server answers a limited number of searches at once, and the
+second replica is slow, so the strategies differ in how much traffic
+they send to it.
+
+Usage:
+    python benchmarks/bench_replicas.py --calls 600 --latency 0.005 --slow-latency 0.04
+"""
+
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from mock_directory import create_mock_connector
+from redhat_ldap_mcp.config.models import PerformanceConfig
+from redhat_ldap_mcp.tools.people_search import PeopleSearchTool
+
+
+def run(connector, uids: list[str], threads: int) -> float:
+    """Run the calls on a thread pool and return elapsed seconds."""
+    tool = PeopleSearchTool(connector)
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        start = time.perf_counter()
+        list(executor.map(tool.get_person_details, uids))
+        return time.perf_counter() - start
+
+
+def main():
+    """Run the benchmark and print throughput and per-server request shares."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--people", type=int, default=200, help="Synthetic directory size")
+    parser.add_argument("--calls", type=int, default=600, help="Tool calls")
+    parser.add_argument("--threads", type=int, default=24, help="Concurrent callers")
+    parser.add_argument("--latency", type=float, default=0.005, help="Per-search latency (s)")
+    parser.add_argument(
+        "--slow-latency", type=float, default=0.04, help="Per-search latency of the slow replica"
+    )
+    parser.add_argument("--capacity", type=int, default=4, help="Concurrent searches per server")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    performance = PerformanceConfig(pool_max_size=args.threads, query_cache_enabled=False)
+    uids = [f"user{i % args.people}" for i in range(args.calls)]
+    setups = [("single server", [], "round_robin")] + [
+        (strategy, [args.latency, args.slow_latency], strategy)
+        for strategy in ("round_robin", "least_outstanding", "latency")
+    ]
+
+    print(
+        f"{args.calls} get_person_details calls from {args.threads} threads, "
+        f"{args.capacity} concurrent searches per server"
+    )
+    print(f"{'servers':<20}{'elapsed (s)':>12}{'calls/s':>10}   requests per server")
+    for name, replica_latencies, strategy in setups:
+        connector = create_mock_connector(
+            people=args.people,
+            latency=args.latency,
+            performance_config=performance,
+            replica_latencies=replica_latencies,
+            server_capacity=args.capacity,
+            server_selection=strategy,
+        )
+        elapsed = run(connector, uids, args.threads)
+        shares = " ".join(
+            f"{url.removeprefix('ldap://mock-')}={stats['requests']}"
+            for url, stats in connector.server_stats().items()
+        )
+        print(f"{name:<20}{elapsed:>12.2f}{args.calls / elapsed:>10.1f}   {shares}")
+        connector.disconnect()
+
+
+if __name__ == "__main__":
+    main()
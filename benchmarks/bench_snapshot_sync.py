@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""
+Benchmark keeping a local people snapshot in sync with the directory.
+
+Fills a SQLite snapshot from the mock directory with one full sweep, then
+modifies a few people (bumping their modifyTimestamp) and runs an
+incremental sync, which fetches only those. Also compares reading every
+person back from the snapshot, as index rebuilds do, with sweeping them
+from the directory again.
+
+Usage:
+    python benchmarks/bench_snapshot_sync.py --people 50000 --changes 100 --latency 0.002
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from ldap3 import MODIFY_REPLACE
+from mock_directory import create_mock_connector, person_dn
+from redhat_ldap_mcp.config.models import PerformanceConfig
+from redhat_ldap_mcp.tools.people_search import PEOPLE_SNAPSHOT, PeopleSearchTool
+
+
+def timed(func):
+    """Run func once and return (seconds, result)."""
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    """Run the benchmark and print sync costs."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--people", type=int, default=50000, help="Synthetic directory size")
+    parser.add_argument("--changes", type=int, default=100, help="People modified between syncs")
+    parser.add_argument("--latency", type=float, default=0.002, help="Seconds per LDAP search")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as directory:
+        performance = PerformanceConfig(
+            query_cache_enabled=False, snapshot_path=os.path.join(directory, "snapshot.db")
+        )
+        connector = create_mock_connector(
+            people=args.people, latency=args.latency, performance_config=performance
+        )
+        tool = PeopleSearchTool(connector)
+        snapshot = connector.snapshot
+
+        def process(entry):
+            return tool._process_person_entry(entry), ""
+
+        full = snapshot.sync(PEOPLE_SNAPSHOT, tool._fetch_people_since, process, full=True)
+
+        with connector.connection() as connection:
+            for index in range(0, args.people, max(1, args.people // args.changes))[: args.changes]:
+                connection.modify(
+                    person_dn(index),
+                    {
+                        "title": [(MODIFY_REPLACE, ["Distinguished Engineer"])],
+                        "modifyTimestamp": [(MODIFY_REPLACE, ["20250101000000Z"])],
+                    },
+                )
+        incremental = snapshot.sync(PEOPLE_SNAPSHOT, tool._fetch_people_since, process)
+
+        load_seconds, people = timed(lambda: snapshot.load(PEOPLE_SNAPSHOT))
+        sweep_seconds, swept = timed(
+            lambda: [process(entry)[0] for entry in tool._fetch_people_since(None)]
+        )
+        assert people == swept
+
+        print(f"{args.people} people, {args.changes} modified, {args.latency * 1000:.0f}ms/search")
+        print(f"{'operation':<24}{'fetched':>10}{'seconds':>10}")
+        for name, stats in [("full sync", full), ("incremental sync", incremental)]:
+            print(f"{name:<24}{stats['fetched']:>10}{stats['seconds']:>10.3f}")
+        print(f"{'read from snapshot':<24}{0:>10}{load_seconds:>10.3f}")
+        print(f"{'sweep from LDAP':<24}{len(swept):>10}{sweep_seconds:>10.3f}")
+        snapshot.close()
+
+
+if __name__ == "__main__":
+    main()
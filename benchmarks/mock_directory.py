@@ -0,0 +1,266 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""
+Local mock directory for benchmarks.
+
+Builds an LDAPConnector backed by ldap3's MOCK_SYNC strategy and a
+synthetic org tree, optionally adding a fixed per-operation latency so
+round-trip savings show up the way they would against a real server.
+Replicas share the same entries but can have their own latency, and each
+server can be limited to a number of concurrent searches. Setting the
+connector's mock_outage event takes the directory down: searches fail
+with socket errors and new connections are refused after
+connect_timeout.
+
+The stock mock evaluates every equality assertion by scanning all entries
+under the search base, so an OR of 50 uids costs 50 full scans. Real
+servers answer those from equality indexes; the connections built here
+do the same so batched filters are not unfairly penalized.
+"""
+
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from ldap3 import ANONYMOUS, MOCK_SYNC, NONE, Connection, Server
+from ldap3.core.exceptions import LDAPSocketOpenError, LDAPSocketReceiveError
+from ldap3.operation.search import MATCH_EQUAL
+from ldap3.utils.ciDict import CaseInsensitiveDict
+from ldap3.utils.conv import to_unicode
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from redhat_ldap_mcp.config.models import (  # noqa: E402
+    LDAPConfig,
+    PerformanceConfig,
+    SecurityConfig,
+)
+from redhat_ldap_mcp.core.ldap_connector import LDAPConnector  # noqa: E402
+
+BASE_DN = "dc=example,dc=com"
+PEOPLE_BASE = f"ou=users,{BASE_DN}"
+GROUPS_BASE = f"ou=groups,{BASE_DN}"
+
+LOCATIONS = [
+    ("Raleigh", "NC", "United States"),
+    ("Boston", "MA", "United States"),
+    ("Brno", "South Moravia", "Czech Republic"),
+    ("Beijing", "Beijing", "China"),
+    ("Waterford", "Munster", "Ireland"),
+    ("Ra'anana", "Center", "Israel"),
+]
+FIRST_NAMES = ["James", "Maria", "Wei", "Aoife", "Tomas", "Noa", "Priya", "John", "Elena"]
+LAST_NAMES = ["Smith", "Novak", "Chen", "Murphy", "Levi", "Garcia", "Patel", "Laska", "Rossi"]
+TITLES = ["Software Engineer", "Senior Software Engineer", "Principal Engineer", "Manager"]
+
+
+_index_lock = threading.Lock()
+
+
+def _equality_index(server: Server, attribute: str) -> dict[str, set[str]]:
+    """Return (building on first use) a lowercased value -> DNs index for an attribute."""
+    indexes = server.__dict__.setdefault("_equality_indexes", CaseInsensitiveDict())
+    with _index_lock:
+        if attribute not in indexes:
+            index: dict[str, set[str]] = {}
+            for dn, attributes in server.dit.items():
+                for value in attributes.get(attribute, []):
+                    index.setdefault(to_unicode(value).lower(), set()).add(dn)
+            indexes[attribute] = index
+        return indexes[attribute]
+
+
+class LatencyConnection(Connection):
+    """MOCK_SYNC connection with indexed equality matching and optional latency."""
+
+    latency = 0.0
+    # Limits the searches the mock server answers at once, if set
+    capacity: threading.Semaphore | None = None
+    # Set while the mock directory is down
+    outage: threading.Event | None = None
+
+    def __init__(self, *args, **kwargs):
+        """Create the connection and route equality matches through an index."""
+        super().__init__(*args, **kwargs)
+        scan = self.strategy.evaluate_filter_node
+        server = self.server
+
+        def evaluate_filter_node(node, candidates):
+            if node.tag == MATCH_EQUAL and not node.elements:
+                candidate_set = set(candidates)
+                index = _equality_index(server, node.assertion["attr"])
+                node.matched = index.get(to_unicode(node.assertion["value"]).lower(), set())
+                node.matched = node.matched & candidate_set
+                node.unmatched = candidate_set - node.matched
+                return None
+            return scan(node, candidates)
+
+        self.strategy.evaluate_filter_node = evaluate_filter_node
+
+    def search(self, *args, **kwargs):
+        """Wait for server capacity and delay, then run the mock search."""
+        if self.capacity is None:
+            return self._search(*args, **kwargs)
+        with self.capacity:
+            return self._search(*args, **kwargs)
+
+    def _search(self, *args, **kwargs):
+        """Delay, then run the mock search."""
+        if self.latency:
+            time.sleep(self.latency)
+        if self.outage is not None and self.outage.is_set():
+            raise LDAPSocketReceiveError("mock directory is down")
+        return super().search(*args, **kwargs)
+
+
+def person_dn(index: int) -> str:
+    """Return the DN of the synthetic person with the given index."""
+    return f"uid=user{index},{PEOPLE_BASE}"
+
+
+def created(index: int) -> str:
+    """Return the modifyTimestamp of the synthetic entry with the given index, a second apart."""
+    return (datetime(2024, 1, 1) + timedelta(seconds=index)).strftime("%Y%m%d%H%M%SZ")
+
+
+def build_people(count: int, span: int = 8) -> list[tuple[str, dict]]:
+    """
+    Build a synthetic org tree where person i reports to person (i - 1) // span.
+
+    Args:
+        count: Number of people
+        span: Direct reports per manager
+
+    Returns:
+        List of (dn, attributes) tuples
+    """
+    people = []
+    for index in range(count):
+        first = FIRST_NAMES[index % len(FIRST_NAMES)]
+        last = LAST_NAMES[(index // len(FIRST_NAMES)) % len(LAST_NAMES)]
+        city, state, country = LOCATIONS[index % len(LOCATIONS)]
+        attributes = {
+            "objectClass": ["top", "person", "inetOrgPerson"],
+            "uid": f"user{index}",
+            "cn": f"{first} {last} {index}",
+            "givenName": first,
+            "sn": last,
+            "mail": f"user{index}@example.com",
+            "title": TITLES[index % len(TITLES)],
+            "l": city,
+            "st": state,
+            "co": country,
+            "rhatLocation": f"{city} Office",
+            "rhatCostCenterDesc": f"Cost Center {index % 20}",
+            "employeeNumber": str(100000 + index),
+            "modifyTimestamp": created(index),
+        }
+        if index > 0:
+            attributes["manager"] = person_dn((index - 1) // span)
+        people.append((person_dn(index), attributes))
+    return people
+
+
+def build_groups(count: int, members_per_group: int, people: int) -> list[tuple[str, dict]]:
+    """Build groupOfNames entries whose members cycle through the synthetic people."""
+    groups = []
+    for index in range(count):
+        members = [person_dn((index + offset) % people) for offset in range(members_per_group)]
+        groups.append(
+            (
+                f"cn=group{index},{GROUPS_BASE}",
+                {
+                    "objectClass": ["top", "groupOfNames"],
+                    "cn": f"group{index}",
+                    "description": f"Synthetic group {index}",
+                    "member": members,
+                    "modifyTimestamp": created(index),
+                },
+            )
+        )
+    return groups
+
+
+def create_mock_connector(
+    people: int = 1000,
+    groups: int = 0,
+    members_per_group: int = 0,
+    latency: float = 0.0,
+    performance_config: PerformanceConfig | None = None,
+    replica_latencies: list[float] | None = None,
+    server_capacity: int = 0,
+    server_selection: str = "round_robin",
+    connect_timeout: float = 0.0,
+) -> LDAPConnector:
+    """
+    Create an LDAPConnector wired to a populated in-memory directory.
+
+    Args:
+        people: Number of synthetic people
+        groups: Number of synthetic groups
+        members_per_group: Members per synthetic group
+        latency: Seconds added to every search
+        performance_config: Optional performance settings
+        replica_latencies: Seconds added to every search on each read replica
+        server_capacity: Concurrent searches each server answers (0 = unlimited)
+        server_selection: Strategy picking among the server and its replicas
+        connect_timeout: Seconds a refused connection takes during an outage
+
+    Returns:
+        LDAPConnector whose pooled connections all share the mock directory
+    """
+    replica_latencies = replica_latencies or []
+    ldap_config = LDAPConfig(
+        server="ldap://mock-directory",
+        replicas=[f"ldap://mock-replica{index + 1}" for index in range(len(replica_latencies))],
+        server_selection=server_selection,
+        base_dn=BASE_DN,
+    )
+    connector = LDAPConnector(
+        ldap_config, SecurityConfig(), performance_config or PerformanceConfig()
+    )
+
+    server = Server("mock-directory", get_info=NONE)
+    seed = Connection(server, client_strategy=MOCK_SYNC, authentication=ANONYMOUS)
+    seed.strategy.add_entry(BASE_DN, {"objectClass": ["top", "domain"], "dc": "example"})
+    seed.strategy.add_entry(PEOPLE_BASE, {"objectClass": ["organizationalUnit"], "ou": "users"})
+    seed.strategy.add_entry(GROUPS_BASE, {"objectClass": ["organizationalUnit"], "ou": "groups"})
+    for dn, attributes in build_people(people):
+        seed.strategy.add_entry(dn, attributes)
+    for dn, attributes in build_groups(groups, members_per_group, people):
+        seed.strategy.add_entry(dn, attributes)
+
+    # Per host: (latency, capacity); every host serves the same mock entries
+    hosts = {
+        host: (host_latency, threading.Semaphore(server_capacity) if server_capacity else None)
+        for host, host_latency in [
+            ("mock-directory", latency),
+            *((f"mock-replica{i + 1}", r) for i, r in enumerate(replica_latencies)),
+        ]
+    }
+
+    outage = threading.Event()
+
+    def create_connection(target: Server | None = None, **options) -> Connection:
+        if outage.is_set():
+            time.sleep(connect_timeout)
+            raise LDAPSocketOpenError("mock directory is down")
+        connection = LatencyConnection(
+            server,
+            client_strategy=MOCK_SYNC,
+            authentication=ANONYMOUS,
+            raise_exceptions=True,
+        )
+        connection.latency, connection.capacity = hosts[target.host if target else "mock-directory"]
+        connection.outage = outage
+        return connection
+
+    connector._create_connection = create_connection
+    connector.mock_outage = outage
+    return connector
@@ -8,13 +8,20 @@
 
 from typing import Literal
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 
 class LDAPConfig(BaseModel):
     """LDAP connection configuration for corporate directories."""
 
     server: str = Field(..., description="LDAP server URL (ldap:// or ldaps://)")
+    replicas: list[str] = Field(
+        default_factory=list,
+        description="Further server URLs (read replicas) sharing the load with server",
+    )
+    server_selection: Literal["round_robin", "least_outstanding", "latency"] = Field(
+        default="round_robin", description="How each request picks among server and replicas"
+    )
     base_dn: str = Field(..., description="Base Distinguished Name for searches")
     auth_method: Literal["anonymous", "simple", "sasl"] = Field(
         default="anonymous", description="Authentication method"
@@ -37,6 +44,15 @@ class LDAPConfig(BaseModel):
             raise ValueError("Server must start with ldap:// or ldaps://")
         return v
 
+    @field_validator("replicas")
+    @classmethod
+    def validate_replicas(cls, v):
+        """Validate replica URL formats."""
+        for url in v:
+            if not url.startswith(("ldap://", "ldaps://")):
+                raise ValueError("Replicas must start with ldap:// or ldaps://")
+        return v
+
     @field_validator("auth_method")
     @classmethod
     def validate_auth_requirements(cls, v, values):
@@ -141,12 +157,164 @@ class PerformanceConfig(BaseModel):
     """Performance configuration for LDAP operations."""
 
     max_retries: int = Field(default=3, description="Maximum connection retries")
-    retry_delay: float = Field(default=1.0, description="Retry delay in seconds")
+    retry_delay: float = Field(
+        default=1.0, description="First connection retry delay in seconds, doubling per retry"
+    )
+    retry_max_delay: float = Field(
+        default=30.0, description="Longest connection retry delay in seconds"
+    )
+    circuit_breaker_threshold: int = Field(
+        default=3, description="Consecutive failures that open a server's circuit breaker"
+    )
+    circuit_breaker_open_interval: float = Field(
+        default=5.0,
+        description="Seconds an opened circuit rejects requests before a trial request, "
+        "doubling on every further trip",
+    )
+    circuit_breaker_max_open_interval: float = Field(
+        default=300.0, description="Longest time an opened circuit rejects requests"
+    )
     page_size: int = Field(default=1000, description="LDAP search page size")
     max_results: int = Field(default=5000, description="Maximum search results")
-    cache_timeout: int = Field(default=300, description="Schema cache timeout in seconds")
+    cache_timeout: int = Field(
+        default=300, description="Schema and query result cache timeout in seconds"
+    )
+
+    # Query result cache
+    query_cache_enabled: bool = Field(default=True, description="Cache LDAP search results")
+    query_cache_max_entries: int = Field(
+        default=10000, description="Maximum number of cached search results"
+    )
+    query_cache_max_bytes: int = Field(
+        default=64 * 1024 * 1024, description="Approximate memory budget for cached results"
+    )
+    negative_cache_timeout: int = Field(
+        default=60, description="Seconds an empty search result stays cached"
+    )
+    stale_cache_max_age: float = Field(
+        default=3600.0,
+        description="Seconds past expiry a cached search is still served while the "
+        "directory is unavailable (0 disables)",
+    )
+
+    # Cursor pagination
+    vlv_enabled: bool = Field(
+        default=True,
+        description="Read result pages with server-side sort and virtual list view "
+        "when the server supports them",
+    )
+    max_open_cursors: int = Field(
+        default=16,
+        description="Paged searches kept open for the next page (at most half of pool_max_size)",
+    )
+    cursor_timeout: float = Field(
+        default=120.0, description="Seconds an unused open paged search is kept"
+    )
+
+    # In-memory directory indexes
+    org_graph_enabled: bool = Field(
+        default=False, description="Serve manager relationships from an in-memory graph"
+    )
+    org_graph_refresh_interval: float = Field(
+        default=900.0, description="Seconds before the org graph is rebuilt in the background"
+    )
+    people_index_enabled: bool = Field(
+        default=False, description="Answer people searches from an in-memory trigram index"
+    )
+    people_index_refresh_interval: float = Field(
+        default=900.0, description="Seconds before the people index is rebuilt in the background"
+    )
+    people_index_max_staleness: float = Field(
+        default=3600.0,
+        description="Seconds after which an unrefreshed people index is bypassed for LDAP",
+    )
+    location_index_enabled: bool = Field(
+        default=False, description="Answer location tools from precomputed location aggregates"
+    )
+    location_index_refresh_interval: float = Field(
+        default=900.0, description="Seconds before the location aggregates are rebuilt"
+    )
+    index_max_entries: int = Field(
+        default=200000, description="Maximum people loaded into in-memory indexes"
+    )
 
-    @field_validator("max_retries", "page_size", "max_results", "cache_timeout")
+    # Local directory snapshot
+    snapshot_path: str | None = Field(
+        default=None,
+        description="SQLite file keeping a local snapshot of people and groups (disabled if unset)",
+    )
+    snapshot_sync_interval: float = Field(
+        default=300.0, description="Seconds between incremental (modifyTimestamp) snapshot syncs"
+    )
+    snapshot_full_sync_interval: float = Field(
+        default=86400.0,
+        description="Seconds between full snapshot resyncs, which also drop deleted entries",
+    )
+
+    # RFC 4533 change feed
+    syncrepl_enabled: bool = Field(
+        default=False,
+        description="Follow directory changes with a syncrepl refreshAndPersist search "
+        "to invalidate cached searches, indexes and the snapshot as they happen",
+    )
+    syncrepl_cookie_path: str | None = Field(
+        default=None, description="File keeping the syncrepl cookie across restarts"
+    )
+    syncrepl_reconnect_delay: float = Field(
+        default=5.0,
+        description="Seconds before reconnecting a dropped syncrepl search (doubles up to 300)",
+    )
+    syncrepl_expire_interval: float = Field(
+        default=60.0,
+        description="Minimum seconds between index and snapshot refreshes triggered by changes",
+    )
+
+    # Connection pool
+    pool_min_size: int = Field(default=1, description="Idle connections kept open in the pool")
+    pool_max_size: int = Field(default=10, description="Maximum pooled LDAP connections")
+    pool_max_idle_time: float = Field(
+        default=300.0, description="Seconds an idle pooled connection is kept before eviction"
+    )
+    pool_max_lifetime: float = Field(
+        default=3600.0, description="Seconds after which a pooled connection is replaced"
+    )
+    pool_checkout_timeout: float = Field(
+        default=30.0, description="Seconds to wait for a free pooled connection"
+    )
+    health_check_method: Literal["root_dse", "whoami"] = Field(
+        default="root_dse",
+        description="Connection health probe: read the root DSE or run a WhoAmI extended operation",
+    )
+    health_check_deep: bool = Field(
+        default=False, description="Also read the base DN entry when probing a connection"
+    )
+    health_check_interval: float = Field(
+        default=60.0,
+        description="Seconds a connection stays trusted after a probe or successful use; "
+        "idle pooled connections older than this are probed in the background",
+    )
+    async_max_workers: int | None = Field(
+        default=None,
+        description="Threads serving async tool calls (defaults to pool_max_size)",
+    )
+    request_coalescing_enabled: bool = Field(
+        default=True,
+        description="Share one execution between identical tool calls running concurrently",
+    )
+
+    @field_validator(
+        "max_retries",
+        "page_size",
+        "max_results",
+        "cache_timeout",
+        "pool_max_size",
+        "query_cache_max_entries",
+        "query_cache_max_bytes",
+        "negative_cache_timeout",
+        "index_max_entries",
+        "circuit_breaker_threshold",
+        "max_open_cursors",
+    )
     @classmethod
     def validate_positive_int(cls, v):
         """Validate positive integers."""
@@ -162,6 +330,46 @@ class PerformanceConfig(BaseModel):
             raise ValueError("Retry delay must be positive")
         return v
 
+    @field_validator(
+        "pool_max_idle_time",
+        "pool_max_lifetime",
+        "pool_checkout_timeout",
+        "org_graph_refresh_interval",
+        "people_index_refresh_interval",
+        "location_index_refresh_interval",
+        "people_index_max_staleness",
+        "snapshot_sync_interval",
+        "snapshot_full_sync_interval",
+        "syncrepl_reconnect_delay",
+        "syncrepl_expire_interval",
+        "health_check_interval",
+        "retry_max_delay",
+        "circuit_breaker_open_interval",
+        "circuit_breaker_max_open_interval",
+        "cursor_timeout",
+    )
+    @classmethod
+    def validate_positive_duration(cls, v):
+        """Validate positive durations."""
+        if v <= 0:
+            raise ValueError("Duration must be positive")
+        return v
+
+    @field_validator("stale_cache_max_age")
+    @classmethod
+    def validate_non_negative_duration(cls, v):
+        """Validate durations that may be zero."""
+        if v < 0:
+            raise ValueError("Duration must not be negative")
+        return v
+
+    @model_validator(mode="after")
+    def validate_pool_bounds(self):
+        """Validate connection pool size bounds."""
+        if self.pool_min_size < 0 or self.pool_min_size > self.pool_max_size:
+            raise ValueError("pool_min_size must be between 0 and pool_max_size")
+        return self
+
 
 class ExportConfig(BaseModel):
     """Configuration for data export functionality."""
@@ -0,0 +1,224 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Asyncio facade over the LDAP connector."""
+
+import asyncio
+import functools
+from collections.abc import Callable, Hashable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from ldap3 import ALL_ATTRIBUTES, SUBTREE
+
+from .ldap_connector import LDAPConnector
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class AsyncLDAPConnector:
+    """
+    Asyncio wrapper around LDAPConnector.
+
+    ldap3 has no asyncio-native strategy, so blocking directory calls are
+    offloaded to a dedicated, bounded thread pool. Awaiting callers cost
+    nothing while they queue, so an event loop can keep hundreds of tool
+    calls in flight while at most ``max_workers`` threads talk to LDAP and
+    the server's shared worker threads stay free.
+    """
+
+    def __init__(self, connector: LDAPConnector, max_workers: int | None = None):
+        """
+        Initialize the async connector.
+
+        Args:
+            connector: Synchronous connector doing the actual LDAP work
+            max_workers: Executor size (defaults to async_max_workers, then pool_max_size)
+        """
+        self.connector = connector
+
+        performance_config = connector.performance_config
+        self.max_workers = (
+            max_workers or performance_config.async_max_workers or performance_config.pool_max_size
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="ldap-async"
+        )
+        # key -> pending call of run_latest(); only touched on the event loop
+        self._latest: dict[str, asyncio.Future] = {}
+        # call key -> running call of run_shared(); only touched on the event loop
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking callable on the LDAP executor.
+
+        Args:
+            func: Callable to run, typically a tool or connector method
+            *args: Positional arguments for the callable
+            **kwargs: Keyword arguments for the callable
+
+        Returns:
+            The callable's return value
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def run_shared(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking callable, sharing one execution between identical concurrent calls.
+
+        Calls to the same function (by qualified name, so bound methods of
+        different tool instances match) with equal arguments while one is
+        still running wait for that one instead of repeating its LDAP work,
+        and all get its result or exception. The result object is shared
+        between callers and must not be mutated. Cancelling one caller
+        does not cancel the shared call. Calls with unhashable arguments,
+        or with request_coalescing_enabled off, run on their own.
+
+        Args:
+            func: Callable to run, typically a tool method
+            *args: Positional arguments for the callable
+            **kwargs: Keyword arguments for the callable
+
+        Returns:
+            The callable's return value
+        """
+        key = self._call_key(func, args, kwargs)
+        if key is None or not self.connector.performance_config.request_coalescing_enabled:
+            return await self.run(func, *args, **kwargs)
+
+        future = self._in_flight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done: self._forget_in_flight(key, done))
+        else:
+            logger.debug(f"Sharing in-flight call {key[0]}")
+        return await asyncio.shield(future)
+
+    def _forget_in_flight(self, key: Hashable, future: asyncio.Future) -> None:
+        """Drop a finished shared call so later calls run afresh."""
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+
+    @staticmethod
+    def _call_key(
+        func: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any]
+    ) -> tuple | None:
+        """
+        Build the key identifying a call for run_shared().
+
+        Lists (e.g. requested fields) are converted to tuples.
+
+        Returns:
+            Hashable key, or None if the call cannot be keyed
+        """
+        name = getattr(func, "__qualname__", None)
+        if name is None:
+            return None
+
+        def freeze(value: Any) -> Any:
+            return tuple(freeze(item) for item in value) if isinstance(value, list) else value
+
+        key = (
+            name,
+            tuple(freeze(arg) for arg in args),
+            tuple(sorted((name, freeze(value)) for name, value in kwargs.items())),
+        )
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    async def run_latest(
+        self, key: str, func: Callable[..., T], *args: Any, **kwargs: Any
+    ) -> T | None:
+        """
+        Run a blocking callable, superseding any pending call with the same key.
+
+        Meant for typeahead: a newer keystroke cancels the previous one. A
+        superseded call that has not started never reaches LDAP and frees
+        its executor slot; one already running finishes in the background
+        with its result discarded. Either way its caller gets None at once.
+
+        Args:
+            key: Supersession key, e.g. a client session id
+            func: Callable to run
+            *args: Positional arguments for the callable
+            **kwargs: Keyword arguments for the callable
+
+        Returns:
+            The callable's return value, or None if a newer call superseded it
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+        previous = self._latest.get(key)
+        if previous is not None:
+            previous.cancel()
+        self._latest[key] = future
+
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if self._latest.get(key) is not future:
+                logger.debug(f"Call superseded for key '{key}'")
+                return None
+            raise  # The caller itself was cancelled
+        finally:
+            if self._latest.get(key) is future:
+                del self._latest[key]
+
+    async def search(
+        self,
+        search_base: str,
+        search_filter: str,
+        attributes: list[str] | str = ALL_ATTRIBUTES,
+        search_scope: str = SUBTREE,
+        size_limit: int = 0,
+    ) -> list[dict[str, Any]]:
+        """
+        Perform an LDAP search without blocking the event loop.
+
+        Args:
+            search_base: Base DN for search
+            search_filter: LDAP filter string
+            attributes: Attributes to retrieve
+            search_scope: Search scope (SUBTREE, ONELEVEL, BASE)
+            size_limit: Maximum number of results (0 = no limit)
+
+        Returns:
+            List of LDAP entries as dictionaries
+        """
+        return await self.run(
+            self.connector.search,
+            search_base=search_base,
+            search_filter=search_filter,
+            attributes=attributes,
+            search_scope=search_scope,
+            size_limit=size_limit,
+        )
+
+    async def test_connection(self) -> dict[str, Any]:
+        """Test the LDAP connection without blocking the event loop."""
+        return await self.run(self.connector.test_connection)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the executor and close pooled connections.
+
+        Args:
+            wait: Wait for in-flight calls to finish
+        """
+        self._executor.shutdown(wait=wait)
+        self.connector.disconnect()
+        logger.info("Async LDAP connector shut down")
@@ -0,0 +1,265 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Query result cache for LDAP searches."""
+
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from threading import Lock
+from typing import Any
+
+from ldap3 import BASE, LEVEL
+
+from .filters import filter_may_match, normalize_dn
+
+# Cache key: (search_base, search_filter, search_scope, attributes, size_limit)
+CacheKey = tuple[str, str, str, tuple[str, ...] | str, int]
+
+
+def make_cache_key(
+    search_base: str,
+    search_filter: str,
+    search_scope: str,
+    attributes: list[str] | str,
+    size_limit: int,
+) -> CacheKey:
+    """
+    Build a normalized cache key for a search.
+
+    DNs are case-insensitive (and servers differ in spacing after RDN
+    separators) and attribute order does not change the result, so both are
+    normalized to share cache entries between equivalent calls.
+    """
+    if isinstance(attributes, str):
+        attribute_key: tuple[str, ...] | str = attributes
+    else:
+        attribute_key = tuple(sorted({attr.lower() for attr in attributes}))
+    return (normalize_dn(search_base), search_filter, str(search_scope), attribute_key, size_limit)
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Roughly estimate the memory footprint of a search result in bytes.
+
+    This is intentionally cheap rather than exact (sys.getsizeof on every
+    nested object costs more than the searches being cached); it only needs
+    to be proportional so the byte budget bounds memory.
+    """
+    if isinstance(value, str | bytes):
+        return 49 + len(value)
+    if isinstance(value, dict):
+        return 64 + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, list | tuple | set):
+        return 56 + sum(estimate_size(item) for item in value)
+    return 32
+
+
+class QueryCache:
+    """
+    Thread-safe TTL + LRU cache of LDAP search results.
+
+    Empty results are cached too (negative caching) with their own, usually
+    shorter, TTL so repeated lookups of unknown identifiers stay cheap
+    without hiding newly created entries for long. The cache is bounded
+    both by entry count and by an estimated byte budget; the least
+    recently used results are evicted first.
+
+    With a stale_ttl, expired results are kept that much longer (still
+    subject to LRU eviction) so get_stale() can serve them while the
+    directory is unavailable.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        negative_ttl: float = 60.0,
+        max_entries: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        stale_ttl: float = 0.0,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Seconds a non-empty result stays fresh
+            negative_ttl: Seconds an empty result stays fresh
+            max_entries: Maximum number of cached searches
+            max_bytes: Approximate memory budget for cached results
+            stale_ttl: Seconds past expiry a result is kept for get_stale()
+        """
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stale_ttl = stale_ttl
+
+        self._lock = Lock()
+        # key -> (entries, expires_at, size)
+        self._entries: OrderedDict[
+            CacheKey, tuple[list[dict[str, Any]], float, int]
+        ] = OrderedDict()
+        self._bytes = 0
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "negative_hits": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+            "stale_hits": 0,
+        }
+
+    def get(self, key: CacheKey) -> list[dict[str, Any]] | None:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Cache key from make_cache_key()
+
+        Returns:
+            Copy of the cached entry list (possibly empty), or None on a miss
+        """
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None:
+                self._stats["misses"] += 1
+                return None
+
+            entries, expires_at, size = cached
+            now = time.monotonic()
+            if now >= expires_at:
+                if now >= expires_at + self.stale_ttl:
+                    self._remove(key)
+                    self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            if not entries:
+                self._stats["negative_hits"] += 1
+            return list(entries)
+
+    def get_stale(self, key: CacheKey) -> list[dict[str, Any]] | None:
+        """
+        Look up a cached result, accepting one expired less than stale_ttl ago.
+
+        Args:
+            key: Cache key from make_cache_key()
+
+        Returns:
+            Copy of the cached entry list, or None if there is none to serve
+        """
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None:
+                return None
+            entries, expires_at, _ = cached
+            if time.monotonic() >= expires_at + self.stale_ttl:
+                return None
+            self._stats["stale_hits"] += 1
+            return list(entries)
+
+    def put(self, key: CacheKey, entries: list[dict[str, Any]]) -> None:
+        """
+        Store a search result.
+
+        Args:
+            key: Cache key from make_cache_key()
+            entries: Search result; an empty list is cached as a negative result
+        """
+        size = estimate_size(entries)
+        if size > self.max_bytes:
+            return
+
+        ttl = self.ttl if entries else self.negative_ttl
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (list(entries), time.monotonic() + ttl, size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats["evictions"] += 1
+
+    def invalidate(
+        self,
+        dn: str | None = None,
+        attributes: Mapping[str, Any] | None = None,
+        deleted: bool = False,
+    ) -> int:
+        """
+        Drop cached results.
+
+        Args:
+            dn: Drop only results that could involve this changed entry:
+                results containing it, and searches whose scope includes it
+                and whose filter it may now match. Drops everything when omitted.
+            attributes: Some current attributes of the entry, to rule out
+                searches whose filter it cannot match; without them every
+                search whose scope includes the entry is dropped
+            deleted: The entry was deleted, so it can only have changed
+                results that contained it
+
+        Returns:
+            Number of cached searches removed
+        """
+        with self._lock:
+            if dn is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                self._bytes = 0
+            else:
+                target = normalize_dn(dn)
+                stale = [
+                    key
+                    for key, (entries, _, _) in self._entries.items()
+                    if _contains_dn(entries, target)
+                    or (
+                        not deleted
+                        and _in_scope(key[0], key[2], target)
+                        and (attributes is None or filter_may_match(key[1], attributes))
+                    )
+                ]
+                for key in stale:
+                    self._remove(key)
+                removed = len(stale)
+
+            self._stats["invalidations"] += removed
+            return removed
+
+    def stats(self) -> dict[str, Any]:
+        """Return cache counters for monitoring."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+                **self._stats,
+            }
+
+    def _remove(self, key: CacheKey) -> None:
+        """Remove a key and its byte accounting (caller holds the lock)."""
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+
+def _in_scope(search_base: str, search_scope: str, dn: str) -> bool:
+    """Check whether a search with a normalized base and scope can return the normalized DN."""
+    if search_scope == BASE:
+        return dn == search_base
+    if search_scope == LEVEL:
+        return dn.partition(",")[2] == search_base
+    return dn == search_base or dn.endswith("," + search_base)
+
+
+def _contains_dn(entries: list[dict[str, Any]], dn: str) -> bool:
+    """Check whether a cached result includes an entry with the given normalized DN."""
+    return any(normalize_dn(entry.get("dn", "")) == dn for entry in entries)
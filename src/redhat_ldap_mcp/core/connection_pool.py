@@ -0,0 +1,409 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Thread-safe pool of bound LDAP connections."""
+
+import bisect
+import threading
+import time
+from collections.abc import Callable
+from threading import Condition
+from typing import Any
+
+from ldap3 import Connection
+from ldap3.core.exceptions import LDAPException
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class ConnectionPool:
+    """
+    Bounded pool of bound LDAP connections.
+
+    Connections are created lazily by a factory up to ``max_size``. Idle
+    connections are reused most-recently-used first, so a quiet server
+    naturally shrinks back towards ``min_size`` through idle eviction.
+    Every checkout runs a health check and silently replaces connections
+    that are unbound, expired or idle for too long.
+
+    That check must be cheap, as it runs on the request path. A network
+    probe can be given separately: a connection counts as verified when it
+    is returned after use or passes a probe, and idle connections not
+    verified for probe_interval are probed by a background thread, which
+    closes those that fail so checkouts do not pick them up. The same
+    thread closes expired idle connections, which most-recently-used
+    checkouts would otherwise leave at the bottom of the idle stack.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Connection],
+        min_size: int = 1,
+        max_size: int = 10,
+        max_idle_time: float = 300.0,
+        max_lifetime: float = 3600.0,
+        checkout_timeout: float = 30.0,
+        health_check: Callable[[Connection], bool] | None = None,
+        probe: Callable[[Connection], bool] | None = None,
+        probe_interval: float = 60.0,
+    ):
+        """
+        Initialize the connection pool.
+
+        Args:
+            factory: Callable returning a new bound connection
+            min_size: Number of idle connections kept regardless of idle time
+            max_size: Maximum number of open connections
+            max_idle_time: Seconds an idle connection may sit before eviction
+            max_lifetime: Seconds after which a connection is always replaced
+            checkout_timeout: Seconds to wait for a free connection
+            health_check: Optional callable validating a connection on checkout
+            probe: Optional network health check run on stale idle connections
+                in the background
+            probe_interval: Seconds after which an idle connection is probed again
+        """
+        self._factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle_time = max_idle_time
+        self.max_lifetime = max_lifetime
+        self.checkout_timeout = checkout_timeout
+        self._health_check = health_check or self._default_health_check
+        self._probe = probe
+        self.probe_interval = probe_interval
+
+        self._condition = Condition()
+        # Idle connections as (connection, created_at, released_at), newest last
+        self._idle: list[tuple[Connection, float, float]] = []
+        # created_at timestamps for every open connection, keyed by id()
+        self._created: dict[int, float] = {}
+        # When each open connection was last known to work, keyed by id()
+        self._verified: dict[int, float] = {}
+        self._pending = 0
+        self._closed = False
+        self._probing = False
+
+        self._stats = {
+            "created": 0,
+            "reused": 0,
+            "evicted": 0,
+            "discarded": 0,
+            "timeouts": 0,
+            "probed": 0,
+            "probe_failures": 0,
+        }
+
+    @property
+    def size(self) -> int:
+        """Number of open connections (idle and in use)."""
+        with self._condition:
+            return len(self._created) + self._pending
+
+    @property
+    def in_use(self) -> int:
+        """Number of connections currently checked out."""
+        with self._condition:
+            return len(self._created) - len(self._idle)
+
+    def acquire(self, timeout: float | None = None) -> Connection:
+        """
+        Check out a healthy connection, creating one if the pool has room.
+
+        Args:
+            timeout: Seconds to wait for a free connection (defaults to checkout_timeout)
+
+        Returns:
+            Connection: Bound LDAP connection owned by the caller until released
+
+        Raises:
+            LDAPException: If the pool is closed or no connection frees up in time
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            stale = []
+            with self._condition:
+                if self._closed:
+                    raise LDAPException("Connection pool is closed")
+
+                candidate = None
+                while self._idle:
+                    connection, created_at, released_at = self._idle.pop()
+                    if self._is_expired(created_at, released_at, time.monotonic()):
+                        self._forget(connection)
+                        self._stats["evicted"] += 1
+                        stale.append(connection)
+                        continue
+                    candidate = connection
+                    break
+
+                if candidate is None:
+                    if len(self._created) + self._pending < self.max_size:
+                        self._pending += 1
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._stats["timeouts"] += 1
+                            raise LDAPException(
+                                f"Timed out after {timeout}s waiting for a pooled LDAP connection"
+                            )
+                        self._condition.wait(remaining)
+                        continue
+
+            self._close_all(stale)
+
+            if candidate is not None:
+                # Health checks may hit the network, so run them outside the lock
+                if self._health_check(candidate):
+                    with self._condition:
+                        self._stats["reused"] += 1
+                        maintenance_due = self._maintenance_due(time.monotonic())
+                    if maintenance_due:
+                        self._schedule_maintenance()
+                    return candidate
+                logger.debug("Pooled connection failed health check, replacing it")
+                self.release(candidate, discard=True)
+                continue
+
+            return self._create()
+
+    def release(self, connection: Connection, discard: bool = False) -> None:
+        """
+        Return a connection to the pool.
+
+        Args:
+            connection: Connection previously obtained from acquire()
+            discard: Close the connection instead of reusing it (e.g. after a socket error)
+        """
+        with self._condition:
+            created_at = self._created.get(id(connection))
+            if created_at is None:
+                # Not one of ours (already discarded or created outside the pool)
+                return
+
+            now = time.monotonic()
+            if discard or self._closed or now - created_at >= self.max_lifetime:
+                self._forget(connection)
+                self._stats["discarded"] += 1
+                to_close = connection
+            else:
+                self._idle.append((connection, created_at, now))
+                # It just served a request, which is as good as a probe
+                self._verified[id(connection)] = now
+                to_close = None
+
+            self._condition.notify()
+            maintenance_due = self._maintenance_due(now)
+
+        if to_close is not None:
+            self._close_all([to_close])
+        if maintenance_due:
+            self._schedule_maintenance()
+
+    def evict_idle(self) -> int:
+        """
+        Close idle connections beyond min_size that exceeded max_idle_time or max_lifetime.
+
+        Returns:
+            Number of connections closed
+        """
+        now = time.monotonic()
+        stale = []
+        with self._condition:
+            keep = []
+            # Oldest first so the most recently used connections survive
+            for index, (connection, created_at, released_at) in enumerate(self._idle):
+                remaining_idle = len(self._idle) - index
+                if remaining_idle > self.min_size and self._is_expired(
+                    created_at, released_at, now
+                ):
+                    self._forget(connection)
+                    self._stats["evicted"] += 1
+                    stale.append(connection)
+                else:
+                    keep.append((connection, created_at, released_at))
+            self._idle = keep
+
+        self._close_all(stale)
+        if stale:
+            logger.debug(f"Evicted {len(stale)} idle LDAP connections")
+        return len(stale)
+
+    def probe_idle(self) -> int:
+        """
+        Probe idle connections not verified for probe_interval, closing those that fail.
+
+        Each connection is taken out of the idle list while it is probed, so
+        it is never handed out and probed at the same time.
+
+        Returns:
+            Number of connections that failed their probe
+        """
+        if self._probe is None:
+            return 0
+
+        failed = 0
+        while True:
+            with self._condition:
+                if self._closed:
+                    return failed
+                now = time.monotonic()
+                for index, (connection, created_at, released_at) in enumerate(self._idle):
+                    if self._is_unverified(connection, now) and not self._is_expired(
+                        created_at, released_at, now
+                    ):
+                        item = self._idle.pop(index)
+                        break
+                else:
+                    return failed
+
+            connection = item[0]
+            try:
+                healthy = self._probe(connection)
+            except Exception as e:
+                logger.debug(f"Pooled connection probe raised: {e}")
+                healthy = False
+
+            with self._condition:
+                self._stats["probed"] += 1
+                if healthy and not self._closed:
+                    self._verified[id(connection)] = time.monotonic()
+                    # Back in its place by release time, so idle eviction is unaffected
+                    bisect.insort(self._idle, item, key=lambda idle: idle[2])
+                    to_close = None
+                else:
+                    self._forget(connection)
+                    to_close = connection
+                    if not healthy:
+                        self._stats["probe_failures"] += 1
+                        failed += 1
+                self._condition.notify()
+
+            if to_close is not None:
+                logger.debug("Idle pooled connection failed its probe, closing it")
+                self._close_all([to_close])
+
+    def close(self) -> None:
+        """Close all idle connections and refuse further checkouts."""
+        with self._condition:
+            self._closed = True
+            idle = [connection for connection, _, _ in self._idle]
+            for connection in idle:
+                self._forget(connection)
+            self._idle = []
+            self._condition.notify_all()
+
+        self._close_all(idle)
+
+    def reset(self) -> None:
+        """Close all idle connections but keep the pool usable."""
+        with self._condition:
+            idle = [connection for connection, _, _ in self._idle]
+            for connection in idle:
+                self._forget(connection)
+            self._idle = []
+
+        self._close_all(idle)
+
+    def stats(self) -> dict[str, Any]:
+        """Return pool counters for monitoring."""
+        with self._condition:
+            return {
+                "size": len(self._created) + self._pending,
+                "idle": len(self._idle),
+                "in_use": len(self._created) - len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                **self._stats,
+            }
+
+    def _create(self) -> Connection:
+        """Create a new connection for a slot already reserved in _pending."""
+        try:
+            connection = self._factory()
+        except Exception:
+            with self._condition:
+                self._pending -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self._pending -= 1
+            self._created[id(connection)] = self._verified[id(connection)] = time.monotonic()
+            self._stats["created"] += 1
+            if self._closed:
+                self._forget(connection)
+                to_close = connection
+            else:
+                to_close = None
+
+        if to_close is not None:
+            self._close_all([to_close])
+            raise LDAPException("Connection pool is closed")
+
+        return connection
+
+    def _is_expired(self, created_at: float, released_at: float, now: float) -> bool:
+        """Check whether an idle connection should be evicted."""
+        return now - created_at >= self.max_lifetime or now - released_at >= self.max_idle_time
+
+    def _forget(self, connection: Connection) -> None:
+        """Drop bookkeeping for a connection (caller holds the lock)."""
+        self._created.pop(id(connection), None)
+        self._verified.pop(id(connection), None)
+
+    def _is_unverified(self, connection: Connection, now: float) -> bool:
+        """Check whether a connection is due for a probe (caller holds the lock)."""
+        return now - self._verified.get(id(connection), 0.0) >= self.probe_interval
+
+    def _maintenance_due(self, now: float) -> bool:
+        """Check whether background eviction or probing should start (caller holds the lock)."""
+        if self._probing:
+            return False
+        # Idle connections evict_idle() may close: all but the newest min_size
+        evictable = self._idle[: max(len(self._idle) - self.min_size, 0)]
+        if any(
+            self._is_expired(created_at, released_at, now)
+            for _, created_at, released_at in evictable
+        ):
+            return True
+        return self._probe is not None and any(
+            self._is_unverified(connection, now) for connection, _, _ in self._idle
+        )
+
+    def _schedule_maintenance(self) -> None:
+        """Evict expired and probe stale idle connections in the background, one run at a time."""
+        with self._condition:
+            if self._probing:
+                return
+            self._probing = True
+
+        def maintain():
+            try:
+                self.evict_idle()
+                self.probe_idle()
+            finally:
+                with self._condition:
+                    self._probing = False
+
+        threading.Thread(target=maintain, name="ldap-pool-probe", daemon=True).start()
+
+    @staticmethod
+    def _default_health_check(connection: Connection) -> bool:
+        """Accept connections that are still bound and not closed."""
+        return bool(connection.bound) and not getattr(connection, "closed", False)
+
+    @staticmethod
+    def _close_all(connections: list[Connection]) -> None:
+        """Unbind connections, ignoring errors from already-dead sockets."""
+        for connection in connections:
+            try:
+                connection.unbind()
+            except Exception as e:
+                logger.debug(f"Error closing pooled connection: {e}")
@@ -0,0 +1,218 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Helpers for building batched LDAP search filters and checking them against entries."""
+
+import re
+from collections.abc import Iterable, Iterator, Mapping
+from typing import Any, TypeVar
+
+from ldap3.utils.conv import escape_filter_chars
+
+T = TypeVar("T")
+
+# Values OR-ed into a single filter. Directory servers cap request size and
+# filter complexity, and very large ORs can stop the server from using its
+# indexes; 50 DNs keeps each filter to a few KB.
+MAX_FILTER_VALUES = 50
+
+# Active Directory's LDAP_MATCHING_RULE_IN_CHAIN: walks the attribute's DN
+# links transitively on the server, e.g. every group a DN is nested into
+IN_CHAIN_MATCHING_RULE = "1.2.840.113556.1.4.1941"
+
+# attr=value, attr>=value, attr<=value or attr~=value inside one filter item
+_ITEM = re.compile(r"^([A-Za-z0-9;.-]+)(>=|<=|~=|=)(.*)$", re.DOTALL)
+_ESCAPE = re.compile(r"\\([0-9a-fA-F]{2})")
+# Characters matching rules commonly ignore (case is folded separately)
+_INSIGNIFICANT = re.compile(r"[\s-]+")
+
+
+def chunked(items: Iterable[T], size: int = MAX_FILTER_VALUES) -> Iterator[list[T]]:
+    """
+    Split items into lists of at most size elements.
+
+    Args:
+        items: Items to split
+        size: Maximum chunk length
+
+    Yields:
+        Consecutive chunks of items
+    """
+    chunk: list[T] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def or_filter(attribute: str, values: Iterable[str]) -> str:
+    """
+    Build an escaped filter matching any of the values.
+
+    Args:
+        attribute: Attribute to compare
+        values: Assertion values (escaped here)
+
+    Returns:
+        "(attr=value)" for one value, "(|(attr=v1)(attr=v2)...)" for several
+    """
+    clauses = [f"({attribute}={escape_filter_chars(value)})" for value in values]
+    if len(clauses) == 1:
+        return clauses[0]
+    return f"(|{''.join(clauses)})"
+
+
+def in_chain_filter(attribute: str, dn: str) -> str:
+    """
+    Build an escaped filter matching entries linked to a DN through any chain.
+
+    Only servers implementing IN_CHAIN_MATCHING_RULE (Active Directory) can
+    evaluate it; others reject the filter or match nothing.
+
+    Args:
+        attribute: DN-valued attribute to follow, e.g. "member"
+        dn: DN at the end of the chain (escaped here)
+
+    Returns:
+        "(attr:1.2.840.113556.1.4.1941:=dn)"
+    """
+    return f"({attribute}:{IN_CHAIN_MATCHING_RULE}:={escape_filter_chars(dn)})"
+
+
+def normalize_dn(dn: str) -> str:
+    """
+    Normalize a DN for comparisons.
+
+    DNs are case-insensitive and servers differ in whether they keep spaces
+    after RDN separators, so "uid=a, ou=Users" and "UID=a,ou=users" match.
+    """
+    return ",".join(part.strip() for part in dn.split(",")).lower()
+
+
+def filter_may_match(search_filter: str, attributes: Mapping[str, Any]) -> bool:
+    """
+    Check whether an entry may match a search filter.
+
+    Equality, substring and presence assertions are evaluated on the given
+    attributes. Values are compared case-insensitively and ignoring spaces
+    and hyphens, looser than any server's matching rules, so a match is
+    never missed. Assertions on attributes not in the mapping, ordering,
+    approximate and extensible matches, and filters that do not parse count
+    as possibly matching.
+
+    Args:
+        search_filter: RFC 4515 filter string
+        attributes: Some of the entry's attributes, each listed with all its
+            values (an empty list or None when the entry has none)
+
+    Returns:
+        False only if the entry cannot match the filter
+    """
+    values = {name.lower(): value for name, value in attributes.items()}
+    try:
+        result, _ = _evaluate(search_filter.strip(), 0, values)
+    except (IndexError, ValueError):
+        return True
+    return result is not False
+
+
+def _evaluate(text: str, pos: int, values: dict[str, Any]) -> tuple[bool | None, int]:
+    """
+    Evaluate the filter starting at pos with three-valued logic (None = unknown).
+
+    Returns:
+        The result and the position after the filter's closing parenthesis
+    """
+    if text[pos] != "(":
+        raise ValueError(f"Expected '(' at {pos}")
+    operator = text[pos + 1]
+
+    if operator in "&|!":
+        results = []
+        pos = _skip_spaces(text, pos + 2)
+        while text[pos] != ")":
+            result, pos = _evaluate(text, pos, values)
+            results.append(result)
+            pos = _skip_spaces(text, pos)
+        if operator == "!":
+            if len(results) != 1:
+                raise ValueError("'!' takes one filter")
+            return (None if results[0] is None else not results[0]), pos + 1
+        decisive = operator == "|"
+        if decisive in results:
+            return decisive, pos + 1
+        return (None if None in results else not decisive), pos + 1
+
+    end = text.index(")", pos)
+    return _evaluate_item(text[pos + 1 : end], values), end + 1
+
+
+def _skip_spaces(text: str, pos: int) -> int:
+    """Skip whitespace between filters, as in filters written over several lines."""
+    while text[pos].isspace():
+        pos += 1
+    return pos
+
+
+def _evaluate_item(item: str, values: dict[str, Any]) -> bool | None:
+    """Evaluate one attribute assertion, or return None when it cannot be decided."""
+    match = _ITEM.match(item)
+    if not match:
+        return None  # Extensible match
+    attribute, operator, assertion = match.groups()
+    attribute = attribute.split(";")[0].lower()
+    if operator != "=" or attribute not in values:
+        return None
+
+    entry_values = values[attribute]
+    if entry_values is None:
+        entry_values = []
+    elif not isinstance(entry_values, list | tuple):
+        entry_values = [entry_values]
+    entry_values = [_canonical(str(value)) for value in entry_values]
+
+    if assertion == "*":
+        return bool(entry_values)
+    if "*" in assertion:
+        parts = [_canonical(_unescape(part)) for part in assertion.split("*")]
+        return any(_matches_substrings(value, parts) for value in entry_values)
+    return _canonical(_unescape(assertion)) in entry_values
+
+
+def _matches_substrings(value: str, parts: list[str]) -> bool:
+    """Check a value against initial*any*...*final substring parts."""
+    initial, *middle, final = parts
+    if not value.startswith(initial):
+        return False
+    pos = len(initial)
+    for part in middle:
+        found = value.find(part, pos)
+        if found < 0:
+            return False
+        pos = found + len(part)
+    return len(value) - pos >= len(final) and value.endswith(final)
+
+
+def _unescape(value: str) -> str:
+    """Decode the \\xx (UTF-8 byte) escapes of a filter assertion value."""
+    if "\\" not in value:
+        return value
+    decoded = bytearray()
+    pos = 0
+    for match in _ESCAPE.finditer(value):
+        decoded += value[pos : match.start()].encode()
+        decoded.append(int(match.group(1), 16))
+        pos = match.end()
+    decoded += value[pos:].encode()
+    return decoded.decode(errors="replace")
+
+
+def _canonical(value: str) -> str:
+    """Fold case and drop spaces and hyphens, for loose value comparisons."""
+    return _INSIGNIFICANT.sub("", value.lower())
@@ -0,0 +1,223 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Fuzzy and phonetic name matching over processed person records."""
+
+import heapq
+import re
+from collections.abc import Sequence
+from typing import Any
+
+_WORD = re.compile(r"[^\W\d_]+")
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+# Similarity credited to a name that sounds like the query but is further
+# away than the edit distance budget ("Kathryn" for "Katherine")
+PHONETIC_SIMILARITY = 0.5
+
+# Distinct names scored per search; bounds the time spent on very common names
+MAX_CANDIDATES = 5000
+
+
+def name_tokens(text: str) -> list[str]:
+    """Split a name into lowercase alphabetic words."""
+    return _WORD.findall(text.lower())
+
+
+def edit_distance(first: str, second: str) -> int:
+    """
+    Return the optimal string alignment distance between two words.
+
+    Counts insertions, deletions, substitutions and swaps of adjacent
+    characters ("jhon" -> "john") as one edit each.
+    """
+    rows = [list(range(len(second) + 1))]
+    for i in range(1, len(first) + 1):
+        row = [i] + [0] * len(second)
+        for j in range(1, len(second) + 1):
+            cost = first[i - 1] != second[j - 1]
+            row[j] = min(rows[-1][j] + 1, row[j - 1] + 1, rows[-1][j - 1] + cost)
+            if i > 1 and j > 1 and first[i - 1] == second[j - 2] and first[i - 2] == second[j - 1]:
+                row[j] = min(row[j], rows[-2][j - 2] + 1)
+        rows = [rows[-1], row]
+    return rows[-1][-1]
+
+
+def deletes(word: str, depth: int = 1) -> set[str]:
+    """Return the word and every string up to depth character deletions away from it."""
+    variants = frontier = {word}
+    for _ in range(depth):
+        frontier = {part[:i] + part[i + 1 :] for part in frontier for i in range(len(part))}
+        variants = variants | frontier
+    return variants
+
+
+def soundex(word: str) -> str:
+    """
+    Return the American Soundex code of a word, e.g. "R163" for Robert and Rupert.
+
+    Args:
+        word: Lowercase alphabetic word
+
+    Returns:
+        Four-character code, or "" for an empty word
+    """
+    if not word:
+        return ""
+    code = [word[0].upper()]
+    previous = _SOUNDEX_CODES.get(word[0], "")
+    for char in word[1:]:
+        digit = _SOUNDEX_CODES.get(char, "")
+        if digit and digit != previous:
+            code.append(digit)
+        if char not in "hw":  # h and w do not separate equal codes
+            previous = digit
+    return "".join(code)[:4].ljust(4, "0")
+
+
+def max_edits(word: str) -> int:
+    """Edit distance budget for a query word: none for very short words, more for long ones."""
+    if len(word) <= 2:
+        return 0
+    return 1 if len(word) <= 5 else 2
+
+
+# Shortest indexed word a query word with a budget of 2 (6+ characters) can reach
+_TWO_EDIT_MIN_LENGTH = 4
+
+
+class FuzzyNameIndex:
+    """
+    Typo- and sound-tolerant name search over person records.
+
+    Every word of a person's cn, given name and surname is indexed. A query
+    word matches indexed words within a small edit distance or with the same
+    Soundex code, scored 1 - edits / length or PHONETIC_SIMILARITY.
+    Edit-distance candidates come from a SymSpell-style table of deletions:
+    two words d edits (or swaps) apart always share a variant within d
+    deletions of each, so finding them takes a few hundred dict lookups at
+    most instead of a comparison against every name. Words that a two-edit
+    query can reach are stored with their variants up to two deletions deep,
+    about len(word) ** 2 / 2 entries per distinct word, shorter ones one
+    deletion deep. A person matches when each query word matches one
+    of their words; people are ranked by the summed similarity, ties keeping
+    directory order. People sharing the same name words are scored once,
+    and only names holding a match of the least common query word are
+    scored, at most MAX_CANDIDATES of them, so each search takes bounded
+    time however common the names are.
+    """
+
+    def __init__(self, people: Sequence[dict[str, Any]]):
+        """
+        Build the index.
+
+        Args:
+            people: Processed person records
+        """
+        self.people = people
+        # Distinct word sets ("names") with the people holding each, so that
+        # people sharing a name are scored once
+        name_ids: dict[frozenset[str], int] = {}
+        self._names: list[frozenset[str]] = []
+        self._holders: list[list[int]] = []
+        for index, person in enumerate(people):
+            words: set[str] = set()
+            for field in ("cn", "given_name", "surname"):
+                values = person.get(field)
+                for value in values if isinstance(values, list) else [values]:
+                    if value:
+                        words.update(name_tokens(str(value)))
+            name = frozenset(words)
+            if name not in name_ids:
+                name_ids[name] = len(self._names)
+                self._names.append(name)
+                self._holders.append([])
+            self._holders[name_ids[name]].append(index)
+
+        # word -> names containing it
+        self._postings: dict[str, list[int]] = {}
+        for name_id, name in enumerate(self._names):
+            for word in name:
+                self._postings.setdefault(word, []).append(name_id)
+
+        self._variants: dict[str, list[str]] = {}
+        self._sounds: dict[str, list[str]] = {}
+        for word in self._postings:
+            depth = 2 if len(word) >= _TWO_EDIT_MIN_LENGTH else 1
+            for variant in deletes(word, depth):
+                self._variants.setdefault(variant, []).append(word)
+            self._sounds.setdefault(soundex(word), []).append(word)
+
+    def search(self, query: str, max_results: int) -> list[dict[str, Any]]:
+        """
+        Find people whose names approximately match a query.
+
+        Args:
+            query: Name or names, e.g. "Jon Smyth"
+            max_results: Maximum number of results
+
+        Returns:
+            Matching person records, best first
+        """
+        query_words = list(dict.fromkeys(name_tokens(query)))
+        if not query_words:
+            return []
+
+        matches = [self._similar_words(word) for word in query_words]
+        if not all(matches):
+            return []
+
+        # Score only the names holding some match of the most selective
+        # word, closest matches first, up to MAX_CANDIDATES names
+        rarest = min(matches, key=lambda similar: sum(len(self._postings[w]) for w in similar))
+        candidates: set[int] = set()
+        for word in sorted(rarest, key=rarest.__getitem__, reverse=True):
+            candidates.update(self._postings[word])
+            if len(candidates) >= MAX_CANDIDATES:
+                break
+
+        levels: dict[float, list[int]] = {}
+        for name_id in candidates:
+            name = self._names[name_id]
+            total = 0.0
+            for similar in matches:
+                best = max((similar.get(word, 0.0) for word in name), default=0.0)
+                if not best:
+                    break
+                total += best
+            else:
+                levels.setdefault(total, []).extend(self._holders[name_id])
+
+        results: list[int] = []
+        for total in sorted(levels, reverse=True):
+            results.extend(heapq.nsmallest(max_results - len(results), levels[total]))
+            if len(results) >= max_results:
+                break
+        return [self.people[index] for index in results]
+
+    def _similar_words(self, word: str) -> dict[str, float]:
+        """Return indexed words similar to a query word with their similarity."""
+        similar = {}
+        checked = set()
+        budget = max_edits(word)
+        for variant in deletes(word, budget):
+            for candidate in self._variants.get(variant, []):
+                if candidate not in checked:
+                    checked.add(candidate)
+                    distance = edit_distance(word, candidate)
+                    if distance <= budget:
+                        similar[candidate] = 1.0 - distance / max(len(word), len(candidate))
+        for candidate in self._sounds.get(soundex(word), []):
+            similar.setdefault(candidate, PHONETIC_SIMILARITY)
+        return similar
@@ -0,0 +1,209 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Registry of in-process directory indexes with background refresh."""
+
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class _IndexEntry:
+    """A built index and its refresh bookkeeping."""
+
+    def __init__(self):
+        """Initialize an entry with no index built yet."""
+        self.value: Any = None
+        self.built_at = 0.0
+        self.build_seconds = 0.0
+        self.builds = 0
+        self.refreshing = False
+        # Set by expire(); cleared when a build starts, so changes made
+        # during a build trigger another one
+        self.expired = False
+        # When and why the last synchronous build failed, to back off retries
+        self.failed_at = 0.0
+        self.error: Exception | None = None
+        self.build_lock = threading.Lock()
+
+
+class IndexRegistry:
+    """
+    Named, lazily built indexes shared by all tools of a connector.
+
+    The first caller builds an index synchronously. Once an index is older
+    than its max_age, or has been expired because the directory changed,
+    callers keep getting the current copy while a single background thread
+    rebuilds it (stale-while-revalidate), so a refresh never blocks tool
+    calls. A failed refresh keeps the previous copy. A failed first build
+    is not retried until max_age has passed; callers fail fast meanwhile.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._lock = threading.Lock()
+        self._entries: dict[str, _IndexEntry] = {}
+
+    def get(self, name: str, builder: Callable[[], Any], max_age: float, wait: bool = True) -> Any:
+        """
+        Return an index, building or scheduling a refresh as needed.
+
+        Args:
+            name: Index name
+            builder: Callable returning a freshly built index
+            max_age: Seconds after which the index is rebuilt in the background
+            wait: Build a missing index synchronously; when False, start the
+                first build in the background and return None until it is done
+
+        Returns:
+            The index, or None if wait is False and it is not built yet
+
+        Raises:
+            Exception: Whatever the builder raises when no copy exists yet and
+                wait is True; RuntimeError while backing off after such a failure
+        """
+        entry = self._entry(name)
+
+        if entry.value is None and not wait:
+            # A failed background build resets built_at, so retries back off
+            if not entry.built_at or time.monotonic() - entry.built_at > max_age:
+                self._schedule_refresh(name, entry, builder)
+            return entry.value
+
+        if entry.value is None:
+            self._check_backoff(name, entry, max_age)
+            with entry.build_lock:
+                # Another caller may have finished (or failed) the build while we waited
+                if entry.value is None:
+                    self._check_backoff(name, entry, max_age)
+                    try:
+                        self._build(name, entry, builder)
+                    except Exception as e:
+                        entry.failed_at, entry.error = time.monotonic(), e
+                        raise
+            return entry.value
+
+        if entry.expired or time.monotonic() - entry.built_at > max_age:
+            self._schedule_refresh(name, entry, builder)
+        return entry.value
+
+    def peek(self, name: str) -> Any | None:
+        """Return an index if it has been built, without building it."""
+        with self._lock:
+            entry = self._entries.get(name)
+        return entry.value if entry else None
+
+    def put(self, name: str, value: Any) -> None:
+        """
+        Install an index built or updated outside the registry.
+
+        Args:
+            name: Index name
+            value: The index
+        """
+        entry = self._entry(name)
+        entry.value = value
+        entry.built_at = time.monotonic()
+
+    def invalidate(self, name: str | None = None) -> None:
+        """
+        Drop an index so the next get() rebuilds it.
+
+        Args:
+            name: Index name; drops every index when omitted
+        """
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+    def expire(self, name: str | None = None) -> None:
+        """
+        Mark built indexes out of date, so the next get() refreshes them in the background.
+
+        Unlike invalidate(), callers keep getting the current copy meanwhile.
+
+        Args:
+            name: Index name; expires every index when omitted
+        """
+        with self._lock:
+            entries = list(self._entries.values()) if name is None else [self._entries.get(name)]
+        for entry in entries:
+            if entry is not None and entry.value is not None:
+                entry.expired = True
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Return per-index age and build statistics."""
+        now = time.monotonic()
+        with self._lock:
+            entries = dict(self._entries)
+        return {
+            name: {
+                "built": entry.value is not None,
+                "age": now - entry.built_at if entry.value is not None else None,
+                "builds": entry.builds,
+                "build_seconds": entry.build_seconds,
+                "refreshing": entry.refreshing,
+                "expired": entry.expired,
+                "size": len(entry.value) if hasattr(entry.value, "__len__") else None,
+            }
+            for name, entry in entries.items()
+        }
+
+    def _entry(self, name: str) -> _IndexEntry:
+        """Get or create the bookkeeping entry for an index."""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                entry = self._entries[name] = _IndexEntry()
+            return entry
+
+    @staticmethod
+    def _check_backoff(name: str, entry: _IndexEntry, max_age: float) -> None:
+        """Fail fast while a failed first build is backing off (for max_age seconds)."""
+        if entry.error is None:
+            return
+        age = time.monotonic() - entry.failed_at
+        if age <= max_age:
+            raise RuntimeError(f"Building index '{name}' failed {age:.0f}s ago: {entry.error}")
+
+    def _build(self, name: str, entry: _IndexEntry, builder: Callable[[], Any]) -> None:
+        """Run the builder and install its result."""
+        start = time.monotonic()
+        entry.expired = False
+        value = builder()
+        entry.build_seconds = time.monotonic() - start
+        entry.builds += 1
+        entry.value = value
+        entry.built_at = time.monotonic()
+        entry.error = None
+        logger.info(f"Built index '{name}' in {entry.build_seconds:.2f}s")
+
+    def _schedule_refresh(self, name: str, entry: _IndexEntry, builder: Callable[[], Any]) -> None:
+        """Start a background rebuild unless one is already running."""
+        with self._lock:
+            if entry.refreshing:
+                return
+            entry.refreshing = True
+
+        def refresh():
+            try:
+                with entry.build_lock:
+                    self._build(name, entry, builder)
+            except Exception as e:
+                logger.warning(f"Refreshing index '{name}' failed, keeping previous copy: {e}")
+                # Back off for a full interval instead of retrying on every call
+                entry.built_at = time.monotonic()
+            finally:
+                entry.refreshing = False
+
+        threading.Thread(target=refresh, name=f"index-refresh-{name}", daemon=True).start()
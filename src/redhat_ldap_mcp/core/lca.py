@@ -0,0 +1,107 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Lowest common ancestor queries over the org tree via binary lifting."""
+
+from collections.abc import Iterable
+
+
+class LCAIndex:
+    """
+    Binary lifting table over a forest given as parent and depth arrays.
+
+    ``up[k][v]`` is the 2^k-th manager of v (roots point to themselves), so
+    lifting a node by any distance takes O(log depth) steps. Building costs
+    O(n log depth) time and memory; each query is O(log depth).
+    """
+
+    def __init__(self, parent: list[int], depth: list[int]):
+        """
+        Build the lifting table.
+
+        Args:
+            parent: Parent index per node, -1 for roots (must be acyclic)
+            depth: Depth per node, 0 for roots
+        """
+        self.depth = depth
+        levels = max(max(depth, default=0).bit_length(), 1)
+
+        first = [node if manager == -1 else manager for node, manager in enumerate(parent)]
+        self.up: list[list[int]] = [first]
+        for _ in range(1, levels):
+            previous = self.up[-1]
+            self.up.append([previous[previous[node]] for node in range(len(previous))])
+
+    def ancestor(self, node: int, distance: int) -> int:
+        """
+        Return the manager distance levels above a node (the root if shallower).
+
+        Args:
+            node: Node index
+            distance: Number of levels to climb
+
+        Returns:
+            Ancestor index
+        """
+        level = 0
+        while distance and level < len(self.up):
+            if distance & 1:
+                node = self.up[level][node]
+            distance >>= 1
+            level += 1
+        return node
+
+    def lca(self, first: int, second: int) -> int | None:
+        """
+        Return the lowest common ancestor of two nodes.
+
+        A node is its own ancestor, so if one node is above the other the
+        upper node is returned.
+
+        Args:
+            first: First node index
+            second: Second node index
+
+        Returns:
+            Lowest common ancestor, or None if the nodes are in different trees
+        """
+        if self.depth[first] < self.depth[second]:
+            first, second = second, first
+        first = self.ancestor(first, self.depth[first] - self.depth[second])
+        if first == second:
+            return first
+
+        for level in range(len(self.up) - 1, -1, -1):
+            if self.up[level][first] != self.up[level][second]:
+                first = self.up[level][first]
+                second = self.up[level][second]
+
+        first, second = self.up[0][first], self.up[0][second]
+        return first if first == second else None
+
+    def distance(self, first: int, second: int) -> int | None:
+        """
+        Return the number of reporting edges between two nodes.
+
+        Args:
+            first: First node index
+            second: Second node index
+
+        Returns:
+            Edge count through the lowest common ancestor, or None if unrelated
+        """
+        ancestor = self.lca(first, second)
+        if ancestor is None:
+            return None
+        return self.depth[first] + self.depth[second] - 2 * self.depth[ancestor]
+
+    def lca_many(self, pairs: Iterable[tuple[int, int]]) -> list[int | None]:
+        """Answer lca() for many pairs."""
+        return [self.lca(first, second) for first, second in pairs]
+
+    def distance_many(self, pairs: Iterable[tuple[int, int]]) -> list[int | None]:
+        """Answer distance() for many pairs."""
+        return [self.distance(first, second) for first, second in pairs]
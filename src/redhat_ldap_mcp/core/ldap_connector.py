@@ -6,19 +6,56 @@
 
 """Enhanced LDAP connector for corporate LDAP directories."""
 
-import logging
+import hashlib
 import ssl
+import threading
 import time
-from threading import Lock
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import partial
 from typing import Any
 
 import ldap3
-from ldap3 import ALL, ALL_ATTRIBUTES, SUBTREE, Connection, Server
-from ldap3.core.exceptions import LDAPBindError, LDAPException, LDAPSocketOpenError
+from ldap3 import ALL, ALL_ATTRIBUTES, BASE, SUBTREE, Connection, Server
+from ldap3.core.exceptions import (
+    LDAPBindError,
+    LDAPCommunicationError,
+    LDAPException,
+    LDAPNoSuchObjectResult,
+    LDAPSocketOpenError,
+)
 
 from ..config.models import LDAPConfig, PerformanceConfig, SecurityConfig
-
-logger = logging.getLogger(__name__)
+from .cache import QueryCache, make_cache_key
+from .connection_pool import ConnectionPool
+from .index_registry import IndexRegistry
+from .logging import get_logger
+from .paging import (
+    PAGED_RESULTS_OID,
+    SORT_REQUEST_OID,
+    VLV_REQUEST_OID,
+    VLV_RESPONSE_OID,
+    OpenCursor,
+    OpenCursorStore,
+    decode_cursor,
+    decode_vlv_response,
+    encode_cursor,
+    sort_control,
+    vlv_request_control,
+)
+from .server_selector import (
+    DirectoryUnavailableError,
+    ServerSelector,
+    ServerState,
+    backoff_delay,
+)
+from .snapshot import DirectorySnapshot
+from .syncrepl import SyncReplConsumer
+
+logger = get_logger(__name__)
+
+# RFC 4532 "Who am I?" extended operation
+WHOAMI_OID = "1.3.6.1.4.1.4203.1.11.3"
 
 
 class LDAPConnector:
@@ -29,7 +66,16 @@ class LDAPConnector:
     - Anonymous bind (for read-only corporate directories)
     - Simple bind (username/password)
     - SASL bind (future implementation)
-    - Automatic reconnection and retry logic
+    - Automatic reconnection with jittered exponential backoff
+    - Per-server circuit breakers, serving stale cached results during outages
+    - Load balancing and failover across read replicas
+    - Bounded pools of bound connections, health-checked in the background
+    - TTL + LRU cache of search results
+    - Cursor pagination with server-side sort and virtual list view
+    - Registry of shared in-memory directory indexes
+    - Optional local SQLite snapshot of people and groups
+    - Optional syncrepl change feed keeping the above fresh
+    - Search base discovery shared by every tool instance
     - Corporate LDAP optimizations
     """
 
@@ -51,12 +97,79 @@ class LDAPConnector:
         self.security_config = security_config
         self.performance_config = performance_config
 
-        self._connection: Connection | None = None
-        self._server: Server | None = None
-        self._lock = Lock()
+        # Server and read replicas, each with its own connection pool
+        self._servers: list[ServerState] = []
 
         self._setup_server()
 
+        for state in self._servers:
+            state.pool = ConnectionPool(
+                factory=partial(self._open_connection, state),
+                min_size=performance_config.pool_min_size,
+                max_size=performance_config.pool_max_size,
+                max_idle_time=performance_config.pool_max_idle_time,
+                max_lifetime=performance_config.pool_max_lifetime,
+                checkout_timeout=performance_config.pool_checkout_timeout,
+                probe=partial(self._probe_server, state),
+                probe_interval=performance_config.health_check_interval,
+            )
+        self._selector = ServerSelector(
+            self._servers,
+            strategy=ldap_config.server_selection,
+            failure_threshold=performance_config.circuit_breaker_threshold,
+            open_interval=performance_config.circuit_breaker_open_interval,
+            max_open_interval=performance_config.circuit_breaker_max_open_interval,
+        )
+        # Server of every checked-out connection, keyed by id()
+        self._checked_out: dict[int, ServerState] = {}
+        self._checked_out_lock = threading.Lock()
+
+        self._cache: QueryCache | None = None
+        if performance_config.query_cache_enabled:
+            self._cache = QueryCache(
+                ttl=performance_config.cache_timeout,
+                negative_ttl=performance_config.negative_cache_timeout,
+                max_entries=performance_config.query_cache_max_entries,
+                max_bytes=performance_config.query_cache_max_bytes,
+                stale_ttl=performance_config.stale_cache_max_age,
+            )
+
+        # Paged searches left open between pages of search_page(); each holds
+        # a connection, so at most half of a pool's connections
+        self._cursors = OpenCursorStore(
+            self._close_cursor,
+            max_size=min(
+                performance_config.max_open_cursors, performance_config.pool_max_size // 2
+            ),
+            timeout=performance_config.cursor_timeout,
+        )
+        # Cleared when a server advertising VLV turns out unable to serve it
+        self._vlv_usable = performance_config.vlv_enabled
+
+        # In-memory indexes (org graph, ...) shared by every tool instance
+        self.indexes = IndexRegistry()
+
+        # Local snapshot of people and groups, kept in sync by the tools
+        self.snapshot: DirectorySnapshot | None = None
+        if performance_config.snapshot_path:
+            self.snapshot = DirectorySnapshot(performance_config.snapshot_path)
+
+        # Discovered search bases: kind -> (base DN, expires_at)
+        self._search_bases: dict[str, tuple[str, float]] = {}
+        self._search_bases_lock = threading.Lock()
+
+        # Directory change feed invalidating the cache, indexes and snapshot
+        self.change_feed: SyncReplConsumer | None = None
+        if performance_config.syncrepl_enabled:
+            self.change_feed = SyncReplConsumer(
+                self,
+                ldap_config.base_dn,
+                cookie_path=performance_config.syncrepl_cookie_path,
+                reconnect_delay=performance_config.syncrepl_reconnect_delay,
+                expire_interval=performance_config.syncrepl_expire_interval,
+            )
+            self.change_feed.start()
+
     def _setup_server(self) -> None:
         """Setup LDAP server configuration."""
         try:
@@ -72,15 +185,16 @@ class LDAPConnector:
                     ca_certs_file=self.security_config.ca_cert_file,
                 )
 
-            # Create server
-            self._server = Server(
-                self.ldap_config.server,
-                get_info=ALL,
-                tls=tls_config,
-                connect_timeout=self.ldap_config.timeout,
-            )
-
-            logger.info(f"Configured LDAP server: {self.ldap_config.server}")
+            # Create the server and its replicas
+            for url in [self.ldap_config.server, *self.ldap_config.replicas]:
+                server = Server(
+                    url,
+                    get_info=ALL,
+                    tls=tls_config,
+                    connect_timeout=self.ldap_config.timeout,
+                )
+                self._servers.append(ServerState(url, server))
+                logger.info(f"Configured LDAP server: {url}")
 
         except Exception as e:
             logger.error(f"Error setting up LDAP server: {e}")
@@ -88,7 +202,88 @@ class LDAPConnector:
 
     def connect(self) -> Connection:
         """
-        Establish LDAP connection with retry logic.
+        Check out a bound connection from the pool of the selected server.
+
+        Servers are tried in the order of the server_selection strategy;
+        when one cannot hand out a connection, the next one is tried.
+        Servers whose circuit breaker is open are skipped, so during an
+        outage this fails at once instead of waiting on connection attempts.
+        The caller owns the connection until it is handed back with release().
+        Prefer the connection() context manager, which always releases.
+
+        Returns:
+            Connection: Active LDAP connection
+
+        Raises:
+            DirectoryUnavailableError: If no server can provide a connection
+        """
+        # Expired cursors hand their connections back before a new checkout
+        self._cursors.expire()
+
+        candidates = self._selector.candidates()
+        if not candidates:
+            raise DirectoryUnavailableError(
+                f"LDAP directory unavailable (circuit open), retry in "
+                f"{self._selector.retry_in():.1f}s"
+            )
+
+        last_error: LDAPException | None = None
+        for state in candidates:
+            try:
+                connection = state.pool.acquire()
+            except LDAPException as e:
+                logger.debug(f"No connection from {state.url}: {e}")
+                last_error = e
+                continue
+            with self._checked_out_lock:
+                self._checked_out[id(connection)] = state
+                state.requests += 1
+            return connection
+        raise DirectoryUnavailableError(str(last_error)) from last_error
+
+    def release(self, connection: Connection, discard: bool = False) -> None:
+        """
+        Return a connection obtained from connect() to its server's pool.
+
+        Args:
+            connection: Connection to return
+            discard: Close the connection instead of reusing it, counting a
+                failure of its server (e.g. after a socket error)
+        """
+        with self._checked_out_lock:
+            state = self._checked_out.pop(id(connection), None)
+        if state is None:
+            return
+        if discard:
+            self._selector.record_failure(state)
+        else:
+            self._selector.record_success(state)
+        state.pool.release(connection, discard=discard)
+
+    @contextmanager
+    def connection(self) -> Iterator[Connection]:
+        """Context manager yielding a pooled connection that is always released."""
+        connection = self.connect()
+        discard = False
+        try:
+            yield connection
+        except LDAPCommunicationError:
+            discard = True
+            raise
+        finally:
+            self.release(connection, discard=discard)
+
+    def _open_connection(self, state: ServerState) -> Connection:
+        """
+        Establish a new bound LDAP connection with retry logic.
+
+        Used by each server's connection pool as its connection factory.
+        Retries wait an exponentially growing, jittered delay. With replicas
+        configured, a server gets a single attempt so the checkout fails
+        over to the next server instead of retrying.
+
+        Args:
+            state: Server to connect to
 
         Returns:
             Connection: Active LDAP connection
@@ -96,85 +291,91 @@ class LDAPConnector:
         Raises:
             LDAPException: If connection fails after all retries
         """
-        with self._lock:
-            if self._connection and self._connection.bound:
-                return self._connection
+        last_error = None
+        attempts = self.performance_config.max_retries if len(self._servers) == 1 else 1
 
-            last_error = None
+        for attempt in range(attempts):
+            try:
+                logger.debug(f"Attempting LDAP connection to {state.url} (attempt {attempt + 1})")
 
-            for attempt in range(self.performance_config.max_retries):
-                try:
-                    logger.debug(f"Attempting LDAP connection (attempt {attempt + 1})")
-
-                    # Create connection based on auth method
-                    connection = self._create_connection()
-
-                    # Test the connection
-                    if self._test_connection(connection):
-                        self._connection = connection
-                        logger.info(
-                            f"Successfully connected to LDAP server using "
-                            f"{self.ldap_config.auth_method} auth"
-                        )
-                        return connection
-                    else:
-                        logger.warning(f"Connection test failed on attempt {attempt + 1}")
-
-                except (LDAPSocketOpenError, LDAPBindError) as e:
-                    logger.warning(f"Connection failed on attempt {attempt + 1}: {e}")
-                    last_error = e
+                # Create connection based on auth method
+                connection = self._create_connection(state.server)
 
-                except Exception as e:
-                    logger.error(f"Unexpected error during connection attempt {attempt + 1}: {e}")
-                    last_error = e
-
-                # Retry delay (except for last attempt)
-                if attempt < self.performance_config.max_retries - 1:
-                    logger.debug(f"Retrying in {self.performance_config.retry_delay} seconds")
-                    time.sleep(self.performance_config.retry_delay)
-
-            # All attempts failed
-            error_msg = (
-                f"Failed to connect to LDAP server after "
-                f"{self.performance_config.max_retries} attempts"
-            )
-            if last_error:
-                error_msg += f". Last error: {last_error}"
+                # Test the connection
+                if self._test_connection(connection):
+                    logger.info(
+                        f"Successfully connected to LDAP server {state.url} using "
+                        f"{self.ldap_config.auth_method} auth"
+                    )
+                    self._selector.record_success(state)
+                    return connection
+                else:
+                    logger.warning(f"Connection test failed on attempt {attempt + 1}")
 
-            logger.error(error_msg)
-            raise LDAPException(error_msg)
+            except (LDAPSocketOpenError, LDAPBindError) as e:
+                logger.warning(f"Connection failed on attempt {attempt + 1}: {e}")
+                last_error = e
 
-    def _create_connection(self) -> Connection:
+            except Exception as e:
+                logger.error(f"Unexpected error during connection attempt {attempt + 1}: {e}")
+                last_error = e
+
+            # Retry delay (except for last attempt)
+            if attempt < attempts - 1:
+                delay = backoff_delay(
+                    self.performance_config.retry_delay,
+                    attempt,
+                    self.performance_config.retry_max_delay,
+                )
+                logger.debug(f"Retrying in {delay:.2f} seconds")
+                time.sleep(delay)
+
+        # All attempts failed
+        self._selector.record_failure(state)
+        error_msg = f"Failed to connect to LDAP server {state.url} after {attempts} attempts"
+        if last_error:
+            error_msg += f". Last error: {last_error}"
+
+        logger.error(error_msg)
+        raise LDAPException(error_msg)
+
+    def _create_connection(self, server: Server | None = None, **options: Any) -> Connection:
         """
         Create LDAP connection based on authentication method.
 
+        Args:
+            server: Server to connect to (defaults to the configured server)
+            **options: Connection arguments overriding the defaults, e.g. client_strategy
+
         Returns:
             Connection: LDAP connection object
         """
         if self.ldap_config.auth_method == "anonymous":
-            return self._create_anonymous_connection()
+            return self._create_anonymous_connection(server, **options)
         elif self.ldap_config.auth_method == "simple":
-            return self._create_simple_connection()
+            return self._create_simple_connection(server, **options)
         elif self.ldap_config.auth_method == "sasl":
-            return self._create_sasl_connection()
+            return self._create_sasl_connection(server, **options)
         else:
             raise ValueError(f"Unsupported authentication method: {self.ldap_config.auth_method}")
 
-    def _create_anonymous_connection(self) -> Connection:
+    def _create_anonymous_connection(
+        self, server: Server | None = None, **options: Any
+    ) -> Connection:
         """Create anonymous LDAP connection."""
         logger.debug("Creating anonymous LDAP connection")
 
         connection = Connection(
-            self._server,
+            server or self._servers[0].server,
             authentication=ldap3.ANONYMOUS,
-            receive_timeout=self.ldap_config.receive_timeout,
             check_names=True,
             raise_exceptions=True,
+            **{"receive_timeout": self.ldap_config.receive_timeout, **options},
         )
 
         return connection
 
-    def _create_simple_connection(self) -> Connection:
+    def _create_simple_connection(self, server: Server | None = None, **options: Any) -> Connection:
         """Create simple bind LDAP connection."""
         logger.debug("Creating simple bind LDAP connection")
 
@@ -182,24 +383,69 @@ class LDAPConnector:
             raise ValueError("Simple authentication requires bind_dn and password")
 
         connection = Connection(
-            self._server,
+            server or self._servers[0].server,
             user=self.ldap_config.bind_dn,
             password=self.ldap_config.password,
             authentication=ldap3.SIMPLE,
-            receive_timeout=self.ldap_config.receive_timeout,
             check_names=True,
             raise_exceptions=True,
+            **{"receive_timeout": self.ldap_config.receive_timeout, **options},
         )
 
         return connection
 
-    def _create_sasl_connection(self) -> Connection:
+    def _create_sasl_connection(self, server: Server | None = None, **options: Any) -> Connection:
         """Create SASL LDAP connection (placeholder for future implementation)."""
         raise NotImplementedError("SASL authentication is not yet implemented")
 
+    def open_stream_connection(self) -> Connection:
+        """
+        Open a dedicated bound connection for a long-running streamed search.
+
+        The connection is not pooled, goes to the first server the selector
+        offers that accepts it, uses ldap3's ASYNC_STREAM strategy and has no
+        receive timeout, so a persistent search can sit idle between
+        notifications. The caller must unbind it.
+
+        Returns:
+            Connection: Bound streaming connection
+
+        Raises:
+            DirectoryUnavailableError: If no server can open and bind the connection
+        """
+        candidates = self._selector.candidates()
+        if not candidates:
+            raise DirectoryUnavailableError(
+                f"LDAP directory unavailable (circuit open), retry in "
+                f"{self._selector.retry_in():.1f}s"
+            )
+
+        last_error: Exception | None = None
+        for state in candidates:
+            connection = None
+            try:
+                connection = self._create_connection(
+                    state.server, client_strategy=ldap3.ASYNC_STREAM, receive_timeout=None
+                )
+                if not connection.bind():
+                    raise LDAPBindError(f"Bind failed: {connection.result}")
+            except Exception as e:
+                logger.debug(f"No streaming connection from {state.url}: {e}")
+                self._selector.record_failure(state)
+                last_error = e
+                if connection is not None:
+                    try:
+                        connection.unbind()
+                    except Exception as close_error:
+                        logger.debug(f"Could not close streaming connection: {close_error}")
+                continue
+            self._selector.record_success(state)
+            return connection
+        raise DirectoryUnavailableError(str(last_error)) from last_error
+
     def _test_connection(self, connection: Connection) -> bool:
         """
-        Test LDAP connection.
+        Bind a new connection and probe it.
 
         Args:
             connection: Connection to test
@@ -208,82 +454,246 @@ class LDAPConnector:
             True if connection is working
         """
         try:
-            # Bind the connection
             if not connection.bind():
                 logger.debug(f"Bind failed: {connection.result}")
                 return False
+        except Exception as e:
+            logger.debug(f"Connection test failed: {e}")
+            return False
+        return self._probe_connection(connection)
 
-            # Test with different search strategies for corporate LDAP compatibility
-            test_strategies = [
-                # Strategy 1: Root DSE search (standard but may not work with corporate LDAP)
-                {
-                    "search_base": self.ldap_config.base_dn,
-                    "search_filter": "(objectClass=*)",
-                    "search_scope": ldap3.BASE,
-                    "attributes": ["namingContexts"],
-                    "name": "Root DSE",
-                },
-                # Strategy 2: Simple base DN search
-                {
-                    "search_base": self.ldap_config.base_dn,
-                    "search_filter": "(objectClass=*)",
-                    "search_scope": ldap3.SUBTREE,
-                    "attributes": ["objectClass"],
-                    "name": "Base DN subtree",
-                },
-                # Strategy 3: Search for any person object (most likely to work)
-                {
-                    "search_base": self.ldap_config.base_dn,
-                    "search_filter": "(objectClass=person)",
-                    "search_scope": ldap3.SUBTREE,
-                    "attributes": ["uid"],
-                    "name": "Person search",
-                },
-            ]
-
-            for strategy in test_strategies:
-                try:
-                    success = connection.search(
-                        search_base=strategy["search_base"],
-                        search_filter=strategy["search_filter"],
-                        search_scope=strategy["search_scope"],
-                        attributes=strategy["attributes"],
-                        size_limit=1,
-                    )
+    def _probe_connection(self, connection: Connection) -> bool:
+        """
+        Check a bound connection with one cheap request, plus an optional deeper one.
 
-                    if success and connection.entries:
-                        logger.debug(
-                            f"Connection test successful using {strategy['name']} strategy"
-                        )
-                        return True
-                    elif success:
-                        logger.debug(f"{strategy['name']} search succeeded but returned no entries")
-                    else:
-                        logger.debug(f"{strategy['name']} search failed: {connection.result}")
+        The root DSE read and the WhoAmI operation (health_check_method)
+        touch no directory data, so they cost the same on any directory
+        size; WhoAmI also confirms the bind is still accepted. Servers that
+        refuse them (restricted root DSE, no WhoAmI support) are checked by
+        reading the base DN entry instead, which health_check_deep also
+        always does.
 
-                except Exception as e:
-                    logger.debug(f"{strategy['name']} strategy failed: {e}")
-                    continue
+        Args:
+            connection: Bound connection to check
 
-            # If all strategies failed, the connection is not working
-            logger.debug("All connection test strategies failed")
+        Returns:
+            True if the connection is working
+        """
+        method = self.performance_config.health_check_method
+        try:
+            if method == "whoami":
+                answered = connection.extended(WHOAMI_OID)
+            else:
+                answered = connection.search(
+                    search_base="",
+                    search_filter="(objectClass=*)",
+                    search_scope=BASE,
+                    attributes=["supportedLDAPVersion"],
+                )
+        except LDAPCommunicationError as e:
+            logger.debug(f"Connection health check failed: {e}")
             return False
+        except Exception as e:
+            logger.debug(f"{method} check refused, reading the base DN instead: {e}")
+            answered = False
+
+        if answered and not self.performance_config.health_check_deep:
+            return True
 
+        try:
+            found = connection.search(
+                search_base=self.ldap_config.base_dn,
+                search_filter="(objectClass=*)",
+                search_scope=BASE,
+                attributes=["1.1"],
+            )
+            if found and connection.entries:
+                return True
+            logger.debug(f"Base DN check failed: {connection.result}")
         except Exception as e:
-            logger.debug(f"Connection test failed: {e}")
-            return False
+            logger.debug(f"Base DN check failed: {e}")
+        return False
+
+    def _probe_server(self, state: ServerState, connection: Connection) -> bool:
+        """
+        Probe an idle pooled connection, timing it as a latency sample of its server.
+
+        A failed probe only closes the connection: servers drop idle
+        connections routinely, so it does not mark the server down.
+
+        Args:
+            state: Server the connection belongs to
+            connection: Idle pooled connection
+
+        Returns:
+            True if the connection is working
+        """
+        start = time.monotonic()
+        healthy = self._probe_connection(connection)
+        if healthy:
+            self._selector.record_success(state, time.monotonic() - start)
+        return healthy
 
     def disconnect(self) -> None:
-        """Disconnect from LDAP server."""
-        with self._lock:
-            if self._connection:
+        """
+        Disconnect from LDAP server.
+
+        Closes every idle pooled connection and stops the change feed.
+        Connections currently checked out are closed when they are released.
+        """
+        if self.change_feed:
+            self.change_feed.stop()
+        self._cursors.clear()
+        for state in self._servers:
+            state.pool.reset()
+        if self._cache:
+            self._cache.invalidate()
+        self._search_bases.clear()
+        logger.info("Disconnected from LDAP server")
+
+    def pool_stats(self) -> dict[str, Any]:
+        """Return connection pool statistics, summed over every server's pool."""
+        totals: dict[str, Any] = {}
+        for state in self._servers:
+            for name, value in state.pool.stats().items():
+                totals[name] = totals.get(name, 0) + value
+        return totals
+
+    def cursor_stats(self) -> dict[str, int]:
+        """Return counts of paged searches kept open for search_page() cursors."""
+        return self._cursors.stats()
+
+    def server_stats(self) -> dict[str, dict[str, Any]]:
+        """Return circuit breaker, load and latency statistics per server and replica."""
+        stats = self._selector.stats()
+        for state in self._servers:
+            stats[state.url]["pool"] = state.pool.stats()
+        return stats
+
+    def cache_stats(self) -> dict[str, Any]:
+        """Return query cache statistics (empty when the cache is disabled)."""
+        return self._cache.stats() if self._cache else {}
+
+    def snapshot_stats(self) -> dict[str, Any]:
+        """Return directory snapshot sync statistics (empty when the snapshot is disabled)."""
+        return self.snapshot.stats() if self.snapshot else {}
+
+    def change_feed_stats(self) -> dict[str, Any]:
+        """Return syncrepl change feed statistics (empty when the feed is disabled)."""
+        return self.change_feed.stats() if self.change_feed else {}
+
+    def invalidate_cache(
+        self,
+        dn: str | None = None,
+        attributes: dict[str, Any] | None = None,
+        deleted: bool = False,
+    ) -> int:
+        """
+        Drop cached search results.
+
+        Args:
+            dn: Only drop results that could involve this changed entry;
+                drops everything when omitted
+            attributes: Some current attributes of the entry, narrowing the
+                searches dropped to those whose filter it may match
+            deleted: The entry was deleted, so only results containing it are dropped
+
+        Returns:
+            Number of cached searches removed
+        """
+        if not self._cache:
+            return 0
+        removed = self._cache.invalidate(dn, attributes, deleted)
+        logger.debug(f"Invalidated {removed} cached searches")
+        return removed
+
+    def discover_search_base(self, kind: str, containers: list[str]) -> str:
+        """
+        Find the first candidate container that exists under the base DN.
+
+        The result is remembered for cache_timeout seconds and shared by
+        every tool using this connector, so the containers are only probed
+        once per timeout. Concurrent callers wait for a single discovery.
+        A result is only remembered when every probe got a definite answer:
+        after a failed probe (timeout, dropped connection, open circuit) the
+        next call probes again.
+
+        Args:
+            kind: Name of the search base for caching and logging, e.g. "people"
+            containers: Candidate container RDNs relative to the base DN, in
+                order of preference
+
+        Returns:
+            DN of the first existing container, or the base DN if none exists
+        """
+        cached = self._search_bases.get(kind)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+
+        with self._search_bases_lock:
+            # Another caller may have finished discovery while we waited
+            cached = self._search_bases.get(kind)
+            if cached and cached[1] > time.monotonic():
+                return cached[0]
+
+            base_dn = self.ldap_config.base_dn
+            search_base = base_dn
+            probes_failed = False
+            for container in containers:
                 try:
-                    self._connection.unbind()
-                    logger.info("Disconnected from LDAP server")
+                    if self.search(
+                        search_base=f"{container},{base_dn}",
+                        search_filter="(objectClass=*)",
+                        attributes=["dn"],
+                        search_scope=BASE,
+                        size_limit=1,
+                    ):
+                        search_base = f"{container},{base_dn}"
+                        break
+                except LDAPNoSuchObjectResult:
+                    continue
                 except Exception as e:
-                    logger.warning(f"Error during disconnect: {e}")
-                finally:
-                    self._connection = None
+                    logger.warning(f"Could not probe {kind} container {container}: {e}")
+                    probes_failed = True
+
+            if search_base == base_dn:
+                logger.warning(f"Using base DN for {kind} search: {base_dn}")
+            else:
+                logger.info(f"Using {kind} search base: {search_base}")
+
+            if probes_failed:
+                return search_base
+            expires_at = time.monotonic() + self.performance_config.cache_timeout
+            self._search_bases[kind] = (search_base, expires_at)
+            return search_base
+
+    def server_supports(self, oid: str, connection: Connection | None = None) -> bool:
+        """
+        Check whether the server's root DSE advertises an OID.
+
+        Server info is read when the first connection binds, so this returns
+        False until then.
+
+        Args:
+            oid: Feature, capability, control or extension OID
+            connection: Check the server of this connection rather than the
+                first server with known info (replicas may differ)
+
+        Returns:
+            True if the server advertises the OID
+        """
+        if connection is not None:
+            info = connection.server.info
+        else:
+            info = next((state.server.info for state in self._servers if state.server.info), None)
+        if not info:
+            return False
+        advertised = [
+            *(info.supported_features or []),
+            *(info.supported_controls or []),
+            *(info.supported_extensions or []),
+        ]
+        return any(entry[0] == oid for entry in advertised)
 
     def search(
         self,
@@ -296,6 +706,13 @@ class LDAPConnector:
         """
         Perform LDAP search operation with paging support.
 
+        Results are served from the query cache when an identical search
+        (same base, filter, scope, attributes and size limit) ran within the
+        cache timeout. Cached entry dictionaries are shared between callers
+        and must not be mutated. While the directory is unavailable (every
+        circuit open, connections failing), a result that expired less than
+        stale_cache_max_age ago is served instead of failing.
+
         Args:
             search_base: Base DN for search
             search_filter: LDAP filter string
@@ -306,10 +723,74 @@ class LDAPConnector:
         Returns:
             List of LDAP entries as dictionaries
 
+        Raises:
+            LDAPException: If search fails
+        """
+        cache_key = None
+        if self._cache:
+            cache_key = make_cache_key(
+                search_base, search_filter, search_scope, attributes, size_limit
+            )
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"Search served from cache: {len(cached)} entries")
+                return cached
+
+        try:
+            entries = list(
+                self.iter_search(
+                    search_base=search_base,
+                    search_filter=search_filter,
+                    attributes=attributes,
+                    search_scope=search_scope,
+                    size_limit=size_limit,
+                )
+            )
+        except (DirectoryUnavailableError, LDAPCommunicationError) as e:
+            stale = self._cache.get_stale(cache_key) if cache_key is not None else None
+            if stale is None:
+                raise
+            logger.warning(f"Serving a stale cached search result: {e}")
+            return stale
+        logger.debug(f"Search returned {len(entries)} entries")
+
+        if cache_key is not None:
+            self._cache.put(cache_key, entries)
+        return entries
+
+    def iter_search(
+        self,
+        search_base: str,
+        search_filter: str,
+        attributes: list[str] | str = ALL_ATTRIBUTES,
+        search_scope: str = SUBTREE,
+        size_limit: int = 0,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Stream LDAP search results page by page.
+
+        Only one page of entries is held in memory at a time. The pooled
+        connection stays checked out until the generator is exhausted or
+        closed, so callers that stop early should close it (for example with
+        contextlib.closing) to release the connection and abandon the
+        server-side paged search.
+
+        Args:
+            search_base: Base DN for search
+            search_filter: LDAP filter string
+            attributes: Attributes to retrieve
+            search_scope: Search scope (SUBTREE, ONELEVEL, BASE)
+            size_limit: Maximum number of results (0 = no limit)
+
+        Yields:
+            LDAP entries as dictionaries
+
         Raises:
             LDAPException: If search fails
         """
         connection = self.connect()
+        discard = False
+        cookie = None
 
         try:
             logger.debug(f"Searching: base={search_base}, filter={search_filter}")
@@ -318,10 +799,10 @@ class LDAPConnector:
             effective_limit = size_limit if size_limit > 0 else self.performance_config.max_results
             paged_size = min(self.performance_config.page_size, effective_limit)
 
-            entries = []
-            cookie = None
+            returned = 0
 
             while True:
+                start = time.monotonic()
                 success = connection.search(
                     search_base=search_base,
                     search_filter=search_filter,
@@ -330,108 +811,372 @@ class LDAPConnector:
                     paged_size=paged_size,
                     paged_cookie=cookie,
                 )
+                self._record_latency(connection, time.monotonic() - start)
 
-                if not success:
+                # ldap3 also returns False for a successful search with no
+                # entries; only a non-zero result code is a failure
+                if not success and connection.result.get("result") != 0:
                     logger.error(f"Search failed: {connection.result}")
                     raise LDAPException(f"Search failed: {connection.result}")
 
-                # Process entries
-                for entry in connection.entries:
-                    entry_dict = self._process_entry(entry)
-                    entries.append(entry_dict)
-
-                    # Check size limit
-                    if len(entries) >= effective_limit:
-                        logger.debug(f"Size limit reached: {effective_limit}")
-                        return entries[:effective_limit]
-
-                # Check for more pages
+                # Check for more pages before handing out entries, so an early
+                # stop knows whether there is a paged search to abandon
                 controls = connection.result.get("controls", {})
                 paged_control = controls.get("1.2.840.113556.1.4.319", {})
                 cookie = paged_control.get("value", {}).get("cookie")
 
+                # Decode straight from the response; referrals are skipped
+                for entry in connection.response or []:
+                    if entry.get("type") != "searchResEntry":
+                        continue
+                    yield self._process_entry(entry)
+                    returned += 1
+
+                    # Check size limit
+                    if returned >= effective_limit:
+                        logger.debug(f"Size limit reached: {effective_limit}")
+                        return
+
                 if not cookie:
                     break
 
-            logger.debug(f"Search returned {len(entries)} entries")
-            return entries
+        except LDAPCommunicationError as e:
+            logger.error(f"Search error: {e}")
+            discard = True
+            raise
 
         except Exception as e:
             logger.error(f"Search error: {e}")
             raise
 
-    def _process_entry(self, entry) -> dict[str, Any]:
+        finally:
+            if cookie and not discard:
+                self._abandon_paged_search(connection, search_base, search_filter, cookie)
+            self.release(connection, discard=discard)
+
+    def _record_latency(self, connection: Connection, seconds: float) -> None:
+        """Count an answered request as a latency sample of the connection's server."""
+        with self._checked_out_lock:
+            state = self._checked_out.get(id(connection))
+        if state is not None:
+            self._selector.record_success(state, seconds)
+
+    def _abandon_paged_search(
+        self, connection: Connection, search_base: str, search_filter: str, cookie: bytes
+    ) -> None:
+        """
+        Release server-side paged search state after an early stop.
+
+        RFC 2696: a paged request with size zero and the last cookie tells the
+        server to discard the result set.
         """
-        Process LDAP entry into dictionary format.
+        try:
+            connection.search(
+                search_base=search_base,
+                search_filter=search_filter,
+                attributes=["1.1"],
+                paged_size=0,
+                paged_cookie=cookie,
+            )
+        except Exception as e:
+            logger.debug(f"Could not abandon paged search: {e}")
+
+    def search_page(
+        self,
+        search_base: str,
+        search_filter: str,
+        attributes: list[str] | str = ALL_ATTRIBUTES,
+        page_size: int = 50,
+        cursor: str | None = None,
+        sort_key: str = "cn",
+        search_scope: str = SUBTREE,
+    ) -> tuple[list[dict[str, Any]], str | None, int | None]:
+        """
+        Read one page of a search sorted on an attribute, resuming from a cursor.
+
+        When the server advertises server-side sorting and virtual list
+        view, each page is a VLV request for its offset in the sorted
+        result, so reading a deep page costs one page of work on the server
+        (given a matching VLV index) and nothing is kept open between calls.
+        Otherwise the search runs with simple paged results, sorted when the
+        server can, and is left open on its connection for the next page for
+        up to cursor_timeout seconds. A cursor whose search was closed
+        (expired, evicted, or its page requested twice) still works: the
+        search restarts and skips the entries already returned.
+
+        Pages are not cached. Cursors are only valid for the same base,
+        filter, scope, attributes and sort key.
 
         Args:
-            entry: LDAP entry from ldap3
+            search_base: Base DN for search
+            search_filter: LDAP filter string
+            attributes: Attributes to retrieve
+            page_size: Entries per page (at most max_results)
+            cursor: Cursor returned with the previous page, or None for the first
+            sort_key: Attribute the results are sorted on
+            search_scope: Search scope (SUBTREE, ONELEVEL, BASE)
 
         Returns:
-            Dictionary representation of entry
+            (entries, cursor of the next page or None after the last page,
+            total number of entries if the server reported it)
+
+        Raises:
+            ValueError: If the cursor is malformed or belongs to another search
+            LDAPException: If search fails
         """
-        entry_dict = {"dn": entry.entry_dn, "attributes": {}}
+        page_size = max(1, min(page_size, self.performance_config.max_results))
+        key = make_cache_key(search_base, search_filter, search_scope, attributes, 0)
+        query = hashlib.sha256(repr((key, sort_key.lower())).encode()).hexdigest()[:16]
+
+        state: dict[str, Any] = {}
+        offset = 0
+        open_cursor = None
+        if cursor:
+            state = decode_cursor(cursor)
+            if state.get("q") != query:
+                raise ValueError("Cursor belongs to a different search")
+            offset = state["o"]
+            if state.get("c"):
+                open_cursor = self._cursors.take(state["c"])
+                if open_cursor is not None and open_cursor.offset != offset:
+                    self._close_cursor(open_cursor)
+                    open_cursor = None
+
+        connection = open_cursor.connection if open_cursor else self.connect()
+        cookie = open_cursor.cookie if open_cursor else None
+        discard = False
+        keep_open = False
 
-        for attr_name in entry.entry_attributes:
-            attr_value = getattr(entry, attr_name)
+        try:
+            logger.debug(f"Searching page: base={search_base}, filter={search_filter}")
 
-            if hasattr(attr_value, "value"):
-                # Handle ldap3 attribute objects
-                value = attr_value.value
-            else:
-                value = str(attr_value)
+            if open_cursor is None and self._can_use_vlv(connection):
+                try:
+                    context_id = state.get("x")
+                    return self._read_vlv_page(
+                        connection,
+                        search_base,
+                        search_filter,
+                        attributes,
+                        search_scope,
+                        sort_key,
+                        query,
+                        offset,
+                        page_size,
+                        bytes.fromhex(context_id) if context_id else None,
+                    )
+                except LDAPCommunicationError:
+                    raise
+                except LDAPException as e:
+                    logger.warning(f"Virtual list view failed, using paged results instead: {e}")
+                    self._vlv_usable = False
+
+            controls = None
+            if self.server_supports(SORT_REQUEST_OID, connection):
+                controls = [sort_control([sort_key])]
+            entries, cookie, total = self._read_paged_page(
+                connection,
+                search_base,
+                search_filter,
+                attributes,
+                search_scope,
+                controls,
+                cookie,
+                0 if open_cursor else offset,
+                page_size,
+            )
+            if not cookie:
+                return entries, None, total
+
+            offset += len(entries)
+            next_cursor = {"q": query, "o": offset}
+            if self._cursors.max_size:
+                next_cursor["c"] = self._cursors.put(
+                    OpenCursor(connection, cookie, query, offset, search_base, search_filter)
+                )
+                keep_open = True
+            return entries, encode_cursor(next_cursor), total
 
-            # Handle multi-valued attributes
-            if isinstance(value, list) and len(value) == 1:
-                entry_dict["attributes"][attr_name] = value[0]
-            else:
-                entry_dict["attributes"][attr_name] = value
+        except LDAPCommunicationError as e:
+            logger.error(f"Search error: {e}")
+            discard = True
+            raise
 
-        return entry_dict
+        except Exception as e:
+            logger.error(f"Search error: {e}")
+            raise
 
-    def test_connection(self) -> dict[str, Any]:
+        finally:
+            if not keep_open:
+                if cookie and not discard:
+                    self._abandon_paged_search(connection, search_base, search_filter, cookie)
+                self.release(connection, discard=discard)
+
+    def _can_use_vlv(self, connection: Connection) -> bool:
+        """Check whether pages can be read with server-side sort and virtual list view."""
+        return (
+            self._vlv_usable
+            and self.server_supports(VLV_REQUEST_OID, connection)
+            and self.server_supports(SORT_REQUEST_OID, connection)
+        )
+
+    def _read_vlv_page(
+        self,
+        connection: Connection,
+        search_base: str,
+        search_filter: str,
+        attributes: list[str] | str,
+        search_scope: str,
+        sort_key: str,
+        query: str,
+        offset: int,
+        page_size: int,
+        context_id: bytes | None,
+    ) -> tuple[list[dict[str, Any]], str | None, int | None]:
         """
-        Test LDAP connection and return server information.
+        Read the page starting at an offset with a virtual list view request.
 
         Returns:
-            Dictionary with connection test results
+            (entries, cursor of the next page or None, total number of entries)
+
+        Raises:
+            LDAPException: If the search fails or the server declines the view
         """
-        try:
-            connection = self.connect()
-
-            # Get server info
-            server_info = {
-                "connected": True,
-                "server": connection.server.host,
-                "port": connection.server.port,
-                "ssl": connection.server.ssl,
-                "bound": connection.bound,
-                "auth_method": self.ldap_config.auth_method,
-            }
+        start = time.monotonic()
+        success = connection.search(
+            search_base=search_base,
+            search_filter=search_filter,
+            search_scope=search_scope,
+            attributes=attributes,
+            controls=[
+                sort_control([sort_key], criticality=True),
+                vlv_request_control(offset + 1, page_size, context_id),
+            ],
+        )
+        self._record_latency(connection, time.monotonic() - start)
+        if not success and connection.result.get("result") != 0:
+            raise LDAPException(f"Search failed: {connection.result}")
+
+        response = connection.result.get("controls", {}).get(VLV_RESPONSE_OID)
+        if not response:
+            raise LDAPException("Server did not answer the virtual list view request")
+        _, total, result, context_id = decode_vlv_response(response["value"])
+        if result:
+            raise LDAPException(f"Virtual list view failed with result code {result}")
+
+        entries = []
+        # Past the end the server answers with the last entries instead
+        if offset < total:
+            entries = [
+                self._process_entry(entry)
+                for entry in connection.response or []
+                if entry.get("type") == "searchResEntry"
+            ][:page_size]
+        offset += len(entries)
+        if not entries or offset >= total:
+            return entries, None, total
+
+        next_cursor = {"q": query, "o": offset}
+        if context_id:
+            next_cursor["x"] = context_id.hex()
+        return entries, encode_cursor(next_cursor), total
+
+    def _read_paged_page(
+        self,
+        connection: Connection,
+        search_base: str,
+        search_filter: str,
+        attributes: list[str] | str,
+        search_scope: str,
+        controls: list[tuple[str, bool, bytes]] | None,
+        cookie: bytes | None,
+        skip: int,
+        page_size: int,
+    ) -> tuple[list[dict[str, Any]], bytes | None, int | None]:
+        """
+        Read one page of a paged search, first skipping entries already returned.
 
-            if self.ldap_config.auth_method != "anonymous":
-                server_info["user"] = connection.user
+        Every request asks the server for exactly the entries still needed,
+        so the returned cookie points just past the page.
 
-            # Try a simple search to test functionality
-            try:
-                success = connection.search(
-                    search_base=self.ldap_config.base_dn,
-                    search_filter="(objectClass=*)",
-                    search_scope=ldap3.BASE,
-                    attributes=["namingContexts"],
-                    size_limit=1,
-                )
-                server_info["search_test"] = success
-                if success and connection.entries:
-                    server_info["base_dn_exists"] = True
+        Returns:
+            (entries, cookie of the rest or None when done, the server's
+            estimate of the total if it gave one)
+
+        Raises:
+            LDAPException: If the search fails
+        """
+        entries: list[dict[str, Any]] = []
+        total = None
+        while True:
+            start = time.monotonic()
+            success = connection.search(
+                search_base=search_base,
+                search_filter=search_filter,
+                search_scope=search_scope,
+                attributes=attributes,
+                paged_size=skip or page_size - len(entries),
+                paged_cookie=cookie,
+                controls=controls,
+            )
+            self._record_latency(connection, time.monotonic() - start)
+            if not success and connection.result.get("result") != 0:
+                raise LDAPException(f"Search failed: {connection.result}")
+
+            paged_control = connection.result.get("controls", {}).get(PAGED_RESULTS_OID, {})
+            cookie = paged_control.get("value", {}).get("cookie")
+            total = paged_control.get("value", {}).get("size") or total
+
+            for entry in connection.response or []:
+                if entry.get("type") != "searchResEntry":
+                    continue
+                if skip:
+                    skip -= 1
                 else:
-                    server_info["base_dn_exists"] = False
-            except Exception as e:
-                server_info["search_test"] = False
-                server_info["search_error"] = str(e)
+                    entries.append(self._process_entry(entry))
 
-            logger.info("Connection test successful")
-            return server_info
+            if not cookie or (not skip and len(entries) >= page_size):
+                return entries, cookie, total
+
+    def _close_cursor(self, cursor: OpenCursor) -> None:
+        """Abandon the paged search of an open cursor and release its connection."""
+        self._abandon_paged_search(
+            cursor.connection, cursor.search_base, cursor.search_filter, cursor.cookie
+        )
+        self.release(cursor.connection)
+
+    def _process_entry(self, entry: dict[str, Any]) -> dict[str, Any]:
+        """
+        Process a search response entry into dictionary format.
+
+        Reads the attribute values ldap3 has already decoded into the raw
+        response instead of building an ldap3 Entry per result, which costs
+        far more than the values themselves. Single values are unwrapped and
+        requested attributes the entry lacks become None, as with Entry.
+
+        Args:
+            entry: searchResEntry item of connection.response
+
+        Returns:
+            Dictionary representation of entry
+        """
+        attributes = {}
+        for name, value in entry["attributes"].items():
+            if isinstance(value, list):
+                value = value[0] if len(value) == 1 else value or None
+            attributes[name] = value
+        return {"dn": entry["dn"], "attributes": attributes}
+
+    def test_connection(self) -> dict[str, Any]:
+        """
+        Test LDAP connection and return server information.
+
+        Returns:
+            Dictionary with connection test results
+        """
+        try:
+            with self.connection() as connection:
+                return self._describe_connection(connection)
 
         except Exception as e:
             logger.error(f"Connection test failed: {e}")
@@ -441,6 +1186,50 @@ class LDAPConnector:
                 "auth_method": self.ldap_config.auth_method,
             }
 
+    def _describe_connection(self, connection: Connection) -> dict[str, Any]:
+        """
+        Collect server information and run a base DN search on a connection.
+
+        Args:
+            connection: Bound connection to inspect
+
+        Returns:
+            Dictionary with connection test results
+        """
+        # Get server info
+        server_info = {
+            "connected": True,
+            "server": connection.server.host,
+            "port": connection.server.port,
+            "ssl": connection.server.ssl,
+            "bound": connection.bound,
+            "auth_method": self.ldap_config.auth_method,
+        }
+
+        if self.ldap_config.auth_method != "anonymous":
+            server_info["user"] = connection.user
+
+        # Try a simple search to test functionality
+        try:
+            success = connection.search(
+                search_base=self.ldap_config.base_dn,
+                search_filter="(objectClass=*)",
+                search_scope=ldap3.BASE,
+                attributes=["namingContexts"],
+                size_limit=1,
+            )
+            server_info["search_test"] = success
+            if success and connection.entries:
+                server_info["base_dn_exists"] = True
+            else:
+                server_info["base_dn_exists"] = False
+        except Exception as e:
+            server_info["search_test"] = False
+            server_info["search_error"] = str(e)
+
+        logger.info("Connection test successful")
+        return server_info
+
     def get_schema_info(self) -> dict[str, Any]:
         """
         Get LDAP schema information.
@@ -449,27 +1238,26 @@ class LDAPConnector:
             Dictionary with schema information
         """
         try:
-            connection = self.connect()
-
-            schema_info = {"object_classes": [], "attributes": [], "naming_contexts": []}
+            with self.connection() as connection:
+                schema_info = {"object_classes": [], "attributes": [], "naming_contexts": []}
 
-            # Get naming contexts
-            if connection.server.info and connection.server.info.naming_contexts:
-                schema_info["naming_contexts"] = list(connection.server.info.naming_contexts)
+                # Get naming contexts
+                if connection.server.info and connection.server.info.naming_contexts:
+                    schema_info["naming_contexts"] = list(connection.server.info.naming_contexts)
 
-            # Get schema information if available
-            if connection.server.info and connection.server.info.schema:
-                schema = connection.server.info.schema
+                # Get schema information if available
+                if connection.server.info and connection.server.info.schema:
+                    schema = connection.server.info.schema
 
-                # Get object classes
-                if hasattr(schema, "object_classes"):
-                    schema_info["object_classes"] = list(schema.object_classes.keys())
+                    # Get object classes
+                    if hasattr(schema, "object_classes"):
+                        schema_info["object_classes"] = list(schema.object_classes.keys())
 
-                # Get attribute types
-                if hasattr(schema, "attribute_types"):
-                    schema_info["attributes"] = list(schema.attribute_types.keys())
+                    # Get attribute types
+                    if hasattr(schema, "attribute_types"):
+                        schema_info["attributes"] = list(schema.attribute_types.keys())
 
-            return schema_info
+                return schema_info
 
         except Exception as e:
             logger.error(f"Schema info retrieval failed: {e}")
@@ -0,0 +1,198 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Precomputed location aggregates answering the location tools."""
+
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+LOCATION_INDEX = "location_index"
+
+# Attributes read per person to build the aggregates
+LOCATION_INDEX_ATTRIBUTES = ["uid", "physicalDeliveryOfficeName", "rhatLocation", "l", "st", "co"]
+
+# Location attributes after the uid flag in a combination
+_LOCATION_ATTRIBUTES = LOCATION_INDEX_ATTRIBUTES[1:]
+
+
+def attribute_values(value: Any) -> tuple[Any, ...]:
+    """Return the non-empty values of a single- or multi-valued attribute."""
+    if isinstance(value, list | tuple):
+        return tuple(item for item in value if item)
+    return (value,) if value else ()
+
+
+def first_value(value: Any) -> Any:
+    """Return the first non-empty value of an attribute, or None; locations group by it."""
+    values = attribute_values(value)
+    return values[0] if values else None
+
+
+def summarize_locations(locations: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Compute location statistics from a list of locations.
+
+    Args:
+        locations: Locations as returned by find_locations, largest first
+
+    Returns:
+        Location statistics, or an empty dictionary when there are no locations
+    """
+    if not locations:
+        return {}
+
+    total_people = sum(loc["people_count"] for loc in locations)
+    return {
+        "total_locations": len(locations),
+        "total_people_with_location": total_people,
+        "largest_location": max(locations, key=lambda x: x["people_count"]),
+        "average_people_per_location": total_people / len(locations),
+        "locations_by_size": {
+            "large": len([loc for loc in locations if loc["people_count"] >= 100]),
+            "medium": len([loc for loc in locations if 20 <= loc["people_count"] < 100]),
+            "small": len([loc for loc in locations if loc["people_count"] < 20]),
+        },
+    }
+
+
+def _aggregate(combinations: Iterable[tuple[tuple, int]]) -> list[dict[str, Any]]:
+    """Group (location attribute values, people count) pairs into locations, largest first."""
+    offices: dict[str, dict[str, Any]] = {}
+    for (_, *values), count in combinations:
+        office_name, rhat_location, city, state, country = (
+            attribute[0] if attribute else None for attribute in values
+        )
+        office = office_name or rhat_location or city
+        if not office:
+            continue
+        data = offices.setdefault(
+            office, {"people_count": 0, "cities": set(), "states": set(), "countries": set()}
+        )
+        data["people_count"] += count
+        if city:
+            data["cities"].add(city)
+        if state:
+            data["states"].add(state)
+        if country:
+            data["countries"].add(country)
+
+    locations = []
+    for name, data in offices.items():
+        location = {
+            "name": name,
+            "people_count": data["people_count"],
+            "city": ", ".join(sorted(data["cities"])),
+            "state": ", ".join(sorted(data["states"])),
+            "country": ", ".join(sorted(data["countries"])),
+        }
+        locations.append({key: value for key, value in location.items() if value})
+
+    locations.sort(key=lambda x: x["people_count"], reverse=True)
+    return locations
+
+
+class LocationIndex:
+    """
+    Materialized location aggregates built from one sweep of people.
+
+    People are counted per distinct combination of location attribute
+    values, of which a directory has about as many as it has offices.
+    Multi-valued attributes are grouped by their first value, like the
+    LDAP sweeps, and queries match any of their values. The location
+    list, the country -> state -> city -> office hierarchy and the stats are
+    computed once at build time. A location query matches the combinations
+    (case-insensitively, like the directory's substring filter) rather than
+    the people, so every read costs the size of its result, not the directory.
+    """
+
+    def __init__(self, entries: Iterable[Mapping[str, Any]]):
+        """
+        Build the aggregates.
+
+        Args:
+            entries: Raw person entries with LOCATION_INDEX_ATTRIBUTES
+        """
+        self.combinations: Counter[tuple] = Counter()
+        hierarchy: dict[Any, dict[Any, dict[Any, Counter]]] = {}
+
+        for entry in entries:
+            attrs = entry.get("attributes", {})
+            values = [attribute_values(attrs.get(name)) for name in _LOCATION_ATTRIBUTES]
+            self.combinations[(bool(attrs.get("uid")), *values)] += 1
+
+            # Same defaults as the LDAP hierarchy sweep, which counts people without a uid
+            office_name, rhat_location, city, state, country = (
+                attribute[0] if attribute else None for attribute in values
+            )
+            cities = hierarchy.setdefault(country or "Unknown", {}).setdefault(
+                state or "Unknown", {}
+            )
+            cities.setdefault(city or "Unknown", Counter())[
+                office_name or rhat_location or "Unknown"
+            ] += 1
+
+        self.hierarchy = {
+            country: {
+                state: {city: dict(offices) for city, offices in cities.items()}
+                for state, cities in states.items()
+            }
+            for country, states in hierarchy.items()
+        }
+        # find_locations skips people without a uid
+        self._with_uid = [
+            (combination, count)
+            for combination, count in self.combinations.items()
+            if combination[0]
+        ]
+        self.all_locations = _aggregate(self._with_uid)
+        self.stats = summarize_locations(self.all_locations)
+
+    def __len__(self) -> int:
+        """Return the number of people counted."""
+        return sum(self.combinations.values())
+
+    def locations(self, query: str | None = None) -> list[dict[str, Any]]:
+        """
+        Return locations with people counts, largest first.
+
+        Args:
+            query: Optional text that one of a person's location attributes
+                must contain for the person to be counted
+
+        Returns:
+            List of location dictionaries, as find_locations returns them
+        """
+        if not query:
+            return [dict(location) for location in self.all_locations]
+
+        needle = query.lower()
+        # Every value of office, rhatLocation, l, st and co, after the uid flag
+        return _aggregate(
+            (combination, count)
+            for combination, count in self._with_uid
+            if any(needle in str(value).lower() for values in combination[1:] for value in values)
+        )
+
+    def location_hierarchy(self) -> dict[str, Any]:
+        """Return a copy of the country -> state -> city -> office people counts."""
+        return {
+            country: {
+                state: {city: dict(offices) for city, offices in cities.items()}
+                for state, cities in states.items()
+            }
+            for country, states in self.hierarchy.items()
+        }
+
+    def location_stats(self) -> dict[str, Any]:
+        """Return a copy of the location statistics."""
+        if not self.stats:
+            return {}
+        return {
+            **self.stats,
+            "largest_location": dict(self.stats["largest_location"]),
+            "locations_by_size": dict(self.stats["locations_by_size"]),
+        }
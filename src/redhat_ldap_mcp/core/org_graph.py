@@ -0,0 +1,221 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""In-memory graph of the directory's manager relationships."""
+
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from .filters import normalize_dn
+from .lca import LCAIndex
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+ORG_GRAPH_INDEX = "org_graph"
+
+
+class DirectoryGraph:
+    """
+    Manager hierarchy of every person in the directory.
+
+    People are numbered in sweep order; the hierarchy is held in flat
+    arrays (parent index, child index lists, depth, subtree size) so chain
+    and peer queries are O(depth) list lookups, and common-manager and
+    distance queries are O(log depth) via a lazily built LCAIndex. Manager
+    cycles are broken by promoting one member of each cycle to a root.
+    """
+
+    def __init__(self, people: Iterable[Mapping[str, Any]]):
+        """
+        Build the graph.
+
+        Args:
+            people: Processed person records with "dn" and optional "uid",
+                "mail" and "manager" keys
+        """
+        self.people: list[Mapping[str, Any]] = []
+        self._by_dn: dict[str, int] = {}
+        self._by_uid: dict[str, int] = {}
+        self._by_mail: dict[str, int] = {}
+        manager_dns: list[str | None] = []
+
+        for person in people:
+            dn = person.get("dn")
+            if not dn or normalize_dn(dn) in self._by_dn:
+                continue
+
+            index = len(self.people)
+            self.people.append(person)
+            self._by_dn[normalize_dn(dn)] = index
+            if person.get("uid"):
+                self._by_uid.setdefault(person["uid"], index)
+            if person.get("mail"):
+                self._by_mail.setdefault(person["mail"].lower(), index)
+
+            manager = person.get("manager")
+            if isinstance(manager, list):
+                manager = manager[0] if manager else None
+            manager_dns.append(manager)
+
+        size = len(self.people)
+        self.parent: list[int] = [-1] * size
+        for index, manager_dn in enumerate(manager_dns):
+            if manager_dn:
+                manager_index = self._by_dn.get(normalize_dn(manager_dn), -1)
+                if manager_index != index:  # Top-level managers may report to themselves
+                    self.parent[index] = manager_index
+
+        self.children: list[list[int]] = [[] for _ in range(size)]
+        self.depth: list[int] = [0] * size
+        self.subtree_sizes: list[int] = [1] * size
+        self._link()
+        self._lca: LCAIndex | None = None
+
+    def __len__(self) -> int:
+        """Return the number of people in the graph."""
+        return len(self.people)
+
+    def resolve(self, identifier: str) -> int | None:
+        """
+        Find a person's index.
+
+        Args:
+            identifier: uid, email or DN
+
+        Returns:
+            Index of the person, or None if they are not in the graph
+        """
+        if "@" in identifier:
+            return self._by_mail.get(identifier.lower())
+        if "=" in identifier and "," in identifier:
+            return self._by_dn.get(normalize_dn(identifier))
+        return self._by_uid.get(identifier)
+
+    def manager_chain(self, index: int, max_levels: int | None = None) -> list[int]:
+        """
+        Return the indexes of a person's managers, nearest first.
+
+        Args:
+            index: Person index
+            max_levels: Optional maximum chain length
+
+        Returns:
+            Manager indexes from the immediate manager to the top
+        """
+        chain = []
+        current = self.parent[index]
+        while current != -1 and (max_levels is None or len(chain) < max_levels):
+            chain.append(current)
+            current = self.parent[current]
+        return chain
+
+    def peers(self, index: int) -> list[int]:
+        """Return the indexes of people sharing the person's manager."""
+        manager = self.parent[index]
+        if manager == -1:
+            return []
+        return [peer for peer in self.children[manager] if peer != index]
+
+    def subtree_size(self, index: int) -> int:
+        """Return the number of people reporting to the person, directly or not."""
+        return self.subtree_sizes[index] - 1
+
+    def common_manager(self, first: int, second: int) -> int | None:
+        """
+        Find the lowest manager shared by two people's management chains.
+
+        A person is not their own manager, so when one person manages the
+        other the answer is the manager above them, matching chain
+        intersection semantics.
+
+        Args:
+            first: First person index
+            second: Second person index
+
+        Returns:
+            Index of the lowest common manager, or None if the chains do not meet
+        """
+        first, second = self.parent[first], self.parent[second]
+        if first == -1 or second == -1:
+            return None
+        return self.lca.lca(first, second)
+
+    def distance(self, first: int, second: int) -> int | None:
+        """
+        Return the number of reporting steps between two people.
+
+        Args:
+            first: First person index
+            second: Second person index
+
+        Returns:
+            Steps up to their lowest shared manager (which may be one of
+            them) and back down, or None if they are in different trees
+        """
+        return self.lca.distance(first, second)
+
+    @property
+    def lca(self) -> LCAIndex:
+        """Binary lifting index, built on first use."""
+        if self._lca is None:
+            # Concurrent first callers may both build it; the results are identical
+            self._lca = LCAIndex(self.parent, self.depth)
+        return self._lca
+
+    def _link(self) -> None:
+        """Break manager cycles, then fill children, depth and subtree sizes."""
+        size = len(self.people)
+        for index, manager in enumerate(self.parent):
+            if manager != -1:
+                self.children[manager].append(index)
+
+        order = self._walk([index for index in range(size) if self.parent[index] == -1])
+        reached = [False] * size
+        for index in order:
+            reached[index] = True
+
+        # Anything unreached hangs off a manager cycle
+        broken = 0
+        for start in range(size):
+            if reached[start]:
+                continue
+            seen = set()
+            current = start
+            while current not in seen and not reached[current]:
+                seen.add(current)
+                current = self.parent[current]
+            if reached[current]:
+                continue
+
+            # current is on the cycle: make it a root
+            self.children[self.parent[current]].remove(current)
+            self.parent[current] = -1
+            broken += 1
+            for index in self._walk([current]):
+                reached[index] = True
+                order.append(index)
+
+        if broken:
+            logger.warning(f"Broke {broken} manager cycles while building the org graph")
+
+        for index in order:
+            manager = self.parent[index]
+            if manager != -1:
+                self.depth[index] = self.depth[manager] + 1
+        for index in reversed(order):
+            manager = self.parent[index]
+            if manager != -1:
+                self.subtree_sizes[manager] += self.subtree_sizes[index]
+
+    def _walk(self, roots: list[int]) -> list[int]:
+        """Return the breadth-first order of the subtrees under the roots."""
+        order = list(roots)
+        position = 0
+        while position < len(order):
+            order.extend(self.children[order[position]])
+            position += 1
+        return order
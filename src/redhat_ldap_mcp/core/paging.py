@@ -0,0 +1,353 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Cursor pagination: server-side sort and virtual list view controls, and open cursors."""
+
+import base64
+import binascii
+import json
+import secrets
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from pyasn1.codec.ber import decoder, encoder
+from pyasn1.type import namedtype, namedval, tag, univ
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+# RFC 2891 server-side sorting
+SORT_REQUEST_OID = "1.2.840.113556.1.4.473"
+SORT_RESPONSE_OID = "1.2.840.113556.1.4.474"
+# Virtual list view (draft-ietf-ldapext-ldapv3-vlv)
+VLV_REQUEST_OID = "2.16.840.1.113730.3.4.9"
+VLV_RESPONSE_OID = "2.16.840.1.113730.3.4.10"
+# RFC 2696 simple paged results
+PAGED_RESULTS_OID = "1.2.840.113556.1.4.319"
+
+
+def _context(number: int, constructed: bool = False) -> tag.Tag:
+    """Return an implicit context-specific tag."""
+    form = tag.tagFormatConstructed if constructed else tag.tagFormatSimple
+    return tag.Tag(tag.tagClassContext, form, number)
+
+
+class _SortKey(univ.Sequence):
+    """One sort key: attribute, optional ordering rule, direction."""
+
+    componentType = namedtype.NamedTypes(
+        namedtype.NamedType("attributeType", univ.OctetString()),
+        namedtype.OptionalNamedType(
+            "orderingRule", univ.OctetString().subtype(implicitTag=_context(0))
+        ),
+        namedtype.DefaultedNamedType(
+            "reverseOrder", univ.Boolean(False).subtype(implicitTag=_context(1))
+        ),
+    )
+
+
+class SortKeyList(univ.SequenceOf):
+    """Server-side sort request: sort keys, most significant first."""
+
+    componentType = _SortKey()
+
+
+class _ByOffset(univ.Sequence):
+    """VLV target given as a position in the sorted result."""
+
+    componentType = namedtype.NamedTypes(
+        namedtype.NamedType("offset", univ.Integer()),
+        namedtype.NamedType("contentCount", univ.Integer()),
+    )
+
+
+class _VLVTarget(univ.Choice):
+    """VLV target: an offset, or the first entry at or after an assertion value."""
+
+    componentType = namedtype.NamedTypes(
+        namedtype.NamedType("byOffset", _ByOffset().subtype(implicitTag=_context(0, True))),
+        namedtype.NamedType(
+            "greaterThanOrEqual", univ.OctetString().subtype(implicitTag=_context(1))
+        ),
+    )
+
+
+class VirtualListViewRequest(univ.Sequence):
+    """VLV request: entries before and after the target, and the target."""
+
+    componentType = namedtype.NamedTypes(
+        namedtype.NamedType("beforeCount", univ.Integer()),
+        namedtype.NamedType("afterCount", univ.Integer()),
+        namedtype.NamedType("target", _VLVTarget()),
+        namedtype.OptionalNamedType("contextID", univ.OctetString()),
+    )
+
+
+class VirtualListViewResponse(univ.Sequence):
+    """VLV response: position of the target, size of the list and result code."""
+
+    componentType = namedtype.NamedTypes(
+        namedtype.NamedType("targetPosition", univ.Integer()),
+        namedtype.NamedType("contentCount", univ.Integer()),
+        namedtype.NamedType(
+            "virtualListViewResult",
+            univ.Enumerated(
+                namedValues=namedval.NamedValues(
+                    ("success", 0),
+                    ("operationsError", 1),
+                    ("protocolError", 2),
+                    ("unwillingToPerform", 53),
+                    ("insufficientAccessRights", 50),
+                    ("timeLimitExceeded", 3),
+                    ("adminLimitExceeded", 11),
+                    ("inappropriateMatching", 18),
+                    ("sortControlMissing", 60),
+                    ("offsetRangeError", 61),
+                    ("other", 80),
+                )
+            ),
+        ),
+        namedtype.OptionalNamedType("contextID", univ.OctetString()),
+    )
+
+
+def sort_control(keys: list[str], criticality: bool = False) -> tuple[str, bool, bytes]:
+    """
+    Build a server-side sort request control.
+
+    Args:
+        keys: Attributes to sort on, most significant first, ascending
+        criticality: Fail the search if the server cannot sort
+
+    Returns:
+        (oid, criticality, BER value) tuple, as ldap3 search() accepts
+    """
+    value = SortKeyList()
+    for position, key in enumerate(keys):
+        sort_key = _SortKey()
+        sort_key["attributeType"] = key
+        value[position] = sort_key
+    return SORT_REQUEST_OID, criticality, encoder.encode(value)
+
+
+def vlv_request_control(
+    offset: int, count: int, context_id: bytes | None = None
+) -> tuple[str, bool, bytes]:
+    """
+    Build a critical VLV request control for one page of a sorted result.
+
+    The content count is sent as zero, which makes the server take the
+    offset as an exact position rather than a proportion.
+
+    Args:
+        offset: 1-based position of the first entry of the page
+        count: Number of entries in the page
+        context_id: Context the server returned with the previous page, if any
+
+    Returns:
+        (oid, criticality, BER value) tuple, as ldap3 search() accepts
+    """
+    value = VirtualListViewRequest()
+    value["beforeCount"] = 0
+    value["afterCount"] = max(count - 1, 0)
+    target = value["target"]["byOffset"]
+    target["offset"] = offset
+    target["contentCount"] = 0
+    if context_id:
+        value["contextID"] = context_id
+    return VLV_REQUEST_OID, True, encoder.encode(value)
+
+
+def decode_vlv_response(value: bytes) -> tuple[int, int, int, bytes | None]:
+    """
+    Decode a VLV response control value.
+
+    Args:
+        value: BER encoded VirtualListViewResponse
+
+    Returns:
+        (target position, content count, result code, context ID or None)
+    """
+    decoded, _ = decoder.decode(value, asn1Spec=VirtualListViewResponse())
+    context_id = decoded["contextID"]
+    return (
+        int(decoded["targetPosition"]),
+        int(decoded["contentCount"]),
+        int(decoded["virtualListViewResult"]),
+        bytes(context_id) if context_id.isValue else None,
+    )
+
+
+def encode_cursor(state: dict[str, Any]) -> str:
+    """Encode cursor state as an opaque URL-safe token."""
+    data = json.dumps(state, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> dict[str, Any]:
+    """
+    Decode a token made by encode_cursor().
+
+    Args:
+        cursor: Cursor token
+
+    Returns:
+        Cursor state
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(state, dict) or not isinstance(state.get("o"), int) or state["o"] < 0:
+        raise ValueError("Invalid cursor")
+    return state
+
+
+class OpenCursor:
+    """A paged search left open between two pages, on its own checked-out connection."""
+
+    def __init__(
+        self,
+        connection: Any,
+        cookie: bytes,
+        query: str,
+        offset: int,
+        search_base: str,
+        search_filter: str,
+    ):
+        """
+        Initialize the open cursor.
+
+        Args:
+            connection: Connection the paged search runs on
+            cookie: Paged results cookie of the next page
+            query: Fingerprint of the search
+            offset: Number of entries already returned
+            search_base: Base DN of the search, to abandon it
+            search_filter: Filter of the search, to abandon it
+        """
+        self.connection = connection
+        self.cookie = cookie
+        self.query = query
+        self.offset = offset
+        self.search_base = search_base
+        self.search_filter = search_filter
+        self.expires_at = 0.0
+
+
+class OpenCursorStore:
+    """
+    Paged searches kept open so the next page costs one page of work.
+
+    Paged results cookies are only valid on the connection that started the
+    search, so each open cursor holds a pooled connection checked out. The
+    store is therefore small and short-lived: cursors expire after timeout
+    seconds, and opening one past max_size closes the oldest. A cursor is
+    removed while a page is being read from it, so two requests with the
+    same token never share a connection; a caller that finds nothing falls
+    back to restarting the search from the cursor's offset.
+    """
+
+    def __init__(
+        self, close: Callable[["OpenCursor"], None], max_size: int = 16, timeout: float = 120.0
+    ):
+        """
+        Initialize an empty store.
+
+        Args:
+            close: Called with each expired or evicted OpenCursor to abandon
+                its search and release its connection
+            max_size: Most cursors kept open
+            timeout: Seconds an unused cursor stays open
+        """
+        self._close = close
+        self.max_size = max_size
+        self.timeout = timeout
+        self._cursors: dict[str, OpenCursor] = {}
+        self._lock = threading.Lock()
+        self._counters = {"opened": 0, "resumed": 0, "expired": 0, "evicted": 0}
+
+    def put(self, cursor: OpenCursor) -> str:
+        """
+        Keep a cursor open.
+
+        Args:
+            cursor: Cursor to keep
+
+        Returns:
+            Key to take() it back with
+        """
+        key = secrets.token_urlsafe(12)
+        cursor.expires_at = time.monotonic() + self.timeout
+        evicted = []
+        with self._lock:
+            evicted.extend(self._pop_expired())
+            while len(self._cursors) >= self.max_size:
+                oldest = next(iter(self._cursors))
+                evicted.append(self._cursors.pop(oldest))
+                self._counters["evicted"] += 1
+            self._cursors[key] = cursor
+            self._counters["opened"] += 1
+        self._close_all(evicted)
+        return key
+
+    def take(self, key: str) -> OpenCursor | None:
+        """
+        Remove and return an open cursor.
+
+        Args:
+            key: Key returned by put()
+
+        Returns:
+            The cursor, or None if it expired, was evicted or is already taken
+        """
+        with self._lock:
+            expired = self._pop_expired()
+            cursor = self._cursors.pop(key, None)
+            if cursor is not None:
+                self._counters["resumed"] += 1
+        self._close_all(expired)
+        return cursor
+
+    def expire(self) -> None:
+        """Close cursors whose timeout has passed."""
+        with self._lock:
+            expired = self._pop_expired()
+        self._close_all(expired)
+
+    def clear(self) -> None:
+        """Close every open cursor."""
+        with self._lock:
+            cursors = list(self._cursors.values())
+            self._cursors.clear()
+        self._close_all(cursors)
+
+    def stats(self) -> dict[str, int]:
+        """Return the number of open cursors and lifetime counters."""
+        with self._lock:
+            return {"open": len(self._cursors), **self._counters}
+
+    def _pop_expired(self) -> list[OpenCursor]:
+        """Remove expired cursors; the caller holds the lock."""
+        now = time.monotonic()
+        expired = [key for key, cursor in self._cursors.items() if cursor.expires_at <= now]
+        self._counters["expired"] += len(expired)
+        return [self._cursors.pop(key) for key in expired]
+
+    def _close_all(self, cursors: list[OpenCursor]) -> None:
+        """Close cursors outside the lock, since closing talks to the server."""
+        for cursor in cursors:
+            try:
+                self._close(cursor)
+            except Exception as e:
+                logger.debug(f"Could not close open cursor: {e}")
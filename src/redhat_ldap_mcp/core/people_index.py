@@ -0,0 +1,275 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""In-memory trigram and prefix index answering people searches."""
+
+import bisect
+import heapq
+import re
+import time
+from array import array
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any
+
+from .fuzzy import FuzzyNameIndex
+
+PEOPLE_INDEX = "people_index"
+
+# Processed person fields matched by search_people, with ranking weights
+FIELD_WEIGHTS = {
+    "uid": 3.0,
+    "cn": 3.0,
+    "mail": 2.0,
+    "given_name": 2.0,
+    "surname": 2.0,
+    "title": 1.0,
+    "department": 1.0,
+}
+
+# Start of every word after the first, for typeahead on surnames
+_LATER_WORD = re.compile(r"(?<=\s)\S")
+
+# Match kinds, best first: whole value, value prefix, anywhere in the value
+_EXACT, _PREFIX, _SUBSTRING = 3.0, 2.0, 1.0
+
+
+def trigrams(text: str) -> set[str]:
+    """Return the distinct three-character substrings of a (lowercased) text."""
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _field_values(value: Any) -> list[str]:
+    """Lowercase a processed field value into a list of values."""
+    if value is None:
+        return []
+    if isinstance(value, list | tuple):
+        return [str(item).lower() for item in value]
+    return [str(value).lower()]
+
+
+def _score_levels(fields: Sequence[str]) -> list[list[tuple[str, float]]]:
+    """Group (field, match kind) pairs by score, highest score first."""
+    levels: dict[float, list[tuple[str, float]]] = {}
+    for field in fields:
+        for kind in (_EXACT, _PREFIX, _SUBSTRING):
+            levels.setdefault(FIELD_WEIGHTS[field] * kind, []).append((field, kind))
+    return [levels[score] for score in sorted(levels, reverse=True)]
+
+
+class PeopleIndex:
+    """
+    Trigram inverted index over the searchable fields of every person.
+
+    A field can only contain a query if it contains all of the query's
+    trigrams, so per field the shortest posting list among those trigrams
+    bounds the candidates. Matches are ranked by field weight times match kind
+    (exact, prefix, substring), ties keeping directory order. Ranking works
+    down the score levels and stops once max_results people are found:
+    exact matches come from a dict, prefix matches from a sorted value list,
+    and substring matches from an in-order scan of the candidates that stops
+    early, so common terms matching most of the directory stay cheap.
+    Postings are compact arrays, about 4 bytes per distinct trigram per
+    person and field.
+    """
+
+    def __init__(self, people: Iterable[Mapping[str, Any]]):
+        """
+        Build the index.
+
+        Args:
+            people: Processed person records
+        """
+        self.people: list[Mapping[str, Any]] = list(people)
+        self.built_at = time.monotonic()
+        self._fuzzy: FuzzyNameIndex | None = None
+
+        # field -> joined lowercase values per person, for substring tests
+        self._columns: dict[str, list[str]] = {}
+        # field -> value -> people with that exact value
+        self._exact: dict[str, dict[str, list[int]]] = {}
+        # field -> (sorted values, person per value), for prefix ranges
+        self._sorted: dict[str, tuple[list[str], list[int]]] = {}
+        for field in FIELD_WEIGHTS:
+            values = [_field_values(person.get(field)) for person in self.people]
+            self._columns[field] = ["\n".join(person_values) for person_values in values]
+            exact: dict[str, list[int]] = {}
+            pairs = []
+            for index, person_values in enumerate(values):
+                for value in person_values:
+                    exact.setdefault(value, []).append(index)
+                    pairs.append((value, index))
+            pairs.sort()
+            self._exact[field] = exact
+            self._sorted[field] = ([value for value, _ in pairs], [index for _, index in pairs])
+
+        # Sorted typeahead keys (uid, mail, cn and each later word of cn onwards)
+        completions = []
+        for index in range(len(self.people)):
+            for field in ("uid", "mail"):
+                completions.extend(
+                    (value, index) for value in self._columns[field][index].split("\n")
+                )
+            for cn in self._columns["cn"][index].split("\n"):
+                completions.append((cn, index))
+                completions.extend(
+                    (cn[match.start() :], index) for match in _LATER_WORD.finditer(cn)
+                )
+        completions = sorted(pair for pair in completions if pair[0])
+        self._completion_keys = [key for key, _ in completions]
+        self._completion_people = [index for _, index in completions]
+
+        # field -> trigram -> people whose field contains it, in directory order
+        self._postings: dict[str, dict[str, array]] = {}
+        for field, column in self._columns.items():
+            postings: dict[str, list[int]] = {}
+            for index, text in enumerate(column):
+                for gram in trigrams(text):
+                    postings.setdefault(gram, []).append(index)
+            self._postings[field] = {
+                gram: array("I", indexes) for gram, indexes in postings.items()
+            }
+
+    def __len__(self) -> int:
+        """Return the number of people in the index."""
+        return len(self.people)
+
+    @property
+    def fuzzy(self) -> FuzzyNameIndex:
+        """Fuzzy and phonetic name index over the same people, built on first use."""
+        if self._fuzzy is None:
+            # Concurrent first callers may both build it; the results are identical
+            self._fuzzy = FuzzyNameIndex(self.people)
+        return self._fuzzy
+
+    @property
+    def age(self) -> float:
+        """Seconds since the index was built."""
+        return time.monotonic() - self.built_at
+
+    def search(
+        self, query: str, fields: Sequence[str], max_results: int
+    ) -> list[dict[str, Any]] | None:
+        """
+        Find people with a field containing the query, best matches first.
+
+        Records are shared with the index and must not be mutated.
+
+        Args:
+            query: Substring to look for (case-insensitive)
+            fields: Processed field names to match, keys of FIELD_WEIGHTS
+            max_results: Maximum number of results
+
+        Returns:
+            Matching person records, or None if the query is shorter than a
+            trigram and cannot be answered from the index
+        """
+        needle = query.lower()
+        grams = trigrams(needle)
+        if not grams:
+            return None
+
+        # A field can only contain the needle if it contains all of its trigrams
+        candidates: dict[str, Sequence[int]] = {}
+        for field in fields:
+            postings = [self._postings[field].get(gram, ()) for gram in grams]
+            candidates[field] = min(postings, key=len)
+
+        results: list[int] = []
+        seen: set[int] = set()
+        for level in _score_levels(fields):
+            needed = max_results - len(results)
+            if needed <= 0:
+                break
+            found: set[int] = set()
+            for field, kind in level:
+                if candidates[field]:
+                    found.update(
+                        self._matches(field, kind, needle, candidates[field], needed, seen)
+                    )
+            best = heapq.nsmallest(needed, found)
+            results.extend(best)
+            seen.update(best)
+
+        return [self.people[index] for index in results]
+
+    def complete(self, prefix: str, max_results: int) -> list[dict[str, Any]]:
+        """
+        Find people whose uid, mail, cn or a word of the cn starts with a prefix.
+
+        A binary search over the sorted completion keys followed by a walk
+        of at most a few entries per result, so each call costs microseconds
+        however large the directory is. Results are in key order, exact
+        matches first.
+
+        Args:
+            prefix: Typed prefix (case-insensitive)
+            max_results: Maximum number of results
+
+        Returns:
+            Matching person records, shared with the index
+        """
+        prefix = prefix.lower()
+        if not prefix:
+            return []
+
+        keys = self._completion_keys
+        position = bisect.bisect_left(keys, prefix)
+        results: dict[int, None] = {}
+        while position < len(keys) and len(results) < max_results:
+            if not keys[position].startswith(prefix):
+                break
+            results.setdefault(self._completion_people[position])
+            position += 1
+        return [self.people[index] for index in results]
+
+    def _matches(
+        self,
+        field: str,
+        kind: float,
+        needle: str,
+        candidates: Sequence[int],
+        needed: int,
+        seen: set[int],
+    ) -> list[int]:
+        """
+        Find people not yet seen whose field matches the needle with the given kind.
+
+        Returns every match for narrow prefix lookups; otherwise walks the
+        matches or candidates in directory order and returns the first needed
+        matches, which are the only ones that can make the results.
+        """
+        column = self._columns[field]
+        if kind == _EXACT:
+            # Exact lists are in directory order already
+            candidates = self._exact[field].get(needle, ())
+
+            def matches(text: str) -> bool:
+                return True
+
+        elif kind == _PREFIX:
+            values, indexes = self._sorted[field]
+            low = bisect.bisect_left(values, needle)
+            high = bisect.bisect_left(values, needle + "\uffff")
+            # A wide range is cheaper to sample by scanning candidates in order
+            if (high - low) ** 2 <= needed * len(candidates):
+                return [indexes[i] for i in range(low, high) if indexes[i] not in seen]
+            line_start = "\n" + needle
+
+            def matches(text: str) -> bool:
+                return text.startswith(needle) or line_start in text
+
+        else:
+
+            def matches(text: str) -> bool:
+                return needle in text
+
+        found = []
+        for index in candidates:
+            if index not in seen and matches(column[index]):
+                found.append(index)
+                if len(found) >= needed:
+                    break
+        return found
@@ -0,0 +1,166 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Compact person records for whole-directory snapshots."""
+
+from collections.abc import Iterable, Iterator, Mapping
+from operator import itemgetter
+from typing import Any
+
+# LDAP attributes each processed person field is built from, in field order
+PERSON_FIELD_ATTRIBUTES: dict[str, tuple[str, ...]] = {
+    "uid": ("uid",),
+    "dn": (),
+    "cn": ("cn",),
+    "display_name": ("displayName",),
+    "given_name": ("givenName",),
+    "surname": ("sn",),
+    "mail": ("mail",),
+    "title": ("title", "rhatJobTitle"),
+    "department": ("rhatCostCenterDesc",),
+    "manager": ("manager",),
+    "phone": ("telephoneNumber",),
+    "mobile": ("mobile",),
+    "office_location": ("physicalDeliveryOfficeName", "rhatLocation", "l"),
+    "city": ("l",),
+    "state": ("st",),
+    "country": ("co",),
+    "employee_id": ("employeeNumber", "rhatWorkerId"),
+    "employee_type": ("employeeType", "rhatPersonType"),
+    "cost_center": ("rhatCostCenter",),
+    "rhat_job_title": ("rhatJobTitle",),
+    "rhat_cost_center": ("rhatCostCenter",),
+    "rhat_cost_center_desc": ("rhatCostCenterDesc",),
+    "rhat_location": ("rhatLocation",),
+    "rhat_bio": ("rhatBio",),
+    "rhat_geo": ("rhatGeo",),
+    "rhat_organization": ("rhatOrganization",),
+    "rhat_job_role": ("rhatJobRole",),
+    "rhat_team_lead": ("rhatTeamLead",),
+    "rhat_original_hire_date": ("rhatOriginalHireDate",),
+    "rhat_hire_date": ("rhatHireDate",),
+    "rhat_worker_id": ("rhatWorkerId",),
+    "rhat_building_code": ("rhatBuildingCode",),
+    "rhat_office_location": ("rhatOfficeLocation",),
+}
+
+PERSON_FIELDS = tuple(PERSON_FIELD_ATTRIBUTES)
+
+# Bit marking each field as set in Person._mask
+_FIELD_BITS = {field: 1 << position for position, field in enumerate(PERSON_FIELDS)}
+
+# Fields whose values repeat across many people (names, places, org units,
+# managers), stored once per snapshot
+INTERNED_FIELDS = frozenset(
+    {
+        "given_name",
+        "surname",
+        "title",
+        "department",
+        "manager",
+        "office_location",
+        "city",
+        "state",
+        "country",
+        "employee_type",
+        "cost_center",
+        "rhat_job_title",
+        "rhat_cost_center",
+        "rhat_cost_center_desc",
+        "rhat_location",
+        "rhat_geo",
+        "rhat_organization",
+        "rhat_job_role",
+        "rhat_team_lead",
+        "rhat_original_hire_date",
+        "rhat_hire_date",
+        "rhat_building_code",
+        "rhat_office_location",
+    }
+)
+
+
+class Person(Mapping):
+    """
+    Read-only person record backed by a tuple of its set values.
+
+    Holds the same fields as a processed person dictionary in about a
+    third of the space: a bitmask of the fields that are set and a tuple
+    of their values in field order, with no per-record hash table. Values
+    of INTERNED_FIELDS are shared through the pool the record is built
+    with. It is a Mapping of the set fields, so code reading records with
+    get() or ** works on either; convert with to_dict() where a real
+    dictionary is needed.
+    """
+
+    __slots__ = ("_mask", "_values")
+
+    def __init__(self, record: Mapping[str, Any], pool: dict[str, str] | None = None):
+        """
+        Copy a processed person record.
+
+        Args:
+            record: Processed person dictionary (keys of PERSON_FIELD_ATTRIBUTES)
+            pool: Shared strings for INTERNED_FIELDS values, usually one per snapshot
+
+        Raises:
+            KeyError: If the record has a field that is not a person field
+        """
+        present = []
+        for field, value in record.items():
+            if value is None:
+                continue
+            if pool is not None and field in INTERNED_FIELDS and isinstance(value, str):
+                value = pool.setdefault(value, value)
+            present.append((_FIELD_BITS[field], value))
+        present.sort(key=itemgetter(0))
+        self._mask = sum(bit for bit, _ in present)
+        self._values = tuple(value for _, value in present)
+
+    def __getitem__(self, field: str) -> Any:
+        """Return a set field, raising KeyError for unset or unknown fields."""
+        bit = _FIELD_BITS.get(field, 0)
+        if not self._mask & bit:
+            raise KeyError(field)
+        # Values before this one are those of the lower set bits
+        return self._values[(self._mask & (bit - 1)).bit_count()]
+
+    def get(self, field: str, default: Any = None) -> Any:
+        """Return a field's value, or default when it is unset or unknown."""
+        bit = _FIELD_BITS.get(field, 0)
+        if not self._mask & bit:
+            return default
+        return self._values[(self._mask & (bit - 1)).bit_count()]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the set fields in field order."""
+        return (field for field, bit in _FIELD_BITS.items() if self._mask & bit)
+
+    def __len__(self) -> int:
+        """Return the number of set fields."""
+        return len(self._values)
+
+    def __repr__(self) -> str:
+        """Show the record like the dictionary it stands for."""
+        return f"Person({self.to_dict()!r})"
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the record as a new processed person dictionary."""
+        return dict(zip(self, self._values, strict=True))
+
+
+def compact_people(records: Iterable[Mapping[str, Any]]) -> list[Person]:
+    """
+    Convert processed person records to Person records sharing repeated values.
+
+    Args:
+        records: Processed person dictionaries
+
+    Returns:
+        Person records in the same order
+    """
+    pool: dict[str, str] = {}
+    return [Person(record, pool) for record in records]
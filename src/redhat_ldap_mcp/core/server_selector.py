@@ -0,0 +1,271 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Choice of LDAP server (primary or read replica) for each checkout, with circuit breakers."""
+
+import random
+import threading
+import time
+from typing import Any
+
+from ldap3 import Server
+from ldap3.core.exceptions import LDAPException
+
+from .connection_pool import ConnectionPool
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+# Weight of the newest sample in each server's moving average latency
+LATENCY_SMOOTHING = 0.2
+
+
+class DirectoryUnavailableError(LDAPException):
+    """No LDAP server can take a request: connections fail or every circuit is open."""
+
+
+def backoff_delay(base: float, attempt: int, cap: float) -> float:
+    """
+    Return an exponential backoff delay with jitter.
+
+    The delay doubles with every attempt up to cap, and is then drawn
+    from its upper half so that clients failing together do not retry
+    together.
+
+    Args:
+        base: Delay of the first attempt, in seconds
+        attempt: Number of failed attempts so far, starting at 0
+        cap: Longest delay, in seconds
+
+    Returns:
+        Seconds to wait
+    """
+    delay = min(cap, base * 2 ** min(attempt, 32))
+    return random.uniform(delay / 2, delay)
+
+
+class ServerState:
+    """One LDAP server with its connection pool, circuit breaker and latency."""
+
+    def __init__(self, url: str, server: Server):
+        """
+        Initialize the state of a server that has not been used yet.
+
+        Args:
+            url: Server URL as configured
+            server: ldap3 server object
+        """
+        self.url = url
+        self.server = server
+        # Set by the connector once its factory can refer to this state
+        self.pool: ConnectionPool | None = None
+
+        # Exponential moving average of operation round trips, in seconds
+        self.latency: float | None = None
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+
+        # Circuit breaker: open until open_until, then half-open; 0 when closed
+        self.open_until = 0.0
+        # Consecutive trips, doubling the open interval
+        self.open_count = 0
+        # No other half-open trial request starts before this time
+        self.trial_until = 0.0
+        self.trips = 0
+        self.rejected = 0
+
+    @property
+    def outstanding(self) -> int:
+        """Number of this server's connections currently checked out."""
+        return self.pool.in_use if self.pool else 0
+
+    def circuit(self, now: float) -> str:
+        """Return the circuit breaker state: closed, open or half_open."""
+        if not self.open_until:
+            return "closed"
+        return "open" if now < self.open_until else "half_open"
+
+
+class ServerSelector:
+    """
+    Orders servers for each checkout according to a selection strategy.
+
+    Strategies:
+    - round_robin: rotate through the servers
+    - least_outstanding: fewest connections checked out, ties rotated
+    - latency: random, weighted by the inverse of each server's average
+      latency; servers without samples count as the fastest one so they
+      get measured
+
+    Every server has a circuit breaker. Closed servers are offered in
+    strategy order, those with recent failures after the others so
+    checkouts fail over at once. failure_threshold consecutive failures
+    open the circuit: the server is not offered at all for open_interval
+    (doubling on every further trip up to max_open_interval, with jitter).
+    It then turns half-open and is offered first to a single trial
+    request: success closes the circuit, failure opens it again. When
+    every circuit is open there is nothing to try, so requests fail fast
+    instead of each waiting out connection timeouts.
+    """
+
+    STRATEGIES = ("round_robin", "least_outstanding", "latency")
+
+    def __init__(
+        self,
+        servers: list[ServerState],
+        strategy: str = "round_robin",
+        failure_threshold: int = 3,
+        open_interval: float = 5.0,
+        max_open_interval: float = 300.0,
+    ):
+        """
+        Initialize the selector.
+
+        Args:
+            servers: Servers in configuration order
+            strategy: One of STRATEGIES
+            failure_threshold: Consecutive failures that open a server's circuit
+            open_interval: Seconds a circuit first stays open
+            max_open_interval: Longest time a circuit stays open
+
+        Raises:
+            ValueError: If the strategy is unknown or there are no servers
+        """
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown server selection strategy: {strategy}")
+        if not servers:
+            raise ValueError("At least one LDAP server is required")
+        self.servers = servers
+        self.strategy = strategy
+        self.failure_threshold = failure_threshold
+        self.open_interval = open_interval
+        self.max_open_interval = max_open_interval
+
+        self._lock = threading.Lock()
+        self._next = 0
+        self._random = random.Random()
+
+    def candidates(self) -> list[ServerState]:
+        """
+        Return the servers a checkout should try, in order.
+
+        Claims the trial request of a half-open server, which comes first.
+
+        Returns:
+            Servers to try; empty when every circuit is open
+        """
+        now = time.monotonic()
+        with self._lock:
+            closed, trials = [], []
+            for server in self.servers:
+                circuit = server.circuit(now)
+                if circuit == "closed":
+                    closed.append(server)
+                elif circuit == "half_open" and server.trial_until <= now:
+                    # Another trial may start if this one never reports back
+                    server.trial_until = now + self.open_interval
+                    trials.append(server)
+                else:
+                    server.rejected += 1
+
+            if len(closed) > 1:
+                start = self._next % len(closed)
+                self._next += 1
+                closed = closed[start:] + closed[:start]
+                if self.strategy == "least_outstanding":
+                    # Stable sort keeps the rotation among equally busy servers
+                    closed.sort(key=lambda server: server.outstanding)
+                elif self.strategy == "latency":
+                    closed = self._order_by_latency(closed)
+                closed.sort(key=lambda server: server.consecutive_failures > 0)
+        return trials + closed
+
+    def retry_in(self) -> float:
+        """Return seconds until the first open circuit turns half-open (0 if none is open)."""
+        now = time.monotonic()
+        with self._lock:
+            waits = [server.open_until - now for server in self.servers if server.open_until]
+        return max(0.0, min(waits)) if waits else 0.0
+
+    def record_success(self, server: ServerState, seconds: float | None = None) -> None:
+        """
+        Close a server's circuit, folding a round trip into its average latency.
+
+        Args:
+            server: Server that answered
+            seconds: Round-trip time of the operation, if measured
+        """
+        with self._lock:
+            if server.open_until:
+                logger.info(f"LDAP server {server.url} is back, closing its circuit")
+            server.consecutive_failures = 0
+            server.open_until = 0.0
+            server.open_count = 0
+            server.trial_until = 0.0
+            if seconds is not None:
+                if server.latency is None:
+                    server.latency = seconds
+                else:
+                    server.latency += LATENCY_SMOOTHING * (seconds - server.latency)
+
+    def record_failure(self, server: ServerState) -> None:
+        """
+        Count a failure, opening the server's circuit past the threshold or after a trial.
+
+        Args:
+            server: Server whose connection or operation failed
+        """
+        now = time.monotonic()
+        with self._lock:
+            server.failures += 1
+            server.consecutive_failures += 1
+            if server.circuit(now) == "open":
+                return
+            if server.open_until or server.consecutive_failures >= self.failure_threshold:
+                interval = backoff_delay(
+                    self.open_interval, server.open_count, self.max_open_interval
+                )
+                server.open_until = now + interval
+                server.open_count += 1
+                server.trips += 1
+                logger.warning(
+                    f"Opened circuit of LDAP server {server.url} for {interval:.1f}s "
+                    f"after {server.consecutive_failures} consecutive failures"
+                )
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Return circuit, load and latency statistics per server URL."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                server.url: {
+                    "circuit": server.circuit(now),
+                    "retry_in": max(0.0, server.open_until - now) if server.open_until else 0.0,
+                    "outstanding": server.outstanding,
+                    "requests": server.requests,
+                    "failures": server.failures,
+                    "consecutive_failures": server.consecutive_failures,
+                    "trips": server.trips,
+                    "rejected": server.rejected,
+                    "latency_ms": (
+                        round(server.latency * 1000, 3) if server.latency is not None else None
+                    ),
+                }
+                for server in self.servers
+            }
+
+    def _order_by_latency(self, servers: list[ServerState]) -> list[ServerState]:
+        """Draw the first server weighted by inverse latency, then order the rest fastest first."""
+        known = [server.latency for server in servers if server.latency is not None]
+        fastest = max(min(known), 1e-6) if known else 1.0
+        weights = [1.0 / max(server.latency or fastest, 1e-6) for server in servers]
+        first = self._random.choices(servers, weights=weights)[0]
+        rest = sorted(
+            (server for server in servers if server is not first),
+            key=lambda server: server.latency if server.latency is not None else fastest,
+        )
+        return [first, *rest]
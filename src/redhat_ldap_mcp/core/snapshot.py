@@ -0,0 +1,377 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Local SQLite snapshot of directory entries with incremental sync."""
+
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterable
+from datetime import datetime, timezone
+from typing import Any
+
+from .filters import normalize_dn
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+# Entries written per transaction while syncing
+WRITE_BATCH_SIZE = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    kind TEXT NOT NULL,
+    dn TEXT NOT NULL,
+    generation INTEGER NOT NULL,
+    search_text TEXT NOT NULL,
+    record TEXT NOT NULL,
+    PRIMARY KEY (kind, dn)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    kind TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL,
+    watermark TEXT,
+    full_synced_at REAL NOT NULL,
+    synced_at REAL NOT NULL
+);
+"""
+
+# Fetches raw entries modified at or after a GeneralizedTime, or all for None
+Fetch = Callable[[str | None], Iterable[dict[str, Any]]]
+# Turns a raw entry into (stored record, lowercase text searched by search())
+Process = Callable[[dict[str, Any]], tuple[Any, str]]
+
+
+def generalized_time(value: Any) -> str | None:
+    """
+    Normalize a modifyTimestamp value to a YYYYMMDDHHMMSSZ string.
+
+    ldap3 returns datetimes when the server schema is known and strings
+    otherwise; both are reduced to whole seconds in UTC so they compare
+    as strings.
+
+    Args:
+        value: Attribute value (datetime, string or list of either)
+
+    Returns:
+        GeneralizedTime string, or None when the value is missing or unreadable
+    """
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.strftime("%Y%m%d%H%M%SZ")
+    if isinstance(value, bytes):
+        value = value.decode("ascii", "replace")
+    if isinstance(value, str) and len(value) >= 14 and value[:14].isdigit():
+        return value[:14] + "Z"
+    return None
+
+
+class _KindState:
+    """Sync bookkeeping of one kind of entry."""
+
+    def __init__(self, generation=0, watermark=None, full_synced_at=0.0, synced_at=0.0):
+        """Initialize the state, by default that of a kind never synced."""
+        self.generation: int = generation
+        self.watermark: str | None = watermark
+        self.full_synced_at: float = full_synced_at
+        self.synced_at: float = synced_at
+        # Set by expire(full=True) until the next full sync
+        self.full_sync_required = False
+        self.lock = threading.Lock()
+        self.last_sync: dict[str, Any] | None = None
+
+
+class DirectorySnapshot:
+    """
+    Local copy of directory entries (people, groups, ...) kept in SQLite.
+
+    Each kind of entry is filled by one paged sweep and then kept current by
+    fetching only entries with modifyTimestamp at or after the newest one
+    seen so far. Incremental syncs cannot see deletions or the old DN of a
+    renamed entry, so a full resync runs every full_sync_interval; it
+    overwrites entries in place and drops those it did not see. The file
+    survives restarts, so a restarted server reads a warm snapshot and only
+    fetches what changed while it was down.
+
+    Records are stored as JSON in directory order and returned as new
+    objects on every read. One SQLite connection is shared by all threads,
+    serialized by a lock.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (creating if needed) a snapshot file.
+
+        Args:
+            path: SQLite database file, or ":memory:"
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+        self._states: dict[str, _KindState] = {}
+        for kind, *state in self._db.execute("SELECT * FROM sync_state"):
+            self._states[kind] = _KindState(*state)
+        self._counters = {"full_syncs": 0, "incremental_syncs": 0, "failed_syncs": 0}
+
+    def refresh(
+        self,
+        kind: str,
+        fetch: Fetch,
+        process: Process,
+        sync_interval: float,
+        full_sync_interval: float,
+    ) -> None:
+        """
+        Sync a kind of entry if it is due, serving the current copy on failure.
+
+        Nothing happens until sync_interval has passed since the last sync,
+        or expire() was called. Then a full sync runs when the kind was never
+        fully synced, when the last full sync is older than
+        full_sync_interval, when expire(full=True) asked for one, or when no
+        entry carried a modifyTimestamp to sync incrementally from;
+        otherwise an incremental sync runs. Concurrent callers wait for a running sync
+        instead of starting their own.
+
+        Args:
+            kind: Entry kind, e.g. "people"
+            fetch: Returns raw entries, including their modifyTimestamp,
+                modified at or after a GeneralizedTime (all entries for None)
+            process: Returns the record to store and its search text for a raw entry
+            sync_interval: Seconds between incremental syncs
+            full_sync_interval: Seconds between full syncs
+
+        Raises:
+            Exception: Whatever the sync raises when the kind was never fully synced
+        """
+        state = self._state(kind)
+        with state.lock:
+            now = time.time()
+            if now - state.synced_at < sync_interval:
+                return
+            full = (
+                not state.watermark
+                or state.full_sync_required
+                or now - state.full_synced_at >= full_sync_interval
+            )
+
+            try:
+                self.sync(kind, fetch, process, full)
+            except Exception as e:
+                self._counters["failed_syncs"] += 1
+                if not state.full_synced_at:
+                    raise
+                logger.warning(f"Syncing {kind} snapshot failed, serving the previous copy: {e}")
+                # Back off for a full interval instead of retrying on every call
+                state.synced_at = now
+
+    def sync(self, kind: str, fetch: Fetch, process: Process, full: bool = False) -> dict[str, Any]:
+        """
+        Sync a kind of entry now.
+
+        Args:
+            kind: Entry kind, e.g. "people"
+            fetch: Returns raw entries, including their modifyTimestamp,
+                modified at or after a GeneralizedTime (all entries for None)
+            process: Returns the record to store and its search text for a raw entry
+            full: Re-read every entry and drop those no longer in the directory
+
+        Returns:
+            Statistics of this sync
+
+        Raises:
+            Exception: Whatever fetch or process raise; entries already
+                written are kept, and the sync state is not advanced
+        """
+        state = self._state(kind)
+        start = time.monotonic()
+        started_at = time.time()
+        generation = state.generation + 1 if full else state.generation
+        watermark = None if full else state.watermark
+
+        fetched = 0
+        batch = []
+        for entry in fetch(watermark):
+            record, search_text = process(entry)
+            stamp = generalized_time(entry.get("attributes", {}).get("modifyTimestamp"))
+            if stamp and (watermark is None or stamp > watermark):
+                watermark = stamp
+            batch.append((kind, normalize_dn(entry["dn"]), generation, search_text, record))
+            fetched += 1
+            if len(batch) >= WRITE_BATCH_SIZE:
+                self._write(batch)
+                batch = []
+        self._write(batch)
+
+        removed = 0
+        with self._lock, self._db:
+            if full:
+                removed = self._db.execute(
+                    "DELETE FROM entries WHERE kind = ? AND generation < ?", (kind, generation)
+                ).rowcount
+            full_synced_at = started_at if full else state.full_synced_at
+            self._db.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?, ?)",
+                (kind, generation, watermark, full_synced_at, started_at),
+            )
+        state.generation = generation
+        state.watermark = watermark
+        state.full_synced_at = full_synced_at
+        state.synced_at = started_at
+        if full:
+            state.full_sync_required = False
+
+        mode = "full" if full else "incremental"
+        self._counters[f"{mode}_syncs"] += 1
+        state.last_sync = {
+            "mode": mode,
+            "fetched": fetched,
+            "removed": removed,
+            "seconds": time.monotonic() - start,
+        }
+        logger.info(
+            f"Synced {kind} snapshot ({mode}): {fetched} fetched, {removed} removed "
+            f"in {state.last_sync['seconds']:.2f}s"
+        )
+        return state.last_sync
+
+    def expire(self, kind: str | None = None, full: bool = False) -> None:
+        """
+        Make the next refresh() sync, whatever its sync_interval.
+
+        Args:
+            kind: Entry kind; expires every kind when omitted
+            full: Make that sync a full one, e.g. after deletions that
+                incremental syncs cannot see
+        """
+        with self._lock:
+            states = list(self._states.values()) if kind is None else [self._states.get(kind)]
+        for state in states:
+            if state is not None:
+                state.synced_at = 0.0
+                state.full_sync_required = state.full_sync_required or full
+
+    def remove(self, dn: str) -> int:
+        """
+        Drop an entry of any kind, e.g. one known to be deleted.
+
+        Args:
+            dn: Entry DN, in any case
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock, self._db:
+            return self._db.execute(
+                "DELETE FROM entries WHERE dn = ?", (normalize_dn(dn),)
+            ).rowcount
+
+    def load(self, kind: str) -> list[Any]:
+        """
+        Read every record of a kind in directory order.
+
+        Args:
+            kind: Entry kind
+
+        Returns:
+            Stored records
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT record FROM entries WHERE kind = ? ORDER BY rowid", (kind,)
+            ).fetchall()
+        return [json.loads(record) for (record,) in rows]
+
+    def get(self, kind: str, dn: str) -> Any | None:
+        """
+        Read one record by DN.
+
+        Args:
+            kind: Entry kind
+            dn: Entry DN, in any case
+
+        Returns:
+            Stored record, or None if the snapshot lacks the entry
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT record FROM entries WHERE kind = ? AND dn = ?", (kind, normalize_dn(dn))
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def search(self, kind: str, text: str, limit: int) -> list[Any]:
+        """
+        Read the records whose search text contains a string.
+
+        Args:
+            kind: Entry kind
+            text: Case-insensitive substring
+            limit: Maximum number of records
+
+        Returns:
+            Matching records in directory order
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT record FROM entries WHERE kind = ? AND instr(search_text, ?) > 0 "
+                "ORDER BY rowid LIMIT ?",
+                (kind, text.lower(), limit),
+            ).fetchall()
+        return [json.loads(record) for (record,) in rows]
+
+    def stats(self) -> dict[str, Any]:
+        """Return sync counters and per-kind sizes, watermarks and last sync statistics."""
+        with self._lock:
+            sizes = dict(
+                self._db.execute("SELECT kind, COUNT(*) FROM entries GROUP BY kind").fetchall()
+            )
+        now = time.time()
+        return {
+            **self._counters,
+            "kinds": {
+                kind: {
+                    "entries": sizes.get(kind, 0),
+                    "watermark": state.watermark,
+                    "age": now - state.synced_at if state.synced_at else None,
+                    "full_sync_age": now - state.full_synced_at if state.full_synced_at else None,
+                    "last_sync": state.last_sync,
+                }
+                for kind, state in self._states.items()
+            },
+        }
+
+    def close(self) -> None:
+        """Close the snapshot file."""
+        with self._lock:
+            self._db.close()
+
+    def _state(self, kind: str) -> _KindState:
+        """Get or create the sync state of a kind."""
+        with self._lock:
+            return self._states.setdefault(kind, _KindState())
+
+    def _write(self, batch: list[tuple[str, str, int, str, Any]]) -> None:
+        """Insert or overwrite a batch of entries in one transaction."""
+        if not batch:
+            return
+        rows = [
+            (kind, dn, generation, search_text, json.dumps(record, default=str))
+            for kind, dn, generation, search_text, record in batch
+        ]
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO entries VALUES (?, ?, ?, ?, ?) ON CONFLICT (kind, dn) DO UPDATE SET "
+                "generation = excluded.generation, search_text = excluded.search_text, "
+                "record = excluded.record",
+                rows,
+            )
@@ -0,0 +1,639 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""RFC 4533 content synchronization (syncrepl) consumer keeping caches fresh."""
+
+import os
+import queue
+import threading
+import time
+import uuid
+from typing import TYPE_CHECKING, Any
+
+from ldap3 import BASE, SUBTREE
+from ldap3.core.exceptions import LDAPCommunicationError
+from pyasn1.codec.ber import decoder, encoder
+from pyasn1.type import namedtype, namedval, tag, univ
+
+from .filters import normalize_dn
+from .logging import get_logger
+
+if TYPE_CHECKING:
+    from .ldap_connector import LDAPConnector
+
+logger = get_logger(__name__)
+
+SYNC_REQUEST_OID = "1.3.6.1.4.1.4203.1.9.1.1"
+SYNC_STATE_OID = "1.3.6.1.4.1.4203.1.9.1.2"
+SYNC_INFO_OID = "1.3.6.1.4.1.4203.1.9.1.4"
+
+# resultCode telling the consumer its cookie is too old to resume from
+SYNC_REFRESH_REQUIRED = 4096
+
+# Sync state -> stats() counter
+_STATE_COUNTERS = {"add": "adds", "modify": "modifies", "delete": "deletes"}
+
+# Longest wait between reconnection attempts
+MAX_RECONNECT_DELAY = 300.0
+
+# Attributes read from a changed entry to rule out cached searches it
+# cannot match: those the tools filter on, except potentially huge
+# membership lists (searches on those are dropped whenever in scope)
+CHANGE_MATCH_ATTRIBUTES = [
+    "objectClass",
+    "uid",
+    "cn",
+    "sn",
+    "givenName",
+    "displayName",
+    "mail",
+    "title",
+    "description",
+    "manager",
+    "l",
+    "st",
+    "co",
+    "physicalDeliveryOfficeName",
+    "rhatLocation",
+    "rhatCostCenterDesc",
+]
+
+
+def _context(number: int, constructed: bool = False) -> tag.Tag:
+    """Return an implicit context-specific tag."""
+    form = tag.tagFormatConstructed if constructed else tag.tagFormatSimple
+    return tag.Tag(tag.tagClassContext, form, number)
+
+
+class SyncRequestValue(univ.Sequence):
+    """syncRequestValue: mode, optional cookie and reloadHint."""
+
+    componentType = namedtype.NamedTypes(
+        namedtype.NamedType(
+            "mode",
+            univ.Enumerated(
+                namedValues=namedval.NamedValues(("refreshOnly", 1), ("refreshAndPersist", 3))
+            ),
+        ),
+        namedtype.OptionalNamedType("cookie", univ.OctetString()),
+        namedtype.DefaultedNamedType("reloadHint", univ.Boolean(False)),
+    )
+
+
+class SyncStateValue(univ.Sequence):
+    """syncStateValue: the state of one returned entry."""
+
+    componentType = namedtype.NamedTypes(
+        namedtype.NamedType(
+            "state",
+            univ.Enumerated(
+                namedValues=namedval.NamedValues(
+                    ("present", 0), ("add", 1), ("modify", 2), ("delete", 3)
+                )
+            ),
+        ),
+        namedtype.NamedType("entryUUID", univ.OctetString()),
+        namedtype.OptionalNamedType("cookie", univ.OctetString()),
+    )
+
+
+class _RefreshPhase(univ.Sequence):
+    """refreshDelete / refreshPresent: end of a refresh phase."""
+
+    componentType = namedtype.NamedTypes(
+        namedtype.OptionalNamedType("cookie", univ.OctetString()),
+        namedtype.DefaultedNamedType("refreshDone", univ.Boolean(True)),
+    )
+
+
+class _SyncIdSet(univ.Sequence):
+    """syncIdSet: entryUUIDs of present or deleted entries."""
+
+    componentType = namedtype.NamedTypes(
+        namedtype.OptionalNamedType("cookie", univ.OctetString()),
+        namedtype.DefaultedNamedType("refreshDeletes", univ.Boolean(False)),
+        namedtype.NamedType("syncUUIDs", univ.SetOf(componentType=univ.OctetString())),
+    )
+
+
+class SyncInfoValue(univ.Choice):
+    """syncInfoValue: intermediate response carrying cookies and phase changes."""
+
+    componentType = namedtype.NamedTypes(
+        namedtype.NamedType("newcookie", univ.OctetString().subtype(implicitTag=_context(0))),
+        namedtype.NamedType(
+            "refreshDelete", _RefreshPhase().subtype(implicitTag=_context(1, True))
+        ),
+        namedtype.NamedType(
+            "refreshPresent", _RefreshPhase().subtype(implicitTag=_context(2, True))
+        ),
+        namedtype.NamedType("syncIdSet", _SyncIdSet().subtype(implicitTag=_context(3, True))),
+    )
+
+
+def _uuid_bytes(value: Any) -> bytes | None:
+    """Return an entryUUID attribute value as the 16 bytes sync controls carry, or None."""
+    if isinstance(value, list | tuple):
+        value = value[0] if value else None
+    if isinstance(value, bytes):
+        if len(value) == 16:
+            return value
+        value = value.decode(errors="replace")
+    try:
+        return uuid.UUID(str(value)).bytes
+    except (TypeError, ValueError):
+        return None
+
+
+def sync_request_control(cookie: bytes | None = None) -> tuple[str, bool, bytes]:
+    """
+    Build a critical refreshAndPersist Sync Request control.
+
+    Args:
+        cookie: Cookie of the last synchronized state, or None for a full refresh
+
+    Returns:
+        (oid, criticality, BER value) tuple, as ldap3 search() accepts
+    """
+    value = SyncRequestValue()
+    value["mode"] = "refreshAndPersist"
+    if cookie:
+        value["cookie"] = cookie
+    return SYNC_REQUEST_OID, True, encoder.encode(value)
+
+
+def _optional_bytes(value: Any) -> bytes | None:
+    """Return an optional OCTET STRING component as bytes, or None when absent."""
+    return bytes(value) if value.isValue else None
+
+
+def decode_sync_state(value: bytes) -> tuple[str, bytes, bytes | None]:
+    """
+    Decode a Sync State control value.
+
+    Args:
+        value: BER encoded syncStateValue
+
+    Returns:
+        (state, entryUUID, cookie); state is present, add, modify or delete
+    """
+    decoded, _ = decoder.decode(value, asn1Spec=SyncStateValue())
+    state = decoded["state"].prettyPrint()
+    return state, bytes(decoded["entryUUID"]), _optional_bytes(decoded["cookie"])
+
+
+def decode_sync_info(value: bytes) -> dict[str, Any]:
+    """
+    Decode a Sync Info intermediate response value.
+
+    Args:
+        value: BER encoded syncInfoValue
+
+    Returns:
+        Dictionary with "type" (newcookie, refreshDelete, refreshPresent or
+        syncIdSet), "cookie", and per type "refresh_done" or
+        "refresh_deletes" and "uuids"
+    """
+    decoded, _ = decoder.decode(value, asn1Spec=SyncInfoValue())
+    kind = decoded.getName()
+    component = decoded.getComponent()
+    if kind == "newcookie":
+        return {"type": kind, "cookie": bytes(component)}
+
+    info = {"type": kind, "cookie": _optional_bytes(component["cookie"])}
+    if kind == "syncIdSet":
+        info["refresh_deletes"] = bool(component["refreshDeletes"])
+        info["uuids"] = [bytes(uuid) for uuid in component["syncUUIDs"]]
+    else:
+        info["refresh_done"] = bool(component["refreshDone"])
+    return info
+
+
+class SyncReplConsumer:
+    """
+    Follows directory changes with an RFC 4533 refreshAndPersist search.
+
+    A background thread keeps one streaming search open on a dedicated
+    connection. ldap3's receiver thread only queues change notifications,
+    so it keeps reading the stream; the background thread then invalidates
+    the connector's cached searches each entry was in or, judging by its
+    current attributes (one base read per change), may now match. In-memory indexes and the
+    snapshot are marked for a background refresh at most once per
+    expire_interval, so steady edits coalesce into periodic refreshes
+    instead of continuous directory sweeps, while still catching up much
+    sooner than their own refresh intervals. Deleted entries are dropped
+    from the snapshot directly.
+
+    Renames (modDN) are reported as modifications of the entry under its
+    new DN, so the consumer keeps the DN of every entryUUID it has seen.
+    A full refresh lists every entry; after a session resumed from a
+    cookie the map is filled by one entryUUID sweep of the subtree. A
+    renamed entry's old DN is invalidated like a deleted entry. While the
+    map is incomplete (during that sweep, or if it fails), a change to an
+    entry not seen yet may be a rename from an unknown DN, so it drops
+    every cached search and the next snapshot refresh is a full resync.
+
+    The initial refresh phase is applied in bulk once it completes. When
+    it reports deletions only as entryUUIDs (or as the complement of a
+    present set), the snapshot is marked for a full resync, since entries
+    are not tracked by UUID. The last cookie is saved to cookie_path, if
+    given, so a restarted consumer resumes where it stopped. Dropped
+    connections are retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        connector: "LDAPConnector",
+        search_base: str,
+        cookie_path: str | None = None,
+        reconnect_delay: float = 5.0,
+        expire_interval: float = 60.0,
+    ):
+        """
+        Initialize the consumer.
+
+        Args:
+            connector: Connector whose cache, indexes and snapshot are kept fresh
+            search_base: Base DN of the synchronized subtree
+            cookie_path: File keeping the sync cookie across restarts
+            reconnect_delay: Seconds before the first reconnection attempt
+            expire_interval: Minimum seconds between index and snapshot
+                refreshes triggered by changes
+        """
+        self.connector = connector
+        self.search_base = search_base
+        self.cookie_path = cookie_path
+        self.reconnect_delay = reconnect_delay
+        self.expire_interval = expire_interval
+
+        self.cookie = self._load_cookie()
+        self.connected = False
+        self.refreshing = True
+        self._refresh_changes = 0
+        self._deletions_unknown = False
+        self._done = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._counters = {"adds": 0, "modifies": 0, "deletes": 0, "refreshes": 0, "reconnects": 0}
+        self._last_event = 0.0
+        # (dn, deleted, renamed from, origin unknown) changes queued by the receiver
+        # thread for the consumer thread
+        self._changes: queue.SimpleQueue[tuple[str, bool, str | None, bool]] = queue.SimpleQueue()
+        # entryUUID -> DN of the entries seen, and whether that covers the whole subtree
+        self._entry_dns: dict[bytes, str] = {}
+        self._entry_dns_lock = threading.Lock()
+        self._entry_dns_complete = False
+        self._full_refresh = self.cookie is None
+        self._entry_dns_wanted = False
+        # Changes not yet passed on to the indexes and snapshot, and when they last were
+        self._expiry_pending = False
+        self._expiry_full = False
+        self._expired_at = 0.0
+
+    def start(self) -> None:
+        """Start following changes in a background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="syncrepl-consumer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop following changes.
+
+        Args:
+            timeout: Seconds to wait for the background thread to finish
+        """
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def stats(self) -> dict[str, Any]:
+        """Return connection state, event counters and the age of the last event."""
+        return {
+            **self._counters,
+            "connected": self.connected,
+            "refreshing": self.refreshing,
+            "has_cookie": self.cookie is not None,
+            "tracked_entries": len(self._entry_dns),
+            "last_event_age": time.monotonic() - self._last_event if self._last_event else None,
+        }
+
+    def handle_message(self, message: dict[str, Any]) -> None:
+        """
+        Apply one message of the sync search.
+
+        Called by ldap3's receiver thread for every response to the search:
+        entries carrying a Sync State control, Sync Info intermediate
+        responses and the final searchResDone. Nothing here reads from the
+        directory: changes are queued for the consumer thread.
+
+        Args:
+            message: ldap3 response dictionary
+        """
+        try:
+            kind = message.get("type")
+            if kind == "searchResEntry":
+                control = (message.get("controls") or {}).get(SYNC_STATE_OID)
+                if control:
+                    self._apply_entry(message["dn"], *decode_sync_state(control["value"]))
+            elif kind == "intermediateResponse" and message.get("responseName") == SYNC_INFO_OID:
+                self._apply_info(decode_sync_info(message["responseValue"]))
+            elif kind == "searchResDone":
+                if message.get("result") == SYNC_REFRESH_REQUIRED:
+                    logger.info("Server requires a full sync refresh, dropping the cookie")
+                    self._save_cookie(None)
+                else:
+                    logger.warning(f"Sync search ended: {message.get('description')}")
+                self._done.set()
+        except Exception as e:
+            logger.error(f"Could not apply sync message: {e}")
+
+    def _apply_entry(self, dn: str, state: str, entry_uuid: bytes, cookie: bytes | None) -> None:
+        """Apply the Sync State of one returned entry."""
+        deleted = state == "delete"
+        with self._entry_dns_lock:
+            previous_dn = self._entry_dns.pop(entry_uuid, None)
+            if not deleted:
+                self._entry_dns[entry_uuid] = dn
+            origin_unknown = previous_dn is None and not self._entry_dns_complete
+
+        if state != "present":
+            self._counters[_STATE_COUNTERS[state]] += 1
+            self._last_event = time.monotonic()
+            if self.refreshing:
+                self._refresh_changes += 1
+                if deleted and self.connector.snapshot:
+                    self.connector.snapshot.remove(dn)
+            else:
+                logger.debug(f"Directory change ({state}): {dn}")
+                renamed_from = None
+                if previous_dn and normalize_dn(previous_dn) != normalize_dn(dn):
+                    logger.debug(f"Directory entry renamed from {previous_dn}")
+                    renamed_from = previous_dn
+                self._changes.put((dn, deleted, renamed_from, state == "modify" and origin_unknown))
+        if cookie:
+            self._save_cookie(cookie)
+
+    def _apply_info(self, info: dict[str, Any]) -> None:
+        """Apply a Sync Info message."""
+        if info["type"] == "refreshPresent":
+            # Entries not listed as present were deleted, but they are not tracked
+            self._deletions_unknown = True
+        elif info["type"] == "syncIdSet" and info["refresh_deletes"]:
+            with self._entry_dns_lock:
+                for entry_uuid in info["uuids"]:
+                    self._entry_dns.pop(entry_uuid, None)
+            if self.refreshing:
+                self._deletions_unknown = True
+            else:
+                self._changed_all(deletions_unknown=True)
+
+        if self.refreshing and info.get("refresh_done"):
+            self._end_refresh()
+        if info["cookie"]:
+            self._save_cookie(info["cookie"])
+
+    def _end_refresh(self) -> None:
+        """Apply the refresh phase in bulk and switch to per-change updates."""
+        self.refreshing = False
+        self._counters["refreshes"] += 1
+        logger.info(f"Sync refresh done: {self._refresh_changes} changed entries")
+        if self._refresh_changes or self._deletions_unknown:
+            self._changed_all(self._deletions_unknown)
+        if self._full_refresh:
+            # Every entry was listed, with its DN
+            self._entry_dns_complete = True
+        elif not self._entry_dns_complete:
+            self._entry_dns_wanted = True
+        self._refresh_changes = 0
+        self._deletions_unknown = False
+
+    def _apply_changes(self, timeout: float = 0.0) -> None:
+        """
+        Apply the queued changes.
+
+        Args:
+            timeout: Seconds to wait for a first change when none is queued
+        """
+        while True:
+            try:
+                dn, deleted, renamed_from, origin_unknown = self._changes.get(
+                    block=timeout > 0, timeout=timeout
+                )
+            except queue.Empty:
+                return
+            timeout = 0.0
+            try:
+                self._changed(dn, deleted, renamed_from, origin_unknown)
+            except Exception as e:
+                logger.error(f"Could not apply change to {dn}: {e}")
+
+    def _changed(
+        self,
+        dn: str,
+        deleted: bool = False,
+        renamed_from: str | None = None,
+        origin_unknown: bool = False,
+    ) -> None:
+        """
+        Invalidate what one changed entry may have made stale.
+
+        Args:
+            dn: Current DN of the entry
+            deleted: The entry was deleted
+            renamed_from: Previous DN of a renamed entry
+            origin_unknown: The entry may have been renamed from a DN not seen
+        """
+        if origin_unknown:
+            # Cached results and snapshot rows may hold the entry under any DN
+            self.connector.invalidate_cache()
+            self._expiry_full = True
+        else:
+            if renamed_from:
+                self.connector.invalidate_cache(renamed_from, deleted=True)
+                if self.connector.snapshot:
+                    self.connector.snapshot.remove(renamed_from)
+            attributes = None if deleted else self._read_entry(dn)
+            self.connector.invalidate_cache(dn, attributes=attributes, deleted=deleted)
+            if deleted and self.connector.snapshot:
+                self.connector.snapshot.remove(dn)
+        self._expiry_pending = True
+        self._flush_expiry()
+
+    def _changed_all(self, deletions_unknown: bool) -> None:
+        """Invalidate everything after changes that cannot be applied one by one."""
+        self.connector.invalidate_cache()
+        self.connector.indexes.expire()
+        if self.connector.snapshot:
+            self.connector.snapshot.expire(full=deletions_unknown or self._expiry_full)
+        # Covers any changes still waiting for a refresh
+        self._expiry_pending = False
+        self._expiry_full = False
+        self._expired_at = time.monotonic()
+
+    def _flush_expiry(self) -> None:
+        """Expire the indexes and snapshot for pending changes, at most once per expire_interval."""
+        if not self._expiry_pending:
+            return
+        now = time.monotonic()
+        if self._expired_at and now - self._expired_at < self.expire_interval:
+            return
+        self._expiry_pending = False
+        self._expired_at = now
+        self.connector.indexes.expire()
+        if self.connector.snapshot:
+            self.connector.snapshot.expire(full=self._expiry_full)
+        self._expiry_full = False
+
+    def _read_entry(self, dn: str) -> dict[str, Any] | None:
+        """
+        Read the CHANGE_MATCH_ATTRIBUTES of a changed entry, bypassing the cache.
+
+        Returns:
+            Every CHANGE_MATCH_ATTRIBUTES attribute with its values (an empty
+            list when unset), or None if the entry could not be read
+        """
+        try:
+            entries = list(
+                self.connector.iter_search(
+                    search_base=dn,
+                    search_filter="(objectClass=*)",
+                    attributes=CHANGE_MATCH_ATTRIBUTES,
+                    search_scope=BASE,
+                )
+            )
+        except Exception as e:
+            logger.debug(f"Could not read changed entry {dn}: {e}")
+            return None
+        if not entries:
+            return None
+        found = {name.lower(): value for name, value in entries[0].get("attributes", {}).items()}
+        return {name: found.get(name.lower(), []) for name in CHANGE_MATCH_ATTRIBUTES}
+
+    def _load_entry_dns(self) -> None:
+        """
+        Map the entryUUID of every entry in the subtree to its DN with one sweep.
+
+        Entries the feed reported meanwhile keep the DN it reported. On
+        failure, or if the subtree exceeds index_max_entries, the map stays
+        incomplete and is loaded again after the next session's refresh.
+        """
+        max_entries = self.connector.performance_config.index_max_entries
+        entry_dns: dict[bytes, str] = {}
+        try:
+            for entry in self.connector.iter_search(
+                search_base=self.search_base,
+                search_filter="(objectClass=*)",
+                attributes=["entryUUID"],
+                search_scope=SUBTREE,
+                size_limit=max_entries + 1,
+            ):
+                entry_uuid = _uuid_bytes(entry.get("attributes", {}).get("entryUUID"))
+                if entry_uuid:
+                    entry_dns[entry_uuid] = entry["dn"]
+        except Exception as e:
+            logger.warning(f"Could not map entryUUIDs to DNs: {e}")
+            return
+        if len(entry_dns) > max_entries:
+            logger.warning(f"Sync subtree has more than {max_entries} entries to map to DNs")
+            return
+
+        with self._entry_dns_lock:
+            for entry_uuid, dn in entry_dns.items():
+                self._entry_dns.setdefault(entry_uuid, dn)
+            self._entry_dns_complete = True
+        logger.info(f"Mapped {len(entry_dns)} entryUUIDs to DNs")
+
+    def _run(self) -> None:
+        """Keep a sync search open until stopped, reconnecting with backoff."""
+        delay = self.reconnect_delay
+        while not self._stop.is_set():
+            try:
+                self._consume()
+            except Exception as e:
+                logger.warning(f"Sync search failed: {e}")
+            if self._stop.is_set():
+                break
+            if not self.refreshing:
+                # The last session got through its refresh; start backing off afresh
+                delay = self.reconnect_delay
+            logger.info(f"Reconnecting sync search in {delay:.0f}s")
+            self._stop.wait(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+            self._counters["reconnects"] += 1
+
+    def _consume(self) -> None:
+        """
+        Run one sync search session until it ends, the connection drops or stop() is called.
+
+        Raises:
+            LDAPCommunicationError: If the connection is closed under the search
+        """
+        connection = self.connector.open_stream_connection()
+        self._done.clear()
+        self.refreshing = True
+        self._refresh_changes = 0
+        self._deletions_unknown = False
+        self._full_refresh = self.cookie is None
+        if self._full_refresh:
+            # The refresh lists every entry again; forget those since deleted
+            with self._entry_dns_lock:
+                self._entry_dns.clear()
+                self._entry_dns_complete = False
+        try:
+            strategy = connection.strategy
+            # Hold the lock so no response is dispatched before the callback is set
+            with strategy.async_lock:
+                message_id = connection.search(
+                    search_base=self.search_base,
+                    search_filter="(objectClass=*)",
+                    search_scope=SUBTREE,
+                    attributes=["1.1"],
+                    controls=[sync_request_control(self.cookie)],
+                )
+                strategy.persistent_search_message_id = message_id
+                strategy.callback = self.handle_message
+            self.connected = True
+            logger.info(f"Sync search started on {self.search_base}")
+
+            while not self._stop.is_set():
+                if self._entry_dns_wanted:
+                    self._entry_dns_wanted = False
+                    self._load_entry_dns()
+                self._apply_changes(timeout=1.0)
+                self._flush_expiry()
+                if self._done.is_set():
+                    self._apply_changes()
+                    return
+                if connection.closed:
+                    raise LDAPCommunicationError("Sync search connection closed")
+        finally:
+            self.connected = False
+            try:
+                connection.unbind()
+            except Exception as e:
+                logger.debug(f"Could not unbind sync search connection: {e}")
+
+    def _load_cookie(self) -> bytes | None:
+        """Read the saved cookie, if any."""
+        if not self.cookie_path or not os.path.exists(self.cookie_path):
+            return None
+        with open(self.cookie_path, "rb") as cookie_file:
+            return cookie_file.read() or None
+
+    def _save_cookie(self, cookie: bytes | None) -> None:
+        """Remember the cookie, writing it atomically to cookie_path when set."""
+        if cookie == self.cookie:
+            return
+        self.cookie = cookie
+        if not self.cookie_path:
+            return
+        temporary = f"{self.cookie_path}.tmp"
+        with open(temporary, "wb") as cookie_file:
+            cookie_file.write(cookie or b"")
+        os.replace(temporary, self.cookie_path)
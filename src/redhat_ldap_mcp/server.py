@@ -10,9 +10,10 @@ import os
 from typing import Any
 
 from fastmcp import FastMCP
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, SerializerFunctionWrapHandler, model_serializer
 
 from .config.loader import load_config
+from .core.async_connector import AsyncLDAPConnector
 from .core.ldap_connector import LDAPConnector
 from .core.logging import get_logger, setup_logging
 from .tools.groups import GroupsTool
@@ -25,8 +26,9 @@ logger = get_logger(__name__)
 # Initialize MCP server
 mcp = FastMCP("RedHat LDAP MCP")
 
-# Global connector instance
+# Global connector instances
 _connector: LDAPConnector | None = None
+_async_connector: AsyncLDAPConnector | None = None
 _config = None
 
 
@@ -47,8 +49,25 @@ def get_connector() -> LDAPConnector:
     return _connector
 
 
+def get_async_connector() -> AsyncLDAPConnector:
+    """Get the global async LDAP connector used by the MCP tools."""
+    global _async_connector
+
+    if _async_connector is None:
+        _async_connector = AsyncLDAPConnector(get_connector())
+        logger.info(f"Async LDAP connector initialized ({_async_connector.max_workers} workers)")
+
+    return _async_connector
+
+
+FIELDS_DESCRIPTION = (
+    'Person fields to fetch and return, e.g. ["uid", "cn", "manager"]; '
+    "uid and cn are always included. All fields when omitted"
+)
+
+
 class PersonResult(BaseModel):
-    """Person search result model."""
+    """Person search result model. Only fields that were set are serialized."""
 
     uid: str = Field(description="Unique identifier")
     dn: str | None = Field(None, description="Distinguished name")
@@ -85,11 +104,23 @@ class PersonResult(BaseModel):
     rhat_building_code: str | None = Field(None, description="Red Hat building code")
     rhat_office_location: str | None = Field(None, description="Red Hat office location")
 
+    # Deliberately unannotated: a return type would replace the published output
+    # schema of every person tool with that type's schema
+    @model_serializer(mode="wrap")
+    def _omit_unset(self, handler: SerializerFunctionWrapHandler):  # type: ignore[no-untyped-def]
+        """Drop fields the directory did not return or the caller did not request."""
+        data = handler(self)
+        return {key: value for key, value in data.items() if key in self.model_fields_set}
+
 
 @mcp.tool()
-def search_people(
+async def search_people(
     query: str = Field(description="Search query (name, email, uid, etc.)"),
     max_results: int = Field(default=10, description="Maximum number of results"),
+    fuzzy: bool = Field(
+        default=False, description="Match names approximately (typos, spelling variants)"
+    ),
+    fields: list[str] | None = Field(default=None, description=FIELDS_DESCRIPTION),  # noqa: B008
 ) -> list[PersonResult]:
     """
     Search for people in the corporate directory.
@@ -100,39 +131,155 @@ def search_people(
     - Username (uid)
     - Employee ID
     - Department
+
+    With fuzzy, names match despite typos or variant spellings.
     """
-    connector = get_connector()
-    tool = PeopleSearchTool(connector)
+    connector = get_async_connector()
+    tool = PeopleSearchTool(connector.connector)
 
     try:
-        results = tool.search_people(query, max_results)
+        results = await connector.run_shared(tool.search_people, query, max_results, fuzzy, fields)
         return [PersonResult(**person) for person in results]
     except Exception as e:
         logger.error(f"People search failed: {e}")
         raise
 
 
+class PersonPage(BaseModel):
+    """One page of people, with the cursor of the next page."""
+
+    people: list[PersonResult] = Field(description="People on this page")
+    next_cursor: str | None = Field(
+        None, description="Cursor of the next page; absent after the last page"
+    )
+    total: int | None = Field(None, description="Total number of matches, if the server knows")
+
+
+@mcp.tool()
+async def search_people_page(
+    query: str = Field(description="Search query (name, email, uid, etc.)"),
+    page_size: int = Field(default=10, description="Number of people per page"),
+    cursor: str
+    | None = Field(
+        default=None, description="next_cursor of the previous page; omit for the first page"
+    ),
+    fields: list[str] | None = Field(default=None, description=FIELDS_DESCRIPTION),  # noqa: B008
+) -> PersonPage:
+    """
+    Page through people matching a query, sorted by name.
+
+    Pass the returned next_cursor, with the same query and fields, to get
+    the next page.
+    """
+    connector = get_async_connector()
+    tool = PeopleSearchTool(connector.connector)
+
+    try:
+        page = await connector.run_shared(tool.search_people_page, query, page_size, cursor, fields)
+        return PersonPage(**page)
+    except Exception as e:
+        logger.error(f"People search failed: {e}")
+        raise
+
+
+class PersonSuggestion(BaseModel):
+    """Autocomplete suggestion model."""
+
+    uid: str = Field(description="Unique identifier")
+    cn: str = Field(description="Common name")
+    title: str | None = Field(None, description="Job title")
+
+
 @mcp.tool()
-def get_person_details(
+async def autocomplete_people(
+    prefix: str = Field(description="Typed prefix of a uid, email, name or surname"),
+    max_results: int = Field(default=10, description="Maximum number of suggestions"),
+    session_id: str
+    | None = Field(
+        default=None,
+        description="Typeahead session; a newer call with the same id supersedes pending "
+        "ones, which return no suggestions",
+    ),
+) -> list[PersonSuggestion]:
+    """
+    Suggest people as a name, uid or email is typed.
+
+    Returns only uid, name and title, for calling on every keystroke.
+    """
+    connector = get_async_connector()
+    tool = PeopleSearchTool(connector.connector)
+
+    try:
+        if session_id:
+            suggestions = await connector.run_latest(
+                f"autocomplete:{session_id}", tool.autocomplete_people, prefix, max_results
+            )
+        else:
+            suggestions = await connector.run_shared(tool.autocomplete_people, prefix, max_results)
+        return [PersonSuggestion(**suggestion) for suggestion in suggestions or []]
+    except Exception as e:
+        logger.error(f"People autocomplete failed: {e}")
+        raise
+
+
+@mcp.tool()
+async def get_person_details(
     identifier: str = Field(description="Person identifier (uid, email, or DN)"),
+    fields: list[str] | None = Field(default=None, description=FIELDS_DESCRIPTION),  # noqa: B008
 ) -> PersonResult | None:
     """
     Get detailed information about a specific person.
 
     Args:
         identifier: Can be uid, email address, or full DN
+        fields: Only these person fields, instead of every attribute
     """
-    connector = get_connector()
-    tool = PeopleSearchTool(connector)
+    connector = get_async_connector()
+    tool = PeopleSearchTool(connector.connector)
 
     try:
-        person = tool.get_person_details(identifier)
+        person = await connector.run_shared(tool.get_person_details, identifier, fields)
         return PersonResult(**person) if person else None
     except Exception as e:
         logger.error(f"Get person details failed: {e}")
         raise
 
 
+class PeopleDetails(BaseModel):
+    """Bulk person lookup result."""
+
+    people: dict[str, PersonResult] = Field(
+        description="People found, keyed by the identifier they were requested with"
+    )
+    not_found: list[str] = Field(description="Identifiers matching nobody")
+    errors: dict[str, str] = Field(description="Identifiers whose lookup failed, with the error")
+
+
+@mcp.tool()
+async def get_people_details(
+    identifiers: list[str] = Field(  # noqa: B008
+        description="Person identifiers (uids, email addresses or DNs, in any mix)"
+    ),
+    fields: list[str] | None = Field(default=None, description=FIELDS_DESCRIPTION),  # noqa: B008
+) -> PeopleDetails:
+    """
+    Get detailed information about many people in one call.
+
+    Much faster than calling get_person_details for each person: lookups
+    are batched into a few directory searches. Lookups that fail are
+    reported under errors instead of failing the whole call.
+    """
+    connector = get_async_connector()
+    tool = PeopleSearchTool(connector.connector)
+
+    try:
+        details = await connector.run_shared(tool.get_people_details, identifiers, fields)
+        return PeopleDetails(**details)
+    except Exception as e:
+        logger.error(f"Get people details failed: {e}")
+        raise
+
+
 class OrganizationNode(BaseModel):
     """Organization chart node model."""
 
@@ -142,20 +289,23 @@ class OrganizationNode(BaseModel):
 
 
 @mcp.tool()
-def get_organization_chart(
+async def get_organization_chart(
     manager_id: str = Field(description="Manager identifier (uid, email, or DN)"),
     max_depth: int = Field(default=3, description="Maximum depth to traverse"),
+    fields: list[str] | None = Field(default=None, description=FIELDS_DESCRIPTION),  # noqa: B008
 ) -> OrganizationNode | None:
     """
     Get organization chart starting from a specific manager.
 
     Returns a hierarchical view of the organization structure.
     """
-    connector = get_connector()
-    tool = OrganizationTool(connector)
+    connector = get_async_connector()
+    tool = OrganizationTool(connector.connector)
 
     try:
-        org_data = tool.build_organization_chart(manager_id, max_depth)
+        org_data = await connector.run_shared(
+            tool.build_organization_chart, manager_id, max_depth, fields
+        )
         if org_data:
             return OrganizationNode(**org_data)
         return None
@@ -165,23 +315,68 @@ def get_organization_chart(
 
 
 @mcp.tool()
-def find_manager_chain(
+async def find_manager_chain(
     person_id: str = Field(description="Person identifier (uid, email, or DN)"),
+    fields: list[str] | None = Field(default=None, description=FIELDS_DESCRIPTION),  # noqa: B008
 ) -> list[PersonResult]:
     """
     Find the management chain for a person (all managers up to the top).
     """
-    connector = get_connector()
-    tool = OrganizationTool(connector)
+    connector = get_async_connector()
+    tool = OrganizationTool(connector.connector)
 
     try:
-        managers = tool.get_manager_chain(person_id)
+        managers = await connector.run_shared(tool.get_manager_chain, person_id, fields)
         return [PersonResult(**manager) for manager in managers]
     except Exception as e:
         logger.error(f"Manager chain search failed: {e}")
         raise
 
 
+@mcp.tool()
+async def find_common_manager(
+    person1_id: str = Field(description="First person identifier (uid, email, or DN)"),
+    person2_id: str = Field(description="Second person identifier (uid, email, or DN)"),
+    fields: list[str] | None = Field(default=None, description=FIELDS_DESCRIPTION),  # noqa: B008
+) -> PersonResult | None:
+    """
+    Find the lowest manager two people have in common.
+    """
+    connector = get_async_connector()
+    tool = OrganizationTool(connector.connector)
+
+    try:
+        manager = await connector.run_shared(
+            tool.find_common_manager, person1_id, person2_id, fields
+        )
+        return PersonResult(**manager) if manager else None
+    except Exception as e:
+        logger.error(f"Common manager search failed: {e}")
+        raise
+
+
+@mcp.tool()
+async def get_org_distances(
+    person_ids: list[str] = Field(  # noqa: B008
+        description="Person identifiers (uid, email, or DN)"
+    ),
+) -> dict[str, Any]:
+    """
+    Compute reporting distances and common managers between every pair of people.
+
+    Useful for analytics such as how far apart the members of a group sit
+    in the org chart.
+    """
+    connector = get_async_connector()
+    tool = OrganizationTool(connector.connector)
+
+    try:
+        return await connector.run_shared(tool.get_org_distances, person_ids)
+    except Exception as e:
+        logger.error(f"Org distance computation failed: {e}")
+        raise
+
+
 class GroupInfo(BaseModel):
     """Group information model."""
 
@@ -190,21 +385,26 @@ class GroupInfo(BaseModel):
     description: str | None = Field(None, description="Group description")
     member_count: int = Field(description="Number of members")
     members: list[str] = Field(default=[], description="Member DNs")
+    nesting_depth: int | None = Field(
+        None,
+        description="Nested groups between the person and this group (0 for direct "
+        "membership); null for nested groups when the server does not report the depth",
+    )
 
 
 @mcp.tool()
-def search_groups(
+async def search_groups(
     query: str = Field(description="Group search query"),
     max_results: int = Field(default=10, description="Maximum number of results"),
 ) -> list[GroupInfo]:
     """
     Search for groups in the directory.
     """
-    connector = get_connector()
-    tool = GroupsTool(connector)
+    connector = get_async_connector()
+    tool = GroupsTool(connector.connector)
 
     try:
-        groups = tool.search_groups(query, max_results)
+        groups = await connector.run_shared(tool.search_groups, query, max_results)
         return [GroupInfo(**group) for group in groups]
     except Exception as e:
         logger.error(f"Group search failed: {e}")
@@ -212,17 +412,20 @@ def search_groups(
 
 
 @mcp.tool()
-def get_person_groups(
+async def get_person_groups(
     person_id: str = Field(description="Person identifier (uid, email, or DN)"),
+    transitive: bool = Field(
+        default=False, description="Include groups inherited through nested groups"
+    ),
 ) -> list[GroupInfo]:
     """
     Get all groups that a person is a member of.
     """
-    connector = get_connector()
-    tool = GroupsTool(connector)
+    connector = get_async_connector()
+    tool = GroupsTool(connector.connector)
 
     try:
-        groups = tool.get_person_groups(person_id)
+        groups = await connector.run_shared(tool.get_person_groups, person_id, transitive)
         return [GroupInfo(**group) for group in groups]
     except Exception as e:
         logger.error(f"Person groups search failed: {e}")
@@ -230,17 +433,18 @@ def get_person_groups(
 
 
 @mcp.tool()
-def get_group_members(
+async def get_group_members(
     group_name: str = Field(description="Group name or DN"),
+    fields: list[str] | None = Field(default=None, description=FIELDS_DESCRIPTION),  # noqa: B008
 ) -> list[PersonResult]:
     """
     Get all members of a specific group.
     """
-    connector = get_connector()
-    tool = GroupsTool(connector)
+    connector = get_async_connector()
+    tool = GroupsTool(connector.connector)
 
     try:
-        members = tool.get_group_members(group_name)
+        members = await connector.run_shared(tool.get_group_members, group_name, fields)
         return [PersonResult(**member) for member in members]
     except Exception as e:
         logger.error(f"Group members search failed: {e}")
@@ -259,17 +463,17 @@ class LocationInfo(BaseModel):
 
 
 @mcp.tool()
-def find_locations(
+async def find_locations(
     query: str | None = Field(None, description="Location search query")
 ) -> list[LocationInfo]:
     """
     Find office locations and people counts.
     """
-    connector = get_connector()
-    tool = LocationsTool(connector)
+    connector = get_async_connector()
+    tool = LocationsTool(connector.connector)
 
     try:
-        locations = tool.find_locations(query)
+        locations = await connector.run_shared(tool.find_locations, query)
         return [LocationInfo(**location) for location in locations]
     except Exception as e:
         logger.error(f"Location search failed: {e}")
@@ -277,18 +481,21 @@ def find_locations(
 
 
 @mcp.tool()
-def get_people_at_location(
+async def get_people_at_location(
     location: str = Field(description="Location name"),
     max_results: int = Field(default=50, description="Maximum number of results"),
+    fields: list[str] | None = Field(default=None, description=FIELDS_DESCRIPTION),  # noqa: B008
 ) -> list[PersonResult]:
     """
     Get all people at a specific location.
     """
-    connector = get_connector()
-    tool = LocationsTool(connector)
+    connector = get_async_connector()
+    tool = LocationsTool(connector.connector)
 
     try:
-        people = tool.get_people_at_location(location, max_results)
+        people = await connector.run_shared(
+            tool.get_people_at_location, location, max_results, fields
+        )
         return [PersonResult(**person) for person in people]
     except Exception as e:
         logger.error(f"People at location search failed: {e}")
@@ -296,14 +503,43 @@ def get_people_at_location(
 
 
 @mcp.tool()
-def test_connection() -> dict[str, Any]:
+async def get_people_at_location_page(
+    location: str = Field(description="Location name"),
+    page_size: int = Field(default=50, description="Number of people per page"),
+    cursor: str
+    | None = Field(
+        default=None, description="next_cursor of the previous page; omit for the first page"
+    ),
+    fields: list[str] | None = Field(default=None, description=FIELDS_DESCRIPTION),  # noqa: B008
+) -> PersonPage:
+    """
+    Page through the people at a location, sorted by name.
+
+    Pass the returned next_cursor, with the same location and fields, to
+    get the next page.
+    """
+    connector = get_async_connector()
+    tool = LocationsTool(connector.connector)
+
+    try:
+        page = await connector.run_shared(
+            tool.get_people_at_location_page, location, page_size, cursor, fields
+        )
+        return PersonPage(**page)
+    except Exception as e:
+        logger.error(f"People at location search failed: {e}")
+        raise
+
+
+@mcp.tool()
+async def test_connection() -> dict[str, Any]:
     """
     Test the LDAP connection and return connection status.
     """
-    connector = get_connector()
+    connector = get_async_connector()
 
     try:
-        result = connector.test_connection()
+        result = await connector.test_connection()
         return result
     except Exception as e:
         logger.error(f"Connection test failed: {e}")
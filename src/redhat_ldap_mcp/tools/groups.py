@@ -7,14 +7,43 @@
 """Groups and team membership tool for corporate LDAP directories."""
 
 import re
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
+from ldap3 import SUBTREE
+from ldap3.core.exceptions import LDAPException
+
+from ..core.cache import CacheKey, QueryCache, make_cache_key
+from ..core.filters import MAX_FILTER_VALUES, chunked, in_chain_filter, normalize_dn, or_filter
 from ..core.ldap_connector import LDAPConnector
 from ..core.logging import get_logger
-from .people_search import PeopleSearchTool
+from ..core.snapshot import DirectorySnapshot
+from .people_search import PeopleSearchTool, project_person
 
 logger = get_logger(__name__)
 
+GROUP_PARENTS_INDEX = "group_parents"
+
+# supportedCapabilities value advertised by Active Directory domain controllers
+ACTIVE_DIRECTORY_CAPABILITY = "1.2.840.113556.1.4.800"
+
+GROUP_CONTAINERS = ["ou=groups", "ou=adhoc,ou=managedGroups", "cn=groups", "ou=group"]
+
+# Snapshot kind holding group entries
+GROUP_SNAPSHOT = "groups"
+
+GROUP_OBJECT_CLASSES = ["group", "groupOfNames", "groupOfUniqueNames", "posixGroup"]
+
+GROUP_ATTRIBUTES = ["cn", "dn", "description", "displayName", "member", "uniqueMember", "memberUid"]
+
+
+def _as_list(value: Any) -> list:
+    """Normalize a possibly missing (None) or single-valued attribute to a list."""
+    if value is None:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
 
 class GroupsTool:
     """Tool for managing groups and team memberships in LDAP."""
@@ -41,6 +70,15 @@ class GroupsTool:
         """
         logger.info(f"Searching for groups: '{query}' (max {max_results} results)")
 
+        snapshot = self._get_snapshot()
+        if snapshot is not None:
+            groups = [
+                self._process_group_entry(entry)
+                for entry in snapshot.search(GROUP_SNAPSHOT, query, max_results)
+            ]
+            logger.info(f"Found {len(groups)} groups matching '{query}' in the snapshot")
+            return groups
+
         # Build search filter
         escaped_query = re.sub(r"([*()\\])", r"\\\1", query)
         search_filter = f"""(&(objectClass=group)
@@ -90,20 +128,24 @@ class GroupsTool:
         logger.info(f"Found {len(all_results)} groups matching '{query}'")
         return all_results[:max_results]
 
-    def get_person_groups(self, person_id: str) -> list[dict[str, Any]]:
+    def get_person_groups(self, person_id: str, transitive: bool = False) -> list[dict[str, Any]]:
         """
         Get all groups that a person is a member of.
 
         Args:
             person_id: Person identifier (uid, email, or DN)
+            transitive: Also include groups the person belongs to through
+                nested groups; each group then carries a "nesting_depth"
+                (0 for direct membership, None for nested groups on servers
+                that expand nesting themselves)
 
         Returns:
             List of group dictionaries
         """
         logger.info(f"Finding groups for person: {person_id}")
 
-        # Get person details to get their DN
-        person = self.people_tool.get_person_details(person_id)
+        # Get person details to get their DN (uid and cn come along)
+        person = self.people_tool.get_person_details(person_id, ["dn"])
         if not person:
             logger.warning(f"Person not found: {person_id}")
             return []
@@ -115,39 +157,33 @@ class GroupsTool:
             logger.warning("Person DN not found")
             return []
 
-        groups = []
-
-        # Search by member DN
-        groups.extend(self._search_groups_by_member(person_dn, "member"))
-        groups.extend(self._search_groups_by_member(person_dn, "uniqueMember"))
-
-        # Search by uid for POSIX groups
-        if person_uid:
-            groups.extend(self._search_groups_by_member(person_uid, "memberUid"))
-
-        # Remove duplicates
-        unique_groups = []
-        seen_dns = set()
-        for group in groups:
-            if group["dn"] not in seen_dns:
-                unique_groups.append(group)
-                seen_dns.add(group["dn"])
+        if transitive:
+            groups = self._get_transitive_groups(person_dn, person_uid)
+        else:
+            groups = self._search_groups_by_member(person_dn, person_uid)
 
-        logger.info(f"Found {len(unique_groups)} groups for person")
-        return unique_groups
+        logger.info(f"Found {len(groups)} groups for person")
+        return groups
 
-    def get_group_members(self, group_name: str) -> list[dict[str, Any]]:
+    def get_group_members(
+        self, group_name: str, fields: Sequence[str] | None = None
+    ) -> list[dict[str, Any]]:
         """
         Get all members of a specific group.
 
         Args:
             group_name: Group name or DN
+            fields: Person fields to fetch and return (uid and cn always),
+                or None for all
 
         Returns:
             List of member person dictionaries
         """
         logger.info(f"Getting members for group: {group_name}")
 
+        # Resolve (and validate) the attributes before any search
+        attributes = ["*"] if fields is None else self.people_tool.get_person_attributes(fields)
+
         # Find the group first
         if "=" in group_name and "," in group_name:
             # Looks like a DN
@@ -163,49 +199,52 @@ class GroupsTool:
             group_filter = "(objectClass=*)"
 
         try:
-            # Get group details with all member attributes
-            results = self.connector.search(
-                search_base=group_dn,
-                search_filter=group_filter,
-                attributes=["member", "uniqueMember", "memberUid"],
-                size_limit=1,
-            )
+            snapshot = self._get_snapshot()
+            group_entry = snapshot.get(GROUP_SNAPSHOT, group_dn) if snapshot else None
+            if group_entry is None:
+                # Get group details with all member attributes
+                results = self.connector.search(
+                    search_base=group_dn,
+                    search_filter=group_filter,
+                    attributes=["member", "uniqueMember", "memberUid"],
+                    size_limit=1,
+                )
 
-            if not results:
-                logger.warning(f"Group not found: {group_name}")
-                return []
+                if not results:
+                    logger.warning(f"Group not found: {group_name}")
+                    return []
 
-            group_entry = results[0]
+                group_entry = results[0]
             attrs = group_entry.get("attributes", {})
 
             members = []
 
             # Process different member attribute types
+            member_dns = []
             for member_attr in ["member", "uniqueMember"]:
-                member_dns = attrs.get(member_attr, [])
-                if isinstance(member_dns, str):
-                    member_dns = [member_dns]
-
-                for member_dn in member_dns:
-                    try:
-                        person = self.people_tool.get_person_details(member_dn)
-                        if person:
-                            members.append(person)
-                    except Exception as e:
-                        logger.debug(f"Could not get member details for {member_dn}: {e}")
+                # Requested attributes the group lacks come back as None
+                values = attrs.get(member_attr) or []
+                member_dns.extend([values] if isinstance(values, str) else values)
+
+            people_by_dn = self._resolve_member_dns(member_dns, attributes, fields)
+            for member_dn in member_dns:
+                person = people_by_dn.get(normalize_dn(member_dn))
+                if person:
+                    members.append(person)
 
             # Process memberUid (POSIX groups)
-            member_uids = attrs.get("memberUid", [])
+            member_uids = attrs.get("memberUid") or []
             if isinstance(member_uids, str):
                 member_uids = [member_uids]
 
+            people_by_uid = self._resolve_member_uids(member_uids, attributes, fields)
+            seen_uids = {m.get("uid") for m in members if isinstance(m.get("uid"), str)}
             for uid in member_uids:
-                try:
-                    person = self.people_tool.get_person_details(uid)
-                    if person and not any(m.get("uid") == uid for m in members):
-                        members.append(person)
-                except Exception as e:
-                    logger.debug(f"Could not get member details for uid {uid}: {e}")
+                person = people_by_uid.get(uid)
+                if person and uid not in seen_uids:
+                    members.append(person)
+                    if isinstance(person.get("uid"), str):
+                        seen_uids.add(person["uid"])
 
             logger.info(f"Found {len(members)} members in group")
             return members
@@ -253,79 +292,417 @@ class GroupsTool:
             return None
 
     def _search_groups_by_member(
-        self, member_identifier: str, member_attr: str
+        self, member_dn: str, member_uid: str | None = None
     ) -> list[dict[str, Any]]:
         """
-        Search for groups containing a specific member.
+        Search for groups directly containing a member.
+
+        member, uniqueMember and memberUid are matched in a single OR filter.
 
         Args:
-            member_identifier: Member DN or UID
-            member_attr: Member attribute name (member, uniqueMember, memberUid)
+            member_dn: Member DN, matched against member and uniqueMember
+            member_uid: Member uid, matched against memberUid (POSIX groups)
 
         Returns:
-            List of group dictionaries
+            List of group dictionaries, without duplicates
         """
-        search_filter = f"({member_attr}={member_identifier})"
+        clauses = [or_filter("member", [member_dn]), or_filter("uniqueMember", [member_dn])]
+        if isinstance(member_uid, str) and member_uid:
+            clauses.append(or_filter("memberUid", [member_uid]))
 
         try:
             results = self.connector.search(
                 search_base=self._get_groups_search_base(),
-                search_filter=search_filter,
-                attributes=[
-                    "cn",
-                    "dn",
-                    "description",
-                    "displayName",
-                    "member",
-                    "uniqueMember",
-                    "memberUid",
-                ],
+                search_filter=f"(|{''.join(clauses)})",
+                attributes=GROUP_ATTRIBUTES,
             )
+        except Exception as e:
+            logger.debug(f"Search groups by member failed: {e}")
+            return []
+
+        groups = {}
+        for entry in results:
+            group = self._process_group_entry(entry)
+            groups.setdefault(group["dn"], group)
+        return list(groups.values())
+
+    def _get_transitive_groups(
+        self, person_dn: str, person_uid: str | None
+    ) -> list[dict[str, Any]]:
+        """
+        Expand a person's group memberships through nested groups.
+
+        Where the server advertises Active Directory capabilities the
+        expansion is a single in-chain search. Otherwise groups are expanded
+        breadth first, one batched parent search per nesting level, with
+        each group's parents memoized on the connector so people sharing
+        groups reuse the expansion. A group is visited once, so membership
+        cycles terminate.
+
+        Args:
+            person_dn: Person DN
+            person_uid: Person uid for POSIX memberUid groups
+
+        Returns:
+            Group dictionaries with "nesting_depth", direct groups first;
+            the depth of nested groups is None after an in-chain search
+        """
+        groups: dict[str, dict[str, Any]] = {}
+        for group in self._search_groups_by_member(person_dn, person_uid):
+            groups[normalize_dn(group["dn"])] = {**group, "nesting_depth": 0}
+
+        if self.connector.server_supports(ACTIVE_DIRECTORY_CAPABILITY):
+            try:
+                results = self.connector.search(
+                    search_base=self._get_groups_search_base(),
+                    search_filter=in_chain_filter("member", person_dn),
+                    attributes=GROUP_ATTRIBUTES,
+                )
+                for entry in results:
+                    group = self._process_group_entry(entry)
+                    # The server does not report how deep the nesting is
+                    groups.setdefault(normalize_dn(group["dn"]), {**group, "nesting_depth": None})
+                return list(groups.values())
+            except Exception as e:
+                logger.debug(f"In-chain group search failed, expanding client side: {e}")
+
+        frontier = list(groups)
+        depth = 0
+        while frontier:
+            depth += 1
+            next_frontier = []
+            for parent in self._find_parent_groups([groups[key]["dn"] for key in frontier]):
+                key = normalize_dn(parent["dn"])
+                if key not in groups:
+                    groups[key] = {**parent, "nesting_depth": depth}
+                    next_frontier.append(key)
+            frontier = next_frontier
+
+        return list(groups.values())
+
+    def _find_parent_groups(self, group_dns: list[str]) -> list[dict[str, Any]]:
+        """
+        Find the groups that directly contain any of the given groups.
+
+        Memoized parents are reused; the rest are found with chunked
+        (|(member=g1)(uniqueMember=g1)...) searches. A parent is attributed
+        to the children listed in its member values; when a parent lists
+        none of them (e.g. Active Directory returning a ranged member
+        attribute) the chunk's edges are not memoized.
+
+        Args:
+            group_dns: Child group DNs
+
+        Returns:
+            Parent group dictionaries, possibly with duplicates
+        """
+        memo = self._group_parents_memo()
+        base = self._get_groups_search_base()
+        parents = []
+        pending = []
+        for group_dn in group_dns:
+            cached = memo.get(self._parents_key(base, group_dn))
+            if cached is None:
+                pending.append(group_dn)
+            else:
+                parents.extend(cached)
 
-            groups = []
+        # Each group takes two clauses (member and uniqueMember)
+        for chunk in chunked(pending, MAX_FILTER_VALUES // 2):
+            try:
+                results = self.connector.search(
+                    search_base=base,
+                    search_filter=f"(|{or_filter('member', chunk)}"
+                    f"{or_filter('uniqueMember', chunk)})",
+                    attributes=GROUP_ATTRIBUTES,
+                )
+            except Exception as e:
+                logger.debug(f"Parent group search failed: {e}")
+                continue
+
+            edges: dict[str, list[dict[str, Any]]] = {normalize_dn(dn): [] for dn in chunk}
+            complete = True
             for entry in results:
                 group = self._process_group_entry(entry)
-                if group:
-                    groups.append(group)
+                parents.append(group)
+                attrs = entry.get("attributes", {})
+                children = [
+                    key
+                    for member_attr in ["member", "uniqueMember"]
+                    for key in map(normalize_dn, _as_list(attrs.get(member_attr)))
+                    if key in edges
+                ]
+                if len(chunk) == 1:
+                    children = list(edges)
+                elif not children:
+                    complete = False
+                for key in dict.fromkeys(children):
+                    edges[key].append(group)
+
+            if complete:
+                for group_dn in chunk:
+                    memo.put(self._parents_key(base, group_dn), edges[normalize_dn(group_dn)])
+
+        return parents
+
+    def _group_parents_memo(self) -> QueryCache:
+        """Get the connector-wide memo of group -> parent groups edges."""
+        config = self.connector.performance_config
+        return self.connector.indexes.get(
+            GROUP_PARENTS_INDEX,
+            lambda: QueryCache(
+                ttl=config.cache_timeout,
+                # Most groups have no parents; keep those as long as the rest
+                negative_ttl=config.cache_timeout,
+                max_entries=config.index_max_entries,
+                max_bytes=config.query_cache_max_bytes,
+            ),
+            float("inf"),  # Entries expire individually
+        )
+
+    @staticmethod
+    def _parents_key(base: str, group_dn: str) -> CacheKey:
+        """Key a group's parents as the equivalent single-group search."""
+        group_dn = normalize_dn(group_dn)
+        search_filter = (
+            f"(|{or_filter('member', [group_dn])}{or_filter('uniqueMember', [group_dn])})"
+        )
+        return make_cache_key(base, search_filter, SUBTREE, GROUP_ATTRIBUTES, 0)
+
+    def _resolve_member_dns(
+        self,
+        member_dns: list[str],
+        attributes: list[str] | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Resolve member DNs to person records in bulk.
 
-            return groups
+        DNs of the form uid=X,<people search base> are fetched with chunked
+        (|(uid=a)(uid=b)...) searches and matched back by DN. Anything else,
+        such as nested group DNs or people outside the search base, falls
+        back to concurrent per-DN lookups.
 
-        except Exception as e:
-            logger.debug(f"Search groups by member failed: {e}")
-            return []
+        Args:
+            member_dns: Member DNs, possibly with duplicates
+            attributes: LDAP attributes to fetch, all by default
+            fields: Person fields to return, or None for all
 
-    def _get_groups_search_base(self) -> str:
-        """Get the search base for group searches."""
-        # Try to get from schema config first
-        if hasattr(self.connector.ldap_config, "schema"):
-            schema = self.connector.ldap_config.schema
-            if hasattr(schema, "group_search_base"):
-                return schema.group_search_base
+        Returns:
+            Mapping of normalized DN to person record for resolved members
+        """
+        pending = {normalize_dn(dn): dn for dn in member_dns}
+        people_by_dn: dict[str, dict[str, Any]] = {}
+        if not pending:
+            return people_by_dn
+
+        search_base = self.people_tool._get_people_search_base()
+        people_base = normalize_dn(search_base)
+        uids_by_dn = {}
+        for key, dn in pending.items():
+            attribute, _, uid = dn.partition(",")[0].partition("=")
+            if (
+                attribute.strip().lower() == "uid"
+                and "\\" not in uid  # Escaped RDN values need an exact DN lookup
+                and key.endswith("," + people_base)
+            ):
+                uids_by_dn[key] = uid.strip()
+
+        for chunk in chunked(list(uids_by_dn.items())):
+            try:
+                uid_filter = or_filter("uid", [uid for _, uid in chunk])
+                results = self.connector.search(
+                    search_base=search_base,
+                    search_filter=f"(&(objectClass=person){uid_filter})",
+                    attributes=attributes or ["*"],  # Same attributes as get_person_details
+                )
+            except Exception as e:
+                logger.debug(f"Batched member lookup failed, resolving individually: {e}")
+                continue
+
+            for entry in results:
+                key = normalize_dn(entry.get("dn", ""))
+                if key in pending and key not in people_by_dn:
+                    person = self.people_tool._process_person_entry(entry)
+                    people_by_dn[key] = project_person(person, fields)
+
+            # Anything the batch did not return is not a person under the base
+            for key, _ in chunk:
+                pending.pop(key, None)
+
+        for key in people_by_dn:
+            pending.pop(key, None)
+
+        people_by_dn.update(self._resolve_individually(pending, fields))
+        return people_by_dn
+
+    def _resolve_member_uids(
+        self,
+        member_uids: list[str],
+        attributes: list[str] | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Resolve memberUid values to person records in bulk.
 
-        # Fall back to common patterns
-        base_dn = self.connector.ldap_config.base_dn
+        Args:
+            member_uids: memberUid values, possibly with duplicates
+            attributes: LDAP attributes to fetch, all by default
+            fields: Person fields to return, or None for all
 
-        # Try common group containers
-        group_containers = ["ou=groups", "ou=adhoc,ou=managedGroups", "cn=groups", "ou=group"]
+        Returns:
+            Mapping of uid to the first matching person record
+        """
+        people_by_uid: dict[str, dict[str, Any]] = {}
+        # get_person_details treats emails and DNs differently; keep that behavior
+        plain_uids = [
+            uid for uid in dict.fromkeys(member_uids) if "@" not in uid and "=" not in uid
+        ]
+        special = {uid: uid for uid in dict.fromkeys(member_uids) if uid not in plain_uids}
+        failed = {}
 
-        for container in group_containers:
+        for chunk in chunked(plain_uids):
             try:
-                # Test if this container exists
-                test_results = self.connector.search(
-                    search_base=f"{container},{base_dn}",
-                    search_filter="(objectClass=*)",
-                    attributes=["dn"],
-                    size_limit=1,
+                results = self.connector.search(
+                    search_base=self.people_tool._get_people_search_base(),
+                    search_filter=or_filter("uid", chunk),
+                    attributes=attributes or ["*"],  # Same attributes as get_person_details
                 )
-                if test_results:
-                    logger.info(f"Using groups search base: {container},{base_dn}")
-                    return f"{container},{base_dn}"
-            except Exception:
+            except Exception as e:
+                logger.debug(f"Batched memberUid lookup failed, resolving individually: {e}")
+                failed.update({uid: uid for uid in chunk})
                 continue
 
-        # Fall back to base DN
-        logger.warning(f"Using base DN for groups search: {base_dn}")
-        return base_dn
+            # uid matching is case-insensitive on the server
+            requested: dict[str, list[str]] = {}
+            for uid in chunk:
+                requested.setdefault(uid.lower(), []).append(uid)
+
+            for entry in results:
+                person = project_person(self.people_tool._process_person_entry(entry), fields)
+                values = person.get("uid") or []
+                for value in [values] if isinstance(values, str) else values:
+                    for uid in requested.get(str(value).lower(), []):
+                        people_by_uid.setdefault(uid, person)
+
+        people_by_uid.update(self._resolve_individually({**special, **failed}, fields))
+        return people_by_uid
+
+    def _resolve_individually(
+        self, identifiers: dict[str, str], fields: Sequence[str] | None = None
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Look up people one by one, concurrently across the connection pool.
+
+        Args:
+            identifiers: Mapping of result key to identifier for get_person_details
+            fields: Person fields to fetch and return, or None for all
+
+        Returns:
+            Mapping of result key to person record for identifiers that resolved
+        """
+        if not identifiers:
+            return {}
+
+        def lookup(identifier: str) -> dict[str, Any] | None:
+            try:
+                return self.people_tool.get_person_details(identifier, fields)
+            except Exception as e:
+                logger.debug(f"Could not get member details for {identifier}: {e}")
+                return None
+
+        workers = min(len(identifiers), self.connector.performance_config.pool_max_size)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            people = executor.map(lookup, identifiers.values())
+            return {
+                key: person
+                for key, person in zip(identifiers.keys(), people, strict=True)
+                if person
+            }
+
+    def _get_snapshot(self) -> DirectorySnapshot | None:
+        """
+        Get the local snapshot with groups synced, when enabled.
+
+        Returns:
+            The snapshot, or None when disabled or never synced (callers use LDAP)
+        """
+        performance = self.connector.performance_config
+        if not performance.snapshot_path:
+            return None
+
+        try:
+            self.connector.snapshot.refresh(
+                GROUP_SNAPSHOT,
+                self._fetch_groups_since,
+                self._snapshot_group,
+                performance.snapshot_sync_interval,
+                performance.snapshot_full_sync_interval,
+            )
+        except Exception as e:
+            logger.warning(f"Group snapshot unavailable, using LDAP: {e}")
+            return None
+        return self.connector.snapshot
+
+    def _fetch_groups_since(self, since: str | None) -> Iterator[dict[str, Any]]:
+        """
+        Stream the groups modified since a point in time, for snapshot syncs.
+
+        Args:
+            since: GeneralizedTime to match modifyTimestamp>= against, or None for every group
+
+        Yields:
+            Raw group entries, with their modifyTimestamp
+
+        Raises:
+            LDAPException: If more than index_max_entries groups match
+        """
+        max_entries = self.connector.performance_config.index_max_entries
+        search_filter = or_filter("objectClass", GROUP_OBJECT_CLASSES)
+        if since is not None:
+            search_filter = f"(&{search_filter}(modifyTimestamp>={since}))"
+        entries = self.connector.iter_search(
+            search_base=self._get_groups_search_base(),
+            search_filter=search_filter,
+            attributes=[*GROUP_ATTRIBUTES, "gidNumber", "modifyTimestamp"],
+            size_limit=max_entries + 1,
+        )
+        for count, entry in enumerate(entries):
+            # Fail rather than store a truncated sweep or lose changes
+            if count == max_entries:
+                raise LDAPException(f"Directory has more than {max_entries} groups")
+            yield entry
+
+    @staticmethod
+    def _snapshot_group(entry: dict[str, Any]) -> tuple[dict[str, Any], str]:
+        """
+        Turn a raw group entry into its snapshot record and search text.
+
+        The record keeps the entry's full member lists, so member lookups
+        need no group search; search text is the name and descriptions that
+        search_groups matches.
+        """
+        attrs = {
+            name: value
+            for name, value in entry.get("attributes", {}).items()
+            if name != "modifyTimestamp"
+        }
+        search_text = "\n".join(
+            str(value)
+            for name in ["cn", "description", "displayName"]
+            for value in _as_list(attrs.get(name))
+        )
+        return {"dn": entry["dn"], "attributes": attrs}, search_text.lower()
+
+    def _get_groups_search_base(self) -> str:
+        """Get the search base for group searches."""
+        # Try to get from schema config first
+        schema = getattr(self.connector.ldap_config, "schema", None)
+        if getattr(schema, "group_search_base", None):
+            return schema.group_search_base
+
+        # Fall back to common group containers, discovered once per connector
+        return self.connector.discover_search_base("groups", GROUP_CONTAINERS)
 
     def _process_group_entry(self, entry: dict[str, Any]) -> dict[str, Any]:
         """
@@ -345,9 +722,7 @@ class GroupsTool:
         members = []
 
         for member_attr in ["member", "uniqueMember", "memberUid"]:
-            member_list = attrs.get(member_attr, [])
-            if isinstance(member_list, str):
-                member_list = [member_list]
+            member_list = _as_list(attrs.get(member_attr))
             member_count += len(member_list)
             members.extend(member_list)
 
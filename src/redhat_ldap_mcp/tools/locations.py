@@ -8,14 +8,41 @@
 
 import re
 from collections import defaultdict
+from collections.abc import Sequence
 from typing import Any
 
+from ldap3.core.exceptions import LDAPException
+
 from ..core.ldap_connector import LDAPConnector
+from ..core.location_index import (
+    LOCATION_INDEX,
+    LOCATION_INDEX_ATTRIBUTES,
+    LocationIndex,
+    first_value,
+    summarize_locations,
+)
 from ..core.logging import get_logger
-from .people_search import PeopleSearchTool
+from .people_search import PeopleSearchTool, project_person
 
 logger = get_logger(__name__)
 
+# Attributes fetched for people at a location when no fields are requested
+LOCATION_PERSON_ATTRIBUTES = [
+    "uid",
+    "cn",
+    "sn",
+    "givenName",
+    "mail",
+    "title",
+    "department",
+    "telephoneNumber",
+    "physicalDeliveryOfficeName",
+    "rhatLocation",
+    "l",
+    "st",
+    "co",
+]
+
 
 class LocationsTool:
     """Tool for finding office locations and people at those locations."""
@@ -41,6 +68,12 @@ class LocationsTool:
         """
         logger.info(f"Finding locations with query: {query}")
 
+        index = self._get_index()
+        if index is not None:
+            locations = index.locations(query)
+            logger.info(f"Found {len(locations)} locations in the location index")
+            return locations
+
         # Get all people with location information
         location_attrs = [
             "physicalDeliveryOfficeName",
@@ -65,39 +98,39 @@ class LocationsTool:
             search_filter = f"(&(objectClass=person)(|{''.join(location_filters)}))"
 
         try:
-            results = self.connector.search(
+            # Stream the sweep so only one page of entries is in memory at a time
+            results = self.connector.iter_search(
                 search_base=self.people_tool._get_people_search_base(),
                 search_filter=search_filter,
-                attributes=["uid", "cn"] + location_attrs,
+                attributes=["uid"] + location_attrs,
             )
 
             # Group people by location
             location_counts = defaultdict(
-                lambda: {"people": [], "cities": set(), "states": set(), "countries": set()}
+                lambda: {"people_count": 0, "cities": set(), "states": set(), "countries": set()}
             )
 
             for entry in results:
                 attrs = entry.get("attributes", {})
                 person_uid = attrs.get("uid")
-                person_cn = attrs.get("cn")
 
                 if not person_uid:
                     continue
 
-                # Extract location information
+                # Extract location information, grouping multi-valued attributes by the first
                 office = (
-                    attrs.get("physicalDeliveryOfficeName")
-                    or attrs.get("rhatLocation")
-                    or attrs.get("l")
+                    first_value(attrs.get("physicalDeliveryOfficeName"))
+                    or first_value(attrs.get("rhatLocation"))
+                    or first_value(attrs.get("l"))
                 )
 
                 if office:
-                    location_counts[office]["people"].append({"uid": person_uid, "cn": person_cn})
+                    location_counts[office]["people_count"] += 1
 
                     # Add geographic information
-                    city = attrs.get("l")
-                    state = attrs.get("st")
-                    country = attrs.get("co")
+                    city = first_value(attrs.get("l"))
+                    state = first_value(attrs.get("st"))
+                    country = first_value(attrs.get("co"))
 
                     if city:
                         location_counts[office]["cities"].add(city)
@@ -114,7 +147,7 @@ class LocationsTool:
 
                 location_info = {
                     "name": location_name,
-                    "people_count": len(data["people"]),
+                    "people_count": data["people_count"],
                     "city": ", ".join(sorted(data["cities"])) if data["cities"] else None,
                     "state": ", ".join(sorted(data["states"])) if data["states"] else None,
                     "country": ", ".join(sorted(data["countries"])) if data["countries"] else None,
@@ -134,46 +167,35 @@ class LocationsTool:
             logger.error(f"Location search failed: {e}")
             return []
 
-    def get_people_at_location(self, location: str, max_results: int = 50) -> list[dict[str, Any]]:
+    def get_people_at_location(
+        self, location: str, max_results: int = 50, fields: Sequence[str] | None = None
+    ) -> list[dict[str, Any]]:
         """
         Get all people at a specific location.
 
         Args:
             location: Location name
             max_results: Maximum number of results
+            fields: Person fields to fetch and return (uid and cn always),
+                or None for the default location fields
 
         Returns:
             List of person dictionaries
         """
         logger.info(f"Getting people at location: {location}")
 
-        escaped_location = re.sub(r"([*()\\])", r"\\\1", location)
-
-        # Search for people at this location
-        search_filter = f"""(&(objectClass=person)
-                            (|(physicalDeliveryOfficeName=*{escaped_location}*)
-                              (rhatLocation=*{escaped_location}*)
-                              (l=*{escaped_location}*)))"""
+        # Resolve (and validate) the attributes before any search
+        attributes = (
+            LOCATION_PERSON_ATTRIBUTES
+            if fields is None
+            else self.people_tool.get_person_attributes(fields)
+        )
 
         try:
             results = self.connector.search(
                 search_base=self.people_tool._get_people_search_base(),
-                search_filter=search_filter,
-                attributes=[
-                    "uid",
-                    "cn",
-                    "sn",
-                    "givenName",
-                    "mail",
-                    "title",
-                    "department",
-                    "telephoneNumber",
-                    "physicalDeliveryOfficeName",
-                    "rhatLocation",
-                    "l",
-                    "st",
-                    "co",
-                ],
+                search_filter=self._location_filter(location),
+                attributes=attributes,
                 size_limit=max_results,
             )
 
@@ -181,7 +203,7 @@ class LocationsTool:
             for entry in results:
                 person = self.people_tool._process_person_entry(entry)
                 if person:
-                    people.append(person)
+                    people.append(project_person(person, fields))
 
             # Sort by name
             people.sort(key=lambda x: x.get("cn", ""))
@@ -193,6 +215,58 @@ class LocationsTool:
             logger.error(f"People at location search failed: {e}")
             return []
 
+    def get_people_at_location_page(
+        self,
+        location: str,
+        page_size: int = 50,
+        cursor: str | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Read one page of the people at a location, sorted by name.
+
+        The directory sorts and pages the results (with virtual list view
+        when available), so a deep page of a large location costs one page
+        of work instead of fetching everything before it.
+
+        Args:
+            location: Location name
+            page_size: Number of people per page
+            cursor: next_cursor of the previous page, or None for the first page
+            fields: Person fields to fetch and return (uid and cn always),
+                or None for the default location fields
+
+        Returns:
+            Dictionary with "people", "next_cursor" (None after the last
+            page) and "total" (None when the server does not report it)
+
+        Raises:
+            ValueError: If the cursor is invalid or from another location
+        """
+        logger.info(f"Getting people at location: {location} (page of {page_size})")
+
+        attributes = (
+            LOCATION_PERSON_ATTRIBUTES
+            if fields is None
+            else self.people_tool.get_person_attributes(fields)
+        )
+        entries, next_cursor, total = self.connector.search_page(
+            search_base=self.people_tool._get_people_search_base(),
+            search_filter=self._location_filter(location),
+            attributes=attributes,
+            page_size=page_size,
+            cursor=cursor,
+        )
+
+        people = []
+        for entry in entries:
+            person = self.people_tool._process_person_entry(entry)
+            if person:
+                people.append(project_person(person, fields))
+
+        logger.info(f"Found {len(people)} people at location '{location}' on this page")
+        return {"people": people, "next_cursor": next_cursor, "total": total}
+
     def get_location_hierarchy(self) -> dict[str, Any]:
         """
         Get a hierarchical view of locations (country -> state -> city -> office).
@@ -202,8 +276,12 @@ class LocationsTool:
         """
         logger.info("Building location hierarchy")
 
+        index = self._get_index()
+        if index is not None:
+            return index.location_hierarchy()
+
         try:
-            results = self.connector.search(
+            results = self.connector.iter_search(
                 search_base=self.people_tool._get_people_search_base(),
                 search_filter="(objectClass=person)",
                 attributes=["uid", "physicalDeliveryOfficeName", "rhatLocation", "l", "st", "co"],
@@ -217,12 +295,12 @@ class LocationsTool:
             for entry in results:
                 attrs = entry.get("attributes", {})
 
-                country = attrs.get("co", "Unknown")
-                state = attrs.get("st", "Unknown")
-                city = attrs.get("l", "Unknown")
+                country = first_value(attrs.get("co")) or "Unknown"
+                state = first_value(attrs.get("st")) or "Unknown"
+                city = first_value(attrs.get("l")) or "Unknown"
                 office = (
-                    attrs.get("physicalDeliveryOfficeName")
-                    or attrs.get("rhatLocation")
+                    first_value(attrs.get("physicalDeliveryOfficeName"))
+                    or first_value(attrs.get("rhatLocation"))
                     or "Unknown"
                 )
 
@@ -289,26 +367,65 @@ class LocationsTool:
         """
         logger.info("Calculating location statistics")
 
-        locations = self.find_locations()
-
-        if not locations:
-            return {}
-
-        total_people = sum(loc["people_count"] for loc in locations)
-
-        stats = {
-            "total_locations": len(locations),
-            "total_people_with_location": total_people,
-            "largest_location": (
-                max(locations, key=lambda x: x["people_count"]) if locations else None
-            ),
-            "average_people_per_location": total_people / len(locations) if locations else 0,
-            "locations_by_size": {
-                "large": len([loc for loc in locations if loc["people_count"] >= 100]),
-                "medium": len([loc for loc in locations if 20 <= loc["people_count"] < 100]),
-                "small": len([loc for loc in locations if loc["people_count"] < 20]),
-            },
-        }
+        index = self._get_index()
+        if index is not None:
+            return index.location_stats()
 
+        stats = summarize_locations(self.find_locations())
         logger.info("Calculated location statistics")
         return stats
+
+    def _location_filter(self, location: str) -> str:
+        """Build the filter matching people whose office, location or city contains a name."""
+        escaped_location = re.sub(r"([*()\\])", r"\\\1", location)
+        return f"""(&(objectClass=person)
+                    (|(physicalDeliveryOfficeName=*{escaped_location}*)
+                      (rhatLocation=*{escaped_location}*)
+                      (l=*{escaped_location}*)))"""
+
+    def _get_index(self) -> LocationIndex | None:
+        """
+        Get the shared location aggregates when enabled.
+
+        The aggregates are built on first use and rebuilt in the background
+        every location_index_refresh_interval seconds, or sooner when the
+        change feed reports directory changes. Build failures are logged and
+        callers fall back to LDAP sweeps.
+
+        Returns:
+            The location index, or None when disabled or unavailable
+        """
+        performance = self.connector.performance_config
+        if not performance.location_index_enabled:
+            return None
+
+        try:
+            return self.connector.indexes.get(
+                LOCATION_INDEX, self._build_index, performance.location_index_refresh_interval
+            )
+        except Exception as e:
+            logger.warning(f"Location index unavailable, using LDAP sweeps: {e}")
+            return None
+
+    def _build_index(self) -> LocationIndex:
+        """
+        Build the location aggregates from one streamed sweep of location attributes.
+
+        Returns:
+            The location index
+
+        Raises:
+            LDAPException: If the directory exceeds index_max_entries
+        """
+        max_entries = self.connector.performance_config.index_max_entries
+        index = LocationIndex(
+            self.connector.iter_search(
+                search_base=self.people_tool._get_people_search_base(),
+                search_filter="(objectClass=person)",
+                attributes=LOCATION_INDEX_ATTRIBUTES,
+                size_limit=max_entries + 1,
+            )
+        )
+        if len(index) > max_entries:
+            raise LDAPException(f"Directory has more than {max_entries} people")
+        return index
@@ -6,14 +6,25 @@
 
 """Organization chart tool for corporate LDAP directories."""
 
+from collections.abc import Sequence
 from typing import Any
 
+from ..core.filters import chunked, normalize_dn, or_filter
 from ..core.ldap_connector import LDAPConnector
 from ..core.logging import get_logger
-from .people_search import PeopleSearchTool
+from ..core.org_graph import ORG_GRAPH_INDEX, DirectoryGraph
+from .people_search import PeopleSearchTool, project_person
 
 logger = get_logger(__name__)
 
+# Fields the reporting-line traversal itself reads
+TRAVERSAL_FIELDS = ("dn", "manager")
+
+
+def _traversal_fields(fields: Sequence[str] | None) -> list[str] | None:
+    """Extend requested person fields with those needed to walk reporting lines."""
+    return None if fields is None else list(dict.fromkeys([*fields, *TRAVERSAL_FIELDS]))
+
 
 class OrganizationTool:
     """Tool for building organization charts and exploring reporting structures."""
@@ -28,7 +39,7 @@ class OrganizationTool:
         self.people_tool = PeopleSearchTool(connector)
 
     def build_organization_chart(
-        self, manager_id: str, max_depth: int = 3
+        self, manager_id: str, max_depth: int = 3, fields: Sequence[str] | None = None
     ) -> dict[str, Any] | None:
         """
         Build an organization chart starting from a manager.
@@ -36,43 +47,65 @@ class OrganizationTool:
         Args:
             manager_id: Manager identifier (uid, email, or DN)
             max_depth: Maximum depth to traverse
+            fields: Person fields to fetch and return (uid and cn always),
+                or None for all
 
         Returns:
             Organization chart data structure
         """
         logger.info(f"Building org chart for manager: {manager_id}, depth: {max_depth}")
 
+        located = self._locate(manager_id)
+        if located:
+            graph, index = located
+            org_node = self._build_graph_node(graph, index, 0, max_depth)
+            logger.info(f"Built org chart with {self._count_nodes(org_node)} total people")
+            return self._project_node(org_node, fields)
+
         # Get the manager's details
-        manager = self.people_tool.get_person_details(manager_id)
+        lookup_fields = _traversal_fields(fields)
+        manager = self.people_tool.get_person_details(manager_id, lookup_fields)
         if not manager:
             logger.warning(f"Manager not found: {manager_id}")
             return None
 
-        # Build the org chart recursively
-        org_node = self._build_org_node(manager, 0, max_depth)
+        # Build the org chart one level at a time
+        org_node = self._build_org_tree(manager, max_depth, lookup_fields)
         logger.info(f"Built org chart with {self._count_nodes(org_node)} total people")
-        return org_node
+        return self._project_node(org_node, fields)
 
-    def get_manager_chain(self, person_id: str) -> list[dict[str, Any]]:
+    def get_manager_chain(
+        self, person_id: str, fields: Sequence[str] | None = None
+    ) -> list[dict[str, Any]]:
         """
         Get the management chain for a person (all managers up to the top).
 
         Args:
             person_id: Person identifier (uid, email, or DN)
+            fields: Person fields to fetch and return (uid and cn always),
+                or None for all
 
         Returns:
             List of managers from immediate manager to top level
         """
         logger.info(f"Finding manager chain for: {person_id}")
+        max_levels = 10  # Prevent infinite loops
 
-        person = self.people_tool.get_person_details(person_id)
+        located = self._locate(person_id)
+        if located:
+            graph, index = located
+            managers = [graph.people[i] for i in graph.manager_chain(index, max_levels)]
+            logger.info(f"Found {len(managers)} managers in chain")
+            return [project_person(manager, fields) for manager in managers]
+
+        lookup_fields = _traversal_fields(fields)
+        person = self.people_tool.get_person_details(person_id, lookup_fields)
         if not person:
             logger.warning(f"Person not found: {person_id}")
             return []
 
         managers = []
         current_person = person
-        max_levels = 10  # Prevent infinite loops
 
         for _ in range(max_levels):
             manager_dn = current_person.get("manager")
@@ -80,7 +113,7 @@ class OrganizationTool:
                 break
 
             # Get manager details
-            manager = self.people_tool.get_person_details(manager_dn)
+            manager = self.people_tool.get_person_details(manager_dn, lookup_fields)
             if not manager:
                 logger.warning(f"Manager not found: {manager_dn}")
                 break
@@ -93,22 +126,32 @@ class OrganizationTool:
                 break
 
         logger.info(f"Found {len(managers)} managers in chain")
-        return managers
+        return [project_person(manager, fields) for manager in managers]
 
-    def find_direct_reports(self, manager_id: str) -> list[dict[str, Any]]:
+    def find_direct_reports(
+        self, manager_id: str, fields: Sequence[str] | None = None
+    ) -> list[dict[str, Any]]:
         """
         Find all direct reports for a manager.
 
         Args:
             manager_id: Manager identifier (uid, email, or DN)
+            fields: Person fields to fetch and return (uid and cn always),
+                or None for all
 
         Returns:
             List of direct reports
         """
         logger.info(f"Finding direct reports for: {manager_id}")
 
+        located = self._locate(manager_id)
+        if located:
+            graph, index = located
+            return [project_person(graph.people[i], fields) for i in graph.children[index]]
+
         # Get manager details to get their DN
-        manager = self.people_tool.get_person_details(manager_id)
+        lookup_fields = _traversal_fields(fields)
+        manager = self.people_tool.get_person_details(manager_id, lookup_fields)
         if not manager:
             logger.warning(f"Manager not found: {manager_id}")
             return []
@@ -118,96 +161,329 @@ class OrganizationTool:
             logger.warning("Manager DN not found")
             return []
 
-        # Search for people who report to this manager
-        search_filter = f"(manager={manager_dn})"
-
-        try:
-            # Use comprehensive attributes list from people search tool
-            attributes = self.people_tool.get_person_attributes()
-
-            results = self.connector.search(
-                search_base=self.people_tool._get_people_search_base(),
-                search_filter=search_filter,
-                attributes=attributes,
-            )
-
-            direct_reports = []
-            for entry in results:
-                person = self.people_tool._process_person_entry(entry)
-                if person and person.get("uid") != manager.get("uid"):  # Don't include manager
-                    direct_reports.append(person)
-
-            logger.info(f"Found {len(direct_reports)} direct reports")
-            return direct_reports
-
-        except Exception as e:
-            logger.error(f"Direct reports search failed: {e}")
-            return []
+        reports = self._find_reports_for_managers([manager], lookup_fields)
+        direct_reports = reports[normalize_dn(manager_dn)]
+        logger.info(f"Found {len(direct_reports)} direct reports")
+        return [project_person(report, fields) for report in direct_reports]
 
-    def get_team_structure(self, person_id: str, include_peers: bool = True) -> dict[str, Any]:
+    def get_team_structure(
+        self, person_id: str, include_peers: bool = True, fields: Sequence[str] | None = None
+    ) -> dict[str, Any]:
         """
         Get the team structure around a person (manager, peers, direct reports).
 
         Args:
             person_id: Person identifier
             include_peers: Whether to include peer information
+            fields: Person fields to fetch and return (uid and cn always),
+                or None for all
 
         Returns:
             Team structure data
         """
         logger.info(f"Getting team structure for: {person_id}")
 
-        person = self.people_tool.get_person_details(person_id)
+        located = self._locate(person_id)
+        if located:
+            graph, index = located
+            manager = graph.parent[index]
+            team_structure = {
+                "person": graph.people[index],
+                "manager": graph.people[manager] if manager != -1 else None,
+                "peers": [graph.people[i] for i in graph.peers(index)] if include_peers else [],
+                "direct_reports": [graph.people[i] for i in graph.children[index]],
+            }
+            return self._project_team(team_structure, fields)
+
+        lookup_fields = _traversal_fields(fields)
+        person = self.people_tool.get_person_details(person_id, lookup_fields)
         if not person:
             return {}
 
         team_structure = {"person": person, "manager": None, "peers": [], "direct_reports": []}
 
         # Get manager
+        manager = None
         manager_dn = person.get("manager")
         if manager_dn:
-            manager = self.people_tool.get_person_details(manager_dn)
+            manager = self.people_tool.get_person_details(manager_dn, lookup_fields)
             if manager:
                 team_structure["manager"] = manager
 
-                # Get peers if requested (other people with same manager)
-                if include_peers:
-                    peers = self.find_direct_reports(manager_dn)
-                    # Remove the person themselves from peers
-                    team_structure["peers"] = [
-                        peer for peer in peers if peer.get("uid") != person.get("uid")
-                    ]
+        # Fetch peers (other people with the same manager) and direct reports
+        # in one batched search, reusing the records already resolved above
+        lookup = [person]
+        if manager and include_peers and manager.get("dn"):
+            lookup.append(manager)
+        reports = self._find_reports_for_managers([p for p in lookup if p.get("dn")], lookup_fields)
 
-        # Get direct reports
-        team_structure["direct_reports"] = self.find_direct_reports(person_id)
+        if len(lookup) > 1:
+            peers = reports[normalize_dn(manager["dn"])]
+            # Remove the person themselves from peers
+            team_structure["peers"] = [
+                peer for peer in peers if peer.get("uid") != person.get("uid")
+            ]
 
-        return team_structure
+        if person.get("dn"):
+            team_structure["direct_reports"] = reports[normalize_dn(person["dn"])]
 
-    def _build_org_node(
-        self, person: dict[str, Any], current_depth: int, max_depth: int
+        return self._project_team(team_structure, fields)
+
+    def _project_team(
+        self, team_structure: dict[str, Any], fields: Sequence[str] | None
     ) -> dict[str, Any]:
         """
-        Recursively build an organization node.
+        Project every person in a team structure to the requested fields.
 
         Args:
-            person: Person data
+            team_structure: Team structure as get_team_structure builds it
+            fields: Person fields to keep, or None for all
+
+        Returns:
+            The team structure itself when fields is None, otherwise a projected copy
+        """
+        if fields is None:
+            return team_structure
+        manager = team_structure["manager"]
+        return {
+            "person": project_person(team_structure["person"], fields),
+            "manager": project_person(manager, fields) if manager else None,
+            "peers": [project_person(peer, fields) for peer in team_structure["peers"]],
+            "direct_reports": [
+                project_person(report, fields) for report in team_structure["direct_reports"]
+            ],
+        }
+
+    def _get_graph(self) -> DirectoryGraph | None:
+        """
+        Get the shared org graph when enabled.
+
+        The graph is built on first use and rebuilt in the background every
+        org_graph_refresh_interval seconds. Build failures are logged and
+        callers fall back to LDAP lookups.
+
+        Returns:
+            The org graph, or None when disabled or unavailable
+        """
+        performance = self.connector.performance_config
+        if not performance.org_graph_enabled:
+            return None
+
+        try:
+            return self.connector.indexes.get(
+                ORG_GRAPH_INDEX, self._build_graph, performance.org_graph_refresh_interval
+            )
+        except Exception as e:
+            logger.warning(f"Org graph unavailable, using LDAP lookups: {e}")
+            return None
+
+    def _build_graph(self) -> DirectoryGraph:
+        """
+        Build the org graph from one paged sweep of every person.
+
+        Returns:
+            Directory graph
+
+        Raises:
+            LDAPException: If the directory exceeds index_max_entries
+        """
+        return DirectoryGraph(self.people_tool._sweep_people())
+
+    def _locate(self, identifier: str) -> tuple[DirectoryGraph, int] | None:
+        """
+        Find a person in the org graph.
+
+        Args:
+            identifier: uid, email or DN
+
+        Returns:
+            (graph, index), or None when the graph is disabled or lacks the person
+        """
+        graph = self._get_graph()
+        if graph is None:
+            return None
+
+        index = graph.resolve(identifier)
+        if index is None:
+            # Possibly created since the last refresh; LDAP has the answer
+            return None
+        return graph, index
+
+    def _build_graph_node(
+        self, graph: DirectoryGraph, index: int, current_depth: int, max_depth: int
+    ) -> dict[str, Any]:
+        """
+        Build an organization node from the org graph.
+
+        Args:
+            graph: Org graph
+            index: Person index
             current_depth: Current depth in the tree
             max_depth: Maximum depth to traverse
 
         Returns:
             Organization node
         """
-        node = {"person": person, "direct_reports": [], "level": current_depth}
-
-        # If we haven't reached max depth, get direct reports
+        node = {"person": graph.people[index], "direct_reports": [], "level": current_depth}
         if current_depth < max_depth:
-            direct_reports = self.find_direct_reports(person.get("uid", ""))
+            node["direct_reports"] = [
+                self._build_graph_node(graph, child, current_depth + 1, max_depth)
+                for child in graph.children[index]
+            ]
+        return node
+
+    def _project_node(self, node: dict[str, Any], fields: Sequence[str] | None) -> dict[str, Any]:
+        """
+        Project every person in an organization tree to the requested fields.
 
-            for report in direct_reports:
-                child_node = self._build_org_node(report, current_depth + 1, max_depth)
-                node["direct_reports"].append(child_node)
+        Args:
+            node: Organization node
+            fields: Person fields to keep, or None for all
 
-        return node
+        Returns:
+            The node itself when fields is None, otherwise a projected copy
+        """
+        if fields is None:
+            return node
+        return {
+            **node,
+            "person": project_person(node["person"], fields),
+            "direct_reports": [
+                self._project_node(child, fields) for child in node["direct_reports"]
+            ],
+        }
+
+    def _build_org_tree(
+        self, root: dict[str, Any], max_depth: int, fields: Sequence[str] | None = None
+    ) -> dict[str, Any]:
+        """
+        Build an organization tree breadth-first.
+
+        Each level is fetched with batched (manager=DN) searches for every
+        person on the previous level, so a chart costs one round trip per
+        level and filter chunk rather than two per person.
+
+        Args:
+            root: Person data for the top of the chart
+            max_depth: Maximum depth to traverse
+            fields: Person fields to fetch, including dn and manager, or None for all
+
+        Returns:
+            Organization node
+        """
+        root_node = {"person": root, "direct_reports": [], "level": 0}
+        visited = {normalize_dn(root.get("dn", ""))}
+        level = [root_node]
+
+        for depth in range(1, max_depth + 1):
+            managers = [node["person"] for node in level if node["person"].get("dn")]
+            if not managers:
+                break
+
+            reports = self._find_reports_for_managers(managers, fields)
+            next_level = []
+            for node in level:
+                for report in reports.get(normalize_dn(node["person"].get("dn", "")), []):
+                    report_dn = normalize_dn(report.get("dn", ""))
+                    if report_dn in visited:
+                        # Reporting cycle; each person appears once in the chart
+                        continue
+                    visited.add(report_dn)
+
+                    child_node = {"person": report, "direct_reports": [], "level": depth}
+                    node["direct_reports"].append(child_node)
+                    next_level.append(child_node)
+
+            level = next_level
+
+        return root_node
+
+    def _find_reports_for_managers(
+        self, managers: list[dict[str, Any]], fields: Sequence[str] | None = None
+    ) -> dict[str, list[dict[str, Any]]]:
+        """
+        Find the direct reports of several managers with batched searches.
+
+        Manager DNs are OR-ed into chunked (manager=DN) filters and each
+        result is assigned back to its manager by its manager attribute. A
+        failed search is logged and only leaves the managers of its own
+        chunk without reports.
+
+        Args:
+            managers: Person records with a "dn" key
+            fields: Person fields to fetch, including manager, or None for all
+
+        Returns:
+            Mapping of normalized manager DN to direct reports, in server order
+        """
+        managers_by_dn = {normalize_dn(manager["dn"]): manager for manager in managers}
+        reports: dict[str, list[dict[str, Any]]] = {dn: [] for dn in managers_by_dn}
+
+        try:
+            # Use comprehensive attributes list from people search tool
+            attributes = self.people_tool.get_person_attributes(fields)
+            search_base = self.people_tool._get_people_search_base()
+        except Exception as e:
+            logger.error(f"Direct reports search failed: {e}")
+            return reports
+
+        for chunk in chunked(managers_by_dn.values()):
+            chunk_reports: dict[str, list[dict[str, Any]]] = {}
+            try:
+                results = self.connector.search(
+                    search_base=search_base,
+                    search_filter=or_filter("manager", [manager["dn"] for manager in chunk]),
+                    attributes=attributes,
+                )
+
+                for entry in results:
+                    person = self.people_tool._process_person_entry(entry)
+                    if not person:
+                        continue
+
+                    manager_dn = self._match_manager(person, chunk)
+                    if manager_dn is None:
+                        logger.debug(f"Could not match {person.get('dn')} to a searched manager")
+                        continue
+
+                    manager = managers_by_dn[manager_dn]
+                    if person.get("uid") != manager.get("uid"):  # Don't include manager
+                        chunk_reports.setdefault(manager_dn, []).append(person)
+
+            except Exception as e:
+                logger.error(f"Direct reports search failed for {len(chunk)} managers: {e}")
+                continue
+
+            reports.update(chunk_reports)
+
+        return reports
+
+    def _match_manager(self, person: dict[str, Any], managers: list[dict[str, Any]]) -> str | None:
+        """
+        Find which of the searched managers a returned person reports to.
+
+        Args:
+            person: Person record returned by a batched manager search
+            managers: Managers whose DNs were in the search filter
+
+        Returns:
+            Normalized manager DN, or None if no manager matches
+        """
+        values = person.get("manager") or []
+        if isinstance(values, str):
+            values = [values]
+
+        requested = {normalize_dn(manager["dn"]) for manager in managers}
+        for value in values:
+            manager_dn = normalize_dn(value)
+            if manager_dn in requested:
+                return manager_dn
+
+        # The server matched the filter, so with a single manager the entry
+        # must be theirs even if the DN spelling differs (e.g. escaping)
+        if len(requested) == 1:
+            return next(iter(requested))
+        return None
 
     def _count_nodes(self, node: dict[str, Any]) -> int:
         """
@@ -224,40 +500,151 @@ class OrganizationTool:
             count += self._count_nodes(child)
         return count
 
-    def find_common_manager(self, person1_id: str, person2_id: str) -> dict[str, Any] | None:
+    def find_common_manager(
+        self, person1_id: str, person2_id: str, fields: Sequence[str] | None = None
+    ) -> dict[str, Any] | None:
         """
         Find the common manager between two people.
 
         Args:
             person1_id: First person identifier
             person2_id: Second person identifier
+            fields: Person fields to fetch and return (uid and cn always),
+                or None for all
 
         Returns:
             Common manager or None if not found
         """
         logger.info(f"Finding common manager between {person1_id} and {person2_id}")
 
-        # Get manager chains for both people
-        chain1 = self.get_manager_chain(person1_id)
-        chain2 = self.get_manager_chain(person2_id)
+        common_manager = self.find_common_managers([(person1_id, person2_id)], fields)[0]
+        if common_manager:
+            logger.info(f"Found common manager: {common_manager.get('cn')}")
+        return common_manager
 
-        if not chain1 or not chain2:
-            return None
+    def find_common_managers(
+        self, pairs: list[tuple[str, str]], fields: Sequence[str] | None = None
+    ) -> list[dict[str, Any] | None]:
+        """
+        Find the lowest common manager for many pairs of people.
 
-        # Convert to sets of UIDs for easier comparison
-        managers1 = {mgr.get("uid") for mgr in chain1 if mgr.get("uid")}
-        managers2 = {mgr.get("uid") for mgr in chain2 if mgr.get("uid")}
+        Each query is answered in O(log depth) from the org graph. Without
+        the graph, each distinct person's chain is fetched once and the
+        pairs are answered from a graph of just those chains.
 
-        # Find intersection (common managers)
-        common_manager_uids = managers1.intersection(managers2)
+        Args:
+            pairs: (person1_id, person2_id) identifier pairs
+            fields: Person fields to fetch and return (uid and cn always),
+                or None for all
 
-        if not common_manager_uids:
-            return None
+        Returns:
+            Common manager per pair (None if unknown or not found), in order
+        """
+        graph, located = self._graph_for(
+            [identifier for pair in pairs for identifier in pair], _traversal_fields(fields)
+        )
+
+        results: list[dict[str, Any] | None] = []
+        for first, second in pairs:
+            if first not in located or second not in located:
+                results.append(None)
+                continue
+            common = graph.common_manager(located[first], located[second])
+            results.append(
+                project_person(graph.people[common], fields) if common is not None else None
+            )
+        return results
 
-        # Return the lowest level common manager (first in either chain)
-        for manager in chain1:
-            if manager.get("uid") in common_manager_uids:
-                logger.info(f"Found common manager: {manager.get('cn')}")
-                return manager
+    def get_org_distances(self, person_ids: list[str]) -> dict[str, Any]:
+        """
+        Compute reporting distances between every pair of people.
 
-        return None
+        The distance is the number of reporting steps from one person up to
+        their lowest shared manager and down to the other, so peers are 2
+        apart and a manager and their direct report 1 apart.
+
+        Args:
+            person_ids: Person identifiers (uid, email, or DN)
+
+        Returns:
+            Resolved and unresolved identifiers, per-pair distances and
+            common managers, and summary statistics
+        """
+        logger.info(f"Computing org distances for {len(person_ids)} people")
+
+        identifiers = list(dict.fromkeys(person_ids))
+        # Only uids are reported, so fallback lookups fetch only what the walk needs
+        graph, located = self._graph_for(identifiers, _traversal_fields(["uid"]))
+        resolved = [identifier for identifier in identifiers if identifier in located]
+
+        index_pairs = [
+            (located[first], located[second])
+            for position, first in enumerate(resolved)
+            for second in resolved[position + 1 :]
+        ]
+        distances = graph.lca.distance_many(index_pairs)
+
+        pairs = []
+        for (first, second), distance in zip(index_pairs, distances, strict=True):
+            common = graph.common_manager(first, second)
+            pairs.append(
+                {
+                    "person1": graph.people[first].get("uid"),
+                    "person2": graph.people[second].get("uid"),
+                    "distance": distance,
+                    "common_manager": graph.people[common].get("uid")
+                    if common is not None
+                    else None,
+                }
+            )
+
+        connected = [distance for distance in distances if distance is not None]
+        return {
+            "people": [graph.people[located[identifier]].get("uid") for identifier in resolved],
+            "unresolved": [identifier for identifier in identifiers if identifier not in located],
+            "pairs": pairs,
+            "average_distance": sum(connected) / len(connected) if connected else None,
+            "max_distance": max(connected, default=None),
+        }
+
+    def _graph_for(
+        self, identifiers: list[str], fields: Sequence[str] | None = None
+    ) -> tuple[DirectoryGraph, dict[str, int]]:
+        """
+        Get a graph containing the given people and their manager chains.
+
+        Uses the shared org graph when it knows everyone, otherwise fetches
+        each distinct person's chain once and builds a graph of just those.
+
+        Args:
+            identifiers: Person identifiers
+            fields: Person fields to fetch, including dn and manager, or None for all
+
+        Returns:
+            (graph, mapping of identifier to index); unknown people are omitted
+        """
+        identifiers = list(dict.fromkeys(identifiers))
+
+        graph = self._get_graph()
+        if graph:
+            located = {identifier: graph.resolve(identifier) for identifier in identifiers}
+            if all(index is not None for index in located.values()):
+                return graph, located
+
+        people = []
+        dns = {}
+        for identifier in identifiers:
+            person = self.people_tool.get_person_details(identifier, fields)
+            if not person or not person.get("dn"):
+                continue
+            dns[identifier] = person["dn"]
+            people.append(person)
+            people.extend(self.get_manager_chain(person["dn"], fields))
+
+        local_graph = DirectoryGraph(people)
+        located = {}
+        for identifier, dn in dns.items():
+            index = local_graph.resolve(dn)
+            if index is not None:
+                located[identifier] = index
+        return local_graph, located
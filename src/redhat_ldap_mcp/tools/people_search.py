@@ -7,13 +7,76 @@
 """People search tool for corporate LDAP directories."""
 
 import re
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
+from ldap3.core.exceptions import LDAPException
+from ldap3.utils.conv import escape_filter_chars
+
+from ..core.filters import chunked, normalize_dn, or_filter
+from ..core.fuzzy import name_tokens
 from ..core.ldap_connector import LDAPConnector
 from ..core.logging import get_logger
+from ..core.people_index import PEOPLE_INDEX, PeopleIndex
+from ..core.person import PERSON_FIELD_ATTRIBUTES, Person, compact_people
 
 logger = get_logger(__name__)
 
+PEOPLE_CONTAINERS = ["ou=users", "ou=people", "cn=users"]
+
+# Snapshot kind holding processed person records
+PEOPLE_SNAPSHOT = "people"
+
+_UID_RDN = re.compile(r"uid=([^,]+)")
+
+# Fields every projected person keeps, to identify them
+REQUIRED_PERSON_FIELDS = ("uid", "cn")
+
+
+def person_field_attributes(fields: Iterable[str]) -> set[str]:
+    """
+    Get the LDAP attributes needed to build the given person fields.
+
+    Args:
+        fields: Processed person field names
+
+    Returns:
+        LDAP attribute names, including those of the required fields
+
+    Raises:
+        ValueError: If a field name is unknown
+    """
+    fields = set(fields)
+    unknown = fields - PERSON_FIELD_ATTRIBUTES.keys()
+    if unknown:
+        raise ValueError(
+            f"Unknown person fields: {', '.join(sorted(unknown))}; "
+            f"valid fields are {', '.join(PERSON_FIELD_ATTRIBUTES)}"
+        )
+    return {
+        attribute
+        for field in fields.union(REQUIRED_PERSON_FIELDS)
+        for attribute in PERSON_FIELD_ATTRIBUTES[field]
+    }
+
+
+def project_person(person: Mapping[str, Any], fields: Sequence[str] | None) -> Mapping[str, Any]:
+    """
+    Keep only the requested fields of a person record, plus uid and cn.
+
+    Args:
+        person: Processed person record
+        fields: Field names to keep, or None for all
+
+    Returns:
+        The person itself when fields is None, otherwise a new dictionary
+    """
+    if fields is None:
+        return person
+    keep = set(fields).union(REQUIRED_PERSON_FIELDS)
+    return {field: value for field, value in person.items() if field in keep}
+
 
 class PeopleSearchTool:
     """Tool for searching and retrieving people information from LDAP."""
@@ -27,12 +90,31 @@ class PeopleSearchTool:
         self.connector = connector
         self.config = connector.ldap_config
 
-    def get_person_attributes(self) -> list[str]:
+        # (field, source attributes, formatter) for every attribute-backed field
+        formatters = {
+            "rhat_original_hire_date": self._format_date,
+            "rhat_hire_date": self._format_date,
+            "rhat_worker_id": self._format_value,
+        }
+        self._field_table = [
+            (field, sources, formatters.get(field))
+            for field, sources in PERSON_FIELD_ATTRIBUTES.items()
+            if field not in ("uid", "dn")
+        ]
+
+    def get_person_attributes(self, fields: Sequence[str] | None = None) -> list[str]:
         """
         Get the comprehensive list of attributes to retrieve for person entries.
 
+        Args:
+            fields: Only the attributes these person fields are built from,
+                or None for all
+
         Returns:
             List of LDAP attribute names
+
+        Raises:
+            ValueError: If a field name is unknown
         """
         # Define base attributes to retrieve
         attributes = [
@@ -65,27 +147,54 @@ class PeopleSearchTool:
             if hasattr(schema, "redhat_attributes"):
                 attributes.extend(schema.redhat_attributes)
 
+        if fields is not None:
+            # Narrow rather than replace the list, so only attributes known
+            # to the configured schema are ever requested
+            needed = person_field_attributes(fields)
+            attributes = list(dict.fromkeys(a for a in attributes if a in needed))
+
         return attributes
 
-    def search_people(self, query: str, max_results: int = 10) -> list[dict[str, Any]]:
+    def search_people(
+        self,
+        query: str,
+        max_results: int = 10,
+        fuzzy: bool = False,
+        fields: Sequence[str] | None = None,
+    ) -> list[dict[str, Any]]:
         """
         Search for people in the directory.
 
         Args:
             query: Search query (name, email, uid, etc.)
             max_results: Maximum number of results to return
+            fuzzy: Match names approximately, tolerating typos and spelling
+                variants ("Jon Smyth" finds "John Smith")
+            fields: Person fields to fetch and return (uid and cn always),
+                or None for all
 
         Returns:
             List of person dictionaries
         """
         logger.info(f"Searching for people: '{query}' (max {max_results} results)")
 
+        # Resolve (and validate) the attributes before any search
+        attributes = self.get_person_attributes(fields)
+
+        index = self._get_index()
+        if fuzzy:
+            people = self._fuzzy_search(query, max_results, index, attributes)
+            return [project_person(person, fields) for person in people]
+
+        if index is not None:
+            people = index.search(query, self._query_fields(query), max_results)
+            if people is not None:
+                logger.info(f"Found {len(people)} people matching '{query}' in the people index")
+                return [project_person(person, fields) for person in people]
+
         # Build search filter based on query
         search_filter = self._build_search_filter(query)
 
-        # Get comprehensive attributes list
-        attributes = self.get_person_attributes()
-
         try:
             results = self.connector.search(
                 search_base=self._get_people_search_base(),
@@ -98,7 +207,7 @@ class PeopleSearchTool:
             for entry in results:
                 person = self._process_person_entry(entry)
                 if person:
-                    people.append(person)
+                    people.append(project_person(person, fields))
 
             logger.info(f"Found {len(people)} people matching '{query}'")
             return people
@@ -107,18 +216,166 @@ class PeopleSearchTool:
             logger.error(f"People search failed: {e}")
             raise
 
-    def get_person_details(self, identifier: str) -> dict[str, Any] | None:
+    def search_people_page(
+        self,
+        query: str,
+        page_size: int = 10,
+        cursor: str | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Read one page of people matching a query, sorted by name.
+
+        Always searches the directory, with server-side sorting and virtual
+        list view when available, so any page costs about the same.
+
+        Args:
+            query: Search query (name, email, uid, etc.)
+            page_size: Number of people per page
+            cursor: next_cursor of the previous page, or None for the first page
+            fields: Person fields to fetch and return (uid and cn always),
+                or None for all
+
+        Returns:
+            Dictionary with "people", "next_cursor" (None after the last
+            page) and "total" (None when the server does not report it)
+
+        Raises:
+            ValueError: If the cursor is invalid or from another query
+        """
+        logger.info(f"Searching for people: '{query}' (page of {page_size})")
+
+        attributes = self.get_person_attributes(fields)
+        entries, next_cursor, total = self.connector.search_page(
+            search_base=self._get_people_search_base(),
+            search_filter=self._build_search_filter(query),
+            attributes=attributes,
+            page_size=page_size,
+            cursor=cursor,
+        )
+
+        people = []
+        for entry in entries:
+            person = self._process_person_entry(entry)
+            if person:
+                people.append(project_person(person, fields))
+
+        logger.info(f"Found {len(people)} people matching '{query}' on this page")
+        return {"people": people, "next_cursor": next_cursor, "total": total}
+
+    def _fuzzy_search(
+        self,
+        query: str,
+        max_results: int,
+        index: PeopleIndex | None,
+        attributes: list[str],
+    ) -> list[dict[str, Any]]:
+        """
+        Search names approximately.
+
+        Uses the people index's fuzzy name index when available; otherwise
+        the directory's approximate match (~=) on cn, givenName and sn, one
+        clause group per query word.
+
+        Args:
+            query: Name or names
+            max_results: Maximum number of results
+            index: People index, or None to search LDAP
+            attributes: LDAP attributes to fetch when searching LDAP
+
+        Returns:
+            List of person dictionaries, best matches first
+        """
+        if index is not None:
+            people = index.fuzzy.search(query, max_results)
+            logger.info(f"Found {len(people)} fuzzy matches for '{query}' in the people index")
+            return people
+
+        words = name_tokens(query)
+        if not words:
+            return []
+        clauses = "".join(
+            f"(|(cn~={value})(givenName~={value})(sn~={value}))"
+            for value in map(escape_filter_chars, words)
+        )
+        try:
+            results = self.connector.search(
+                search_base=self._get_people_search_base(),
+                search_filter=f"(&(objectClass=person){clauses})",
+                attributes=attributes,
+                size_limit=max_results,
+            )
+        except Exception as e:
+            logger.error(f"Fuzzy people search failed: {e}")
+            raise
+
+        people = [person for entry in results if (person := self._process_person_entry(entry))]
+        logger.info(f"Found {len(people)} fuzzy matches for '{query}'")
+        return people
+
+    def autocomplete_people(self, prefix: str, max_results: int = 10) -> list[dict[str, Any]]:
+        """
+        Suggest people whose uid, email, name or surname starts with a prefix.
+
+        Answered from the people index when it is available; otherwise a
+        prefix (not substring) search fetching only uid, cn and title.
+
+        Args:
+            prefix: Typed prefix
+            max_results: Maximum number of suggestions
+
+        Returns:
+            List of {"uid", "cn", "title"} dictionaries (title when known)
+        """
+        prefix = prefix.strip()
+        if not prefix:
+            return []
+
+        index = self._get_index()
+        if index is not None:
+            people = index.complete(prefix, max_results)
+        else:
+            value = escape_filter_chars(prefix)
+            # cn=* value* covers surnames, like the index's later-word keys
+            results = self.connector.search(
+                search_base=self._get_people_search_base(),
+                search_filter=(
+                    f"(&(objectClass=person)(|(uid={value}*)(mail={value}*)"
+                    f"(cn={value}*)(cn=* {value}*)))"
+                ),
+                attributes=["uid", "cn", "title"],
+                size_limit=max_results,
+            )
+            people = [person for entry in results if (person := self._process_person_entry(entry))]
+
+        suggestions = []
+        for person in people:
+            suggestion = {
+                field: value[0] if isinstance(value, list) else value
+                for field in ("uid", "cn", "title")
+                if (value := person.get(field))
+            }
+            suggestions.append(suggestion)
+        return suggestions
+
+    def get_person_details(
+        self, identifier: str, fields: Sequence[str] | None = None
+    ) -> dict[str, Any] | None:
         """
         Get detailed information about a specific person.
 
         Args:
             identifier: Person identifier (uid, email, or DN)
+            fields: Person fields to fetch and return (uid and cn always),
+                or None for every attribute
 
         Returns:
             Person dictionary or None if not found
         """
         logger.info(f"Getting person details for: {identifier}")
 
+        attributes = ["*"] if fields is None else self.get_person_attributes(fields)
+
         # Determine search filter based on identifier format
         if "@" in identifier:
             # Email address
@@ -142,12 +399,12 @@ class PeopleSearchTool:
             results = self.connector.search(
                 search_base=search_base,
                 search_filter=search_filter,
-                attributes=["*"],  # Get all attributes
+                attributes=attributes,
                 size_limit=1,
             )
 
             if results:
-                person = self._process_person_entry(results[0])
+                person = project_person(self._process_person_entry(results[0]), fields)
                 logger.info(f"Found person: {person.get('cn', 'Unknown')}")
                 return person
             else:
@@ -158,6 +415,142 @@ class PeopleSearchTool:
             logger.error(f"Get person details failed: {e}")
             raise
 
+    def get_people_details(
+        self, identifiers: Sequence[str], fields: Sequence[str] | None = None
+    ) -> dict[str, Any]:
+        """
+        Get detailed information about many people at once.
+
+        Identifiers are split by type as get_person_details reads them
+        (emails, DNs, uids) and resolved with chunked (|(uid=a)(uid=b)...)
+        and (|(mail=a)...) searches run concurrently across the connection
+        pool, instead of one search per person. DNs of the form
+        uid=X,<people search base> join the uid searches; other DNs are
+        looked up one by one. A failed search does not fail the call: its
+        identifiers are reported under "errors".
+
+        Args:
+            identifiers: Person identifiers (uid, email, or DN), in any mix
+            fields: Person fields to fetch and return (uid and cn always),
+                or None for every attribute
+
+        Returns:
+            Dictionary with "people" (identifier -> person, in request
+            order), "not_found" (identifiers matching nobody) and "errors"
+            (identifier -> error message)
+
+        Raises:
+            ValueError: If a field name is unknown
+        """
+        identifiers = list(dict.fromkeys(identifiers))
+        logger.info(f"Getting person details for {len(identifiers)} identifiers")
+
+        attributes = ["*"] if fields is None else self.get_person_attributes(fields)
+        search_base = self._get_people_search_base()
+        people_base = normalize_dn(search_base)
+
+        # (attribute, value) -> requested identifiers, matched back case-insensitively
+        wanted: dict[tuple[str, str], list[str]] = {}
+        # Normalized DN -> identifier, for DNs found through their uid
+        dns: dict[str, str] = {}
+        dns_by_uid: dict[str, list[str]] = {}
+        individual = []
+        for identifier in identifiers:
+            if "@" in identifier:
+                wanted.setdefault(("mail", identifier.lower()), []).append(identifier)
+            elif "=" in identifier and "," in identifier:
+                key = normalize_dn(identifier)
+                attribute, _, uid = key.partition(",")[0].partition("=")
+                if attribute == "uid" and "\\" not in uid and key.endswith("," + people_base):
+                    dns[key] = identifier
+                    dns_by_uid.setdefault(uid, []).append(identifier)
+                    wanted.setdefault(("uid", uid), [])
+                else:
+                    individual.append(identifier)
+            else:
+                wanted.setdefault(("uid", identifier.lower()), []).append(identifier)
+
+        chunks = [
+            (attribute, chunk)
+            for attribute in ("uid", "mail")
+            for chunk in chunked(value for name, value in wanted if name == attribute)
+        ]
+        people: dict[str, dict[str, Any]] = {}
+        errors: dict[str, str] = {}
+
+        def search_chunk(attribute: str, values: list[str]) -> list[dict[str, Any]]:
+            return self.connector.search(
+                search_base=search_base,
+                search_filter=or_filter(attribute, values),
+                # The matched attribute is needed even when fields leave it out
+                attributes=(
+                    attributes
+                    if attributes == ["*"]
+                    else list(dict.fromkeys([*attributes, attribute]))
+                ),
+            )
+
+        workers = min(
+            len(chunks) + len(individual), self.connector.performance_config.pool_max_size
+        )
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            batches = [
+                (attribute, chunk, executor.submit(search_chunk, attribute, chunk))
+                for attribute, chunk in chunks
+            ]
+            singles = [
+                (identifier, executor.submit(self.get_person_details, identifier, fields))
+                for identifier in individual
+            ]
+
+            for attribute, chunk, future in batches:
+                try:
+                    results = future.result()
+                except Exception as e:
+                    logger.warning(f"Batched {attribute} lookup of {len(chunk)} people failed: {e}")
+                    for value in chunk:
+                        requested = wanted[(attribute, value)]
+                        if attribute == "uid":
+                            requested = requested + dns_by_uid.get(value, [])
+                        errors.update({identifier: str(e) for identifier in requested})
+                    continue
+
+                for entry in results:
+                    person = project_person(self._process_person_entry(entry), fields)
+                    values = entry["attributes"].get(attribute) or []
+                    for value in [values] if isinstance(values, str) else values:
+                        for identifier in wanted.get((attribute, str(value).lower()), []):
+                            people.setdefault(identifier, person)
+                    identifier = dns.get(normalize_dn(entry.get("dn", "")))
+                    if identifier:
+                        people.setdefault(identifier, person)
+
+            for identifier, future in singles:
+                try:
+                    person = future.result()
+                except Exception as e:
+                    errors[identifier] = str(e)
+                    continue
+                if person:
+                    people[identifier] = person
+
+        not_found = [
+            identifier
+            for identifier in identifiers
+            if identifier not in people and identifier not in errors
+        ]
+        logger.info(
+            f"Found {len(people)} of {len(identifiers)} people "
+            f"({len(not_found)} not found, {len(errors)} failed)"
+        )
+        return {
+            "people": {
+                identifier: people[identifier] for identifier in identifiers if identifier in people
+            },
+            "not_found": not_found,
+            "errors": errors,
+        }
+
     def _build_search_filter(self, query: str) -> str:
         """
         Build LDAP search filter based on query.
@@ -202,37 +595,128 @@ class PeopleSearchTool:
             # Multiple terms - search in common name
             return f"(&(objectClass=person)(cn=*{escaped_query}*))"
 
+    def _query_fields(self, query: str) -> tuple[str, ...]:
+        """
+        Get the processed person fields a query matches, as _build_search_filter does.
+
+        Args:
+            query: Search query
+
+        Returns:
+            Field names for PeopleIndex.search
+        """
+        if "@" in query:
+            return ("mail",)
+        if " " not in query and query.replace(".", "").replace("-", "").replace("_", "").isalnum():
+            return ("uid", "cn")
+        if len(query.split()) == 1:
+            return ("cn", "given_name", "surname", "uid", "mail", "title", "department")
+        return ("cn",)
+
+    def _get_index(self) -> PeopleIndex | None:
+        """
+        Get the shared people index when enabled and fresh enough to answer searches.
+
+        The first call starts a background sweep; until it finishes, and
+        whenever refreshes have failed for longer than
+        people_index_max_staleness, searches go to LDAP.
+
+        Returns:
+            People index, or None to search LDAP
+        """
+        performance = self.connector.performance_config
+        if not performance.people_index_enabled:
+            return None
+
+        index = self.connector.indexes.get(
+            PEOPLE_INDEX,
+            lambda: PeopleIndex(self._sweep_people()),
+            performance.people_index_refresh_interval,
+            wait=False,
+        )
+        if index is None or index.age > performance.people_index_max_staleness:
+            return None
+        return index
+
+    def _sweep_people(self) -> list[Person]:
+        """
+        Fetch every person in one paged sweep, for building in-memory indexes.
+
+        With snapshot_path set, people are read from the local snapshot
+        instead, after syncing what changed in the directory. Records are
+        compact Person records sharing repeated values, since indexes keep
+        the whole directory resident.
+
+        Returns:
+            Person records in directory order
+
+        Raises:
+            LDAPException: If the directory exceeds index_max_entries
+        """
+        performance = self.connector.performance_config
+        max_entries = performance.index_max_entries
+        if performance.snapshot_path:
+            snapshot = self.connector.snapshot
+            snapshot.refresh(
+                PEOPLE_SNAPSHOT,
+                self._fetch_people_since,
+                lambda entry: (self._process_person_entry(entry), ""),
+                performance.snapshot_sync_interval,
+                performance.snapshot_full_sync_interval,
+            )
+            return compact_people(snapshot.load(PEOPLE_SNAPSHOT))
+
+        people = compact_people(
+            self._process_person_entry(entry)
+            for entry in self.connector.iter_search(
+                search_base=self._get_people_search_base(),
+                search_filter="(objectClass=person)",
+                attributes=self.get_person_attributes(),
+                size_limit=max_entries + 1,
+            )
+        )
+        if len(people) > max_entries:
+            raise LDAPException(f"Directory has more than {max_entries} people")
+        return people
+
+    def _fetch_people_since(self, since: str | None) -> Iterator[dict[str, Any]]:
+        """
+        Stream the people modified since a point in time, for snapshot syncs.
+
+        Args:
+            since: GeneralizedTime to match modifyTimestamp>= against, or None for everyone
+
+        Yields:
+            Raw person entries, with their modifyTimestamp
+
+        Raises:
+            LDAPException: If more than index_max_entries people match
+        """
+        max_entries = self.connector.performance_config.index_max_entries
+        search_filter = "(objectClass=person)"
+        if since is not None:
+            search_filter = f"(&{search_filter}(modifyTimestamp>={since}))"
+        entries = self.connector.iter_search(
+            search_base=self._get_people_search_base(),
+            search_filter=search_filter,
+            attributes=[*self.get_person_attributes(), "modifyTimestamp"],
+            size_limit=max_entries + 1,
+        )
+        for count, entry in enumerate(entries):
+            # Fail rather than store a truncated sweep or lose changes
+            if count == max_entries:
+                raise LDAPException(f"Directory has more than {max_entries} people")
+            yield entry
+
     def _get_people_search_base(self) -> str:
         """Get the search base for people searches."""
         # Try to get from schema config first
-        if hasattr(self.connector.ldap_config, "schema"):
-            schema = self.connector.ldap_config.schema
-            if hasattr(schema, "person_search_base"):
-                return schema.person_search_base
-
-        # Fall back to common patterns
-        base_dn = self.config.base_dn
-
-        # Try common people containers
-        people_containers = ["ou=users", "ou=people", "cn=users"]
-        for container in people_containers:
-            try:
-                # Test if this container exists
-                test_results = self.connector.search(
-                    search_base=f"{container},{base_dn}",
-                    search_filter="(objectClass=*)",
-                    attributes=["dn"],
-                    size_limit=1,
-                )
-                if test_results:
-                    logger.info(f"Using people search base: {container},{base_dn}")
-                    return f"{container},{base_dn}"
-            except Exception:
-                continue
-
-        # Fall back to base DN
-        logger.warning(f"Using base DN for people search: {base_dn}")
-        return base_dn
+        schema = getattr(self.connector.ldap_config, "schema", None)
+        if getattr(schema, "person_search_base", None):
+            return schema.person_search_base
+
+        # Fall back to common people containers, discovered once per connector
+        return self.connector.discover_search_base("people", PEOPLE_CONTAINERS)
 
     def _process_person_entry(self, entry: dict[str, Any]) -> dict[str, Any]:
         """
@@ -250,54 +734,26 @@ class PeopleSearchTool:
         # Extract uid from DN if not in attributes
         uid = attrs.get("uid")
         if not uid and dn:
-            uid_match = re.search(r"uid=([^,]+)", dn)
+            uid_match = _UID_RDN.search(dn)
             if uid_match:
                 uid = uid_match.group(1)
 
-        # Build standardized person object
-        person = {
-            "uid": uid,
-            "dn": dn,
-            "cn": attrs.get("cn"),
-            "display_name": attrs.get("displayName"),
-            "given_name": attrs.get("givenName"),
-            "surname": attrs.get("sn"),
-            "mail": attrs.get("mail"),
-            "title": attrs.get("title") or attrs.get("rhatJobTitle"),
-            "department": attrs.get("rhatCostCenterDesc"),
-            "manager": attrs.get("manager"),
-            "phone": attrs.get("telephoneNumber"),
-            "mobile": attrs.get("mobile"),
-            "office_location": (
-                attrs.get("physicalDeliveryOfficeName")
-                or attrs.get("rhatLocation")
-                or attrs.get("l")  # locality
-            ),
-            "city": attrs.get("l"),
-            "state": attrs.get("st"),
-            "country": attrs.get("co"),
-            "employee_id": attrs.get("employeeNumber") or attrs.get("rhatWorkerId"),
-            "employee_type": attrs.get("employeeType") or attrs.get("rhatPersonType"),
-            "cost_center": attrs.get("rhatCostCenter"),
-            # Red Hat specific fields
-            "rhat_job_title": attrs.get("rhatJobTitle"),
-            "rhat_cost_center": attrs.get("rhatCostCenter"),
-            "rhat_cost_center_desc": attrs.get("rhatCostCenterDesc"),
-            "rhat_location": attrs.get("rhatLocation"),
-            "rhat_bio": attrs.get("rhatBio"),
-            "rhat_geo": attrs.get("rhatGeo"),
-            "rhat_organization": attrs.get("rhatOrganization"),
-            "rhat_job_role": attrs.get("rhatJobRole"),
-            "rhat_team_lead": attrs.get("rhatTeamLead"),
-            "rhat_original_hire_date": self._format_date(attrs.get("rhatOriginalHireDate")),
-            "rhat_hire_date": self._format_date(attrs.get("rhatHireDate")),
-            "rhat_worker_id": self._format_value(attrs.get("rhatWorkerId")),
-            "rhat_building_code": attrs.get("rhatBuildingCode"),
-            "rhat_office_location": attrs.get("rhatOfficeLocation"),
-        }
-
-        # Clean up None values and empty strings
-        person = {k: v for k, v in person.items() if v}
+        # Build standardized person object, leaving out None values and empty strings
+        person = {}
+        if uid:
+            person["uid"] = uid
+        if dn:
+            person["dn"] = dn
+        for field, sources, formatter in self._field_table:
+            # First non-empty source attribute wins
+            for source in sources:
+                value = attrs.get(source)
+                if value:
+                    break
+            if formatter is not None and value is not None:
+                value = formatter(value)
+            if value:
+                person[field] = value
 
         return person
 
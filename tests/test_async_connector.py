@@ -0,0 +1,192 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Tests for the asyncio LDAP connector."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+from redhat_ldap_mcp.config.models import PerformanceConfig
+from redhat_ldap_mcp.core.async_connector import AsyncLDAPConnector
+
+
+@pytest.fixture
+def sync_connector():
+    """Mock synchronous connector."""
+    connector = Mock()
+    connector.performance_config = PerformanceConfig(pool_max_size=4)
+    return connector
+
+
+class TestAsyncLDAPConnector:
+    """Test the executor-backed async connector."""
+
+    def test_max_workers_defaults_to_pool_size(self, sync_connector):
+        """Test the executor is sized to the connection pool by default."""
+        async_connector = AsyncLDAPConnector(sync_connector)
+
+        assert async_connector.max_workers == 4
+        async_connector.shutdown()
+
+    def test_max_workers_from_config(self, sync_connector):
+        """Test async_max_workers overrides the pool size."""
+        sync_connector.performance_config = PerformanceConfig(async_max_workers=16)
+
+        async_connector = AsyncLDAPConnector(sync_connector)
+
+        assert async_connector.max_workers == 16
+        async_connector.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_search_runs_off_event_loop(self, sync_connector):
+        """Test searches execute on an executor thread, not the event loop thread."""
+        loop_thread = threading.get_ident()
+        search_threads = []
+
+        def search(**kwargs):
+            search_threads.append(threading.get_ident())
+            return [{"dn": "uid=test,dc=test,dc=com", "attributes": {"uid": "test"}}]
+
+        sync_connector.search.side_effect = search
+        async_connector = AsyncLDAPConnector(sync_connector)
+
+        results = await async_connector.search("dc=test,dc=com", "(uid=test)", size_limit=1)
+
+        assert results[0]["attributes"]["uid"] == "test"
+        assert search_threads and search_threads[0] != loop_thread
+        assert sync_connector.search.call_args.kwargs["size_limit"] == 1
+        async_connector.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_are_bounded(self, sync_connector):
+        """Test many awaiting callers never exceed the executor size."""
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def slow_call(value):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.01)
+            with lock:
+                active -= 1
+            return value
+
+        async_connector = AsyncLDAPConnector(sync_connector, max_workers=3)
+
+        results = await asyncio.gather(*(async_connector.run(slow_call, i) for i in range(20)))
+
+        assert results == list(range(20))
+        assert peak <= 3
+        async_connector.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_exceptions_propagate(self, sync_connector):
+        """Test errors raised by the blocking call surface to the awaiting caller."""
+        sync_connector.test_connection.side_effect = RuntimeError("boom")
+        async_connector = AsyncLDAPConnector(sync_connector)
+
+        with pytest.raises(RuntimeError, match="boom"):
+            await async_connector.test_connection()
+        async_connector.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_run_latest_supersedes_pending_calls(self, sync_connector):
+        """Test a newer call with the same key makes older pending calls return None."""
+        release = threading.Event()
+        calls = []
+
+        def lookup(value):
+            calls.append(value)
+            if value == "a":
+                release.wait(1)
+            return value
+
+        async_connector = AsyncLDAPConnector(sync_connector, max_workers=1)
+
+        first = asyncio.ensure_future(async_connector.run_latest("session", lookup, "a"))
+        await asyncio.sleep(0.01)
+        second = asyncio.ensure_future(async_connector.run_latest("session", lookup, "ab"))
+        await asyncio.sleep(0)
+        third = asyncio.ensure_future(async_connector.run_latest("session", lookup, "abc"))
+        other = asyncio.ensure_future(async_connector.run_latest("other", lookup, "x"))
+        await asyncio.sleep(0.01)
+        release.set()
+
+        assert await asyncio.gather(first, second, third, other) == [None, None, "abc", "x"]
+        # "ab" was still queued when superseded, so it never ran
+        assert calls == ["a", "abc", "x"]
+        assert not async_connector._latest
+        async_connector.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_run_shared_coalesces_identical_calls(self, sync_connector):
+        """Test identical concurrent calls share one execution and different ones do not."""
+        release = threading.Event()
+        calls = []
+
+        def lookup(value, fields=None):
+            calls.append(value)
+            release.wait(1)
+            return {"value": value}
+
+        async_connector = AsyncLDAPConnector(sync_connector)
+
+        tasks = [
+            asyncio.ensure_future(async_connector.run_shared(lookup, "a", ["uid"]))
+            for _ in range(3)
+        ]
+        tasks.append(asyncio.ensure_future(async_connector.run_shared(lookup, "b", ["uid"])))
+        await asyncio.sleep(0.01)
+        # Cancelling one waiter leaves the shared call running for the others
+        tasks[0].cancel()
+        release.set()
+
+        results = await asyncio.gather(*tasks[1:])
+        assert results == [{"value": "a"}, {"value": "a"}, {"value": "b"}]
+        assert results[0] is results[1]
+        assert sorted(calls) == ["a", "b"]
+        assert not async_connector._in_flight
+
+        # Finished calls are not cached
+        await async_connector.run_shared(lookup, "a", ["uid"])
+        assert len(calls) == 3
+        async_connector.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_run_shared_disabled(self, sync_connector):
+        """Test request_coalescing_enabled=False runs every call."""
+        sync_connector.performance_config = PerformanceConfig(request_coalescing_enabled=False)
+        release = threading.Event()
+        calls = []
+
+        def lookup(value):
+            calls.append(value)
+            release.wait(1)
+            return value
+
+        async_connector = AsyncLDAPConnector(sync_connector, max_workers=2)
+
+        tasks = [asyncio.ensure_future(async_connector.run_shared(lookup, "a")) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        release.set()
+
+        assert await asyncio.gather(*tasks) == ["a", "a"]
+        assert calls == ["a", "a"]
+        async_connector.shutdown()
+
+    def test_shutdown_disconnects(self, sync_connector):
+        """Test shutdown closes the pooled connections of the wrapped connector."""
+        async_connector = AsyncLDAPConnector(sync_connector)
+
+        async_connector.shutdown()
+
+        sync_connector.disconnect.assert_called_once()
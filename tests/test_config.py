@@ -48,6 +48,13 @@ class TestConfigModels:
         with pytest.raises(ValueError, match="Server must start with ldap://"):
             LDAPConfig(server="http://invalid.com", base_dn="dc=test,dc=com")
 
+    def test_ldap_config_invalid_replica(self):
+        """Test invalid replica URL."""
+        with pytest.raises(ValueError, match="Replicas must start with ldap://"):
+            LDAPConfig(
+                server="ldap://a.com", replicas=["ldap://b.com", "b.com"], base_dn="dc=test,dc=com"
+            )
+
     def test_schema_config_defaults(self):
         """Test schema configuration defaults."""
         config = SchemaConfig(person_search_base="ou=people,dc=test,dc=com")
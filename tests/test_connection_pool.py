@@ -0,0 +1,193 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Tests for the LDAP connection pool."""
+
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+from ldap3.core.exceptions import LDAPException
+from redhat_ldap_mcp.core.connection_pool import ConnectionPool
+
+
+def make_connection():
+    """Create a mock bound connection."""
+    connection = Mock()
+    connection.bound = True
+    connection.closed = False
+    return connection
+
+
+class TestConnectionPool:
+    """Test connection pool checkout, release and eviction."""
+
+    def test_acquire_creates_up_to_max_size(self):
+        """Test the pool creates connections lazily and never exceeds max_size."""
+        factory = Mock(side_effect=make_connection)
+        pool = ConnectionPool(factory, min_size=0, max_size=2, checkout_timeout=0.05)
+
+        first = pool.acquire()
+        second = pool.acquire()
+
+        assert first is not second
+        assert factory.call_count == 2
+        with pytest.raises(LDAPException, match="Timed out"):
+            pool.acquire()
+        assert pool.stats()["timeouts"] == 1
+
+    def test_release_makes_connection_available(self):
+        """Test a released connection is reused by the next checkout."""
+        factory = Mock(side_effect=make_connection)
+        pool = ConnectionPool(factory, max_size=1)
+
+        connection = pool.acquire()
+        pool.release(connection)
+
+        assert pool.acquire() is connection
+        assert factory.call_count == 1
+        assert pool.stats()["reused"] == 1
+
+    def test_waiting_checkout_is_woken_by_release(self):
+        """Test a thread blocked on a full pool gets the released connection."""
+        pool = ConnectionPool(make_connection, max_size=1, checkout_timeout=5)
+        connection = pool.acquire()
+        acquired = []
+
+        waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+        waiter.start()
+        pool.release(connection)
+        waiter.join(timeout=5)
+
+        assert acquired == [connection]
+
+    def test_unhealthy_connection_is_replaced(self):
+        """Test checkout discards connections that fail the health check."""
+        pool = ConnectionPool(make_connection, max_size=1)
+        stale = pool.acquire()
+        pool.release(stale)
+        stale.bound = False
+
+        fresh = pool.acquire()
+
+        assert fresh is not stale
+        stale.unbind.assert_called_once()
+        assert pool.stats()["discarded"] == 1
+
+    def test_discard_closes_connection(self):
+        """Test discarding frees the slot and unbinds the connection."""
+        pool = ConnectionPool(make_connection, max_size=1)
+        connection = pool.acquire()
+
+        pool.release(connection, discard=True)
+
+        connection.unbind.assert_called_once()
+        assert pool.size == 0
+
+    @patch("redhat_ldap_mcp.core.connection_pool.time.monotonic")
+    def test_idle_eviction_keeps_min_size(self, mock_monotonic):
+        """Test idle eviction closes old connections but keeps min_size of them."""
+        mock_monotonic.return_value = 0.0
+        pool = ConnectionPool(make_connection, min_size=1, max_size=3, max_idle_time=10)
+        connections = [pool.acquire() for _ in range(3)]
+        for connection in connections:
+            pool.release(connection)
+
+        mock_monotonic.return_value = 60.0
+        evicted = pool.evict_idle()
+
+        assert evicted == 2
+        assert pool.stats()["idle"] == 1
+
+    @patch("redhat_ldap_mcp.core.connection_pool.time.monotonic")
+    def test_max_lifetime_replaces_connection(self, mock_monotonic):
+        """Test connections older than max_lifetime are closed on release."""
+        mock_monotonic.return_value = 0.0
+        pool = ConnectionPool(make_connection, max_size=1, max_lifetime=100)
+        connection = pool.acquire()
+
+        mock_monotonic.return_value = 150.0
+        pool.release(connection)
+
+        connection.unbind.assert_called_once()
+        assert pool.size == 0
+
+    @patch("redhat_ldap_mcp.core.connection_pool.time.monotonic")
+    def test_stale_idle_connections_are_probed(self, mock_monotonic):
+        """Test only idle connections unverified for probe_interval are probed."""
+        mock_monotonic.return_value = 0.0
+        probe = Mock(return_value=False)
+        pool = ConnectionPool(make_connection, max_size=2, probe=probe, probe_interval=10)
+        stale, used = pool.acquire(), pool.acquire()
+        pool.release(stale)
+        pool.release(used)
+
+        # Using a connection counts as verifying it
+        mock_monotonic.return_value = 5.0
+        pool.release(pool.acquire())
+
+        mock_monotonic.return_value = 12.0
+        assert pool.probe_idle() == 1
+
+        probe.assert_called_once_with(stale)
+        stale.unbind.assert_called_once()
+        assert pool.acquire() is used
+        assert (pool.stats()["probed"], pool.stats()["probe_failures"]) == (1, 1)
+
+    def test_checkout_starts_background_probe(self):
+        """Test a checkout with stale idle connections probes them off the request path."""
+        probed = threading.Event()
+        pool = ConnectionPool(
+            make_connection, max_size=2, probe=lambda c: probed.set() or True, probe_interval=0
+        )
+        connections = [pool.acquire(), pool.acquire()]
+        for connection in connections:
+            pool.release(connection)
+
+        pool.acquire()
+
+        assert probed.wait(2)
+
+    @patch("redhat_ldap_mcp.core.connection_pool.time.monotonic")
+    def test_release_evicts_expired_idle_connections(self, mock_monotonic):
+        """Test an expired idle connection is closed in the background without a checkout."""
+        mock_monotonic.return_value = 0.0
+        pool = ConnectionPool(make_connection, min_size=0, max_size=2, max_idle_time=10)
+        old, recent = pool.acquire(), pool.acquire()
+        unbound = threading.Event()
+        old.unbind.side_effect = lambda: unbound.set()
+        pool.release(old)
+
+        # Checkouts take the newest idle connection, so old would never be reached
+        mock_monotonic.return_value = 60.0
+        pool.release(recent)
+
+        assert unbound.wait(2)
+        recent.unbind.assert_not_called()
+        assert pool.stats()["evicted"] == 1
+
+    def test_factory_failure_frees_slot(self):
+        """Test a failing factory does not leak a reserved slot."""
+        factory = Mock(side_effect=[LDAPException("down"), make_connection()])
+        pool = ConnectionPool(factory, max_size=1)
+
+        with pytest.raises(LDAPException, match="down"):
+            pool.acquire()
+
+        assert pool.acquire() is not None
+        assert pool.size == 1
+
+    def test_close_refuses_checkout(self):
+        """Test a closed pool unbinds idle connections and refuses checkouts."""
+        pool = ConnectionPool(make_connection, max_size=1)
+        connection = pool.acquire()
+        pool.release(connection)
+
+        pool.close()
+
+        connection.unbind.assert_called_once()
+        with pytest.raises(LDAPException, match="closed"):
+            pool.acquire()
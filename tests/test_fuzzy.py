@@ -0,0 +1,143 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Tests for fuzzy and phonetic name matching."""
+
+import random
+from unittest.mock import Mock, patch
+
+from redhat_ldap_mcp.config.models import PerformanceConfig
+from redhat_ldap_mcp.core.fuzzy import FuzzyNameIndex, deletes, edit_distance, soundex
+from redhat_ldap_mcp.core.index_registry import IndexRegistry
+from redhat_ldap_mcp.core.people_index import PEOPLE_INDEX, PeopleIndex
+from redhat_ldap_mcp.tools.people_search import PeopleSearchTool
+
+PEOPLE = [
+    {"uid": "jsmith", "cn": "John Smith", "given_name": "John", "surname": "Smith"},
+    {"uid": "jsmyth", "cn": "Jane Smyth", "given_name": "Jane", "surname": "Smyth"},
+    {"uid": "jsmitty", "cn": "Jon Smitty", "given_name": "Jon", "surname": "Smitty"},
+    {"uid": "kchen", "cn": "Katherine Chen", "given_name": "Katherine", "surname": "Chen"},
+    {"uid": "bjones", "cn": "Bob Jones", "given_name": "Bob", "surname": "Jones"},
+]
+
+
+class TestDistanceFunctions:
+    """Test edit distance, deletion variants and Soundex."""
+
+    def test_edit_distance(self):
+        """Test edit distances, with adjacent swaps counted once."""
+        assert edit_distance("smith", "smyth") == 1
+        assert edit_distance("jon", "john") == 1
+        assert edit_distance("jhon", "john") == 1
+        assert edit_distance("kitten", "sitting") == 3
+        assert edit_distance("", "abc") == 3
+
+    def test_soundex(self):
+        """Test reference Soundex codes."""
+        assert soundex("robert") == soundex("rupert") == "R163"
+        assert soundex("ashcraft") == "A261"
+        assert soundex("tymczak") == "T522"
+        assert soundex("pfister") == "P236"
+        assert soundex("smith") == soundex("smyth") == "S530"
+
+    def test_one_edit_apart_words_share_a_deletion(self):
+        """Test the deletion table finds every word within one edit."""
+        rng = random.Random(3)
+        words = {"".join(rng.choice("abcde") for _ in range(rng.randint(1, 6))) for _ in range(300)}
+
+        for first in words:
+            for second in words:
+                if edit_distance(first, second) <= 1:
+                    assert deletes(first) & deletes(second)
+
+    def test_two_edits_apart_words_share_a_double_deletion(self):
+        """Test two-deep deletion tables find every word within two edits."""
+        rng = random.Random(5)
+        words = {"".join(rng.choice("abcd") for _ in range(rng.randint(4, 7))) for _ in range(150)}
+
+        for first in words:
+            for second in words:
+                if edit_distance(first, second) <= 2:
+                    assert deletes(first, 2) & deletes(second, 2)
+
+
+class TestFuzzyNameIndex:
+    """Test ranked approximate name search."""
+
+    def test_typos_and_variants(self):
+        """Test misspelled names find the intended person first."""
+        index = FuzzyNameIndex(PEOPLE)
+
+        assert [p["uid"] for p in index.search("Jon Smyth", 10)][0] == "jsmith"
+        assert [p["uid"] for p in index.search("John Smith", 10)][0] == "jsmith"
+        assert [p["uid"] for p in index.search("Smyth", 1)] == ["jsmyth"]
+        assert [p["uid"] for p in index.search("Kathryn Chen", 10)] == ["kchen"]
+
+    def test_long_words_allow_two_edits(self):
+        """Test two substitutions in a long word still match, without sounding alike."""
+        index = FuzzyNameIndex(PEOPLE)
+
+        assert soundex("kathebina") != soundex("katherine")
+        assert [p["uid"] for p in index.search("Kathebina", 10)] == ["kchen"]
+        assert index.search("Kathebanu", 10) == []
+
+    def test_every_word_must_match(self):
+        """Test people matching only some query words are excluded."""
+        index = FuzzyNameIndex(PEOPLE)
+
+        assert index.search("Bob Smith", 10) == []
+        assert index.search("Zyx", 10) == []
+        assert index.search("123", 10) == []
+
+
+class TestFuzzyPeopleSearch:
+    """Test the fuzzy mode of search_people."""
+
+    @staticmethod
+    def make_tool(performance_config):
+        """Create a PeopleSearchTool over a mock connector."""
+        connector = Mock()
+        connector.indexes = IndexRegistry()
+        connector.performance_config = performance_config
+        connector.ldap_config.schema.person_search_base = "ou=users,dc=redhat,dc=com"
+        connector.ldap_config.schema.corporate_attributes = []
+        connector.ldap_config.schema.redhat_attributes = []
+        connector.search.return_value = []
+        return PeopleSearchTool(connector)
+
+    def test_fuzzy_search_uses_index(self):
+        """Test fuzzy searches are answered by the people index when enabled."""
+        tool = self.make_tool(PerformanceConfig(people_index_enabled=True))
+        tool.connector.indexes.put(PEOPLE_INDEX, PeopleIndex(PEOPLE))
+
+        results = tool.search_people("Jhon Smith", fuzzy=True)
+
+        assert results[0]["uid"] == "jsmith"
+        tool.connector.search.assert_not_called()
+
+    def test_fuzzy_search_falls_back_to_approximate_filter(self):
+        """Test without an index, fuzzy searches use LDAP approximate matching."""
+        tool = self.make_tool(PerformanceConfig())
+
+        tool.search_people("Jon Smyth", fuzzy=True)
+
+        search_filter = tool.connector.search.call_args.kwargs["search_filter"]
+        assert search_filter == (
+            "(&(objectClass=person)(|(cn~=jon)(givenName~=jon)(sn~=jon))"
+            "(|(cn~=smyth)(givenName~=smyth)(sn~=smyth)))"
+        )
+
+    def test_approximate_filter_escapes_words(self):
+        """Test words are escaped in the approximate filter and empty entries dropped."""
+        tool = self.make_tool(PerformanceConfig())
+        tool.connector.search.return_value = [{}, {"dn": "uid=jsmith,ou=users,dc=redhat,dc=com"}]
+
+        with patch("redhat_ldap_mcp.tools.people_search.name_tokens", return_value=["j*(s)"]):
+            results = tool.search_people("j*(s)", fuzzy=True)
+
+        search_filter = tool.connector.search.call_args.kwargs["search_filter"]
+        assert "(cn~=j\\2a\\28s\\29)" in search_filter
+        assert [person["uid"] for person in results] == ["jsmith"]
@@ -0,0 +1,270 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Tests for the groups tool."""
+
+import re
+from unittest.mock import Mock
+
+import pytest
+from redhat_ldap_mcp.config.models import PerformanceConfig
+from redhat_ldap_mcp.core.filters import normalize_dn
+from redhat_ldap_mcp.core.index_registry import IndexRegistry
+from redhat_ldap_mcp.tools.groups import GroupsTool
+
+PEOPLE_BASE = "ou=users,dc=redhat,dc=com"
+GROUPS_BASE = "ou=groups,dc=redhat,dc=com"
+
+
+def person_entry(uid, base=PEOPLE_BASE):
+    """Create a raw person entry."""
+    return {
+        "dn": f"uid={uid},{base}",
+        "attributes": {"uid": uid, "cn": uid.title(), "objectClass": ["person"]},
+    }
+
+
+class FakeDirectory:
+    """Answers DN, uid and OR-ed uid searches over a fixed set of entries."""
+
+    def __init__(self, entries):
+        """
+        Args:
+            entries: Raw entries keyed by DN
+        """
+        self.entries = {entry["dn"].lower(): entry for entry in entries}
+        self.searches = []
+
+    def search(self, search_base, search_filter, **kwargs):
+        """Evaluate a search the way the tools issue them."""
+        self.searches.append((search_base, search_filter))
+        if search_base.lower() in self.entries:
+            entry = self.entries[search_base.lower()]
+            is_person = "person" in entry["attributes"].get("objectClass", [])
+            if search_filter == "(objectClass=person)" and not is_person:
+                return []
+            return [entry]
+
+        uids = {uid.lower() for uid in re.findall(r"\(uid=([^)]+)\)", search_filter)}
+        people_only = "(objectClass=person)" in search_filter
+        return [
+            entry
+            for dn, entry in self.entries.items()
+            if dn.endswith(search_base.lower())
+            and str(entry["attributes"].get("uid", "")).lower() in uids
+            and (not people_only or "person" in entry["attributes"].get("objectClass", []))
+        ]
+
+
+@pytest.fixture
+def make_tool():
+    """Create a GroupsTool over a fake directory containing one group."""
+
+    def factory(group_attributes, people):
+        group = {"dn": f"cn=team,{GROUPS_BASE}", "attributes": group_attributes}
+        directory = FakeDirectory([group, *people])
+        connector = Mock()
+        connector.search.side_effect = directory.search
+        connector.ldap_config.schema.person_search_base = PEOPLE_BASE
+        connector.performance_config = PerformanceConfig()
+        return GroupsTool(connector), directory
+
+    return factory
+
+
+def per_member_reference(tool, group_dn):
+    """Resolve members one lookup at a time, the way get_group_members used to."""
+    attrs = tool.connector.search(search_base=group_dn, search_filter="(objectClass=*)")[0][
+        "attributes"
+    ]
+    members = []
+    for member_attr in ["member", "uniqueMember"]:
+        for member_dn in attrs.get(member_attr) or []:
+            person = tool.people_tool.get_person_details(member_dn)
+            if person:
+                members.append(person)
+    for uid in attrs.get("memberUid") or []:
+        person = tool.people_tool.get_person_details(uid)
+        if person and not any(m.get("uid") == uid for m in members):
+            members.append(person)
+    return members
+
+
+class TestGroupMembers:
+    """Test batched group member resolution."""
+
+    def test_batched_resolution_matches_per_member_lookups(self, make_tool):
+        """Test output is identical to per-member lookups, duplicates included."""
+        people = [person_entry(f"user{i}") for i in range(120)]
+        outsider = person_entry("contractor", base="ou=external,dc=redhat,dc=com")
+        nested_group = {
+            "dn": f"cn=nested,{GROUPS_BASE}",
+            "attributes": {"cn": "nested", "objectClass": ["groupOfNames"]},
+        }
+        group_attributes = {
+            "member": [
+                *(f"uid=user{i},{PEOPLE_BASE}" for i in range(100)),
+                nested_group["dn"],
+                outsider["dn"],
+                f"uid=gone,{PEOPLE_BASE}",
+            ],
+            "uniqueMember": [f"UID=user1,{PEOPLE_BASE}"],
+            "memberUid": ["user2", "user110", "user110", "missing"],
+        }
+        tool, directory = make_tool(group_attributes, [*people, outsider, nested_group])
+        group_dn = f"cn=team,{GROUPS_BASE}"
+
+        expected = per_member_reference(tool, group_dn)
+        directory.searches.clear()
+        members = tool.get_group_members(group_dn)
+
+        assert members == expected
+        assert [m["uid"] for m in members].count("user1") == 2
+        assert [m["uid"] for m in members][-1] == "user110"
+        # Group, 3 member DN chunks, 2 per-DN fallbacks and 1 memberUid chunk
+        assert len(directory.searches) == 1 + 3 + 2 + 1
+
+    def test_missing_member_attributes(self, make_tool):
+        """Test attributes the group lacks (returned as None) are skipped."""
+        tool, _ = make_tool(
+            {"member": None, "uniqueMember": None, "memberUid": "user0"},
+            [person_entry("user0")],
+        )
+
+        members = tool.get_group_members(f"cn=team,{GROUPS_BASE}")
+
+        assert [m["uid"] for m in members] == ["user0"]
+
+
+class GroupDirectory(FakeDirectory):
+    """FakeDirectory that also answers member, uniqueMember and memberUid filters."""
+
+    def search(self, search_base, search_filter, **kwargs):
+        """Evaluate member assertions as an OR over the groups under the base."""
+        clauses = re.findall(
+            r"\((member|uniqueMember|memberUid)(:[\d.]+:)?=([^)]+)\)", search_filter
+        )
+        if not clauses:
+            return super().search(search_base, search_filter, **kwargs)
+        self.searches.append((search_base, search_filter))
+
+        matches = []
+        for dn, entry in self.entries.items():
+            attrs = entry["attributes"]
+            if not dn.endswith(search_base.lower()) or "person" in attrs.get("objectClass", []):
+                continue
+            if any(
+                normalize_dn(value) in [normalize_dn(v) for v in attrs.get(attr, [])]
+                or (rule and self._nested_in(normalize_dn(value), dn))
+                for attr, rule, value in clauses
+            ):
+                matches.append(entry)
+        return matches
+
+    def _nested_in(self, member_dn, group_dn, seen=None):
+        """Emulate the in-chain matching rule."""
+        seen = seen or set()
+        members = [normalize_dn(m) for m in self.entries[group_dn]["attributes"].get("member", [])]
+        if member_dn in members:
+            return True
+        seen.add(group_dn)
+        return any(
+            self._nested_in(member_dn, m, seen)
+            for m in members
+            if m in self.entries and m not in seen
+        )
+
+
+def group_entry(name, **attributes):
+    """Create a raw group entry."""
+    return {
+        "dn": f"cn={name},{GROUPS_BASE}",
+        "attributes": {"cn": name, "objectClass": ["groupOfNames"], **attributes},
+    }
+
+
+@pytest.fixture
+def nested_groups():
+    """Create a GroupsTool over nested groups with a membership cycle."""
+    person = f"uid=user0,{PEOPLE_BASE}"
+    entries = [
+        person_entry("user0"),
+        person_entry("user1"),
+        group_entry("a", member=[person, f"uid=user1,{PEOPLE_BASE}"]),
+        group_entry("b", member=[f"cn=a,{GROUPS_BASE}"]),
+        group_entry("c", uniqueMember=[f"CN=b, {GROUPS_BASE}"]),
+        group_entry("a-cycle", member=[f"cn=c,{GROUPS_BASE}"]),
+        group_entry("posix", memberUid=["user0"]),
+        group_entry("other", member=[f"uid=user1,{PEOPLE_BASE}"]),
+    ]
+    entries[2]["attributes"]["member"].append(f"cn=a-cycle,{GROUPS_BASE}")
+    directory = GroupDirectory(entries)
+    connector = Mock()
+    connector.search.side_effect = directory.search
+    connector.ldap_config.schema.person_search_base = PEOPLE_BASE
+    connector.ldap_config.schema.group_search_base = GROUPS_BASE
+    connector.ldap_config.schema.corporate_attributes = []
+    connector.ldap_config.schema.redhat_attributes = []
+    connector.performance_config = PerformanceConfig()
+    connector.indexes = IndexRegistry()
+    connector.server_supports.return_value = False
+    return GroupsTool(connector), directory
+
+
+def member_searches(directory):
+    """Return the group membership searches issued so far."""
+    return [f for _, f in directory.searches if "member" in f.lower()]
+
+
+class TestPersonGroups:
+    """Test direct and transitive group membership."""
+
+    def test_direct_groups_use_one_search(self, nested_groups):
+        """Test member, uniqueMember and memberUid are matched in one OR filter."""
+        tool, directory = nested_groups
+
+        groups = tool.get_person_groups("user0")
+
+        assert sorted(g["cn"] for g in groups) == ["a", "posix"]
+        assert len(member_searches(directory)) == 1
+
+    def test_transitive_groups_with_cycle(self, nested_groups):
+        """Test nested groups are expanded level by level and cycles terminate."""
+        tool, directory = nested_groups
+
+        groups = tool.get_person_groups("user0", transitive=True)
+
+        depths = {g["cn"]: g["nesting_depth"] for g in groups}
+        assert depths == {"a": 0, "posix": 0, "b": 1, "c": 2, "a-cycle": 3}
+        # Direct search, then one parent search per level; the last only finds "a" again
+        assert len(member_searches(directory)) == 1 + 4
+
+    def test_parent_edges_are_memoized(self, nested_groups):
+        """Test a second person sharing the groups reuses the expansion."""
+        tool, directory = nested_groups
+        tool.get_person_groups("user0", transitive=True)
+        directory.searches.clear()
+
+        groups = tool.get_person_groups("user1", transitive=True)
+
+        assert {g["cn"] for g in groups} == {"a", "other", "b", "c", "a-cycle"}
+        # Direct search plus the parents of "other", the only new group
+        assert len(member_searches(directory)) == 2
+
+    def test_in_chain_fast_path(self, nested_groups):
+        """Test servers with Active Directory capabilities expand membership server side."""
+        tool, directory = nested_groups
+        tool.connector.server_supports.return_value = True
+
+        groups = tool.get_person_groups("user0", transitive=True)
+
+        searches = member_searches(directory)
+        assert len(searches) == 2
+        assert ":1.2.840.113556.1.4.1941:=" in searches[1]
+        # The in-chain rule follows member only, so "c" (uniqueMember) is not reached
+        assert all("nesting_depth" in g for g in groups)
+        depths = {g["cn"]: g["nesting_depth"] for g in groups}
+        assert depths == {"a": 0, "posix": 0, "b": None}
@@ -9,7 +9,12 @@
 from unittest.mock import Mock, patch
 
 import pytest
-from ldap3.core.exceptions import LDAPException, LDAPSocketOpenError
+from ldap3.core.exceptions import (
+    LDAPException,
+    LDAPNoSuchObjectResult,
+    LDAPSocketOpenError,
+    LDAPSocketReceiveError,
+)
 
 from redhat_ldap_mcp.config.models import LDAPConfig, PerformanceConfig, SecurityConfig
 from redhat_ldap_mcp.core.ldap_connector import LDAPConnector
@@ -30,7 +35,7 @@ class TestLDAPConnectorInit:
 
         assert connector.ldap_config.server == "ldap://test.com"
         assert connector.ldap_config.auth_method == "anonymous"
-        assert connector._connection is None
+        assert connector.pool_stats()["size"] == 0
 
     @patch("redhat_ldap_mcp.core.ldap_connector.Server")
     def test_server_setup_without_tls(self, mock_server):
@@ -161,9 +166,58 @@ class TestLDAPConnectorConnection:
         connection = connector.connect()
 
         assert connection == mock_connection
-        assert connector._connection == mock_connection
+        assert connector.pool_stats()["in_use"] == 1
         mock_connection.bind.assert_called_once()
 
+    @patch("redhat_ldap_mcp.core.ldap_connector.Connection")
+    def test_new_connection_probe_is_cheap(self, mock_connection_class):
+        """Test a new connection is checked with a root DSE read, not subtree searches."""
+        mock_connection = Mock()
+        mock_connection.bind.return_value = True
+        mock_connection.search.return_value = True
+        mock_connection_class.return_value = mock_connection
+
+        connector = LDAPConnector(self.ldap_config, self.security_config, self.performance_config)
+        connector.connect()
+
+        mock_connection.search.assert_called_once()
+        assert mock_connection.search.call_args.kwargs["search_base"] == ""
+        assert mock_connection.search.call_args.kwargs["search_scope"] == "BASE"
+
+    @patch("redhat_ldap_mcp.core.ldap_connector.Connection")
+    def test_whoami_and_deep_probe(self, mock_connection_class):
+        """Test WhoAmI replaces the root DSE read and the deep check reads the base DN."""
+        mock_connection = Mock()
+        mock_connection.bind.return_value = True
+        mock_connection.extended.return_value = True
+        mock_connection.search.return_value = True
+        mock_connection.entries = []
+        mock_connection_class.return_value = mock_connection
+        performance_config = PerformanceConfig(
+            max_retries=1, health_check_method="whoami", health_check_deep=True
+        )
+
+        connector = LDAPConnector(self.ldap_config, self.security_config, performance_config)
+
+        # The base DN entry is missing, so the deep check fails
+        with pytest.raises(LDAPException, match="Failed to connect"):
+            connector.connect()
+        mock_connection.extended.assert_called_once_with("1.3.6.1.4.1.4203.1.11.3")
+        assert mock_connection.search.call_args.kwargs["search_base"] == "dc=test,dc=com"
+
+    @patch("redhat_ldap_mcp.core.ldap_connector.Connection")
+    def test_refused_root_dse_falls_back_to_base_dn(self, mock_connection_class):
+        """Test a server refusing the root DSE is checked by reading the base DN."""
+        mock_connection = Mock()
+        mock_connection.bind.return_value = True
+        mock_connection.search.side_effect = [LDAPException("insufficientAccessRights"), True]
+        mock_connection_class.return_value = mock_connection
+
+        connector = LDAPConnector(self.ldap_config, self.security_config, self.performance_config)
+
+        assert connector.connect() is mock_connection
+        assert mock_connection.search.call_args.kwargs["search_base"] == "dc=test,dc=com"
+
     @patch("redhat_ldap_mcp.core.ldap_connector.Connection")
     def test_connection_bind_failure(self, mock_connection_class):
         """Test connection bind failure."""
@@ -195,7 +249,9 @@ class TestLDAPConnectorConnection:
 
         assert connection == mock_connection
         assert mock_connection.bind.call_count == 2
-        mock_sleep.assert_called_once_with(0.1)  # retry_delay
+        mock_sleep.assert_called_once()
+        # retry_delay, jittered into its upper half
+        assert 0.05 <= mock_sleep.call_args.args[0] <= 0.1
 
     @patch("redhat_ldap_mcp.core.ldap_connector.Connection")
     def test_connection_socket_error(self, mock_connection_class):
@@ -208,31 +264,72 @@ class TestLDAPConnectorConnection:
         with pytest.raises(LDAPException, match="Failed to connect to LDAP server"):
             connector.connect()
 
-    def test_disconnect(self):
-        """Test disconnection."""
-        connector = LDAPConnector(self.ldap_config, self.security_config, self.performance_config)
-
-        # Mock existing connection
+    @patch("redhat_ldap_mcp.core.ldap_connector.Connection")
+    def test_disconnect(self, mock_connection_class):
+        """Test disconnection closes idle pooled connections."""
         mock_connection = Mock()
-        connector._connection = mock_connection
+        mock_connection.bind.return_value = True
+        mock_connection.bound = True
+        mock_connection_class.return_value = mock_connection
+
+        connector = LDAPConnector(self.ldap_config, self.security_config, self.performance_config)
+        connector.release(connector.connect())
 
         connector.disconnect()
 
         mock_connection.unbind.assert_called_once()
-        assert connector._connection is None
+        assert connector.pool_stats()["size"] == 0
 
-    def test_disconnect_with_error(self):
+    @patch("redhat_ldap_mcp.core.ldap_connector.Connection")
+    def test_disconnect_with_error(self, mock_connection_class):
         """Test disconnection with error."""
-        connector = LDAPConnector(self.ldap_config, self.security_config, self.performance_config)
-
         # Mock connection that raises error on unbind
         mock_connection = Mock()
+        mock_connection.bind.return_value = True
+        mock_connection.bound = True
         mock_connection.unbind.side_effect = Exception("Unbind error")
-        connector._connection = mock_connection
+        mock_connection_class.return_value = mock_connection
+
+        connector = LDAPConnector(self.ldap_config, self.security_config, self.performance_config)
+        connector.release(connector.connect())
 
         # Should not raise exception
         connector.disconnect()
-        assert connector._connection is None
+        assert connector.pool_stats()["size"] == 0
+
+    @patch("redhat_ldap_mcp.core.ldap_connector.Connection")
+    def test_connections_are_reused(self, mock_connection_class):
+        """Test released connections are handed out again instead of rebinding."""
+        mock_connection = Mock()
+        mock_connection.bind.return_value = True
+        mock_connection.bound = True
+        mock_connection.closed = False
+        mock_connection_class.return_value = mock_connection
+
+        connector = LDAPConnector(self.ldap_config, self.security_config, self.performance_config)
+        connector.release(connector.connect())
+        connector.release(connector.connect())
+
+        mock_connection.bind.assert_called_once()
+        assert connector.pool_stats()["reused"] == 1
+
+    @patch("redhat_ldap_mcp.core.ldap_connector.Connection")
+    def test_search_discards_connection_on_socket_error(self, mock_connection_class):
+        """Test a connection that hit a socket error is not returned to the pool."""
+        mock_connection = Mock()
+        mock_connection.bind.return_value = True
+        mock_connection.bound = True
+        mock_connection.search.side_effect = [True, LDAPSocketReceiveError("reset")]
+        mock_connection_class.return_value = mock_connection
+
+        connector = LDAPConnector(self.ldap_config, self.security_config, self.performance_config)
+
+        with pytest.raises(LDAPSocketReceiveError):
+            connector.search(search_base="dc=test,dc=com", search_filter="(uid=test)")
+
+        stats = connector.pool_stats()
+        assert stats["size"] == 0
+        assert stats["discarded"] == 1
 
 
 class TestLDAPConnectorSearch:
@@ -258,24 +355,20 @@ class TestLDAPConnectorSearch:
         mock_connection.search.return_value = True
         mock_connection.result = {}
 
-        # Mock LDAP entries
-        mock_entry1 = Mock()
-        mock_entry1.entry_dn = "uid=user1,ou=people,dc=test,dc=com"
-        mock_entry1.entry_attributes = ["uid", "cn"]
-        mock_entry1.uid = Mock()
-        mock_entry1.uid.value = "user1"
-        mock_entry1.cn = Mock()
-        mock_entry1.cn.value = "User One"
-
-        mock_entry2 = Mock()
-        mock_entry2.entry_dn = "uid=user2,ou=people,dc=test,dc=com"
-        mock_entry2.entry_attributes = ["uid", "cn"]
-        mock_entry2.uid = Mock()
-        mock_entry2.uid.value = "user2"
-        mock_entry2.cn = Mock()
-        mock_entry2.cn.value = "User Two"
-
-        mock_connection.entries = [mock_entry1, mock_entry2]
+        # Mock LDAP response, with a referral that is not an entry
+        mock_connection.response = [
+            {
+                "type": "searchResEntry",
+                "dn": "uid=user1,ou=people,dc=test,dc=com",
+                "attributes": {"uid": ["user1"], "cn": ["User One"]},
+            },
+            {"type": "searchResRef", "uri": ["ldap://other.test.com/dc=test,dc=com"]},
+            {
+                "type": "searchResEntry",
+                "dn": "uid=user2,ou=people,dc=test,dc=com",
+                "attributes": {"uid": ["user2"], "cn": ["User Two"]},
+            },
+        ]
         mock_connect.return_value = mock_connection
 
         results = self.connector.search(
@@ -301,6 +394,22 @@ class TestLDAPConnectorSearch:
                 search_base="ou=people,dc=test,dc=com", search_filter="(objectClass=person)"
             )
 
+    @patch.object(LDAPConnector, "connect")
+    def test_search_no_results(self, mock_connect):
+        """Test a successful search without entries returns an empty list."""
+        # ldap3 returns False when a search succeeds but finds nothing
+        mock_connection = Mock()
+        mock_connection.search.return_value = False
+        mock_connection.result = {"result": 0, "description": "success"}
+        mock_connection.response = []
+        mock_connect.return_value = mock_connection
+
+        results = self.connector.search(
+            search_base="ou=people,dc=test,dc=com", search_filter="(uid=nobody)"
+        )
+
+        assert results == []
+
     @patch.object(LDAPConnector, "connect")
     def test_search_with_size_limit(self, mock_connect):
         """Test search with size limit."""
@@ -310,16 +419,7 @@ class TestLDAPConnectorSearch:
         mock_connection.result = {}
 
         # Create 3 mock entries
-        mock_entries = []
-        for i in range(3):
-            mock_entry = Mock()
-            mock_entry.entry_dn = f"uid=user{i},ou=people,dc=test,dc=com"
-            mock_entry.entry_attributes = ["uid"]
-            mock_entry.uid = Mock()
-            mock_entry.uid.value = f"user{i}"
-            mock_entries.append(mock_entry)
-
-        mock_connection.entries = mock_entries
+        mock_connection.response = self._mock_entries(0, 3)
         mock_connect.return_value = mock_connection
 
         # Search with limit of 2
@@ -331,20 +431,183 @@ class TestLDAPConnectorSearch:
 
         assert len(results) == 2
 
+    @patch.object(LDAPConnector, "connect")
+    def test_iter_search_streams_pages(self, mock_connect):
+        """Test iter_search follows paged-result cookies and yields every page."""
+        mock_connection = Mock()
+        mock_connection.search.return_value = True
+        pages = [
+            (self._mock_entries(0, 2), b"cookie-1"),
+            (self._mock_entries(2, 4), b""),
+        ]
+        results = []
+        entries_by_page = []
+        for entries, cookie in pages:
+            entries_by_page.append(entries)
+            results.append({"controls": {"1.2.840.113556.1.4.319": {"value": {"cookie": cookie}}}})
+
+        def search(**kwargs):
+            mock_connection.response = entries_by_page.pop(0)
+            mock_connection.result = results.pop(0)
+            return True
+
+        mock_connection.search.side_effect = search
+        mock_connect.return_value = mock_connection
+
+        stream = self.connector.iter_search(
+            search_base="ou=people,dc=test,dc=com", search_filter="(objectClass=person)"
+        )
+
+        assert next(stream)["attributes"]["uid"] == "user0"
+        assert mock_connection.search.call_count == 1  # Second page not fetched yet
+        remaining = list(stream)
+
+        assert [entry["attributes"]["uid"] for entry in remaining] == ["user1", "user2", "user3"]
+        assert mock_connection.search.call_args_list[1].kwargs["paged_cookie"] == b"cookie-1"
+
+    @patch.object(LDAPConnector, "release")
+    @patch.object(LDAPConnector, "connect")
+    def test_iter_search_early_stop_abandons_paged_search(self, mock_connect, mock_release):
+        """Test closing the stream early abandons the paged search and releases."""
+        mock_connection = Mock()
+        mock_connection.search.return_value = True
+        mock_connection.response = self._mock_entries(0, 2)
+        mock_connection.result = {
+            "controls": {"1.2.840.113556.1.4.319": {"value": {"cookie": b"more"}}}
+        }
+        mock_connect.return_value = mock_connection
+
+        stream = self.connector.iter_search(
+            search_base="ou=people,dc=test,dc=com", search_filter="(objectClass=person)"
+        )
+        next(stream)
+        stream.close()
+
+        abandon_call = mock_connection.search.call_args_list[-1]
+        assert abandon_call.kwargs["paged_size"] == 0
+        assert abandon_call.kwargs["paged_cookie"] == b"more"
+        mock_release.assert_called_once_with(mock_connection, discard=False)
+
+    @patch.object(LDAPConnector, "connect")
+    def test_repeated_search_served_from_cache(self, mock_connect):
+        """Test identical searches hit the server once until invalidated."""
+        mock_connection = Mock()
+        mock_connection.search.return_value = True
+        mock_connection.result = {}
+        mock_connection.response = self._mock_entries(0, 2)
+        mock_connect.return_value = mock_connection
+
+        search_args = {
+            "search_base": "ou=people,dc=test,dc=com",
+            "search_filter": "(objectClass=person)",
+            "attributes": ["uid", "cn"],
+        }
+        first = self.connector.search(**search_args)
+        second = self.connector.search(**{**search_args, "attributes": ["cn", "uid"]})
+
+        assert first == second
+        assert mock_connection.search.call_count == 1
+        assert self.connector.cache_stats()["hits"] == 1
+
+        self.connector.invalidate_cache("uid=user1,ou=people,dc=test,dc=com")
+        self.connector.search(**search_args)
+
+        assert mock_connection.search.call_count == 2
+
+    @patch.object(LDAPConnector, "connect")
+    def test_cache_disabled(self, mock_connect):
+        """Test every search reaches the server when the query cache is disabled."""
+        connector = LDAPConnector(
+            self.ldap_config, self.security_config, PerformanceConfig(query_cache_enabled=False)
+        )
+        mock_connection = Mock()
+        mock_connection.search.return_value = True
+        mock_connection.result = {}
+        mock_connection.response = []
+        mock_connect.return_value = mock_connection
+
+        for _ in range(2):
+            connector.search(search_base="dc=test,dc=com", search_filter="(uid=missing)")
+
+        assert mock_connection.search.call_count == 2
+        assert connector.cache_stats() == {}
+
+    @patch.object(LDAPConnector, "search")
+    def test_discover_search_base_is_memoized(self, mock_search):
+        """Test containers are probed once and the result reused until it expires."""
+
+        def search(search_base, **kwargs):
+            return [{"dn": search_base}] if search_base.startswith("ou=people") else []
+
+        mock_search.side_effect = search
+        containers = ["ou=users", "ou=people", "cn=users"]
+
+        assert (
+            self.connector.discover_search_base("people", containers) == "ou=people,dc=test,dc=com"
+        )
+        assert (
+            self.connector.discover_search_base("people", containers) == "ou=people,dc=test,dc=com"
+        )
+        assert mock_search.call_count == 2
+
+        mock_search.side_effect = lambda **kwargs: []
+        assert self.connector.discover_search_base("groups", ["ou=groups"]) == "dc=test,dc=com"
+
+        with patch("redhat_ldap_mcp.core.ldap_connector.time.monotonic", return_value=1e12):
+            assert self.connector.discover_search_base("people", containers) == "dc=test,dc=com"
+
+    @patch.object(LDAPConnector, "search")
+    def test_discover_search_base_retries_failed_probes(self, mock_search):
+        """Test a base found despite a failed probe is not remembered."""
+
+        def search(search_base, **kwargs):
+            if search_base.startswith("ou=users"):
+                raise LDAPNoSuchObjectResult(result=32, description="noSuchObject")
+            raise LDAPSocketReceiveError("timed out")
+
+        mock_search.side_effect = search
+        containers = ["ou=users", "ou=people"]
+
+        assert self.connector.discover_search_base("people", containers) == "dc=test,dc=com"
+        assert self.connector.discover_search_base("people", containers) == "dc=test,dc=com"
+        assert mock_search.call_count == 4
+
+        mock_search.side_effect = lambda search_base, **kwargs: (
+            [{"dn": search_base}] if search_base.startswith("ou=people") else []
+        )
+        assert (
+            self.connector.discover_search_base("people", containers) == "ou=people,dc=test,dc=com"
+        )
+        assert (
+            self.connector.discover_search_base("people", containers) == "ou=people,dc=test,dc=com"
+        )
+        assert mock_search.call_count == 6
+
+    @staticmethod
+    def _mock_entries(start, stop):
+        """Create mock ldap3 response entries with sequential uids."""
+        return [
+            {
+                "type": "searchResEntry",
+                "dn": f"uid=user{i},ou=people,dc=test,dc=com",
+                "attributes": {"uid": [f"user{i}"]},
+            }
+            for i in range(start, stop)
+        ]
+
     def test_process_entry(self):
         """Test entry processing."""
-        # Create mock entry
-        mock_entry = Mock()
-        mock_entry.entry_dn = "uid=test,ou=people,dc=test,dc=com"
-        mock_entry.entry_attributes = ["uid", "cn", "memberOf"]
-
-        # Mock attribute values
-        mock_entry.uid = Mock()
-        mock_entry.uid.value = "testuser"
-        mock_entry.cn = Mock()
-        mock_entry.cn.value = "Test User"
-        mock_entry.memberOf = Mock()
-        mock_entry.memberOf.value = ["group1", "group2"]  # Multi-valued
+        # Mock response entry; single-valued attributes may be bare values
+        mock_entry = {
+            "type": "searchResEntry",
+            "dn": "uid=test,ou=people,dc=test,dc=com",
+            "attributes": {
+                "uid": "testuser",
+                "cn": ["Test User"],
+                "memberOf": ["group1", "group2"],  # Multi-valued
+                "manager": [],  # Requested but not set
+            },
+        }
 
         result = self.connector._process_entry(mock_entry)
 
@@ -352,16 +615,16 @@ class TestLDAPConnectorSearch:
         assert result["attributes"]["uid"] == "testuser"
         assert result["attributes"]["cn"] == "Test User"
         assert result["attributes"]["memberOf"] == ["group1", "group2"]
+        assert result["attributes"]["manager"] is None
 
     def test_process_entry_single_value_list(self):
         """Test processing entry with single-value list."""
-        mock_entry = Mock()
-        mock_entry.entry_dn = "uid=test,ou=people,dc=test,dc=com"
-        mock_entry.entry_attributes = ["mail"]
-
         # Single value in list should be extracted
-        mock_entry.mail = Mock()
-        mock_entry.mail.value = ["test@example.com"]
+        mock_entry = {
+            "type": "searchResEntry",
+            "dn": "uid=test,ou=people,dc=test,dc=com",
+            "attributes": {"mail": ["test@example.com"]},
+        }
 
         result = self.connector._process_entry(mock_entry)
 
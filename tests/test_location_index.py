@@ -0,0 +1,128 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Tests for the precomputed location aggregates."""
+
+import re
+from unittest.mock import Mock
+
+import pytest
+from redhat_ldap_mcp.config.models import PerformanceConfig
+from redhat_ldap_mcp.core.index_registry import IndexRegistry
+from redhat_ldap_mcp.core.location_index import LOCATION_INDEX
+from redhat_ldap_mcp.tools.locations import LocationsTool
+
+OFFICES = [
+    {"rhatLocation": "Boston Office", "l": "Boston", "st": "MA", "co": "USA"},
+    {"physicalDeliveryOfficeName": "Westford", "l": "Westford", "st": "MA", "co": "USA"},
+    {"rhatLocation": "Brno Office", "l": "Brno", "co": "Czech Republic"},
+    {"l": "Raleigh", "st": "NC", "co": "USA"},
+    {"co": "Remote"},
+    # Multi-valued attributes, and empty ones as ldap3 returns them
+    {"physicalDeliveryOfficeName": ["Raleigh Tower", "Annex"], "l": ["Raleigh", "Durham"]},
+    {"rhatLocation": [], "l": [], "st": [], "co": []},
+    {},
+]
+
+
+def make_entries(count):
+    """Create raw person entries spread unevenly over the offices."""
+    entries = []
+    for i in range(count):
+        office = OFFICES[(i * i) % 37 % len(OFFICES)]
+        attributes = dict(office)
+        # A few entries without a uid, which find_locations skips
+        if i % 17:
+            attributes["uid"] = f"user{i}"
+        entries.append({"dn": f"uid=user{i},ou=users,dc=redhat,dc=com", "attributes": attributes})
+    return entries
+
+
+def fake_iter_search(entries):
+    """Evaluate the location tools' sweeps, matching substring terms case-insensitively."""
+
+    def iter_search(search_filter, **kwargs):
+        terms = re.findall(r"\((\w+)=\*(.+?)\*\)", search_filter)
+        for entry in entries:
+            attrs = entry["attributes"]
+            if not terms or any(
+                value.lower() in str(attrs.get(attribute, "")).lower() for attribute, value in terms
+            ):
+                yield entry
+
+    return iter_search
+
+
+@pytest.fixture
+def tools():
+    """Create a LocationsTool sweeping LDAP and one answering from the location index."""
+    entries = make_entries(200)
+    tools = []
+    for enabled in (False, True):
+        connector = Mock()
+        connector.iter_search = Mock(side_effect=fake_iter_search(entries))
+        connector.performance_config = PerformanceConfig(location_index_enabled=enabled)
+        connector.indexes = IndexRegistry()
+        tool = LocationsTool(connector)
+        tool.people_tool._get_people_search_base = Mock(return_value="ou=users,dc=redhat,dc=com")
+        tools.append(tool)
+    return tools
+
+
+class TestLocationIndex:
+    """Test the location tools answer from the aggregates exactly as from LDAP sweeps."""
+
+    def test_matches_ldap_sweeps(self, tools):
+        """Test locations, queries, hierarchy and stats match, from a single sweep."""
+        ldap_tool, index_tool = tools
+
+        for query in [
+            None,
+            "boston",
+            "MA",
+            "usa",
+            "office",
+            "remote",
+            "annex",
+            "durham",
+            "nowhere",
+        ]:
+            assert index_tool.find_locations(query) == ldap_tool.find_locations(query), query
+        assert index_tool.get_location_hierarchy() == ldap_tool.get_location_hierarchy()
+        assert index_tool.get_location_stats() == ldap_tool.get_location_stats()
+
+        assert index_tool.connector.iter_search.call_count == 1
+        assert index_tool.connector.indexes.stats()[LOCATION_INDEX]["size"] == 200
+
+    def test_multi_valued_attributes_group_by_first_value(self, tools):
+        """Test multi-valued attributes are counted under their first value."""
+        index_tool = tools[1]
+
+        names = [location["name"] for location in index_tool.find_locations("durham")]
+        assert names == ["Raleigh Tower"]
+        assert (
+            "Raleigh Tower" in index_tool.get_location_hierarchy()["Unknown"]["Unknown"]["Raleigh"]
+        )
+
+    def test_results_are_copies(self, tools):
+        """Test mutating a result does not change the aggregates."""
+        index_tool = tools[1]
+
+        index_tool.find_locations()[0]["people_count"] = -1
+        index_tool.get_location_hierarchy()["USA"].clear()
+        index_tool.get_location_stats()["largest_location"]["name"] = "Nowhere"
+
+        assert index_tool.find_locations()[0]["people_count"] > 0
+        assert index_tool.get_location_hierarchy()["USA"]
+        assert index_tool.get_location_stats()["largest_location"]["name"] != "Nowhere"
+
+    def test_build_failure_falls_back_to_ldap(self, tools):
+        """Test a failed build is logged and the tools sweep LDAP instead."""
+        ldap_tool, index_tool = tools
+        sweep = index_tool.connector.iter_search.side_effect
+        index_tool.connector.iter_search.side_effect = [Exception("busy"), sweep(search_filter="")]
+
+        assert index_tool.find_locations() == ldap_tool.find_locations()
@@ -10,6 +10,7 @@ from unittest.mock import Mock, patch
 
 import pytest
 
+from redhat_ldap_mcp.config.models import PerformanceConfig
 from redhat_ldap_mcp.tools.groups import GroupsTool
 from redhat_ldap_mcp.tools.locations import LocationsTool
 from redhat_ldap_mcp.tools.organization import OrganizationTool
@@ -47,6 +48,7 @@ class TestMCPServerTools:
         """Mock LDAP connector for testing."""
         mock_conn = Mock()
         mock_conn.search.return_value = mock_ldap_results
+        mock_conn.iter_search.side_effect = lambda **kwargs: iter(mock_ldap_results)
         mock_conn.test_connection.return_value = {
             "connected": True,
             "server": "ldap.corp.redhat.com",
@@ -54,6 +56,7 @@ class TestMCPServerTools:
         }
         mock_conn.ldap_config = Mock()
         mock_conn.ldap_config.base_dn = "dc=redhat,dc=com"
+        mock_conn.performance_config = PerformanceConfig()
         return mock_conn
 
     def test_people_search_tool(self, mock_connector):
@@ -184,6 +187,95 @@ class TestMCPServerTools:
         people = tool.get_people_at_location("Boston", max_results=50)
         assert isinstance(people, list)
 
+    def test_people_at_location_page(self, mock_connector, mock_ldap_results):
+        """Test a page of people at a location carries the connector's cursor and total."""
+        mock_connector.search_page.return_value = (mock_ldap_results, "next", 120)
+        tool = LocationsTool(mock_connector)
+        tool.people_tool._get_people_search_base = Mock(return_value="ou=users,dc=redhat,dc=com")
+
+        page = tool.get_people_at_location_page("Boston", page_size=1, cursor="prev")
+
+        assert [person["uid"] for person in page["people"]] == ["jlaska"]
+        assert (page["next_cursor"], page["total"]) == ("next", 120)
+        kwargs = mock_connector.search_page.call_args.kwargs
+        assert (kwargs["page_size"], kwargs["cursor"]) == (1, "prev")
+        assert "rhatLocation=*Boston*" in kwargs["search_filter"]
+
+    def test_location_aggregations_stream_results(self, mock_connector):
+        """Test location sweeps consume the streaming search instead of a full list."""
+        tool = LocationsTool(mock_connector)
+        tool.people_tool._get_people_search_base = Mock(return_value="ou=users,dc=redhat,dc=com")
+
+        locations = tool.find_locations()
+        hierarchy = tool.get_location_hierarchy()
+
+        assert locations == [{"name": "Boston", "people_count": 1}]
+        assert hierarchy == {"Unknown": {"Unknown": {"Unknown": {"Boston": 1}}}}
+        assert mock_connector.iter_search.call_count == 2
+        mock_connector.search.assert_not_called()
+
+    def test_fields_projection(self, mock_connector):
+        """Test requested fields narrow the LDAP attributes and the returned records."""
+        mock_connector.ldap_config.schema.corporate_attributes = ["rhatBio"]
+        mock_connector.ldap_config.schema.redhat_attributes = []
+        tool = PeopleSearchTool(mock_connector)
+
+        person = tool.get_person_details("jlaska", fields=["manager"])
+
+        attributes = mock_connector.search.call_args.kwargs["attributes"]
+        assert set(attributes) == {"uid", "cn", "manager"}
+        assert person == {
+            "uid": "jlaska",
+            "cn": "James Laska",
+            "manager": "uid=manager1,ou=users,dc=redhat,dc=com",
+        }
+
+        with pytest.raises(ValueError, match="Unknown person fields: bio"):
+            tool.search_people("James Laska", fields=["bio"])
+
+    def test_projected_manager_chain_still_walks(self, mock_connector, mock_ldap_results):
+        """Test the LDAP manager walk fetches manager DNs even when not requested."""
+        mock_connector.ldap_config.schema.corporate_attributes = []
+        mock_connector.ldap_config.schema.redhat_attributes = []
+        manager = {
+            "dn": "uid=manager1,ou=users,dc=redhat,dc=com",
+            "attributes": {"uid": "manager1", "cn": "Manager One"},
+        }
+        mock_connector.search.side_effect = lambda **kwargs: (
+            [manager] if "manager1" in kwargs["search_base"] else mock_ldap_results
+        )
+        tool = OrganizationTool(mock_connector)
+        tool._get_graph = Mock(return_value=None)
+        tool.people_tool._get_people_search_base = Mock(return_value="ou=users,dc=redhat,dc=com")
+
+        chain = tool.get_manager_chain("jlaska", fields=["title"])
+
+        assert chain == [{"uid": "manager1", "cn": "Manager One"}]
+        first_lookup = mock_connector.search.call_args_list[0].kwargs["attributes"]
+        assert "manager" in first_lookup
+
+    def test_person_result_omits_unset_fields(self):
+        """Test serialized results only carry the fields that were returned."""
+        from redhat_ldap_mcp.server import OrganizationNode, PersonResult
+
+        node = OrganizationNode(person=PersonResult(uid="jlaska", cn="James Laska"), level=0)
+
+        assert node.model_dump() == {
+            "person": {"uid": "jlaska", "cn": "James Laska"},
+            "direct_reports": [],
+            "level": 0,
+        }
+
+    def test_person_result_keeps_output_schema(self):
+        """Test omitting unset fields keeps every field in the serialization schema."""
+        from redhat_ldap_mcp.server import PersonResult
+
+        schema = PersonResult.model_json_schema(mode="serialization")
+
+        assert set(schema["properties"]) == set(PersonResult.model_fields)
+        assert schema["properties"]["mail"]["description"] == "Email address"
+        assert schema["required"] == ["uid", "cn"]
+
 
 class TestMCPServerConfiguration:
     """Test MCP server configuration."""
@@ -0,0 +1,300 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Tests for the in-memory org graph and index registry."""
+
+import random
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+from redhat_ldap_mcp.core.index_registry import IndexRegistry
+from redhat_ldap_mcp.core.lca import LCAIndex
+from redhat_ldap_mcp.core.org_graph import DirectoryGraph
+
+PEOPLE_BASE = "ou=users,dc=test,dc=com"
+
+
+def make_people(managers):
+    """Build person records from a uid -> manager uid mapping."""
+    return [
+        {
+            "uid": uid,
+            "dn": f"uid={uid},{PEOPLE_BASE}",
+            "mail": f"{uid}@test.com",
+            **({"manager": f"uid={manager},{PEOPLE_BASE}"} if manager else {}),
+        }
+        for uid, manager in managers.items()
+    ]
+
+
+@pytest.fixture
+def graph():
+    """
+    Org tree:
+
+        ceo
+        ├── vp1
+        │   ├── dir1
+        │   │   └── eng1
+        │   └── dir2
+        └── vp2
+            └── eng2
+    """
+    return DirectoryGraph(
+        make_people(
+            {
+                "ceo": "ceo",
+                "vp1": "ceo",
+                "vp2": "ceo",
+                "dir1": "vp1",
+                "dir2": "vp1",
+                "eng1": "dir1",
+                "eng2": "vp2",
+            }
+        )
+    )
+
+
+def uids(graph, indexes):
+    """Map indexes to uids."""
+    return [graph.people[i]["uid"] for i in indexes]
+
+
+class TestDirectoryGraph:
+    """Test graph construction and queries."""
+
+    def test_resolve(self, graph):
+        """Test lookups by uid, email and DN (case and spacing insensitive)."""
+        index = graph.resolve("dir1")
+
+        assert graph.resolve("DIR1@test.com") == index
+        assert graph.resolve("UID=dir1, ou=users,dc=test,dc=com") == index
+        assert graph.resolve("nobody") is None
+
+    def test_manager_chain(self, graph):
+        """Test chains run from the immediate manager to the self-managed top."""
+        eng1 = graph.resolve("eng1")
+
+        assert uids(graph, graph.manager_chain(eng1)) == ["dir1", "vp1", "ceo"]
+        assert uids(graph, graph.manager_chain(eng1, max_levels=2)) == ["dir1", "vp1"]
+        assert graph.manager_chain(graph.resolve("ceo")) == []
+
+    def test_children_peers_and_subtree_sizes(self, graph):
+        """Test adjacency, peers and subtree sizes."""
+        vp1, dir1 = graph.resolve("vp1"), graph.resolve("dir1")
+
+        assert uids(graph, graph.children[vp1]) == ["dir1", "dir2"]
+        assert uids(graph, graph.peers(dir1)) == ["dir2"]
+        assert graph.subtree_size(vp1) == 3
+        assert graph.subtree_size(graph.resolve("ceo")) == 6
+        assert graph.depth[graph.resolve("eng1")] == 3
+
+    def test_common_manager(self, graph):
+        """Test the lowest common manager matches chain intersection semantics."""
+        r = graph.resolve
+
+        assert graph.people[graph.common_manager(r("eng1"), r("dir2"))]["uid"] == "vp1"
+        assert graph.people[graph.common_manager(r("eng1"), r("eng2"))]["uid"] == "ceo"
+        # A manager is not their own manager
+        assert graph.people[graph.common_manager(r("vp1"), r("eng1"))]["uid"] == "ceo"
+        assert graph.common_manager(r("ceo"), r("eng1")) is None
+
+    def test_cycles_are_broken(self):
+        """Test manager cycles are promoted to a root instead of looping."""
+        graph = DirectoryGraph(make_people({"a": "c", "b": "a", "c": "b", "d": "c"}))
+
+        roots = [i for i in range(len(graph)) if graph.parent[i] == -1]
+        assert len(roots) == 1
+        assert graph.subtree_size(roots[0]) == 3
+        assert len(graph.manager_chain(graph.resolve("d"))) <= 3
+
+    def test_unknown_manager_is_a_root(self):
+        """Test people whose manager is outside the sweep become roots."""
+        graph = DirectoryGraph(make_people({"a": "gone", "b": "a"}))
+
+        assert graph.parent[graph.resolve("a")] == -1
+        assert uids(graph, graph.manager_chain(graph.resolve("b"))) == ["a"]
+
+
+class TestLCAIndex:
+    """Test binary lifting against a brute-force chain walk."""
+
+    @staticmethod
+    def brute_force_lca(parent, first, second):
+        """Walk both ancestor chains and return the lowest shared node."""
+        ancestors = set()
+        while first != -1:
+            ancestors.add(first)
+            first = parent[first]
+        while second != -1:
+            if second in ancestors:
+                return second
+            second = parent[second]
+        return None
+
+    def test_matches_brute_force(self):
+        """Test random pairs on a random forest of deep and wide trees."""
+        rng = random.Random(7)
+        parent, depth = [-1, -1], [0, 0]
+        for node in range(2, 2000):
+            manager = rng.choice([node - 1, rng.randrange(node)])
+            parent.append(manager)
+            depth.append(depth[manager] + 1)
+        index = LCAIndex(parent, depth)
+
+        pairs = [(rng.randrange(2000), rng.randrange(2000)) for _ in range(500)]
+        expected = [self.brute_force_lca(parent, a, b) for a, b in pairs]
+
+        assert index.lca_many(pairs) == expected
+        for (a, b), ancestor, distance in zip(
+            pairs, expected, index.distance_many(pairs), strict=True
+        ):
+            if ancestor is None:
+                assert distance is None
+            else:
+                assert distance == depth[a] + depth[b] - 2 * depth[ancestor]
+
+    def test_graph_distance(self, graph):
+        """Test reporting distances through the graph."""
+        r = graph.resolve
+
+        assert graph.distance(r("dir1"), r("dir2")) == 2
+        assert graph.distance(r("vp1"), r("eng1")) == 2
+        assert graph.distance(r("eng1"), r("eng2")) == 5
+        assert graph.distance(r("ceo"), r("ceo")) == 0
+
+
+class TestIndexRegistry:
+    """Test lazy builds and stale-while-revalidate refresh."""
+
+    def test_builds_once(self):
+        """Test concurrent first callers share a single build."""
+        registry = IndexRegistry()
+        builder = Mock(side_effect=lambda: time.sleep(0.05) or ["index"])
+
+        threads = [
+            threading.Thread(target=registry.get, args=("people", builder, 60)) for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert builder.call_count == 1
+        assert registry.stats()["people"]["size"] == 1
+
+    def test_stale_index_refreshes_in_background(self):
+        """Test a stale index is served while a rebuild runs."""
+        registry = IndexRegistry()
+        release = threading.Event()
+        versions = iter([["v1"], ["v2"]])
+
+        def builder():
+            value = next(versions)
+            if value == ["v2"]:
+                release.wait(1)
+            return value
+
+        with patch("redhat_ldap_mcp.core.index_registry.time.monotonic", return_value=0.0):
+            assert registry.get("people", builder, max_age=10) == ["v1"]
+
+        with patch("redhat_ldap_mcp.core.index_registry.time.monotonic", return_value=20.0):
+            assert registry.get("people", builder, max_age=10) == ["v1"]
+        release.set()
+
+        for _ in range(100):
+            if registry.peek("people") == ["v2"]:
+                break
+            time.sleep(0.01)
+        assert registry.peek("people") == ["v2"]
+
+    def test_failed_refresh_keeps_previous_copy(self):
+        """Test a failing rebuild leaves the existing index in place."""
+        registry = IndexRegistry()
+        registry.put("people", ["v1"])
+        builder = Mock(side_effect=RuntimeError("ldap down"))
+
+        assert registry.get("people", builder, max_age=-1) == ["v1"]
+        for _ in range(100):
+            if not registry.stats()["people"]["refreshing"]:
+                break
+            time.sleep(0.01)
+
+        assert registry.peek("people") == ["v1"]
+
+    def test_failed_build_backs_off(self):
+        """Test a failed first build is not retried by every caller until max_age passes."""
+        registry = IndexRegistry()
+        builder = Mock(side_effect=[RuntimeError("too many people"), ["index"]])
+
+        with patch("redhat_ldap_mcp.core.index_registry.time.monotonic", return_value=0.0):
+            with pytest.raises(RuntimeError, match="too many people"):
+                registry.get("people", builder, max_age=60)
+            with pytest.raises(RuntimeError, match="failed 0s ago: too many people"):
+                registry.get("people", builder, max_age=60)
+        assert builder.call_count == 1
+
+        with patch("redhat_ldap_mcp.core.index_registry.time.monotonic", return_value=61.0):
+            assert registry.get("people", builder, max_age=60) == ["index"]
+        assert builder.call_count == 2
+
+    def test_invalidate(self):
+        """Test invalidation forces a rebuild on next use."""
+        registry = IndexRegistry()
+        builder = Mock(return_value=["index"])
+        registry.get("people", builder, max_age=60)
+
+        registry.invalidate("people")
+        registry.get("people", builder, max_age=60)
+
+        assert builder.call_count == 2
+
+    def test_expire_refreshes_in_background(self):
+        """Test an expired index is served until its background rebuild replaces it."""
+        registry = IndexRegistry()
+        release = threading.Event()
+        versions = iter([["v1"], ["v2"]])
+
+        def builder():
+            value = next(versions)
+            if value == ["v2"]:
+                release.wait(1)
+            return value
+
+        registry.get("people", builder, max_age=60)
+
+        registry.expire()
+        assert registry.stats()["people"]["expired"]
+        assert registry.get("people", builder, max_age=60) == ["v1"]
+        release.set()
+
+        for _ in range(100):
+            if registry.peek("people") == ["v2"]:
+                break
+            time.sleep(0.01)
+        assert registry.peek("people") == ["v2"]
+        assert not registry.stats()["people"]["expired"]
+
+    def test_background_first_build(self):
+        """Test wait=False returns None until a background first build finishes."""
+        registry = IndexRegistry()
+        release = threading.Event()
+
+        def builder():
+            release.wait(1)
+            return ["index"]
+
+        assert registry.get("people", builder, max_age=60, wait=False) is None
+        release.set()
+
+        for _ in range(100):
+            if registry.get("people", builder, max_age=60, wait=False):
+                break
+            time.sleep(0.01)
+        assert registry.get("people", builder, max_age=60, wait=False) == ["index"]
+        assert registry.stats()["people"]["builds"] == 1
@@ -0,0 +1,285 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Tests for the organization chart tool."""
+
+import re
+from unittest.mock import Mock
+
+import pytest
+from redhat_ldap_mcp.config.models import PerformanceConfig
+from redhat_ldap_mcp.core.filters import MAX_FILTER_VALUES, chunked, or_filter
+from redhat_ldap_mcp.core.index_registry import IndexRegistry
+from redhat_ldap_mcp.tools.organization import OrganizationTool
+
+PEOPLE_BASE = "ou=users,dc=redhat,dc=com"
+
+
+def person_dn(uid):
+    """Return the DN for a uid."""
+    return f"uid={uid},{PEOPLE_BASE}"
+
+
+class FakeDirectory:
+    """Answers uid and OR-ed manager searches over an in-memory org tree."""
+
+    def __init__(self, managers):
+        """
+        Args:
+            managers: Mapping of uid to manager uid (None for the top)
+        """
+        self.entries = {
+            uid: {
+                "dn": person_dn(uid),
+                "attributes": {
+                    "uid": uid,
+                    "cn": uid.title(),
+                    "manager": person_dn(manager) if manager else None,
+                },
+            }
+            for uid, manager in managers.items()
+        }
+        self.filters = []
+
+    def search(self, search_base, search_filter, **kwargs):
+        """Evaluate DN lookups and (uid=...) and (manager=...) clauses."""
+        self.filters.append(search_filter)
+        if search_base != PEOPLE_BASE:
+            return [self.entries[search_base.split(",")[0].split("=")[1]]]
+        if search_filter == "(objectClass=person)":
+            return list(self.entries.values())
+        uids = set(re.findall(r"\(uid=([^)]+)\)", search_filter))
+        managers = {dn.lower() for dn in re.findall(r"\(manager=([^)]+)\)", search_filter)}
+        return [
+            entry
+            for uid, entry in self.entries.items()
+            if uid in uids or (entry["attributes"]["manager"] or "").lower() in managers
+        ]
+
+
+def build_tree(levels, span):
+    """Build a manager mapping where each person has span direct reports."""
+    managers = {"root": None}
+    level = ["root"]
+    for depth in range(1, levels + 1):
+        next_level = []
+        for manager in level:
+            for i in range(span):
+                uid = f"{manager}-{i}" if depth > 1 else f"p{i}"
+                managers[uid] = manager
+                next_level.append(uid)
+        level = next_level
+    return managers
+
+
+@pytest.fixture
+def make_tool():
+    """Create an OrganizationTool over a fake directory."""
+
+    def factory(managers, performance_config=None):
+        directory = FakeDirectory(managers)
+        connector = Mock()
+        connector.search.side_effect = directory.search
+        connector.iter_search.side_effect = lambda **kwargs: iter(directory.search(**kwargs))
+        connector.indexes = IndexRegistry()
+        connector.ldap_config.schema.corporate_attributes = []
+        connector.ldap_config.schema.redhat_attributes = []
+        connector.performance_config = performance_config or PerformanceConfig()
+        tool = OrganizationTool(connector)
+        tool.people_tool._get_people_search_base = Mock(return_value=PEOPLE_BASE)
+        return tool, directory
+
+    return factory
+
+
+class TestFilterHelpers:
+    """Test batched filter construction."""
+
+    def test_or_filter_escapes_values(self):
+        """Test values are escaped and single values are not wrapped in an OR."""
+        assert or_filter("manager", ["cn=a (b)"]) == r"(manager=cn=a \28b\29)"
+        assert or_filter("uid", ["a", "b"]) == "(|(uid=a)(uid=b))"
+
+    def test_chunked(self):
+        """Test chunks never exceed the requested size."""
+        assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+class TestOrganizationChart:
+    """Test level-order org chart construction."""
+
+    def test_one_search_per_level(self, make_tool):
+        """Test each level is fetched with a single batched search."""
+        tool, directory = make_tool(build_tree(levels=3, span=3))
+
+        chart = tool.build_organization_chart("root", max_depth=3)
+
+        assert tool._count_nodes(chart) == 1 + 3 + 9 + 27
+        # Root lookup plus one search per level
+        assert len(directory.filters) == 4
+        first_report = chart["direct_reports"][0]
+        assert first_report["level"] == 1
+        assert first_report["person"]["uid"] == "p0"
+        assert [c["person"]["uid"] for c in first_report["direct_reports"]] == [
+            "p0-0",
+            "p0-1",
+            "p0-2",
+        ]
+        assert all(
+            not leaf["direct_reports"]
+            for leaf in first_report["direct_reports"][0]["direct_reports"]
+        )
+
+    def test_wide_levels_are_chunked(self, make_tool):
+        """Test levels wider than the filter limit are split across searches."""
+        span = MAX_FILTER_VALUES + 10
+        tool, directory = make_tool(build_tree(levels=2, span=span))
+
+        chart = tool.build_organization_chart("root", max_depth=2)
+
+        assert tool._count_nodes(chart) == 1 + span + span * span
+        assert len(directory.filters) == 1 + 1 + 2
+        assert all(f.count("(manager=") <= MAX_FILTER_VALUES for f in directory.filters)
+
+    def test_failed_chunk_only_loses_its_managers(self, make_tool):
+        """Test a failed batched search leaves the other chunks' reports in place."""
+        span = MAX_FILTER_VALUES + 10
+        tool, directory = make_tool(build_tree(levels=2, span=span))
+        searches = []
+
+        def search(**kwargs):
+            searches.append(kwargs)
+            if len(searches) == 3:
+                raise Exception("Server busy")
+            return directory.search(**kwargs)
+
+        tool.connector.search.side_effect = search
+
+        chart = tool.build_organization_chart("root", max_depth=2)
+
+        # The first chunk of the second level failed; the second chunk's reports remain
+        assert tool._count_nodes(chart) == 1 + span + 10 * span
+        report_counts = [len(child["direct_reports"]) for child in chart["direct_reports"]]
+        assert report_counts == [0] * MAX_FILTER_VALUES + [span] * 10
+
+    def test_self_managed_top(self, make_tool):
+        """Test a self-managed root is not listed as its own report."""
+        tool, _ = make_tool({"root": "root", "a": "root"})
+
+        chart = tool.build_organization_chart("root", max_depth=3)
+
+        assert [c["person"]["uid"] for c in chart["direct_reports"]] == ["a"]
+        assert tool._count_nodes(chart) == 2
+
+    def test_reporting_cycle_terminates(self, make_tool):
+        """Test a manager cycle lists each person once."""
+        tool, _ = make_tool({"root": "c", "a": "root", "c": "a"})
+
+        chart = tool.build_organization_chart("root", max_depth=10)
+
+        assert tool._count_nodes(chart) == 3
+
+    def test_team_structure_single_batched_search(self, make_tool):
+        """Test peers and direct reports come from one search."""
+        tool, directory = make_tool({"root": None, "a": "root", "b": "root", "c": "a"})
+
+        team = tool.get_team_structure("a")
+
+        assert team["manager"]["uid"] == "root"
+        assert [peer["uid"] for peer in team["peers"]] == ["b"]
+        assert [report["uid"] for report in team["direct_reports"]] == ["c"]
+        # Person lookup, manager lookup and one batched reports search
+        assert len(directory.filters) == 3
+
+    def test_reports_and_team_fields_projection(self, make_tool):
+        """Test reports and team members are fetched and returned with the requested fields."""
+        tool, _ = make_tool({"root": None, "a": "root", "b": "root", "c": "a"})
+
+        assert tool.find_direct_reports("root", fields=["title"]) == [
+            {"uid": "a", "cn": "A"},
+            {"uid": "b", "cn": "B"},
+        ]
+        team = tool.get_team_structure("a", fields=["title"])
+
+        assert team == {
+            "person": {"uid": "a", "cn": "A"},
+            "manager": {"uid": "root", "cn": "Root"},
+            "peers": [{"uid": "b", "cn": "B"}],
+            "direct_reports": [{"uid": "c", "cn": "C"}],
+        }
+        # The traversal still fetched the DNs and managers it walks
+        attributes = tool.connector.search.call_args.kwargs["attributes"]
+        assert {"manager", "title"} <= set(attributes)
+
+
+class TestOrganizationGraph:
+    """Test organization queries served from the in-memory org graph."""
+
+    @pytest.fixture
+    def graph_tool(self, make_tool):
+        """Organization tool with the org graph enabled."""
+        return make_tool(
+            {"root": "root", "a": "root", "b": "root", "c": "a", "d": "c"},
+            PerformanceConfig(org_graph_enabled=True),
+        )
+
+    def test_queries_after_build_skip_ldap(self, graph_tool):
+        """Test chains, reports, teams and charts need no searches once built."""
+        tool, directory = graph_tool
+
+        assert [m["uid"] for m in tool.get_manager_chain("d")] == ["c", "a", "root"]
+        searches_after_build = len(directory.filters)
+
+        assert [r["uid"] for r in tool.find_direct_reports("root")] == ["a", "b"]
+        team = tool.get_team_structure("a")
+        assert team["manager"]["uid"] == "root"
+        assert [peer["uid"] for peer in team["peers"]] == ["b"]
+        assert [report["uid"] for report in team["direct_reports"]] == ["c"]
+        assert tool.find_common_manager("d", "b")["uid"] == "root"
+        assert tool._count_nodes(tool.build_organization_chart("root", max_depth=2)) == 4
+        assert tool.find_direct_reports("root", fields=["mail"]) == [
+            {"uid": "a", "cn": "A"},
+            {"uid": "b", "cn": "B"},
+        ]
+        assert tool.get_team_structure("a", fields=[])["manager"] == {"uid": "root", "cn": "Root"}
+
+        assert len(directory.filters) == searches_after_build == 1
+
+    def test_unknown_person_falls_back_to_ldap(self, graph_tool):
+        """Test people missing from the graph are looked up in LDAP."""
+        tool, directory = graph_tool
+        tool.get_manager_chain("d")
+
+        assert tool.get_manager_chain("new-hire") == []
+        assert "(uid=new-hire)" in directory.filters
+
+
+class TestCommonManagers:
+    """Test bulk common-manager and org distance queries."""
+
+    MANAGERS = {"root": "root", "a": "root", "b": "root", "c": "a", "d": "a", "e": "b"}
+
+    def test_bulk_common_managers_without_graph(self, make_tool):
+        """Test each person's chain is fetched once for many pairs."""
+        tool, directory = make_tool(self.MANAGERS)
+
+        results = tool.find_common_managers([("c", "d"), ("c", "e"), ("d", "e"), ("c", "x")])
+
+        assert [r["uid"] if r else None for r in results] == ["a", "root", "root", None]
+        # Person lookups for c, d, e and x, plus DN lookups for the chain members
+        assert sum(f.startswith("(uid=") for f in directory.filters) == 4
+
+    def test_org_distances(self, make_tool):
+        """Test pairwise distances are reported for resolved people."""
+        tool, _ = make_tool(self.MANAGERS, PerformanceConfig(org_graph_enabled=True))
+
+        result = tool.get_org_distances(["c", "d", "e", "nobody"])
+
+        assert result["people"] == ["c", "d", "e"]
+        assert result["unresolved"] == ["nobody"]
+        distances = {(p["person1"], p["person2"]): p["distance"] for p in result["pairs"]}
+        assert distances == {("c", "d"): 2, ("c", "e"): 4, ("d", "e"): 4}
+        assert result["max_distance"] == 4
@@ -0,0 +1,262 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Tests for cursor pagination with virtual list view and open paged searches."""
+
+from unittest.mock import Mock, patch
+
+import pytest
+from pyasn1.codec.ber import decoder, encoder
+from redhat_ldap_mcp.config.models import LDAPConfig, PerformanceConfig, SecurityConfig
+from redhat_ldap_mcp.core.ldap_connector import LDAPConnector
+from redhat_ldap_mcp.core.paging import (
+    PAGED_RESULTS_OID,
+    SORT_REQUEST_OID,
+    VLV_REQUEST_OID,
+    VLV_RESPONSE_OID,
+    OpenCursor,
+    OpenCursorStore,
+    VirtualListViewRequest,
+    VirtualListViewResponse,
+    decode_cursor,
+    decode_vlv_response,
+    encode_cursor,
+    sort_control,
+    vlv_request_control,
+)
+
+BASE = "ou=people,dc=test,dc=com"
+FILTER = "(objectClass=person)"
+
+
+class TestPagingMessages:
+    """Test BER encoding of the sort and VLV controls, and cursor tokens."""
+
+    def test_sort_control(self):
+        """Test a single ascending key encodes as SEQUENCE OF SEQUENCE { attributeType }."""
+        assert sort_control(["cn"]) == (SORT_REQUEST_OID, False, bytes.fromhex("300630040402636e"))
+        assert sort_control(["cn"], criticality=True)[1] is True
+
+    def test_vlv_request_control(self):
+        """Test a page is requested by 1-based offset with a zero content count."""
+        assert vlv_request_control(11, 10, b"x") == (
+            VLV_REQUEST_OID,
+            True,
+            bytes.fromhex("3011020100020109a00602010b020100040178"),
+        )
+
+    def test_decode_vlv_response(self):
+        """Test position, count, result and the optional context ID decode."""
+        assert decode_vlv_response(bytes.fromhex("300d02010b0201280a010004026162")) == (
+            11,
+            40,
+            0,
+            b"ab",
+        )
+        assert decode_vlv_response(bytes.fromhex("3009020100020100" + "0a0135"))[2:] == (53, None)
+
+    def test_cursor_round_trip(self):
+        """Test cursors are opaque tokens that decode back, and garbage is rejected."""
+        token = encode_cursor({"q": "abc", "o": 20})
+        assert "{" not in token
+        assert decode_cursor(token) == {"q": "abc", "o": 20}
+
+        for bad in ("not a cursor!", encode_cursor({"q": "abc"}), encode_cursor([1])):
+            with pytest.raises(ValueError, match="Invalid cursor"):
+                decode_cursor(bad)
+
+
+class TestOpenCursorStore:
+    """Test the bounded, expiring store of open paged searches."""
+
+    def cursor(self, offset=10):
+        """Create an open cursor on a mock connection."""
+        return OpenCursor(Mock(), b"cookie", "q", offset, BASE, FILTER)
+
+    def test_take_removes_cursor(self):
+        """Test a cursor can be taken back once."""
+        closed = []
+        store = OpenCursorStore(closed.append, max_size=2)
+        cursor = self.cursor()
+
+        key = store.put(cursor)
+
+        assert store.take(key) is cursor
+        assert store.take(key) is None
+        assert closed == []
+
+    def test_oldest_cursor_evicted_when_full(self):
+        """Test opening a cursor past max_size closes the oldest one."""
+        closed = []
+        store = OpenCursorStore(closed.append, max_size=2)
+        first, second, third = self.cursor(), self.cursor(), self.cursor()
+
+        first_key = store.put(first)
+        store.put(second)
+        store.put(third)
+
+        assert closed == [first]
+        assert store.take(first_key) is None
+        assert store.stats() == {"open": 2, "opened": 3, "resumed": 0, "expired": 0, "evicted": 1}
+
+    @patch("redhat_ldap_mcp.core.paging.time.monotonic")
+    def test_cursors_expire(self, mock_monotonic):
+        """Test an unused cursor is closed after the timeout."""
+        mock_monotonic.return_value = 0.0
+        closed = []
+        store = OpenCursorStore(closed.append, timeout=60)
+        cursor = self.cursor()
+        key = store.put(cursor)
+
+        mock_monotonic.return_value = 61.0
+        store.expire()
+
+        assert closed == [cursor]
+        assert store.take(key) is None
+
+
+class FakeDirectory:
+    """Mock connection over 25 sorted people, answering paged and VLV searches."""
+
+    def __init__(self, controls=()):
+        """Create the connection, advertising the given control OIDs."""
+        self.people = [f"user{i:02d}" for i in range(25)]
+        self.connection = Mock()
+        self.connection.server.info.supported_features = []
+        self.connection.server.info.supported_extensions = []
+        self.connection.server.info.supported_controls = [(oid, "") for oid in controls]
+        self.connection.search.side_effect = self.search
+        self.returned = 0
+
+    def entries(self, start, end):
+        """Return searchResEntry items for a slice of the people."""
+        return [
+            {"type": "searchResEntry", "dn": f"uid={uid},{BASE}", "attributes": {"uid": uid}}
+            for uid in self.people[start:end]
+        ]
+
+    def search(self, paged_size=None, paged_cookie=None, controls=None, **kwargs):
+        """Serve a page by paged results cookie or by VLV offset."""
+        vlv = dict((oid, value) for oid, _, value in controls or []).get(VLV_REQUEST_OID)
+        if vlv:
+            request, _ = decoder.decode(vlv, asn1Spec=VirtualListViewRequest())
+            offset = int(request["target"]["byOffset"]["offset"])
+            end = offset + int(request["afterCount"])
+            response = VirtualListViewResponse()
+            response["targetPosition"] = offset
+            response["contentCount"] = len(self.people)
+            response["virtualListViewResult"] = 0
+            response["contextID"] = b"ctx"
+            self.connection.response = self.entries(offset - 1, end)
+            self.connection.result = {
+                "result": 0,
+                "controls": {VLV_RESPONSE_OID: {"value": encoder.encode(response)}},
+            }
+        else:
+            start = int(paged_cookie or 0)
+            end = start + paged_size
+            cookie = str(end).encode() if paged_size and end < len(self.people) else b""
+            self.connection.response = self.entries(start, end) if paged_size else []
+            self.connection.result = {
+                "result": 0,
+                "controls": {PAGED_RESULTS_OID: {"value": {"size": 0, "cookie": cookie}}},
+            }
+        self.returned += len(self.connection.response)
+        return True
+
+
+class TestSearchPage:
+    """Test LDAPConnector.search_page over VLV and over paged results."""
+
+    def setup_method(self):
+        """Set up a connector with room for open cursors."""
+        self.connector = LDAPConnector(
+            LDAPConfig(server="ldap://test.com", base_dn="dc=test,dc=com"),
+            SecurityConfig(),
+            PerformanceConfig(pool_max_size=4),
+        )
+
+    def read_all(self, page_size=10):
+        """Read every page, returning the uids per page and the totals."""
+        pages, totals, cursor = [], [], None
+        while True:
+            entries, cursor, total = self.connector.search_page(
+                BASE, FILTER, ["uid", "cn"], page_size=page_size, cursor=cursor
+            )
+            pages.append([entry["attributes"]["uid"] for entry in entries])
+            totals.append(total)
+            if cursor is None:
+                return pages, totals
+
+    @patch.object(LDAPConnector, "release")
+    @patch.object(LDAPConnector, "connect")
+    def test_vlv_pages_by_offset(self, mock_connect, mock_release):
+        """Test each page is one sorted VLV request for its offset, holding nothing open."""
+        directory = FakeDirectory(controls=(SORT_REQUEST_OID, VLV_REQUEST_OID))
+        mock_connect.return_value = directory.connection
+
+        pages, totals = self.read_all()
+
+        assert [len(page) for page in pages] == [10, 10, 5]
+        assert pages[2][0] == "user20"
+        assert totals == [25, 25, 25]
+        # Deep pages cost one page of entries, not the prefix
+        assert directory.returned == 25
+        last = directory.connection.search.call_args.kwargs["controls"]
+        assert last[0] == sort_control(["cn"], criticality=True)
+        assert last[1] == vlv_request_control(21, 10, b"ctx")
+        assert mock_release.call_count == 3
+        assert self.connector.cursor_stats()["open"] == 0
+
+    @patch.object(LDAPConnector, "release")
+    @patch.object(LDAPConnector, "connect")
+    def test_paged_search_kept_open_between_pages(self, mock_connect, mock_release):
+        """Test without VLV the paged search continues on its connection from the cookie."""
+        directory = FakeDirectory()
+        mock_connect.return_value = directory.connection
+
+        entries, cursor, _ = self.connector.search_page(BASE, FILTER, page_size=10)
+        assert self.connector.cursor_stats()["open"] == 1
+        mock_release.assert_not_called()
+
+        entries, cursor, _ = self.connector.search_page(BASE, FILTER, page_size=10, cursor=cursor)
+
+        assert entries[0]["attributes"]["uid"] == "user10"
+        assert mock_connect.call_count == 1
+        assert directory.connection.search.call_args.kwargs["paged_cookie"] == b"10"
+        assert directory.returned == 20
+        # No sort control for a server that does not advertise it
+        assert directory.connection.search.call_args.kwargs["controls"] is None
+
+        entries, cursor, _ = self.connector.search_page(BASE, FILTER, page_size=10, cursor=cursor)
+        assert len(entries) == 5 and cursor is None
+        mock_release.assert_called_once_with(directory.connection, discard=False)
+
+    @patch.object(LDAPConnector, "release")
+    @patch.object(LDAPConnector, "connect")
+    def test_reused_cursor_restarts_and_skips(self, mock_connect, mock_release):
+        """Test a cursor whose search was taken restarts and skips what was returned."""
+        directory = FakeDirectory()
+        mock_connect.return_value = directory.connection
+        _, cursor, _ = self.connector.search_page(BASE, FILTER, page_size=10)
+        self.connector.search_page(BASE, FILTER, page_size=10, cursor=cursor)
+
+        # The same page again: the open search has moved on, so start over
+        directory.connection.search.reset_mock()
+        entries, _, _ = self.connector.search_page(BASE, FILTER, page_size=10, cursor=cursor)
+
+        assert [entry["attributes"]["uid"] for entry in entries][:2] == ["user10", "user11"]
+        skip_call = directory.connection.search.call_args_list[0]
+        assert (skip_call.kwargs["paged_size"], skip_call.kwargs["paged_cookie"]) == (10, None)
+
+    @patch.object(LDAPConnector, "connect")
+    def test_cursor_of_another_search_rejected(self, mock_connect):
+        """Test a cursor only resumes the search it came from."""
+        mock_connect.return_value = FakeDirectory().connection
+        _, cursor, _ = self.connector.search_page(BASE, FILTER, page_size=10)
+
+        with pytest.raises(ValueError, match="different search"):
+            self.connector.search_page(BASE, "(uid=a*)", page_size=10, cursor=cursor)
@@ -0,0 +1,121 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Tests for bulk person lookups."""
+
+import re
+import threading
+from unittest.mock import Mock
+
+import pytest
+from ldap3.core.exceptions import LDAPException
+from redhat_ldap_mcp.config.models import PerformanceConfig
+from redhat_ldap_mcp.tools.people_search import PeopleSearchTool
+
+PEOPLE_BASE = "ou=users,dc=redhat,dc=com"
+
+
+def person_entry(uid, base=PEOPLE_BASE):
+    """Create a raw person entry."""
+    return {
+        "dn": f"uid={uid},{base}",
+        "attributes": {"uid": uid, "cn": uid.title(), "mail": f"{uid}@redhat.com"},
+    }
+
+
+class FakeDirectory:
+    """Answers DN, uid, mail and OR-ed uid or mail searches over a fixed set of entries."""
+
+    def __init__(self, entries):
+        """
+        Args:
+            entries: Raw entries
+        """
+        self.entries = {entry["dn"].lower(): entry for entry in entries}
+        self.searches = []
+        self.lock = threading.Lock()
+        self.fail = None
+
+    def search(self, search_base, search_filter, **kwargs):
+        """Evaluate a search the way the tools issue them."""
+        with self.lock:
+            self.searches.append((search_base, search_filter))
+        if self.fail and self.fail in search_filter:
+            raise LDAPException("adminLimitExceeded")
+        if search_base.lower() in self.entries:
+            return [self.entries[search_base.lower()]]
+
+        matches = []
+        for attribute in ("uid", "mail"):
+            values = {
+                value.lower() for value in re.findall(rf"\({attribute}=([^)]+)\)", search_filter)
+            }
+            matches.extend(
+                entry
+                for dn, entry in self.entries.items()
+                if dn.endswith(search_base.lower())
+                and entry["attributes"][attribute].lower() in values
+            )
+        return matches
+
+
+@pytest.fixture
+def tool_and_directory():
+    """Create a PeopleSearchTool over 120 people, one of them outside the people base."""
+    people = [person_entry(f"user{i}") for i in range(120)]
+    directory = FakeDirectory([*people, person_entry("contractor", "ou=external,dc=redhat,dc=com")])
+    connector = Mock()
+    connector.search.side_effect = directory.search
+    connector.ldap_config.schema.corporate_attributes = []
+    connector.ldap_config.schema.redhat_attributes = []
+    connector.performance_config = PerformanceConfig()
+    tool = PeopleSearchTool(connector)
+    tool._get_people_search_base = Mock(return_value=PEOPLE_BASE)
+    return tool, directory
+
+
+class TestGetPeopleDetails:
+    """Test batched resolution of mixed identifiers."""
+
+    def test_batched_lookup_matches_per_person_lookups(self, tool_and_directory):
+        """Test each identifier resolves as get_person_details would, in a few searches."""
+        tool, directory = tool_and_directory
+        identifiers = [
+            *(f"user{i}" for i in range(60)),
+            "USER5",
+            "user7@redhat.com",
+            f"uid=user100,{PEOPLE_BASE}",
+            "uid=contractor,ou=external,dc=redhat,dc=com",
+            "ghost",
+            "user3",
+        ]
+
+        expected = {
+            identifier: person
+            for identifier in dict.fromkeys(identifiers)
+            if (person := tool.get_person_details(identifier))
+        }
+        directory.searches.clear()
+        details = tool.get_people_details(identifiers)
+
+        assert details["people"] == expected
+        assert list(details["people"]) == list(expected)
+        assert details["people"]["USER5"]["uid"] == "user5"
+        assert details["not_found"] == ["ghost"]
+        assert details["errors"] == {}
+        # 2 uid chunks, 1 mail chunk and 1 DN outside the people base
+        assert len(directory.searches) == 4
+
+    def test_failed_chunk_is_reported(self, tool_and_directory):
+        """Test a failing search only fails its own identifiers."""
+        tool, directory = tool_and_directory
+        directory.fail = "(mail="
+
+        details = tool.get_people_details(["user1", "user2@redhat.com"], fields=["title"])
+
+        assert details["people"] == {"user1": {"uid": "user1", "cn": "User1"}}
+        assert details["not_found"] == []
+        assert details["errors"] == {"user2@redhat.com": "adminLimitExceeded"}
@@ -0,0 +1,189 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Tests for the in-memory people index."""
+
+import random
+from unittest.mock import Mock, patch
+
+import pytest
+from redhat_ldap_mcp.config.models import PerformanceConfig
+from redhat_ldap_mcp.core.index_registry import IndexRegistry
+from redhat_ldap_mcp.core.people_index import FIELD_WEIGHTS, PEOPLE_INDEX, PeopleIndex
+from redhat_ldap_mcp.tools.people_search import PeopleSearchTool
+
+FIRST = ["Ana", "Jon", "John", "Johanna", "Wei", "Priya"]
+LAST = ["Smith", "Smythe", "Chen", "Patel", "Johnson"]
+TITLES = ["Engineer", "Senior Engineer", "Manager"]
+
+
+def make_people(count):
+    """Create processed person records."""
+    people = []
+    for i in range(count):
+        first, last = FIRST[i % len(FIRST)], LAST[(i // len(FIRST)) % len(LAST)]
+        people.append(
+            {
+                "uid": f"{first[0].lower()}{last.lower()}{i}",
+                "cn": f"{first} {last}",
+                "given_name": first,
+                "surname": last,
+                "mail": [f"{first.lower()}.{last.lower()}{i}@example.com"],
+                "title": TITLES[i % len(TITLES)],
+            }
+        )
+    return people
+
+
+class TestPeopleIndex:
+    """Test trigram substring search and ranking."""
+
+    def test_matches_brute_force_substring_search(self):
+        """Test results are exactly the people a substring scan finds, up to the limit."""
+        people = make_people(300)
+        index = PeopleIndex(people)
+        rng = random.Random(7)
+        queries = ["smith", "ohn", "engineer", "jsmith1", "wei chen", "example", "zzz"]
+        queries += [p["cn"][1:5] for p in rng.sample(people, 20)]
+
+        for query in queries:
+            for fields in [tuple(FIELD_WEIGHTS), ("uid", "cn"), ("mail",)]:
+                expected = {
+                    id(p)
+                    for p in people
+                    if any(
+                        query.lower() in str(value).lower()
+                        for field in fields
+                        for value in (
+                            p.get(field) if isinstance(p.get(field), list) else [p.get(field)]
+                        )
+                        if value
+                    )
+                }
+                results = index.search(query, fields, len(people))
+                assert {id(p) for p in results} == expected, (query, fields)
+
+    def test_ranking(self):
+        """Test exact beats prefix beats substring, weighted by field."""
+        people = [
+            {"uid": "xjohn", "cn": "Someone Else"},
+            {"uid": "johnson1", "cn": "Johnson One"},
+            {"uid": "john", "cn": "John Doe"},
+            {"uid": "p1", "cn": "Pat", "given_name": "John"},
+            {"uid": "p2", "cn": "Pat", "title": "john"},
+        ]
+        index = PeopleIndex(people)
+
+        results = index.search("John", tuple(FIELD_WEIGHTS), 10)
+
+        assert [p["uid"] for p in results] == ["john", "johnson1", "p1", "xjohn", "p2"]
+        assert [p["uid"] for p in index.search("John", tuple(FIELD_WEIGHTS), 2)] == [
+            "john",
+            "johnson1",
+        ]
+
+    def test_complete(self):
+        """Test prefix completion over uid, mail, cn and later cn words."""
+        people = [
+            {"uid": "jsmith", "cn": "John Smith", "mail": "john.smith@example.com"},
+            {"uid": "smithers", "cn": "Wayland Smithers", "title": "Assistant"},
+            {"uid": "achen", "cn": "Ana Chen", "mail": ["ana@example.com", "achen@example.com"]},
+        ]
+        index = PeopleIndex(people)
+
+        assert [p["uid"] for p in index.complete("Smith", 10)] == ["jsmith", "smithers"]
+        assert [p["uid"] for p in index.complete("john s", 10)] == ["jsmith"]
+        assert [p["uid"] for p in index.complete("ACH", 10)] == ["achen"]
+        assert [p["uid"] for p in index.complete("smithe", 1)] == ["smithers"]
+        assert index.complete("mith", 10) == []
+        assert index.complete("", 10) == []
+
+    def test_short_queries_are_not_answered(self):
+        """Test queries shorter than a trigram fall back to LDAP."""
+        index = PeopleIndex(make_people(10))
+
+        assert index.search("jo", ("cn",), 10) is None
+        assert index.search("qqq", ("cn",), 10) == []
+
+
+@pytest.fixture
+def tool():
+    """Create a PeopleSearchTool with the people index enabled."""
+    connector = Mock()
+    connector.indexes = IndexRegistry()
+    connector.performance_config = PerformanceConfig(people_index_enabled=True)
+    connector.search.return_value = []
+    connector.ldap_config.schema.corporate_attributes = []
+    connector.ldap_config.schema.redhat_attributes = []
+    return PeopleSearchTool(connector)
+
+
+class TestIndexedPeopleSearch:
+    """Test search_people served from the people index."""
+
+    def test_search_uses_index(self, tool):
+        """Test a built index answers searches without LDAP."""
+        tool.connector.indexes.put(PEOPLE_INDEX, PeopleIndex(make_people(30)))
+
+        results = tool.search_people("Smith", max_results=3)
+
+        assert [p["surname"] for p in results] == ["Smith"] * 3
+        tool.connector.search.assert_not_called()
+
+    def test_falls_back_to_ldap_until_built(self, tool):
+        """Test searches go to LDAP while the first sweep runs in the background."""
+        with patch.object(PeopleSearchTool, "_sweep_people", side_effect=RuntimeError("down")):
+            tool.search_people("Smith")
+
+        tool.connector.search.assert_called_once()
+
+    def test_stale_index_is_bypassed(self, tool):
+        """Test an index older than people_index_max_staleness is not used."""
+        index = PeopleIndex(make_people(30))
+        index.built_at -= tool.connector.performance_config.people_index_max_staleness + 1
+        tool.connector.indexes.put(PEOPLE_INDEX, index)
+
+        with patch.object(PeopleSearchTool, "_sweep_people", return_value=[]):
+            tool.search_people("Smith")
+
+        tool.connector.search.assert_called_once()
+
+    def test_query_fields_follow_ldap_filter(self, tool):
+        """Test each query shape searches the same fields as its LDAP filter."""
+        assert tool._query_fields("jon@example.com") == ("mail",)
+        assert tool._query_fields("jsmith") == ("uid", "cn")
+        assert set(tool._query_fields("o'brien")) == set(FIELD_WEIGHTS)
+        assert tool._query_fields("jon smith") == ("cn",)
+
+    def test_autocomplete_projects_fields(self, tool):
+        """Test suggestions carry only uid, cn and title."""
+        tool.connector.indexes.put(PEOPLE_INDEX, PeopleIndex(make_people(30)))
+
+        suggestions = tool.autocomplete_people("jsm", max_results=2)
+
+        assert suggestions == [
+            {"uid": "jsmith1", "cn": "Jon Smith", "title": "Senior Engineer"},
+            {"uid": "jsmith2", "cn": "John Smith", "title": "Manager"},
+        ]
+        tool.connector.search.assert_not_called()
+
+    def test_autocomplete_falls_back_to_prefix_filter(self, tool):
+        """Test without an index, autocomplete sends a prefix filter for three attributes."""
+        tool.connector.performance_config = PerformanceConfig()
+        tool._get_people_search_base = Mock(return_value="ou=users,dc=redhat,dc=com")
+        tool.connector.search.return_value = [
+            {},
+            {
+                "dn": "uid=jsmith,ou=users,dc=redhat,dc=com",
+                "attributes": {"uid": "jsmith", "cn": "J S"},
+            },
+        ]
+
+        assert tool.autocomplete_people("j(s") == [{"uid": "jsmith", "cn": "J S"}]
+        kwargs = tool.connector.search.call_args.kwargs
+        assert "(uid=j\\28s*)" in kwargs["search_filter"]
+        assert "*j" not in kwargs["search_filter"].replace("(cn=* j", "")
+        assert kwargs["attributes"] == ["uid", "cn", "title"]
@@ -0,0 +1,61 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Tests for compact person records."""
+
+import pickle
+
+import pytest
+from redhat_ldap_mcp.core.person import Person, compact_people
+
+
+def record(uid, **fields):
+    """Build a processed person record with fresh (non-shared) strings."""
+    return {
+        "uid": uid,
+        "dn": f"uid={uid},ou=users,dc=example,dc=com",
+        "cn": f"Person {uid}",
+        **{field: "".join(list(value)) for field, value in fields.items()},
+    }
+
+
+class TestPerson:
+    """Test Person records behave like the dictionaries they replace."""
+
+    def test_mapping_behavior(self):
+        """Test lookups, iteration order and conversion match the source record."""
+        source = record("jdoe", title="Engineer", city="Brno")
+        person = Person(source)
+
+        assert person == source
+        assert list(person) == ["uid", "dn", "cn", "title", "city"]
+        assert len(person) == 5
+        assert person["title"] == "Engineer"
+        assert person.get("manager") is None
+        assert person.get("manager", "none") == "none"
+        assert person.get("not_a_field") is None
+        assert person.to_dict() == source
+        assert pickle.loads(pickle.dumps(person)) == source
+        with pytest.raises(KeyError):
+            person["manager"]
+        with pytest.raises(TypeError):
+            person["title"] = "Manager"
+
+    def test_values_are_stored_in_field_order(self):
+        """Test records whose keys are out of field order still look up correctly."""
+        person = Person({"city": "Brno", "uid": "jdoe", "cn": "J Doe"})
+
+        assert person.to_dict() == {"uid": "jdoe", "cn": "J Doe", "city": "Brno"}
+        assert person["city"] == "Brno"
+
+    def test_repeated_values_are_shared(self):
+        """Test a snapshot stores each repeated place or title string once."""
+        people = compact_people(record(f"user{i}", title="Engineer", city="Brno") for i in range(3))
+
+        assert people[0]["city"] is people[1]["city"] is people[2]["city"]
+        assert people[0]["title"] is people[2]["title"]
+        # Unique values are not pooled
+        assert people[0]["uid"] == "user0"
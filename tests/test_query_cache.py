@@ -0,0 +1,220 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Tests for the LDAP query result cache."""
+
+from unittest.mock import patch
+
+from redhat_ldap_mcp.core.cache import QueryCache, estimate_size, make_cache_key
+from redhat_ldap_mcp.core.filters import filter_may_match
+
+PEOPLE_BASE = "ou=people,dc=test,dc=com"
+
+
+def make_entry(uid):
+    """Create a processed search entry."""
+    return {"dn": f"uid={uid},{PEOPLE_BASE}", "attributes": {"uid": uid}}
+
+
+def make_key(search_filter, base=PEOPLE_BASE, scope="SUBTREE"):
+    """Create a cache key for a search, by default a subtree search."""
+    return make_cache_key(base, search_filter, scope, ["uid"], 0)
+
+
+class TestQueryCache:
+    """Test cache expiry, eviction and invalidation."""
+
+    def test_make_cache_key_normalizes_base_and_attributes(self):
+        """Test DN case and attribute order do not produce distinct keys."""
+        first = make_cache_key("OU=People, DC=test,DC=com", "(uid=a)", "SUBTREE", ["uid", "cn"], 0)
+        second = make_cache_key(PEOPLE_BASE, "(uid=a)", "SUBTREE", ["cn", "UID"], 0)
+
+        assert first == second
+        assert first != make_cache_key(PEOPLE_BASE, "(uid=a)", "SUBTREE", ["cn", "uid"], 1)
+
+    def test_hit_returns_copy(self):
+        """Test hits return a fresh list so callers cannot corrupt the cache."""
+        cache = QueryCache()
+        key = make_key("(uid=a)")
+        cache.put(key, [make_entry("a")])
+
+        result = cache.get(key)
+        result.clear()
+
+        assert cache.get(key) == [make_entry("a")]
+        assert cache.stats()["hits"] == 2
+
+    @patch("redhat_ldap_mcp.core.cache.time.monotonic")
+    def test_entries_expire(self, mock_monotonic):
+        """Test positive and negative results expire after their own TTLs."""
+        mock_monotonic.return_value = 0.0
+        cache = QueryCache(ttl=300, negative_ttl=60)
+        found, missing = make_key("(uid=a)"), make_key("(uid=nobody)")
+        cache.put(found, [make_entry("a")])
+        cache.put(missing, [])
+
+        mock_monotonic.return_value = 61.0
+        assert cache.get(missing) is None
+        assert cache.get(found) == [make_entry("a")]
+
+        mock_monotonic.return_value = 301.0
+        assert cache.get(found) is None
+        assert cache.stats()["expirations"] == 2
+
+    @patch("redhat_ldap_mcp.core.cache.time.monotonic")
+    def test_expired_entries_served_stale_within_grace(self, mock_monotonic):
+        """Test get_stale returns expired results until stale_ttl has also passed."""
+        mock_monotonic.return_value = 0.0
+        cache = QueryCache(ttl=300, stale_ttl=600)
+        key = make_key("(uid=a)")
+        cache.put(key, [make_entry("a")])
+
+        mock_monotonic.return_value = 400.0
+        assert cache.get(key) is None
+        assert cache.get_stale(key) == [make_entry("a")]
+
+        mock_monotonic.return_value = 901.0
+        assert cache.get_stale(key) is None
+        assert cache.get(key) is None
+        assert cache.stats()["entries"] == 0
+
+    def test_negative_results_are_cached(self):
+        """Test an empty result is a hit, distinguishable from a miss."""
+        cache = QueryCache()
+        key = make_key("(uid=nobody)")
+        cache.put(key, [])
+
+        assert cache.get(key) == []
+        assert cache.stats()["negative_hits"] == 1
+
+    def test_lru_eviction_by_entry_count(self):
+        """Test the least recently used search is evicted first."""
+        cache = QueryCache(max_entries=2)
+        first, second, third = (make_key(f"(uid={uid})") for uid in "abc")
+        cache.put(first, [make_entry("a")])
+        cache.put(second, [make_entry("b")])
+        cache.get(first)
+
+        cache.put(third, [make_entry("c")])
+
+        assert cache.get(second) is None
+        assert cache.get(first) is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_eviction_by_memory_budget(self):
+        """Test the byte budget bounds the cache and oversized results are skipped."""
+        large = [make_entry(str(i)) for i in range(50)]
+        cache = QueryCache(max_bytes=estimate_size(large) * 3)
+
+        for i in range(10):
+            cache.put(make_key(f"(cn={i}*)"), large)
+        cache.put(make_key("(objectClass=*)"), large * 10)
+
+        stats = cache.stats()
+        assert stats["bytes"] <= cache.max_bytes
+        assert 0 < stats["entries"] < 10
+        assert cache.get(make_key("(objectClass=*)")) is None
+
+    def test_invalidate_dn(self):
+        """Test DN invalidation drops results containing it or searched above it."""
+        cache = QueryCache()
+        contains = make_key("(uid=a)")
+        above = make_key("(uid=nobody)")
+        unrelated = make_key("(cn=*)", base="ou=groups,dc=test,dc=com")
+        cache.put(contains, [make_entry("a")])
+        cache.put(above, [])
+        cache.put(unrelated, [{"dn": "cn=g,ou=groups,dc=test,dc=com", "attributes": {}}])
+
+        removed = cache.invalidate(f"UID=a,{PEOPLE_BASE}")
+
+        assert removed == 2
+        assert cache.get(unrelated) is not None
+
+    def test_invalidate_dn_with_attributes(self):
+        """Test a changed entry only drops searches in scope that it may now match."""
+        cache = QueryCache()
+        other_uid = make_key("(&(objectClass=person)(uid=b))")
+        same_uid = make_key("(&(objectClass=person)(uid=a))")
+        by_title = make_key("(title=Engineer)")
+        base_read = make_key("(objectClass=*)", base=f"uid=b,{PEOPLE_BASE}", scope="BASE")
+        for key in (other_uid, same_uid, by_title, base_read):
+            cache.put(key, [])
+        contains = make_key("(uid=a*)")
+        cache.put(contains, [make_entry("a")])
+
+        removed = cache.invalidate(
+            f"uid=a,{PEOPLE_BASE}", attributes={"objectClass": ["person"], "uid": ["a"]}
+        )
+
+        # uid=a may match, title is unknown, and contains held the entry
+        assert removed == 3
+        assert cache.get(other_uid) == []
+        assert cache.get(base_read) == []
+        assert cache.get(same_uid) is None
+
+    def test_invalidate_dn_ignores_separator_spacing(self):
+        """Test DNs differing in case and spacing after separators still match."""
+        cache = QueryCache()
+        contains = make_key("(uid=a)")
+        below = make_key("(uid=nobody)", base="ou=People, dc=test, dc=com", scope="LEVEL")
+        cache.put(contains, [{"dn": "uid=a, ou=People,dc=test,dc=com", "attributes": {}}])
+        cache.put(below, [])
+
+        assert cache.invalidate("UID=a, ou=people, dc=test,dc=com", deleted=True) == 1
+        assert cache.invalidate("uid=b, OU=People,dc=test, dc=com") == 1
+
+    def test_invalidate_deleted_dn(self):
+        """Test a deleted entry only drops the results that contained it."""
+        cache = QueryCache()
+        above = make_key("(uid=nobody)")
+        contains = make_key("(uid=a)")
+        cache.put(above, [])
+        cache.put(contains, [make_entry("a")])
+
+        assert cache.invalidate(f"uid=a,{PEOPLE_BASE}", deleted=True) == 1
+        assert cache.get(above) == []
+
+    def test_invalidate_all(self):
+        """Test invalidating without a DN clears the cache."""
+        cache = QueryCache()
+        cache.put(make_key("(uid=a)"), [make_entry("a")])
+
+        assert cache.invalidate() == 1
+        assert cache.stats()["entries"] == 0
+        assert cache.stats()["bytes"] == 0
+
+
+class TestFilterMayMatch:
+    """Test the conservative filter check used to scope invalidation."""
+
+    ENTRY = {
+        "objectClass": ["top", "person"],
+        "uid": ["jdoe"],
+        "cn": ["John Doe"],
+        "manager": ["uid=boss, ou=people,dc=test,dc=com"],
+        "title": [],
+    }
+
+    def test_decided_assertions(self):
+        """Test equality, substring and presence assertions on known attributes."""
+        assert filter_may_match("(&(objectClass=person)(uid=JDOE))", self.ENTRY)
+        assert not filter_may_match("(&(objectClass=person)(uid=other))", self.ENTRY)
+        assert filter_may_match("(|(uid=other)(cn=*doe))", self.ENTRY)
+        assert not filter_may_match("(cn=j*smith*)", self.ENTRY)
+        assert not filter_may_match("(!(uid=jdoe))", self.ENTRY)
+        assert not filter_may_match("(title=*)", self.ENTRY)
+        assert not filter_may_match("(uid=jdo\\2a)", self.ENTRY)
+        assert filter_may_match("(manager=uid=boss,ou=people,dc=test,dc=com)", self.ENTRY)
+        assert not filter_may_match("(&(objectClass=person)\n  (|(uid=a)(cn=b)))", self.ENTRY)
+
+    def test_undecided_assertions_may_match(self):
+        """Test unknown attributes, other match types and bad filters never rule an entry out."""
+        assert filter_may_match("(mail=jdoe@test.com)", self.ENTRY)
+        assert not filter_may_match("(&(mail=x)(uid=other))", self.ENTRY)
+        assert filter_may_match("(|(mail=x)(uid=other))", self.ENTRY)
+        assert filter_may_match("(uid>=z)", self.ENTRY)
+        assert filter_may_match("(member:1.2.840.113556.1.4.1941:=uid=a)", self.ENTRY)
+        assert filter_may_match("uid=other", self.ENTRY)
@@ -0,0 +1,236 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Tests for server selection, circuit breakers and replica failover."""
+
+from collections import Counter
+from unittest.mock import Mock, patch
+
+import pytest
+from ldap3.core.exceptions import LDAPSocketOpenError, LDAPSocketReceiveError
+from redhat_ldap_mcp.config.models import LDAPConfig, PerformanceConfig, SecurityConfig
+from redhat_ldap_mcp.core.ldap_connector import LDAPConnector
+from redhat_ldap_mcp.core.server_selector import (
+    DirectoryUnavailableError,
+    ServerSelector,
+    ServerState,
+)
+
+
+def make_servers(*urls):
+    """Create server states with idle mock pools."""
+    servers = []
+    for url in urls:
+        state = ServerState(url, Mock())
+        state.pool = Mock(in_use=0)
+        servers.append(state)
+    return servers
+
+
+class TestServerSelector:
+    """Test selection strategies and health tracking."""
+
+    def test_round_robin_rotates(self):
+        """Test each checkout starts with the next server."""
+        servers = make_servers("ldap://a", "ldap://b", "ldap://c")
+        selector = ServerSelector(servers)
+
+        firsts = [selector.candidates()[0].url for _ in range(4)]
+
+        assert firsts == ["ldap://a", "ldap://b", "ldap://c", "ldap://a"]
+        assert len(selector.candidates()) == 3
+
+    def test_least_outstanding_prefers_idle_servers(self):
+        """Test the server with fewest checked-out connections comes first, ties rotated."""
+        a, b, c = make_servers("ldap://a", "ldap://b", "ldap://c")
+        a.pool.in_use = 3
+        selector = ServerSelector([a, b, c], strategy="least_outstanding")
+
+        firsts = {selector.candidates()[0].url for _ in range(6)}
+
+        assert firsts == {"ldap://b", "ldap://c"}
+        assert selector.candidates()[-1] is a
+
+    def test_latency_weighting_favours_fast_servers(self):
+        """Test a 50x faster server gets almost all first picks, the slow one some."""
+        fast, slow = make_servers("ldap://fast", "ldap://slow")
+        selector = ServerSelector([fast, slow], strategy="latency")
+        selector.record_success(fast, 0.002)
+        selector.record_success(slow, 0.1)
+
+        firsts = Counter(selector.candidates()[0].url for _ in range(2000))
+
+        assert firsts["ldap://fast"] > 1800
+        assert firsts["ldap://slow"] > 0
+
+    def test_failing_server_is_tried_last(self):
+        """Test a server with recent failures is ordered behind clean ones."""
+        a, b = make_servers("ldap://a", "ldap://b")
+        selector = ServerSelector([a, b], failure_threshold=3)
+
+        selector.record_failure(a)
+
+        assert [s.url for s in selector.candidates()] == ["ldap://b", "ldap://a"]
+        assert [s.url for s in selector.candidates()] == ["ldap://b", "ldap://a"]
+        assert selector.stats()["ldap://a"]["circuit"] == "closed"
+
+    @patch("redhat_ldap_mcp.core.server_selector.random.uniform", lambda low, high: high)
+    @patch("redhat_ldap_mcp.core.server_selector.time.monotonic")
+    def test_circuit_opens_half_opens_and_closes(self, mock_monotonic):
+        """Test the breaker rejects while open, allows one trial, and backs off on failure."""
+        mock_monotonic.return_value = 100.0
+        (server,) = make_servers("ldap://a")
+        selector = ServerSelector([server], failure_threshold=2, open_interval=5)
+
+        selector.record_failure(server)
+        selector.record_failure(server)
+        assert selector.candidates() == []
+        assert selector.retry_in() == 5
+
+        # Half-open: exactly one trial, which fails and doubles the interval
+        mock_monotonic.return_value = 105.0
+        assert selector.candidates() == [server]
+        assert selector.candidates() == []
+        selector.record_failure(server)
+        assert selector.stats()["ldap://a"]["retry_in"] == 10
+
+        mock_monotonic.return_value = 115.0
+        assert selector.candidates() == [server]
+        selector.record_success(server)
+
+        stats = selector.stats()["ldap://a"]
+        assert (stats["circuit"], stats["trips"], stats["rejected"]) == ("closed", 2, 2)
+        assert selector.candidates() == [server]
+
+    def test_latency_is_averaged(self):
+        """Test latency samples form a moving average reported in milliseconds."""
+        (server,) = make_servers("ldap://a")
+        selector = ServerSelector([server])
+
+        selector.record_success(server, 0.010)
+        selector.record_success(server, 0.020)
+
+        assert selector.stats()["ldap://a"]["latency_ms"] == pytest.approx(12.0)
+
+    def test_unknown_strategy(self):
+        """Test an unknown strategy is rejected."""
+        with pytest.raises(ValueError, match="Unknown server selection strategy"):
+            ServerSelector(make_servers("ldap://a"), strategy="random")
+
+
+class TestReplicaFailover:
+    """Test the connector spreading connections over replicas."""
+
+    def setup_method(self):
+        """Set up a server with two replicas."""
+        self.ldap_config = LDAPConfig(
+            server="ldap://primary",
+            replicas=["ldap://replica1", "ldap://replica2"],
+            base_dn="dc=test,dc=com",
+        )
+        self.performance_config = PerformanceConfig(max_retries=3, retry_delay=5)
+
+    def connection_factory(self, down=()):
+        """Patchable Connection class creating a bound mock per server, refusing down ones."""
+
+        def create(server, **kwargs):
+            if server.host in down:
+                raise LDAPSocketOpenError("connection refused")
+            connection = Mock(bound=True, closed=False)
+            connection.server = server
+            connection.search.return_value = True
+            return connection
+
+        return Mock(side_effect=create)
+
+    def test_requests_spread_over_replicas(self):
+        """Test round robin checkouts use every server."""
+        connector = LDAPConnector(self.ldap_config, SecurityConfig(), self.performance_config)
+
+        with patch("redhat_ldap_mcp.core.ldap_connector.Connection", self.connection_factory()):
+            hosts = []
+            for _ in range(3):
+                with connector.connection() as connection:
+                    hosts.append(connection.server.host)
+
+        assert sorted(hosts) == ["primary", "replica1", "replica2"]
+        assert connector.server_stats()["ldap://primary"]["requests"] == 1
+
+    @patch("redhat_ldap_mcp.core.ldap_connector.time.sleep")
+    def test_down_server_fails_over_without_retry_delay(self, mock_sleep):
+        """Test an unreachable server is skipped at once and then avoided."""
+        connector = LDAPConnector(self.ldap_config, SecurityConfig(), self.performance_config)
+        factory = self.connection_factory(down={"primary"})
+
+        with patch("redhat_ldap_mcp.core.ldap_connector.Connection", factory):
+            hosts = []
+            for _ in range(4):
+                with connector.connection() as connection:
+                    hosts.append(connection.server.host)
+
+        assert "primary" not in hosts
+        mock_sleep.assert_not_called()
+        stats = connector.server_stats()
+        assert stats["ldap://primary"]["consecutive_failures"] == 1
+        assert connector.pool_stats()["size"] == 2
+
+    def test_stream_connection_fails_over(self):
+        """Test the change feed's connection skips servers that refuse it, then fails clearly."""
+        connector = LDAPConnector(
+            self.ldap_config,
+            SecurityConfig(),
+            PerformanceConfig(circuit_breaker_threshold=1, circuit_breaker_open_interval=30),
+        )
+        factory = self.connection_factory(down={"primary", "replica1"})
+
+        with patch("redhat_ldap_mcp.core.ldap_connector.Connection", factory):
+            connection = connector.open_stream_connection()
+            assert connection.server.host == "replica2"
+            connection.bind.assert_called_once()
+
+            # Every circuit is open once replica2 refuses too
+            factory.side_effect = LDAPSocketOpenError("connection refused")
+            with pytest.raises(DirectoryUnavailableError, match="connection refused"):
+                connector.open_stream_connection()
+            with pytest.raises(DirectoryUnavailableError, match="circuit open"):
+                connector.open_stream_connection()
+
+
+class TestDirectoryOutage:
+    """Test failing fast and serving stale results while the directory is down."""
+
+    @patch("redhat_ldap_mcp.core.cache.time")
+    @patch("redhat_ldap_mcp.core.ldap_connector.Connection")
+    def test_open_circuit_serves_stale_results(self, mock_connection_class, mock_cache_time):
+        """Test an outage opens the circuit, then cached searches go stale instead of failing."""
+        mock_cache_time.monotonic.return_value = 0.0
+        connection = Mock(bound=True, closed=False)
+        connection.search.return_value = True
+        connection.result = {"result": 0, "controls": {}}
+        connection.response = [
+            {"type": "searchResEntry", "dn": "uid=ana,dc=test,dc=com", "attributes": {"uid": "ana"}}
+        ]
+        mock_connection_class.return_value = connection
+        connector = LDAPConnector(
+            LDAPConfig(server="ldap://test.com", base_dn="dc=test,dc=com"),
+            SecurityConfig(),
+            PerformanceConfig(max_retries=1, circuit_breaker_threshold=1, cache_timeout=60),
+        )
+        fresh = connector.search("dc=test,dc=com", "(uid=ana)")
+
+        # The server goes away once the cached result has expired
+        connection.search.side_effect = LDAPSocketReceiveError("connection reset")
+        mock_connection_class.side_effect = LDAPSocketOpenError("connection refused")
+        mock_cache_time.monotonic.return_value = 120.0
+
+        assert connector.search("dc=test,dc=com", "(uid=ana)") == fresh
+        assert connector.server_stats()["ldap://test.com"]["circuit"] == "open"
+
+        mock_connection_class.reset_mock()
+        with pytest.raises(DirectoryUnavailableError, match="circuit open"):
+            connector.search("dc=test,dc=com", "(uid=bo)")
+        mock_connection_class.assert_not_called()
+        assert connector.cache_stats()["stale_hits"] == 1
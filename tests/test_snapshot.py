@@ -0,0 +1,188 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Tests for the local directory snapshot."""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock
+
+import pytest
+from redhat_ldap_mcp.config.models import PerformanceConfig
+from redhat_ldap_mcp.core.index_registry import IndexRegistry
+from redhat_ldap_mcp.core.snapshot import DirectorySnapshot, generalized_time
+from redhat_ldap_mcp.tools.groups import GroupsTool
+from redhat_ldap_mcp.tools.people_search import PEOPLE_SNAPSHOT, PeopleSearchTool
+
+
+def entry(uid, stamp, **attributes):
+    """Build a raw person entry modified at the given GeneralizedTime."""
+    return {
+        "dn": f"uid={uid},ou=users,dc=example,dc=com",
+        "attributes": {"uid": uid, "cn": uid.title(), "modifyTimestamp": stamp, **attributes},
+    }
+
+
+class FakeDirectory:
+    """Fetch callable answering modifyTimestamp>= queries from a list of entries."""
+
+    def __init__(self, entries):
+        """Initialize with raw entries."""
+        self.entries = entries
+        self.calls = []
+
+    def __call__(self, since):
+        """Return the entries modified at or after since (all for None)."""
+        self.calls.append(since)
+        return [
+            e for e in self.entries if since is None or e["attributes"]["modifyTimestamp"] >= since
+        ]
+
+
+def process(raw):
+    """Store the uid and cn, searchable by cn."""
+    record = {"uid": raw["attributes"]["uid"], "cn": raw["attributes"]["cn"]}
+    return record, record["cn"].lower()
+
+
+class TestDirectorySnapshot:
+    """Test full and incremental syncs and reads."""
+
+    def test_incremental_sync_fetches_changes_only(self):
+        """Test an incremental sync asks for entries since the newest timestamp seen."""
+        directory = FakeDirectory([entry("ana", "20240101000000Z"), entry("bo", "20240301000000Z")])
+        snapshot = DirectorySnapshot(":memory:")
+
+        stats = snapshot.sync("people", directory, process, full=True)
+        assert stats["fetched"] == 2
+
+        directory.entries[0] = entry("ana", "20240401000000Z", cn="Anna")
+        directory.entries.append(entry("cy", "20240402000000Z"))
+        stats = snapshot.sync("people", directory, process)
+
+        assert directory.calls == [None, "20240301000000Z"]
+        # bo is refetched at the boundary second; ana's entry keeps its place
+        assert stats["fetched"] == 3
+        assert [p["cn"] for p in snapshot.load("people")] == ["Anna", "Bo", "Cy"]
+        assert snapshot.get("people", "UID=ana,ou=users,dc=example,dc=com")["cn"] == "Anna"
+        assert snapshot.search("people", "AN", 10) == [{"uid": "ana", "cn": "Anna"}]
+        assert snapshot.stats()["kinds"]["people"]["watermark"] == "20240402000000Z"
+
+    def test_full_sync_drops_deleted_entries(self):
+        """Test entries missing from a full sync are removed."""
+        directory = FakeDirectory([entry("ana", "20240101000000Z"), entry("bo", "20240101000000Z")])
+        snapshot = DirectorySnapshot(":memory:")
+        snapshot.sync("people", directory, process, full=True)
+
+        del directory.entries[0]
+        stats = snapshot.sync("people", directory, process, full=True)
+
+        assert stats["removed"] == 1
+        assert [p["uid"] for p in snapshot.load("people")] == ["bo"]
+
+    def test_refresh_schedule_and_failures(self):
+        """Test refresh syncs only when due and keeps serving the snapshot on failure."""
+        directory = FakeDirectory([entry("ana", "20240101000000Z")])
+        snapshot = DirectorySnapshot(":memory:")
+
+        with pytest.raises(RuntimeError):
+            snapshot.refresh("people", Mock(side_effect=RuntimeError("down")), process, 60, 3600)
+
+        snapshot.refresh("people", directory, process, 60, 3600)
+        snapshot.refresh("people", directory, process, 60, 3600)
+        assert directory.calls == [None]
+
+        snapshot.refresh("people", directory, process, 0, 3600)
+        snapshot.refresh("people", directory, process, 0, 0)
+        assert directory.calls == [None, "20240101000000Z", None]
+
+        snapshot.refresh("people", Mock(side_effect=RuntimeError("down")), process, 0, 3600)
+        assert snapshot.load("people") == [{"uid": "ana", "cn": "Ana"}]
+
+        stats = snapshot.stats()
+        assert (stats["full_syncs"], stats["incremental_syncs"], stats["failed_syncs"]) == (2, 1, 2)
+
+    def test_reopened_snapshot_syncs_incrementally(self, tmp_path):
+        """Test a restarted server keeps its snapshot and only fetches changes."""
+        path = str(tmp_path / "snapshot.db")
+        directory = FakeDirectory([entry("ana", "20240101000000Z")])
+        DirectorySnapshot(path).refresh("people", directory, process, 0, 3600)
+
+        snapshot = DirectorySnapshot(path)
+        assert snapshot.load("people") == [{"uid": "ana", "cn": "Ana"}]
+        snapshot.refresh("people", directory, process, 0, 3600)
+
+        assert directory.calls == [None, "20240101000000Z"]
+
+    def test_generalized_time(self):
+        """Test datetimes and strings normalize to comparable UTC strings."""
+        cest = timezone(timedelta(hours=2))
+
+        assert generalized_time(datetime(2024, 5, 1, 14, 0, 0, 500, tzinfo=cest)) == (
+            "20240501120000Z"
+        )
+        assert generalized_time(["20240501120000.0Z"]) == "20240501120000Z"
+        assert generalized_time(None) is None
+        assert generalized_time("yesterday") is None
+
+
+@pytest.fixture
+def connector():
+    """Create a mock connector with an in-memory snapshot."""
+    connector = Mock()
+    connector.indexes = IndexRegistry()
+    connector.performance_config = PerformanceConfig(snapshot_path=":memory:")
+    connector.snapshot = DirectorySnapshot(":memory:")
+    connector.ldap_config.schema.person_search_base = "ou=users,dc=example,dc=com"
+    connector.ldap_config.schema.group_search_base = "ou=groups,dc=example,dc=com"
+    connector.ldap_config.schema.corporate_attributes = []
+    connector.ldap_config.schema.redhat_attributes = []
+    return connector
+
+
+class TestSnapshotTools:
+    """Test tools reading from the snapshot."""
+
+    def test_people_sweep_reads_snapshot(self, connector):
+        """Test index builds sync the people snapshot and then read it."""
+        connector.iter_search.return_value = [entry("ana", "20240101000000Z")]
+        tool = PeopleSearchTool(connector)
+
+        people = tool._sweep_people()
+
+        assert [person["uid"] for person in people] == ["ana"]
+        assert "modifyTimestamp" in connector.iter_search.call_args.kwargs["attributes"]
+        assert connector.snapshot.load(PEOPLE_SNAPSHOT)[0]["cn"] == "Ana"
+
+        # Within snapshot_sync_interval, rebuilds do not touch LDAP
+        connector.iter_search.reset_mock()
+        assert len(tool._sweep_people()) == 1
+        connector.iter_search.assert_not_called()
+
+    def test_groups_served_from_snapshot(self, connector):
+        """Test group search and member lookup use the snapshot instead of searches."""
+        connector.iter_search.return_value = [
+            {
+                "dn": "cn=eng,ou=groups,dc=example,dc=com",
+                "attributes": {
+                    "cn": "eng",
+                    "description": "Engineering",
+                    "memberUid": ["ana"],
+                    "modifyTimestamp": "20240101000000Z",
+                },
+            }
+        ]
+        connector.search.return_value = []
+        tool = GroupsTool(connector)
+
+        groups = tool.search_groups("ENGIN")
+
+        assert [(g["cn"], g["member_count"]) for g in groups] == [("eng", 1)]
+        assert tool.search_groups("nothing") == []
+        connector.search.assert_not_called()
+
+        tool._resolve_member_uids = Mock(return_value={"ana": {"uid": "ana", "cn": "Ana"}})
+        assert tool.get_group_members("eng") == [{"uid": "ana", "cn": "Ana"}]
+        connector.search.assert_not_called()
@@ -0,0 +1,273 @@
+# # Copyright (c) 2024 Red Hat LDAP MCP
+# # SPDX-License-Identifier: MIT
+# #
+# # Red Hat LDAP Model Context Protocol (MCP) Server
+# # Provides LDAP integration for corporate directory services
+
+"""Tests for the syncrepl change feed."""
+
+import threading
+import uuid
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+from redhat_ldap_mcp.core.syncrepl import (
+    CHANGE_MATCH_ATTRIBUTES,
+    SYNC_INFO_OID,
+    SYNC_REFRESH_REQUIRED,
+    SYNC_REQUEST_OID,
+    SYNC_STATE_OID,
+    SyncReplConsumer,
+    decode_sync_info,
+    decode_sync_state,
+    sync_request_control,
+)
+
+UUID = bytes(range(16))
+
+
+def state_value(state, cookie=b"", entry_uuid=UUID):
+    """Hand-encode a syncStateValue (state is the ENUMERATED number)."""
+    body = bytes([0x0A, 0x01, state, 0x04, 0x10]) + entry_uuid
+    if cookie:
+        body += bytes([0x04, len(cookie)]) + cookie
+    return bytes([0x30, len(body)]) + body
+
+
+def entry_uuid(name):
+    """Return a fixed 16-byte entryUUID for a name."""
+    return name.encode().ljust(16, b"-")
+
+
+def entry(dn, state, cookie=b"", uuid_name=None):
+    """Build a searchResEntry as ldap3 hands it to the stream callback."""
+    value = state_value(state, cookie, entry_uuid(uuid_name or dn.split(",")[0]))
+    return {
+        "type": "searchResEntry",
+        "dn": dn,
+        "attributes": {},
+        "controls": {SYNC_STATE_OID: {"criticality": False, "value": value}},
+    }
+
+
+def info(value):
+    """Build a Sync Info intermediate response."""
+    return {"type": "intermediateResponse", "responseName": SYNC_INFO_OID, "responseValue": value}
+
+
+# refreshPresent with refreshDone defaulted to TRUE, then refreshDelete done
+REFRESH_PRESENT_DONE = bytes.fromhex("a200")
+REFRESH_DELETE_DONE = bytes.fromhex("a100")
+NEW_COOKIE = bytes.fromhex("80026333")  # newcookie "c3"
+
+
+class TestSyncMessages:
+    """Test BER encoding and decoding of the sync controls."""
+
+    def test_request_control(self):
+        """Test the request is a critical refreshAndPersist with the cookie."""
+        assert sync_request_control(b"c1") == (
+            SYNC_REQUEST_OID,
+            True,
+            bytes.fromhex("30070a01030402") + b"c1",
+        )
+        assert sync_request_control(None)[2] == bytes.fromhex("30030a0103")
+
+    def test_decode_sync_state(self):
+        """Test entry states, UUIDs and optional cookies decode."""
+        assert decode_sync_state(state_value(2, b"c2")) == ("modify", UUID, b"c2")
+        assert decode_sync_state(state_value(3)) == ("delete", UUID, None)
+
+    def test_decode_sync_info(self):
+        """Test each Sync Info choice decodes, with defaults applied."""
+        assert decode_sync_info(NEW_COOKIE) == {"type": "newcookie", "cookie": b"c3"}
+        assert decode_sync_info(REFRESH_DELETE_DONE) == {
+            "type": "refreshDelete",
+            "cookie": None,
+            "refresh_done": True,
+        }
+        assert decode_sync_info(bytes.fromhex("a20704026334010100"))["refresh_done"] is False
+        sync_id_set = bytes.fromhex("a3170101ff3112" + "0410") + UUID
+        assert decode_sync_info(sync_id_set) == {
+            "type": "syncIdSet",
+            "cookie": None,
+            "refresh_deletes": True,
+            "uuids": [UUID],
+        }
+
+
+@pytest.fixture
+def connector():
+    """Create a mock connector (its cache, indexes and snapshot are mocks too)."""
+    return Mock()
+
+
+class TestSyncReplConsumer:
+    """Test applying a recorded refreshAndPersist stream."""
+
+    def test_refresh_then_persist(self, connector, tmp_path):
+        """Test the refresh phase is applied in bulk and later changes one by one."""
+        cookie_path = str(tmp_path / "cookie")
+        consumer = SyncReplConsumer(connector, "dc=example,dc=com", cookie_path=cookie_path)
+
+        consumer.handle_message(entry("uid=a,dc=example,dc=com", 1))
+        consumer.handle_message(entry("uid=b,dc=example,dc=com", 0))
+        consumer.handle_message(entry("uid=c,dc=example,dc=com", 3))
+        connector.invalidate_cache.assert_not_called()
+        connector.snapshot.remove.assert_called_once_with("uid=c,dc=example,dc=com")
+
+        consumer.handle_message(info(REFRESH_PRESENT_DONE))
+        assert not consumer.refreshing
+        connector.invalidate_cache.assert_called_once_with()
+        connector.indexes.expire.assert_called_once_with()
+        # Deletions implied by the present phase are unknown, so resync fully
+        connector.snapshot.expire.assert_called_once_with(full=True)
+
+        connector.reset_mock()
+        connector.iter_search.return_value = [
+            {"dn": "uid=a,dc=example,dc=com", "attributes": {"uid": ["a"], "CN": ["A"]}}
+        ]
+        consumer.handle_message(entry("uid=a,dc=example,dc=com", 2, b"c2"))
+        # The receiver thread only queues the change; the consumer thread reads the entry
+        connector.iter_search.assert_not_called()
+        connector.invalidate_cache.assert_not_called()
+        consumer._apply_changes()
+        attributes = connector.invalidate_cache.call_args.kwargs["attributes"]
+        assert set(attributes) == set(CHANGE_MATCH_ATTRIBUTES)
+        assert (attributes["uid"], attributes["cn"], attributes["mail"]) == (["a"], ["A"], [])
+        # The refresh just expired everything; the change waits for the next interval
+        connector.indexes.expire.assert_not_called()
+
+        consumer.handle_message(entry("uid=b,dc=example,dc=com", 3))
+        consumer._apply_changes()
+        connector.snapshot.remove.assert_called_once_with("uid=b,dc=example,dc=com")
+        connector.invalidate_cache.assert_called_with(
+            "uid=b,dc=example,dc=com", attributes=None, deleted=True
+        )
+
+        consumer.handle_message(info(NEW_COOKIE))
+        with open(cookie_path, "rb") as cookie_file:
+            assert cookie_file.read() == b"c3"
+        stats = consumer.stats()
+        assert (stats["adds"], stats["modifies"], stats["deletes"]) == (1, 1, 2)
+
+    def test_index_expiry_is_coalesced(self, connector):
+        """Test a burst of changes expires the indexes and snapshot once per interval."""
+        consumer = SyncReplConsumer(connector, "dc=example,dc=com", expire_interval=60)
+        consumer.handle_message(info(REFRESH_DELETE_DONE))
+        connector.iter_search.return_value = []
+
+        with patch("redhat_ldap_mcp.core.syncrepl.time.monotonic", return_value=1000.0):
+            consumer.handle_message(entry("uid=a,dc=example,dc=com", 2))
+            consumer.handle_message(entry("uid=b,dc=example,dc=com", 2))
+            consumer._apply_changes()
+            consumer._flush_expiry()
+        assert connector.indexes.expire.call_count == 1
+        assert connector.invalidate_cache.call_count == 2
+
+        with patch("redhat_ldap_mcp.core.syncrepl.time.monotonic", return_value=1061.0):
+            consumer._flush_expiry()
+            consumer._flush_expiry()
+        assert connector.indexes.expire.call_count == 2
+        connector.snapshot.expire.assert_called_with(full=False)
+
+    def test_rename_invalidates_the_old_dn(self, connector):
+        """Test a modify reporting a known entryUUID under a new DN drops the old DN."""
+        consumer = SyncReplConsumer(connector, "dc=example,dc=com")
+        consumer.handle_message(entry("uid=a,dc=example,dc=com", 1))
+        consumer.handle_message(info(REFRESH_DELETE_DONE))
+        connector.reset_mock()
+        connector.iter_search.return_value = []
+
+        consumer.handle_message(entry("uid=renamed,dc=example,dc=com", 2, uuid_name="uid=a"))
+        consumer._apply_changes()
+
+        assert connector.invalidate_cache.call_args_list[0] == (
+            ("uid=a,dc=example,dc=com",),
+            {"deleted": True},
+        )
+        connector.snapshot.remove.assert_called_once_with("uid=a,dc=example,dc=com")
+        assert connector.invalidate_cache.call_args.args == ("uid=renamed,dc=example,dc=com",)
+        assert consumer.stats()["tracked_entries"] == 1
+
+    def test_resumed_session_maps_entry_uuids(self, connector, tmp_path):
+        """Test a resumed session sweeps entryUUIDs; until then unseen entries may be renames."""
+        cookie_path = tmp_path / "cookie"
+        cookie_path.write_bytes(b"c1")
+        consumer = SyncReplConsumer(connector, "dc=example,dc=com", cookie_path=str(cookie_path))
+        consumer.handle_message(info(REFRESH_DELETE_DONE))
+        connector.performance_config.index_max_entries = 100
+
+        # Before the sweep an unseen entry may have been renamed from anywhere
+        consumer.handle_message(entry("uid=b,dc=example,dc=com", 2))
+        consumer._apply_changes()
+        connector.invalidate_cache.assert_called_once_with()
+        connector.snapshot.expire.assert_called_once_with(full=True)
+
+        connector.iter_search.return_value = [
+            {
+                "dn": "uid=a,dc=example,dc=com",
+                "attributes": {"entryUUID": [str(uuid.UUID(bytes=entry_uuid("uid=a")))]},
+            }
+        ]
+        assert consumer._entry_dns_wanted
+        consumer._load_entry_dns()
+        assert connector.iter_search.call_args.kwargs["attributes"] == ["entryUUID"]
+        connector.reset_mock()
+        connector.iter_search.return_value = []
+
+        consumer.handle_message(entry("uid=renamed,dc=example,dc=com", 2, uuid_name="uid=a"))
+        consumer._apply_changes()
+        connector.snapshot.remove.assert_called_once_with("uid=a,dc=example,dc=com")
+        assert connector.invalidate_cache.call_count == 2
+
+    def test_refresh_without_changes_keeps_caches(self, connector):
+        """Test a resumed session whose refresh found nothing invalidates nothing."""
+        consumer = SyncReplConsumer(connector, "dc=example,dc=com")
+
+        consumer.handle_message(info(REFRESH_DELETE_DONE))
+
+        connector.invalidate_cache.assert_not_called()
+        connector.indexes.expire.assert_not_called()
+
+    def test_cookie_is_resumed_and_dropped_on_refresh_required(self, connector, tmp_path):
+        """Test a restarted consumer sends its saved cookie until the server rejects it."""
+        cookie_path = tmp_path / "cookie"
+        cookie_path.write_bytes(b"c1")
+        consumer = SyncReplConsumer(connector, "dc=example,dc=com", cookie_path=str(cookie_path))
+
+        connection = MagicMock()
+        connection.strategy.async_lock = threading.Lock()
+        connection.closed = False
+        connection.search.side_effect = lambda **kwargs: consumer.handle_message(
+            {"type": "searchResDone", "result": SYNC_REFRESH_REQUIRED}
+        )
+        connector.open_stream_connection.return_value = connection
+        consumer._consume()
+
+        control = connection.search.call_args.kwargs["controls"][0]
+        assert control == sync_request_control(b"c1")
+        assert connection.strategy.callback == consumer.handle_message
+        connection.unbind.assert_called_once()
+        assert consumer.cookie is None
+        assert cookie_path.read_bytes() == b""
+
+    def test_dropped_connection_is_retried(self, connector):
+        """Test the background thread reconnects after the stream fails."""
+        connected = threading.Event()
+        attempts = []
+
+        def open_stream_connection():
+            attempts.append(1)
+            if len(attempts) == 2:
+                connected.set()
+            raise OSError("connection refused")
+
+        connector.open_stream_connection.side_effect = open_stream_connection
+        consumer = SyncReplConsumer(connector, "dc=example,dc=com", reconnect_delay=0.01)
+
+        consumer.start()
+        assert connected.wait(2)
+        consumer.stop()
+
+        assert consumer.stats()["reconnects"] >= 1